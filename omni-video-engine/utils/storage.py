@@ -1,7 +1,7 @@
 import os
 import uuid
 from pathlib import Path
-from typing import List, Any
+from typing import Any, Iterable
 
 import imageio.v2 as imageio
 
@@ -27,19 +27,38 @@ def _normalize_frame(frame: Any):
 
     raise TypeError(f"Unsupported frame type for video encoding: {type(frame)!r}")
 
-def save_video(frames: List[Any], fps: int = 12) -> str:
+def _as_array(frame: Any):
+    if hasattr(frame, "convert"):
+        import numpy as np
+
+        return np.asarray(frame)
+    if isinstance(frame, bytes):
+        return imageio.imread(frame)
+    return frame
+
+def save_video(frames: Iterable[Any], fps: int = 12) -> str:
     """
     Encode a sequence of frames into an MP4 file and return the relative URL path.
-    """
-    if not frames:
-        raise ValueError("Cannot save video: no frames provided")
 
+    Frames are appended to the encoder one at a time, so a generator keeps at most one
+    decoded frame alive instead of materialising the whole clip.
+    """
     Path(EXPORT_DIR).mkdir(parents=True, exist_ok=True)
     filename = f"omni_video_{uuid.uuid4().hex}.mp4"
     output_path = Path(EXPORT_DIR) / filename
 
-    normalized_frames = [_normalize_frame(f) for f in frames]
-    imageio.mimsave(output_path, normalized_frames, fps=fps)
+    written = 0
+    writer = imageio.get_writer(output_path, fps=fps)
+    try:
+        for frame in frames:
+            writer.append_data(_as_array(_normalize_frame(frame)))
+            written += 1
+    finally:
+        writer.close()
+
+    if not written:
+        output_path.unlink(missing_ok=True)
+        raise ValueError("Cannot save video: no frames provided")
 
     # This path is served by StaticFiles("/omni_video_exports") in omni_media.http_fastapi
     return f"/omni_video_exports/{filename}"
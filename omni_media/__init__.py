@@ -4,16 +4,38 @@ from .contracts import (
     MediaOutput,
     VideoObject,
     ImageObject,
+    FrameBuffer,
 )
 from .model_registry import ModelRegistry, ModelProfile
 from .engine import OmniMediaEngine
+from .client_pool import ModelClientPool
+from .warmup import ModelWarmup
 from .pipeline import OmniMediaPipeline
+from .result_cache import GenerationResultCache
+from .gif_encoder import GifEncoder, GifEncoderSettings
+from .watermark import FrameWatermarker
+from .budget_encoder import BudgetUnreachableError, GifBudgetEncoder, Mp4BudgetEncoder
+from .video_encoder import EncoderSettings, StreamingVideoWriter, concat_segments
 from .service import OmniMediaService, InMemoryJobStore, JobRecord
-from .storage import StorageAdapter, LocalFileStorageAdapter, S3LikeStorageAdapter
-from .http_fastapi import create_fastapi_app
+from .sqlite_jobs import SQLiteJobQueue, SQLiteJobStore, create_job_backends_from_env
+from .worker import InMemoryJobQueue, Job, OmniMediaWorker, OmniMediaWorkerPool
+from .executor import ExecutorSaturatedError, ModalityExecutorPool
+from .storage import (
+    StorageAdapter,
+    LocalFileStorageAdapter,
+    S3LikeStorageAdapter,
+    UploadItem,
+    WriteBehindFileStorageAdapter,
+    create_storage_from_env,
+)
+from .content_store import ContentAddressedStorageAdapter
+from .media_delivery import MediaDelivery
+from .retention import RetentionRule, RetentionSweeper
 from .hooks import DefaultMediaHooks, MediaPolicyError
 from .security import (
     ApiKeyAuth,
+    ApiKeyIdentity,
+    ApiKeyRegistry,
     AuthError,
     InMemoryRateLimiter,
     RateLimitError,
@@ -21,6 +43,7 @@ from .security import (
     create_rate_limiter_from_env,
     load_rate_limits_from_env,
 )
+from .cost_budget import BudgetExceededError, CostBudget, estimate_request_cost
 from .audit import AuditLogger
 
 __all__ = [
@@ -29,25 +52,69 @@ __all__ = [
     "MediaOutput",
     "VideoObject",
     "ImageObject",
+    "FrameBuffer",
     "ModelRegistry",
     "ModelProfile",
     "OmniMediaEngine",
+    "ModelClientPool",
+    "ModelWarmup",
     "OmniMediaPipeline",
+    "GenerationResultCache",
+    "FrameWatermarker",
+    "GifEncoder",
+    "GifEncoderSettings",
+    "EncoderSettings",
+    "GifBudgetEncoder",
+    "Mp4BudgetEncoder",
+    "BudgetUnreachableError",
+    "StreamingVideoWriter",
+    "concat_segments",
     "OmniMediaService",
     "InMemoryJobStore",
     "JobRecord",
+    "SQLiteJobQueue",
+    "SQLiteJobStore",
+    "create_job_backends_from_env",
+    "InMemoryJobQueue",
+    "Job",
+    "OmniMediaWorker",
+    "OmniMediaWorkerPool",
+    "ModalityExecutorPool",
+    "ExecutorSaturatedError",
     "StorageAdapter",
     "LocalFileStorageAdapter",
     "S3LikeStorageAdapter",
+    "ContentAddressedStorageAdapter",
+    "MediaDelivery",
+    "RetentionRule",
+    "RetentionSweeper",
+    "WriteBehindFileStorageAdapter",
+    "UploadItem",
+    "create_storage_from_env",
     "create_fastapi_app",
     "DefaultMediaHooks",
     "MediaPolicyError",
     "ApiKeyAuth",
+    "ApiKeyIdentity",
+    "ApiKeyRegistry",
     "AuthError",
     "InMemoryRateLimiter",
     "RedisRateLimiter",
     "RateLimitError",
     "create_rate_limiter_from_env",
     "load_rate_limits_from_env",
+    "BudgetExceededError",
+    "CostBudget",
+    "estimate_request_cost",
     "AuditLogger",
 ]
+
+
+def __getattr__(name: str):
+    # The FastAPI app pulls in fastapi/starlette, so it is only imported on first use; offline tools
+    # such as `python -m omni_media.batch_planner` and their pool workers import this package too.
+    if name == "create_fastapi_app":
+        from .http_fastapi import create_fastapi_app
+
+        return create_fastapi_app
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -0,0 +1,295 @@
+from __future__ import annotations
+
+import argparse
+import importlib
+import itertools
+import json
+import os
+import sys
+import time
+from array import array
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from dataclasses import dataclass, field, fields
+from typing import IO, Any, Iterable, Iterator
+
+from .video_prompt_planner import (
+    _FEATURE_DEFAULTS,
+    _FEATURE_PHRASES,
+    VideoPromptPlan,
+    _build_plan,
+    _compile_shot_prompt,
+    _normalize_prompt,
+)
+
+# Style, motion and camera are stored as small codes into these tuples instead of repeated strings.
+CATEGORIES: dict[str, tuple[str, ...]] = {
+    kind: (default, *dict.fromkeys(value for phrase_kind, value, _ in _FEATURE_PHRASES if phrase_kind == kind))
+    for kind, default in _FEATURE_DEFAULTS.items()
+}
+_CODES = {kind: {value: code for code, value in enumerate(values)} for kind, values in CATEGORIES.items()}
+
+
+@dataclass(slots=True)
+class PlanColumns:
+    # One entry per prompt.
+    ids: list[str] = field(default_factory=list)
+    scene_count: array = field(default_factory=lambda: array("H"))
+    fps: array = field(default_factory=lambda: array("H"))
+    total_frames: array = field(default_factory=lambda: array("I"))
+    duration_sec: array = field(default_factory=lambda: array("d"))
+    style: array = field(default_factory=lambda: array("B"))
+    motion: array = field(default_factory=lambda: array("B"))
+    camera: array = field(default_factory=lambda: array("B"))
+    grounding_score: array = field(default_factory=lambda: array("d"))
+    # Prompt i owns scenes scene_offsets[i]:scene_offsets[i + 1] of the per-scene columns.
+    scene_offsets: array = field(default_factory=lambda: array("I", [0]))
+    scene_text: list[str] = field(default_factory=list)
+    scene_duration_sec: array = field(default_factory=lambda: array("d"))
+    scene_start_frame: array = field(default_factory=lambda: array("I"))
+    scene_frame_count: array = field(default_factory=lambda: array("I"))
+    # Row index -> error message for prompts that could not be planned; their numeric columns are zero.
+    errors: dict[int, str] = field(default_factory=dict)
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def append(self, plan_id: str, plan: VideoPromptPlan) -> None:
+        self.ids.append(plan_id)
+        self.scene_count.append(plan.scene_count)
+        self.fps.append(plan.fps)
+        self.total_frames.append(plan.total_frames)
+        self.duration_sec.append(plan.total_duration_sec)
+        self.style.append(_CODES["style"][plan.style_preset])
+        self.motion.append(_CODES["motion"][plan.motion_profile])
+        self.camera.append(_CODES["camera"][plan.camera_profile])
+        self.grounding_score.append(plan.grounding_score)
+        for scene in plan.scenes:
+            self.scene_text.append(scene.text)
+            self.scene_duration_sec.append(scene.duration_sec)
+            self.scene_start_frame.append(scene.start_frame)
+            self.scene_frame_count.append(scene.frame_count)
+        self.scene_offsets.append(len(self.scene_text))
+
+    def append_error(self, plan_id: str, message: str) -> None:
+        self.errors[len(self.ids)] = message
+        self.ids.append(plan_id)
+        for column in (self.scene_count, self.fps, self.total_frames, self.style, self.motion, self.camera):
+            column.append(0)
+        self.duration_sec.append(0.0)
+        self.grounding_score.append(0.0)
+        self.scene_offsets.append(len(self.scene_text))
+
+    def row(self, index: int) -> dict[str, Any]:
+        if index in self.errors:
+            return {"id": self.ids[index], "error": self.errors[index]}
+        style = CATEGORIES["style"][self.style[index]]
+        motion = CATEGORIES["motion"][self.motion[index]]
+        camera = CATEGORIES["camera"][self.camera[index]]
+        start, end = self.scene_offsets[index], self.scene_offsets[index + 1]
+        return {
+            "id": self.ids[index],
+            "scene_count": self.scene_count[index],
+            "fps": self.fps[index],
+            "total_frames": self.total_frames[index],
+            "duration_sec": self.duration_sec[index],
+            "style_preset": style,
+            "motion_profile": motion,
+            "camera_profile": camera,
+            "grounding_score": self.grounding_score[index],
+            "scenes": [
+                {
+                    "index": slot - start + 1,
+                    "text": self.scene_text[slot],
+                    "duration_sec": self.scene_duration_sec[slot],
+                    "start_frame": self.scene_start_frame[slot],
+                    "frame_count": self.scene_frame_count[slot],
+                    # Shot prompts are derived from the text and profile, so they are not stored.
+                    "shot_prompt": _compile_shot_prompt(self.scene_text[slot], style, motion, camera),
+                }
+                for slot in range(start, end)
+            ],
+        }
+
+    def to_dict(self) -> dict[str, Any]:
+        columns: dict[str, Any] = {"rows": len(self), "categories": CATEGORIES}
+        for column in fields(self):
+            name, value = column.name, getattr(self, column.name)
+            if name == "errors":
+                value = {str(row): message for row, message in value.items()}
+            columns[name] = value.tolist() if isinstance(value, array) else value
+        return columns
+
+
+def _plan_chunk(records: list[tuple[str, str]]) -> PlanColumns:
+    # Runs in the pool workers. The planner's patterns and feature tables are compiled once per process
+    # at import, and results cross the process boundary as a handful of flat arrays, not plan objects.
+    columns = PlanColumns()
+    for plan_id, prompt in records:
+        try:
+            columns.append(plan_id, _build_plan(prompt, _normalize_prompt(prompt)))
+        except ValueError as exc:
+            columns.append_error(plan_id, str(exc))
+    return columns
+
+
+def _chunked(records: Iterable[tuple[str, str]], chunk_size: int) -> Iterator[list[tuple[str, str]]]:
+    iterator = iter(records)
+    while chunk := list(itertools.islice(iterator, chunk_size)):
+        yield chunk
+
+
+def plan_batch(
+    records: Iterable[tuple[str, str]],
+    workers: int | None = None,
+    chunk_size: int = 256,
+    max_in_flight: int | None = None,
+) -> Iterator[PlanColumns]:
+    # Yields one PlanColumns per chunk in input order; at most max_in_flight chunks are buffered so
+    # arbitrarily large inputs stream through in bounded memory.
+    workers = max(1, int(workers or os.cpu_count() or 1))
+    chunks = _chunked(records, max(1, int(chunk_size)))
+    if workers == 1:
+        yield from map(_plan_chunk, chunks)
+        return
+
+    in_flight = max(1, int(max_in_flight or workers * 2))
+    executor = ProcessPoolExecutor(max_workers=workers)
+    pending: deque[Future[PlanColumns]] = deque()
+    try:
+        for chunk in chunks:
+            pending.append(executor.submit(_plan_chunk, chunk))
+            if len(pending) >= in_flight:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
+    finally:
+        executor.shutdown(wait=True, cancel_futures=True)
+
+
+def read_jsonl(stream: IO[str]) -> Iterator[tuple[str, str]]:
+    # Each line is either a JSON string prompt or an object with "prompt" and an optional "id".
+    for line_number, line in enumerate(stream, start=1):
+        if not line.strip():
+            continue
+        try:
+            record = json.loads(line)
+        except json.JSONDecodeError as exc:
+            raise ValueError(f"line {line_number}: invalid JSON ({exc.msg})") from exc
+        if isinstance(record, str):
+            yield str(line_number), record
+        elif isinstance(record, dict) and isinstance(record.get("prompt"), str):
+            yield str(record.get("id", line_number)), record["prompt"]
+        else:
+            raise ValueError(f"line {line_number}: expected a prompt string or an object with a 'prompt' field")
+
+
+class _ParquetWriter:
+    def __init__(self, path: str) -> None:
+        try:
+            self._pa = importlib.import_module("pyarrow")
+            self._pq = importlib.import_module("pyarrow.parquet")
+        except Exception as exc:
+            raise RuntimeError("pyarrow is required for parquet batch plan output") from exc
+        self._path = path
+        self._writer: Any = None
+
+    def write(self, columns: PlanColumns) -> None:
+        pa = self._pa
+        offsets = pa.array(columns.scene_offsets, type=pa.int32())
+
+        def scenes(values: Any, kind: Any) -> Any:
+            return pa.ListArray.from_arrays(offsets, pa.array(values, type=kind))
+
+        table = pa.table(
+            {
+                "id": pa.array(columns.ids, type=pa.string()),
+                "error": pa.array([columns.errors.get(row) for row in range(len(columns))], type=pa.string()),
+                "scene_count": pa.array(columns.scene_count, type=pa.uint16()),
+                "fps": pa.array(columns.fps, type=pa.uint16()),
+                "total_frames": pa.array(columns.total_frames, type=pa.uint32()),
+                "duration_sec": pa.array(columns.duration_sec, type=pa.float64()),
+                "style_preset": pa.DictionaryArray.from_arrays(
+                    pa.array(columns.style, type=pa.uint8()), pa.array(CATEGORIES["style"])
+                ),
+                "motion_profile": pa.DictionaryArray.from_arrays(
+                    pa.array(columns.motion, type=pa.uint8()), pa.array(CATEGORIES["motion"])
+                ),
+                "camera_profile": pa.DictionaryArray.from_arrays(
+                    pa.array(columns.camera, type=pa.uint8()), pa.array(CATEGORIES["camera"])
+                ),
+                "grounding_score": pa.array(columns.grounding_score, type=pa.float64()),
+                "scene_text": scenes(columns.scene_text, pa.string()),
+                "scene_duration_sec": scenes(columns.scene_duration_sec, pa.float64()),
+                "scene_start_frame": scenes(columns.scene_start_frame, pa.uint32()),
+                "scene_frame_count": scenes(columns.scene_frame_count, pa.uint32()),
+            }
+        )
+        if self._writer is None:
+            self._writer = self._pq.ParquetWriter(self._path, table.schema)
+        self._writer.write_table(table)
+
+    def close(self) -> None:
+        if self._writer is not None:
+            self._writer.close()
+
+
+def write_batches(batches: Iterable[PlanColumns], output: str, fmt: str = "jsonl") -> dict[str, Any]:
+    # "jsonl" writes one columnar object per chunk; "parquet" writes one row group per chunk.
+    started = time.perf_counter()
+    stats = {"prompts": 0, "scenes": 0, "errors": 0, "chunks": 0}
+    if fmt == "parquet":
+        if output == "-":
+            raise ValueError("parquet output needs a file path")
+        writer = _ParquetWriter(output)
+        sink: IO[str] | None = None
+    elif fmt == "jsonl":
+        writer = None
+        sink = sys.stdout if output == "-" else open(output, "w", encoding="utf-8")
+    else:
+        raise ValueError(f"unsupported batch plan format: {fmt}")
+
+    try:
+        for columns in batches:
+            if writer is not None:
+                writer.write(columns)
+            elif sink is not None:
+                sink.write(json.dumps(columns.to_dict(), separators=(",", ":"), ensure_ascii=False))
+                sink.write("\n")
+            stats["prompts"] += len(columns)
+            stats["scenes"] += len(columns.scene_text)
+            stats["errors"] += len(columns.errors)
+            stats["chunks"] += 1
+    finally:
+        if writer is not None:
+            writer.close()
+        if sink is not None and sink is not sys.stdout:
+            sink.close()
+
+    elapsed = time.perf_counter() - started
+    stats["elapsed_sec"] = round(elapsed, 3)
+    stats["prompts_per_sec"] = round(stats["prompts"] / elapsed, 1) if elapsed > 0 else None
+    return stats
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description="Plan storyboard prompts from JSONL into columnar scene plans.")
+    parser.add_argument("input", help="JSONL file of prompts, or - for stdin")
+    parser.add_argument("-o", "--output", default="-", help="output path, or - for stdout (jsonl only)")
+    parser.add_argument("--format", choices=("jsonl", "parquet"), default="jsonl")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--chunk-size", type=int, default=256)
+    args = parser.parse_args(argv)
+
+    source = sys.stdin if args.input == "-" else open(args.input, encoding="utf-8")
+    try:
+        batches = plan_batch(read_jsonl(source), workers=args.workers, chunk_size=args.chunk_size)
+        stats = write_batches(batches, args.output, args.format)
+    finally:
+        if source is not sys.stdin:
+            source.close()
+    print(json.dumps(stats), file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
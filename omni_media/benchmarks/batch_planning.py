@@ -0,0 +1,62 @@
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import time
+from typing import Any
+
+from ..batch_planner import plan_batch
+from ..video_prompt_planner import build_video_prompt_plan
+from .prompt_planning import sample_prompts
+
+
+def _records(count: int) -> list[tuple[str, str]]:
+    # An offline backlog is mostly short prompts with a tail of long storyboards.
+    sets = sample_prompts(max(1, count // 4))
+    prompts = sets["short"] * 2 + sets["storyboard_2kb"] + sets["chained_8kb"]
+    return [(str(index), prompt) for index, prompt in enumerate(prompts[:count])]
+
+
+def _worker_counts(limit: int) -> list[int]:
+    counts = [1]
+    while counts[-1] * 2 <= limit:
+        counts.append(counts[-1] * 2)
+    if counts[-1] != limit:
+        counts.append(limit)
+    return counts
+
+
+def run(count: int, max_workers: int, chunk_size: int) -> dict[str, Any]:
+    records = _records(count)
+
+    started = time.perf_counter()
+    for _, prompt in records:
+        build_video_prompt_plan(prompt)
+    single_sec = time.perf_counter() - started
+
+    results: dict[str, Any] = {
+        "per_call": {"prompts_per_sec": round(len(records) / single_sec, 1)},
+    }
+    for workers in _worker_counts(max_workers):
+        started = time.perf_counter()
+        planned = sum(len(columns) for columns in plan_batch(records, workers=workers, chunk_size=chunk_size))
+        elapsed = time.perf_counter() - started
+        results[f"workers_{workers}"] = {
+            "prompts_per_sec": round(planned / elapsed, 1),
+            "speedup_vs_per_call": round(single_sec / elapsed, 2),
+        }
+    return {"prompts": len(records), "cpu_count": os.cpu_count(), "chunk_size": chunk_size, "results": results}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Batch planner throughput (prompts/sec) against worker count.")
+    parser.add_argument("--count", type=int, default=20000)
+    parser.add_argument("--max-workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--chunk-size", type=int, default=256)
+    args = parser.parse_args()
+    print(json.dumps(run(args.count, args.max_workers, args.chunk_size), indent=2))
+
+
+if __name__ == "__main__":
+    main()
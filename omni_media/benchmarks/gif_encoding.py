@@ -0,0 +1,86 @@
+from __future__ import annotations
+
+import argparse
+import io
+import json
+import time
+from typing import Any, Callable
+
+from ..contracts import FrameBuffer
+from ..gif_encoder import GifEncoder, GifEncoderSettings
+
+
+def synthetic_clip(frame_count: int = 48, width: int = 512, height: int = 512, fps: int = 12) -> FrameBuffer:
+    import numpy as np
+
+    buffer = FrameBuffer.allocate(frame_count, height, width, fps=fps)
+    rows = np.linspace(0, 255, height, dtype=np.float32)[:, None]
+    cols = np.linspace(0, 255, width, dtype=np.float32)[None, :]
+    yy, xx = np.mgrid[0:height, 0:width]
+    radius = min(width, height) // 8
+    for index in range(frame_count):
+        t = index / max(1, frame_count - 1)
+        frame = buffer.data[index]
+        frame[..., 0] = rows.astype(np.uint8)
+        frame[..., 1] = cols.astype(np.uint8)
+        frame[..., 2] = np.uint8(96)
+        cx = int((0.15 + 0.7 * t) * width)
+        cy = int((0.3 + 0.4 * (1 - t)) * height)
+        frame[(xx - cx) ** 2 + (yy - cy) ** 2 <= radius * radius] = (250, 240, 40)
+    return buffer
+
+
+def encode_with_pil(buffer: FrameBuffer, loop: int = 0) -> bytes:
+    from PIL import Image
+
+    frames = [Image.fromarray(frame) for frame in buffer]
+    output = io.BytesIO()
+    frames[0].save(
+        output,
+        format="GIF",
+        save_all=True,
+        append_images=frames[1:],
+        duration=int(1000 / max(1, buffer.fps)),
+        loop=loop,
+        optimize=True,
+    )
+    return output.getvalue()
+
+
+def _measure(encode: Callable[[], bytes], repeats: int) -> dict[str, Any]:
+    timings = []
+    size = 0
+    for _ in range(max(1, repeats)):
+        started = time.perf_counter()
+        size = len(encode())
+        timings.append(time.perf_counter() - started)
+    return {"encode_ms": round(min(timings) * 1000, 2), "bytes": size}
+
+
+def run(frame_count: int, width: int, height: int, repeats: int) -> dict[str, Any]:
+    buffer = synthetic_clip(frame_count, width, height)
+    variants: dict[str, Callable[[], bytes]] = {
+        "pil_optimize": lambda: encode_with_pil(buffer),
+        "vectorized": lambda: GifEncoder(GifEncoderSettings()).encode(buffer),
+        "vectorized_dither": lambda: GifEncoder(GifEncoderSettings(dither=True)).encode(buffer),
+        "vectorized_half_fps_256": lambda: GifEncoder(GifEncoderSettings(target_fps=6, max_side=256)).encode(buffer),
+    }
+    return {
+        "frames": frame_count,
+        "resolution": f"{width}x{height}",
+        "results": {name: _measure(encode, repeats) for name, encode in variants.items()},
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Compare the PIL GIF path against the vectorized encoder.")
+    parser.add_argument("--frames", type=int, default=48)
+    parser.add_argument("--width", type=int, default=512)
+    parser.add_argument("--height", type=int, default=512)
+    parser.add_argument("--repeats", type=int, default=3)
+    args = parser.parse_args()
+    print(json.dumps(run(args.frames, args.width, args.height, args.repeats), indent=2))
+
+
+if __name__ == "__main__":
+    main()
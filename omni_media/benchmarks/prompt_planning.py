@@ -0,0 +1,245 @@
+from __future__ import annotations
+
+import argparse
+import json
+import random
+import re
+import time
+from typing import Any, Callable
+
+from ..video_prompt_planner import (
+    SceneSpec,
+    VideoPromptPlan,
+    _allocate_scene_frames,
+    _compile_shot_prompt,
+    _duration_distribution,
+    build_video_prompt_plan,
+)
+
+# The multi-pass planner that the single-pass lexer replaced, kept as the baseline for timings and
+# for checking that both produce identical plans.
+_LEGACY_SPLIT_PATTERN = re.compile(
+    r"(?:\n\s*scene\s*\d+[:\-]|\n\s*\d+[\)\.]\s+|\n\s*[-*]\s+|\s+then\s+|\s+next\s+|\s+cut\s+to\s+)", re.IGNORECASE
+)
+_LEGACY_MARKER_PATTERN = re.compile(r"\bscene\s*\d+\s*[:\-]", re.IGNORECASE)
+_LEGACY_STOP = {
+    "the", "and", "with", "into", "from", "that", "this", "then", "next", "scene", "video",
+    "make", "create", "generate", "show", "shot", "shots", "camera", "style", "motion", "slow",
+    "fast", "for", "of", "in", "on", "at", "to", "a", "an",
+}
+
+_SUBJECTS = [
+    "a lighthouse keeper", "two foxes", "a cyberpunk courier", "an old fishing boat", "a paper lantern",
+    "the harbor crowd", "a lone hiker", "rain-soaked neon signs", "a child's red kite", "the night train",
+]
+_ACTIONS = [
+    "walks along the cliff edge", "races through the market", "drifts over the black and white bay",
+    "pauses under a flickering streetlight", "climbs the spiral stairs", "circles the old clock tower",
+    "splashes through puddles", "watches the storm roll in", "turns toward the camera", "fades into fog",
+]
+_DETAILS = [
+    "in slow motion", "with an aerial drone sweep", "as a close up on wet stone", "under a wide establishing shot",
+    "with dramatic cinematic lighting", "in a high energy chase", "with bird's eye framing", "lit by sci-fi holograms",
+    "at golden hour", "while snow falls softly",
+]
+
+
+def _legacy_normalize(prompt: str) -> str:
+    return re.sub(r"\s+", " ", str(prompt or "").strip())
+
+
+def _legacy_style_profile(prompt: str) -> tuple[str, str, str]:
+    lower = prompt.lower()
+
+    style = "natural"
+    if re.search(r"\b(cinematic|film|movie|dramatic|epic|anamorphic)\b", lower):
+        style = "cinematic"
+    elif re.search(r"\b(anime|cartoon|pixar|stylized|illustrated)\b", lower):
+        style = "stylized"
+    elif re.search(r"\b(noir|monochrome|black\s*and\s*white|gritty)\b", lower):
+        style = "noir"
+    elif re.search(r"\b(neon|cyberpunk|sci[-\s]?fi|futuristic)\b", lower):
+        style = "neon"
+
+    motion = "normal"
+    if re.search(r"\b(slow\s*motion|slow-mo|dramatic\s*slow)\b", lower):
+        motion = "slow"
+    elif re.search(r"\b(fast|action|chase|dynamic|high\s*energy)\b", lower):
+        motion = "fast"
+
+    camera = "standard"
+    if re.search(r"\b(aerial|drone|overhead|bird'?s\s*eye)\b", lower):
+        camera = "aerial"
+    elif re.search(r"\b(close\s*up|macro|portrait)\b", lower):
+        camera = "close-up"
+    elif re.search(r"\b(wide|landscape|establishing\s*shot)\b", lower):
+        camera = "wide"
+
+    return style, motion, camera
+
+
+def _legacy_grounding_tokens(prompt: str) -> list[str]:
+    unique: list[str] = []
+    for token in re.findall(r"\b[a-zA-Z][a-zA-Z'-]{2,}\b", prompt.lower()):
+        if token in _LEGACY_STOP:
+            continue
+        if token not in unique:
+            unique.append(token)
+        if len(unique) >= 12:
+            break
+    return unique
+
+
+def _legacy_split_scenes(prompt: str) -> list[str]:
+    markers = list(_LEGACY_MARKER_PATTERN.finditer(prompt))
+    if markers:
+        parts: list[str] = []
+        for index, marker in enumerate(markers):
+            end = markers[index + 1].start() if index + 1 < len(markers) else len(prompt)
+            chunk = prompt[marker.end() : end].strip(" ,.-")
+            if chunk:
+                parts.append(chunk)
+        if parts:
+            return parts[:8]
+
+    chunks = [part.strip(" ,.-") for part in _LEGACY_SPLIT_PATTERN.split(prompt) if part and part.strip(" ,.-")]
+    if not chunks:
+        return [prompt]
+    if len(chunks) == 1:
+        return chunks
+
+    merged: list[str] = []
+    for chunk in chunks:
+        if len(chunk.split()) < 4 and merged:
+            merged[-1] = f"{merged[-1]}, {chunk}".strip()
+        else:
+            merged.append(chunk)
+    return merged[:8]
+
+
+def _legacy_duration_sec(prompt: str, scene_count: int) -> float:
+    words = len(re.findall(r"\b\w+\b", prompt))
+    base = 5.0 if words <= 12 else 10.0 if words <= 40 else 18.0 if words <= 100 else 28.0
+    return max(4.0, min(60.0, base + max(0, scene_count - 1) * 2.5))
+
+
+def legacy_build_plan(prompt: str) -> VideoPromptPlan:
+    normalized = _legacy_normalize(prompt)
+    if not normalized:
+        raise ValueError("prompt is required")
+
+    style, motion, camera = _legacy_style_profile(normalized)
+    scene_texts = _legacy_split_scenes(normalized)
+    duration_sec = _legacy_duration_sec(normalized, len(scene_texts))
+    per_scene = _duration_distribution(duration_sec, len(scene_texts))
+    fps = 10 if motion == "slow" else 16 if motion == "fast" else 12
+    total_frames = max(16, int(round(duration_sec * fps)))
+    frame_allocations = _allocate_scene_frames(per_scene, total_frames)
+
+    scenes: list[SceneSpec] = []
+    cursor_frame = 0
+    for index, text in enumerate(scene_texts, start=1):
+        frame_count = frame_allocations[index - 1]
+        end_frame = max(cursor_frame, cursor_frame + frame_count - 1)
+        scenes.append(
+            SceneSpec(
+                index=index,
+                text=text,
+                duration_sec=per_scene[index - 1],
+                shot_prompt=_compile_shot_prompt(text, style, motion, camera),
+                start_sec=cursor_frame / max(1, fps),
+                end_sec=(end_frame + 1) / max(1, fps),
+                frame_count=frame_count,
+                start_frame=cursor_frame,
+                end_frame=end_frame,
+            )
+        )
+        cursor_frame = end_frame + 1
+
+    grounding_tokens = _legacy_grounding_tokens(normalized)
+    compiled_text = " ".join(scene.shot_prompt.lower() for scene in scenes)
+    hits = sum(1 for token in grounding_tokens if token in compiled_text)
+    grounding_score = (hits / len(grounding_tokens)) if grounding_tokens else 1.0
+
+    return VideoPromptPlan(
+        original_prompt=str(prompt),
+        normalized_prompt=normalized,
+        scene_count=len(scenes),
+        total_duration_sec=duration_sec,
+        fps=fps,
+        total_frames=total_frames,
+        style_preset=style,
+        motion_profile=motion,
+        camera_profile=camera,
+        scenes=tuple(scenes),
+        grounding_tokens=tuple(grounding_tokens),
+        grounding_score=round(max(0.0, min(1.0, grounding_score)), 3),
+    )
+
+
+def short_prompt(rng: random.Random) -> str:
+    return f"{rng.choice(_SUBJECTS)} {rng.choice(_ACTIONS)} {rng.choice(_DETAILS)}"
+
+
+def storyboard_prompt(rng: random.Random, target_bytes: int = 4096, markers: bool = True) -> str:
+    # Storyboards either use "Scene N:" headings or chain shots with "then" / "cut to".
+    pieces: list[str] = []
+    size = 0
+    index = 1
+    while size < target_bytes:
+        sentence = f"{rng.choice(_SUBJECTS)} {rng.choice(_ACTIONS)} {rng.choice(_DETAILS)}, {rng.choice(_DETAILS)}."
+        if markers:
+            piece = f"Scene {index}: {sentence}"
+        else:
+            piece = sentence if index == 1 else f"{rng.choice(['then', 'next', 'cut to'])} {sentence}"
+        pieces.append(piece)
+        size += len(piece) + 1
+        index += 1
+    return " ".join(pieces)
+
+
+def sample_prompts(count: int, seed: int = 7) -> dict[str, list[str]]:
+    rng = random.Random(seed)
+    return {
+        "short": [short_prompt(rng) for _ in range(count)],
+        "storyboard_2kb": [storyboard_prompt(rng, 2048) for _ in range(count)],
+        "storyboard_8kb": [storyboard_prompt(rng, 8192) for _ in range(count)],
+        "chained_8kb": [storyboard_prompt(rng, 8192, markers=False) for _ in range(count)],
+    }
+
+
+def _measure(build: Callable[[str], VideoPromptPlan], prompts: list[str], repeats: int) -> float:
+    timings = []
+    for _ in range(max(1, repeats)):
+        started = time.perf_counter()
+        for prompt in prompts:
+            build(prompt)
+        timings.append(time.perf_counter() - started)
+    return round(min(timings) / len(prompts) * 1_000_000, 1)
+
+
+def run(count: int, repeats: int) -> dict[str, Any]:
+    results: dict[str, Any] = {}
+    for name, prompts in sample_prompts(count).items():
+        legacy_us = _measure(legacy_build_plan, prompts, repeats)
+        lexer_us = _measure(build_video_prompt_plan, prompts, repeats)
+        results[name] = {
+            "avg_bytes": round(sum(len(prompt) for prompt in prompts) / len(prompts)),
+            "legacy_us": legacy_us,
+            "lexer_us": lexer_us,
+            "speedup": round(legacy_us / lexer_us, 2) if lexer_us else None,
+            "identical": all(legacy_build_plan(prompt) == build_video_prompt_plan(prompt) for prompt in prompts),
+        }
+    return {"prompts_per_set": count, "results": results}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Compare the multi-pass prompt planner against the single-pass lexer.")
+    parser.add_argument("--count", type=int, default=200)
+    parser.add_argument("--repeats", type=int, default=5)
+    args = parser.parse_args()
+    print(json.dumps(run(args.count, args.repeats), indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+from __future__ import annotations
+
+import argparse
+import json
+import threading
+import time
+from collections import defaultdict, deque
+from typing import Any, Callable
+
+from ..security import InMemoryRateLimiter, RateLimitError
+
+
+class LegacyDequeLimiter:
+    # The per-key timestamp deque limiter GCRA replaced, behind one global lock so it is thread-safe.
+    def __init__(self, default_limit: int, default_window_sec: int) -> None:
+        self.default_limit = default_limit
+        self.default_window_sec = default_window_sec
+        self._events: dict[str, deque[float]] = defaultdict(deque)
+        self._lock = threading.Lock()
+
+    def check(self, key: str, limit: int | None = None, window_sec: int | None = None) -> None:
+        use_limit = int(limit or self.default_limit)
+        use_window = int(window_sec or self.default_window_sec)
+        with self._lock:
+            now = time.monotonic()
+            events = self._events[key]
+            while events and events[0] < now - use_window:
+                events.popleft()
+            if len(events) >= use_limit:
+                raise RateLimitError(f"Rate limit exceeded ({use_limit}/{use_window}s)")
+            events.append(now)
+
+
+def _hammer(limiter: Any, keys: Callable[[int, int], str], thread_index: int, checks: int) -> None:
+    check = limiter.check
+    for index in range(checks):
+        try:
+            check(keys(thread_index, index))
+        except RateLimitError:
+            pass
+
+
+def _run_threads(limiter: Any, keys: Callable[[int, int], str], threads: int, checks: int) -> float:
+    workers = [threading.Thread(target=_hammer, args=(limiter, keys, i, checks)) for i in range(threads)]
+    started = time.perf_counter()
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+    return round(threads * checks / (time.perf_counter() - started))
+
+
+def run(checks: int, thread_counts: list[int]) -> dict[str, Any]:
+    # "hot_key" hammers one key that is over its limit, "distinct_keys" is a flood of fresh
+    # x-forwarded-for values that the old limiter kept forever.
+    scenarios: dict[str, Callable[[int, int], str]] = {
+        "hot_key": lambda thread_index, index: "video:shared",
+        "distinct_keys": lambda thread_index, index: f"image:{thread_index}:{index}",
+    }
+    limiters: dict[str, Callable[[], Any]] = {
+        "legacy_deque": lambda: LegacyDequeLimiter(default_limit=100, default_window_sec=60),
+        "gcra_sharded": lambda: InMemoryRateLimiter(default_limit=100, default_window_sec=60, max_keys=50_000),
+    }
+    results: dict[str, Any] = {}
+    for scenario, keys in scenarios.items():
+        for name, factory in limiters.items():
+            row: dict[str, Any] = {}
+            retained = 0
+            for threads in thread_counts:
+                limiter = factory()
+                row[f"threads_{threads}"] = _run_threads(limiter, keys, threads, checks)
+                if isinstance(limiter, InMemoryRateLimiter):
+                    limiter.stop()
+                    retained = limiter.snapshot()["keys"]
+                else:
+                    retained = len(limiter._events)
+            row["keys_retained"] = retained
+            results[f"{scenario}/{name}"] = row
+    return {"checks_per_thread": checks, "unit": "checks/sec", "results": results}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Rate limiter checks/sec under thread contention.")
+    parser.add_argument("--checks", type=int, default=100_000)
+    parser.add_argument("--threads", type=int, nargs="+", default=[1, 4, 16])
+    args = parser.parse_args()
+    print(json.dumps(run(args.checks, args.threads), indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,252 @@
+from __future__ import annotations
+
+import io
+import tempfile
+from dataclasses import dataclass, field, replace
+from pathlib import Path
+from typing import Any
+
+from .contracts import FrameBuffer, _numpy, _pil_image
+from .gif_encoder import GifEncoder, GifEncoderSettings
+from .video_encoder import EncoderSettings, VideoEncoderError, transcode
+
+
+class BudgetUnreachableError(ValueError):
+    pass
+
+
+@dataclass(slots=True)
+class BudgetResult:
+    data: bytes
+    attempts: int
+    settings: dict[str, Any] = field(default_factory=dict)
+    estimates: list[dict[str, Any]] = field(default_factory=list)
+    # Geometry of the re-encoded media (width, height, fps, frame_count) where it differs from the source.
+    output: dict[str, Any] = field(default_factory=dict)
+
+    def metadata(self, budget_bytes: int, original_bytes: int) -> dict[str, Any]:
+        return {
+            "budget_bytes": int(budget_bytes),
+            "original_bytes": int(original_bytes),
+            "encoded_bytes": len(self.data),
+            "encode_attempts": self.attempts,
+            "encode_settings": dict(self.settings),
+        }
+
+
+# Ordered from best to worst quality: (palette colours, frame step, scale).
+GIF_LADDER: tuple[tuple[int, int, float], ...] = (
+    (255, 1, 1.0),
+    (128, 1, 1.0),
+    (255, 2, 1.0),
+    (128, 2, 1.0),
+    (128, 2, 0.75),
+    (64, 2, 0.75),
+    (64, 3, 0.6),
+    (32, 3, 0.5),
+    (32, 4, 0.4),
+    (16, 4, 0.3),
+    (16, 6, 0.25),
+)
+
+# Logical screen descriptor, 256-entry global colour table and NETSCAPE loop block.
+_GIF_HEADER_BYTES = 13 + 768 + 19
+
+MP4_CRF_LADDER: tuple[int, ...] = (23, 26, 29, 32, 35, 38, 42)
+
+
+def _scaled_size(width: int, height: int, max_side: int) -> tuple[int, int]:
+    # Mirrors transcode()'s scale filter: fit inside max_side keeping the aspect ratio (ffmpeg rounds to
+    # nearest), then pad to even dimensions.
+    w, h = min(max_side, width), min(max_side, height)
+    w, h = min(w, (h * width + height // 2) // height), min(h, (w * height + width // 2) // width)
+    return w + w % 2, h + h % 2
+
+
+def decode_gif(data: bytes, default_fps: int = 12) -> FrameBuffer:
+    np = _numpy()
+    Image = _pil_image()
+    gif = Image.open(io.BytesIO(data))
+    frame_count = int(getattr(gif, "n_frames", 1))
+    durations = []
+    buffer = FrameBuffer.allocate(frame_count, gif.height, gif.width, fps=default_fps)
+    for index in range(frame_count):
+        gif.seek(index)
+        buffer.data[index] = np.asarray(gif.convert("RGB"))
+        durations.append(int(gif.info.get("duration") or 0))
+    positive = [value for value in durations if value > 0]
+    if positive:
+        buffer.fps = max(1, round(1000 / (sum(positive) / len(positive))))
+    return buffer
+
+
+class GifBudgetEncoder:
+    def __init__(
+        self,
+        base_settings: GifEncoderSettings | None = None,
+        sample_windows: int = 4,
+        window_frames: int = 3,
+        safety_margin: float = 0.9,
+        max_attempts: int = 4,
+    ) -> None:
+        self.base_settings = base_settings or GifEncoderSettings.from_env()
+        self.sample_windows = max(1, int(sample_windows))
+        self.window_frames = max(2, int(window_frames))
+        self.safety_margin = float(safety_margin)
+        self.max_attempts = max(1, int(max_attempts))
+
+    def _candidate(self, buffer: FrameBuffer, colors: int, step: int, scale: float) -> GifEncoderSettings:
+        longest = max(buffer.width, buffer.height)
+        target_fps = max(1, round(buffer.fps / step)) if step > 1 else None
+        max_side = max(16, int(longest * scale)) if scale < 1.0 else self.base_settings.max_side
+        return replace(self.base_settings, max_colors=colors, target_fps=target_fps, max_side=max_side)
+
+    def _sample(self, buffer: FrameBuffer, step: int) -> tuple[FrameBuffer, int]:
+        kept = list(range(0, len(buffer), step))
+        window = self.window_frames
+        if len(kept) <= self.sample_windows * window:
+            return buffer, len(kept)
+        starts = [
+            round(position * (len(kept) - window) / max(1, self.sample_windows - 1))
+            for position in range(self.sample_windows)
+        ]
+        picked = [kept[start + offset] for start in starts for offset in range(window)]
+        np = _numpy()
+        # Sampled frames are already decimated, so the sample buffer runs at the output rate.
+        sample = FrameBuffer(data=np.ascontiguousarray(buffer.data[picked]), fps=max(1, round(buffer.fps / step)))
+        return sample, len(kept)
+
+    def estimate(self, buffer: FrameBuffer, colors: int, step: int, scale: float) -> tuple[int, bytes | None]:
+        settings = self._candidate(buffer, colors, step, scale)
+        sample, kept_frames = self._sample(buffer, step)
+        if sample is buffer:
+            # Short clips are cheaper to encode outright than to extrapolate.
+            encoded = GifEncoder(settings).encode(buffer)
+            return len(encoded), encoded
+        encoded = GifEncoder(replace(settings, target_fps=None)).encode(sample)
+        body = max(0, len(encoded) - _GIF_HEADER_BYTES)
+        return _GIF_HEADER_BYTES + int(body * kept_frames / len(sample)), None
+
+    def encode(self, buffer: FrameBuffer, max_bytes: int) -> BudgetResult:
+        attempts = 0
+        estimates: list[dict[str, Any]] = []
+        target = int(max_bytes * self.safety_margin)
+        smallest: int | None = None
+        for colors, step, scale in GIF_LADDER:
+            estimate, encoded = self.estimate(buffer, colors, step, scale)
+            estimates.append({"colors": colors, "frame_step": step, "scale": scale, "estimate": estimate})
+            if estimate > target and (colors, step, scale) != GIF_LADDER[-1]:
+                continue
+            if encoded is None:
+                attempts += 1
+                encoded = GifEncoder(self._candidate(buffer, colors, step, scale)).encode(buffer)
+            smallest = len(encoded) if smallest is None else min(smallest, len(encoded))
+            if len(encoded) <= max_bytes:
+                indices, size, fps = GifEncoder(self._candidate(buffer, colors, step, scale))._plan(buffer)
+                width, height = size or (buffer.width, buffer.height)
+                return BudgetResult(
+                    data=encoded,
+                    attempts=attempts,
+                    settings={"colors": colors, "frame_step": step, "scale": scale},
+                    estimates=estimates,
+                    output={"width": width, "height": height, "fps": max(1, round(fps)), "frame_count": len(indices)},
+                )
+            if attempts >= self.max_attempts:
+                break
+        raise BudgetUnreachableError(f"gif output cannot fit {max_bytes} bytes (smallest attempt {smallest} bytes)")
+
+
+class Mp4BudgetEncoder:
+    def __init__(
+        self,
+        base_settings: EncoderSettings | None = None,
+        sample_sec: float = 2.0,
+        safety_margin: float = 0.92,
+        max_attempts: int = 4,
+    ) -> None:
+        self.base_settings = base_settings or EncoderSettings.from_env()
+        self.sample_sec = max(0.5, float(sample_sec))
+        self.safety_margin = float(safety_margin)
+        self.max_attempts = max(1, int(max_attempts))
+
+    def _encode(self, source: Path, settings: EncoderSettings, duration_sec: float | None = None, **kwargs: Any) -> bytes:
+        with tempfile.TemporaryDirectory(prefix="omni-budget-") as tmp:
+            output = Path(tmp) / "out.mp4"
+            transcode(source, output, settings=settings, duration_sec=duration_sec, **kwargs)
+            return output.read_bytes()
+
+    def encode(
+        self,
+        data: bytes,
+        max_bytes: int,
+        duration_sec: float,
+        size: tuple[int, int] | None = None,
+    ) -> BudgetResult:
+        duration = max(0.1, float(duration_sec))
+        target = int(max_bytes * self.safety_margin)
+        estimates: list[dict[str, Any]] = []
+        attempts = 0
+        with tempfile.TemporaryDirectory(prefix="omni-budget-src-") as tmp:
+            source = Path(tmp) / "source.mp4"
+            source.write_bytes(data)
+
+            # CRF keeps quality constant, so a short excerpt scales roughly linearly with duration.
+            sample_sec = min(duration, self.sample_sec)
+            chosen_crf = None
+            for crf in MP4_CRF_LADDER:
+                settings = replace(self.base_settings, crf=crf, bitrate=None)
+                sample = self._encode(source, settings, duration_sec=sample_sec)
+                estimate = int(len(sample) * duration / sample_sec)
+                estimates.append({"crf": crf, "estimate": estimate})
+                if estimate <= target:
+                    chosen_crf = crf
+                    break
+
+            if chosen_crf is not None:
+                attempts += 1
+                encoded = self._encode(source, replace(self.base_settings, crf=chosen_crf, bitrate=None))
+                if len(encoded) <= max_bytes:
+                    return BudgetResult(encoded, attempts, {"crf": chosen_crf}, estimates)
+
+            # Fall back to constrained average bitrate, halving resolution when the rate gets too low to look sane.
+            bitrate = int(target * 8 / duration)
+            max_side = None
+            while attempts < self.max_attempts:
+                attempts += 1
+                settings = replace(self.base_settings, crf=None, bitrate=max(16_000, bitrate))
+                encoded = self._encode(source, settings, max_side=max_side)
+                if len(encoded) <= max_bytes:
+                    output: dict[str, Any] = {}
+                    if max_side and size:
+                        width, height = _scaled_size(size[0], size[1], max_side)
+                        output = {"width": width, "height": height}
+                    return BudgetResult(
+                        encoded,
+                        attempts,
+                        {"bitrate": settings.bitrate, "max_side": max_side},
+                        estimates,
+                        output,
+                    )
+                bitrate = int(bitrate * target / len(encoded))
+                if bitrate < 200_000 and max_side is None:
+                    max_side = 640
+        raise BudgetUnreachableError(f"video output cannot fit {max_bytes} bytes")
+
+
+def fit_to_budget(media_type: str, data: bytes, max_bytes: int, metadata: dict[str, Any]) -> BudgetResult:
+    if media_type == "gif":
+        buffer = decode_gif(data, default_fps=int(metadata.get("fps") or 12))
+        return GifBudgetEncoder().encode(buffer, max_bytes)
+    if media_type == "video":
+        duration = float(metadata.get("duration_sec") or 0) or (
+            int(metadata.get("frame_count") or 0) / max(1, int(metadata.get("fps") or 12))
+        )
+        width, height = int(metadata.get("width") or 0), int(metadata.get("height") or 0)
+        # The stored MP4 was padded to even dimensions when it was first encoded.
+        size = (width + width % 2, height + height % 2) if width and height else None
+        try:
+            return Mp4BudgetEncoder().encode(data, max_bytes, duration_sec=duration or 1.0, size=size)
+        except VideoEncoderError as exc:
+            raise BudgetUnreachableError(str(exc)) from exc
+    raise BudgetUnreachableError(f"{media_type} outputs cannot be re-encoded to a byte budget")
+
@@ -0,0 +1,225 @@
+from __future__ import annotations
+
+import os
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import Any, Callable, Iterator
+
+
+@dataclass(slots=True)
+class _PooledClient:
+    client: Any
+    cost_mb: int
+    loaded_at: float
+    last_used: float
+    load_sec: float
+    hits: int = 0
+    # Requests currently generating with this client; it is only closed once this drops to zero.
+    leases: int = 0
+    retired: bool = False
+
+
+def _close(entry: _PooledClient) -> None:
+    close = getattr(entry.client, "close", None) or getattr(entry.client, "shutdown", None)
+    if callable(close):
+        try:
+            close()
+        except Exception:
+            pass
+
+
+class ModelClientPool:
+    def __init__(
+        self,
+        max_resident: int = 2,
+        memory_budget_mb: int = 0,
+        idle_ttl_sec: float = 1800.0,
+    ) -> None:
+        self.max_resident = max(1, int(max_resident))
+        self.memory_budget_mb = max(0, int(memory_budget_mb))
+        self.idle_ttl_sec = max(0.0, float(idle_ttl_sec))
+        self._entries: OrderedDict[str, _PooledClient] = OrderedDict()
+        self._key_locks: dict[str, threading.Lock] = {}
+        self._lock = threading.Lock()
+        self._stats = {
+            "hits": 0,
+            "misses": 0,
+            "loads": 0,
+            "load_failures": 0,
+            "evictions_lru": 0,
+            "evictions_memory": 0,
+            "evictions_idle": 0,
+            "evictions_manual": 0,
+        }
+        self._load_sec_total = 0.0
+        self._last_load_sec: dict[str, float] = {}
+
+    @classmethod
+    def from_env(cls) -> "ModelClientPool":
+        return cls(
+            max_resident=int(os.getenv("OMNI_MEDIA_MODEL_POOL_MAX_RESIDENT", "2")),
+            memory_budget_mb=int(os.getenv("OMNI_MEDIA_MODEL_POOL_MEMORY_BUDGET_MB", "0")),
+            idle_ttl_sec=float(os.getenv("OMNI_MEDIA_MODEL_POOL_IDLE_TTL_SEC", "1800")),
+        )
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._entries
+
+    def _resident_cost(self) -> int:
+        return sum(entry.cost_mb for entry in self._entries.values())
+
+    def _release(self, key: str, reason: str) -> None:
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return
+        self._stats[f"evictions_{reason}"] += 1
+        if entry.leases:
+            # Still generating on another thread: drop it from the pool now, close it when the last lease ends.
+            entry.retired = True
+            return
+        _close(entry)
+
+    def _evict_idle_locked(self, now: float) -> None:
+        if not self.idle_ttl_sec:
+            return
+        ttl = self.idle_ttl_sec
+        idle = [k for k, entry in self._entries.items() if not entry.leases and now - entry.last_used > ttl]
+        for key in idle:
+            self._release(key, "idle")
+
+    def _victim_locked(self, keep: str | None) -> str | None:
+        # Least recently used first, skipping clients that are in use. If every candidate is busy the pool
+        # stays over its limits until a lease ends and the check runs again.
+        return next((key for key, entry in self._entries.items() if key != keep and not entry.leases), None)
+
+    def _enforce_limits_locked(self, keep: str | None) -> None:
+        while len(self._entries) > self.max_resident:
+            victim = self._victim_locked(keep)
+            if victim is None:
+                break
+            self._release(victim, "lru")
+        while self.memory_budget_mb and self._resident_cost() > self.memory_budget_mb:
+            victim = self._victim_locked(keep)
+            if victim is None:
+                break
+            self._release(victim, "memory")
+
+    def get(self, key: str, loader: Callable[[], Any], cost_mb: int = 0) -> Any:
+        return self._acquire(key, loader, cost_mb, leased=False).client
+
+    @contextmanager
+    def lease(self, key: str, loader: Callable[[], Any], cost_mb: int = 0) -> Iterator[Any]:
+        # Use this around generation: a leased client is never closed by eviction while the lease is held.
+        entry = self._acquire(key, loader, cost_mb, leased=True)
+        try:
+            yield entry.client
+        finally:
+            with self._lock:
+                entry.leases -= 1
+                if entry.leases:
+                    return
+                if entry.retired:
+                    _close(entry)
+                else:
+                    self._enforce_limits_locked(keep=None)
+
+    def _hit_locked(self, key: str, entry: _PooledClient, leased: bool) -> _PooledClient:
+        entry.last_used = time.monotonic()
+        entry.hits += 1
+        entry.leases += 1 if leased else 0
+        self._entries.move_to_end(key)
+        self._stats["hits"] += 1
+        return entry
+
+    def _acquire(self, key: str, loader: Callable[[], Any], cost_mb: int, leased: bool) -> _PooledClient:
+        now = time.monotonic()
+        with self._lock:
+            self._evict_idle_locked(now)
+            entry = self._entries.get(key)
+            if entry is not None:
+                return self._hit_locked(key, entry, leased)
+            key_lock = self._key_locks.setdefault(key, threading.Lock())
+
+        with key_lock:
+            with self._lock:
+                entry = self._entries.get(key)
+                if entry is not None:
+                    return self._hit_locked(key, entry, leased)
+                self._stats["misses"] += 1
+
+            started = time.perf_counter()
+            try:
+                client = loader()
+            except Exception:
+                with self._lock:
+                    self._stats["load_failures"] += 1
+                raise
+            load_sec = time.perf_counter() - started
+
+            with self._lock:
+                loaded_at = time.monotonic()
+                entry = self._entries[key] = _PooledClient(
+                    client=client,
+                    cost_mb=max(0, int(cost_mb)),
+                    loaded_at=loaded_at,
+                    last_used=loaded_at,
+                    load_sec=load_sec,
+                    leases=1 if leased else 0,
+                )
+                self._stats["loads"] += 1
+                self._load_sec_total += load_sec
+                self._last_load_sec[key] = load_sec
+                self._enforce_limits_locked(keep=key)
+            return entry
+
+    def preload(self, items: list[tuple[str, Callable[[], Any], int]]) -> dict[str, str | None]:
+        results: dict[str, str | None] = {}
+        for key, loader, cost_mb in items:
+            try:
+                self.get(key, loader, cost_mb=cost_mb)
+                results[key] = None
+            except Exception as exc:
+                results[key] = str(exc)
+        return results
+
+    def evict(self, key: str) -> bool:
+        with self._lock:
+            if key not in self._entries:
+                return False
+            self._release(key, "manual")
+            return True
+
+    def evict_idle(self) -> None:
+        with self._lock:
+            self._evict_idle_locked(time.monotonic())
+
+    def snapshot(self) -> dict[str, Any]:
+        now = time.monotonic()
+        with self._lock:
+            loads = self._stats["loads"]
+            return {
+                **self._stats,
+                "resident": len(self._entries),
+                "max_resident": self.max_resident,
+                "resident_cost_mb": self._resident_cost(),
+                "memory_budget_mb": self.memory_budget_mb,
+                "idle_ttl_sec": self.idle_ttl_sec,
+                "avg_load_ms": round(self._load_sec_total / loads * 1000, 2) if loads else 0.0,
+                "last_load_ms": {key: round(value * 1000, 2) for key, value in self._last_load_sec.items()},
+                "clients": {
+                    key: {
+                        "cost_mb": entry.cost_mb,
+                        "hits": entry.hits,
+                        "load_ms": round(entry.load_sec * 1000, 2),
+                        "idle_sec": round(now - entry.last_used, 2),
+                        "leases": entry.leases,
+                    }
+                    for key, entry in self._entries.items()
+                },
+            }
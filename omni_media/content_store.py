@@ -0,0 +1,353 @@
+from __future__ import annotations
+
+import hashlib
+import os
+import shutil
+import sqlite3
+import tempfile
+import threading
+import time
+import uuid
+from pathlib import Path
+from typing import Any, Iterable
+
+from .storage import StorageAdapter, _local_output_path
+
+_CHUNK_BYTES = 1024 * 1024
+
+
+def sha256_file(path: str | Path) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as handle:
+        for chunk in iter(lambda: handle.read(_CHUNK_BYTES), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class ContentAddressedStorageAdapter(StorageAdapter):
+    def __init__(
+        self,
+        base_dir: str = "media_outputs",
+        index_path: str | None = None,
+        link_mode: str = "hardlink",
+        busy_timeout_ms: int = 5000,
+    ) -> None:
+        if link_mode not in {"hardlink", "manifest"}:
+            raise ValueError(f"unsupported link mode: {link_mode}")
+        self.base_dir = base_dir
+        self.link_mode = link_mode
+        self.blob_dir = Path(base_dir) / ".cas" / "blobs"
+        self.index_path = index_path or str(Path(base_dir) / ".cas" / "index.sqlite3")
+        self.busy_timeout_ms = int(busy_timeout_ms)
+        self.blob_dir.mkdir(parents=True, exist_ok=True)
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._stats = {"puts": 0, "dedup_hits": 0, "bytes_written": 0, "bytes_saved": 0, "link_fallbacks": 0}
+        self._conn().executescript(
+            """
+            CREATE TABLE IF NOT EXISTS cas_blobs (
+                digest TEXT PRIMARY KEY,
+                size INTEGER NOT NULL,
+                refcount INTEGER NOT NULL DEFAULT 0,
+                created_at REAL NOT NULL,
+                released_at REAL
+            );
+            CREATE TABLE IF NOT EXISTS cas_refs (
+                path TEXT PRIMARY KEY,
+                digest TEXT NOT NULL,
+                request_id TEXT NOT NULL,
+                media_type TEXT NOT NULL,
+                linked INTEGER NOT NULL,
+                created_at REAL NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS idx_cas_refs_request ON cas_refs(request_id);
+            CREATE INDEX IF NOT EXISTS idx_cas_blobs_refcount ON cas_blobs(refcount);
+            """
+        )
+
+    @classmethod
+    def from_env(cls) -> "ContentAddressedStorageAdapter":
+        return cls(
+            base_dir=str(os.getenv("OMNI_MEDIA_STORAGE_DIR", "media_outputs")).strip() or "media_outputs",
+            index_path=str(os.getenv("OMNI_MEDIA_CAS_INDEX", "")).strip() or None,
+            link_mode=str(os.getenv("OMNI_MEDIA_CAS_LINK_MODE", "hardlink")).strip().lower() or "hardlink",
+        )
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.index_path, timeout=self.busy_timeout_ms / 1000, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute(f"PRAGMA busy_timeout={self.busy_timeout_ms}")
+            self._local.conn = conn
+        return conn
+
+    def blob_path(self, digest: str) -> Path:
+        return self.blob_dir / digest[:2] / digest[2:4] / digest
+
+    def has_blob(self, digest: str) -> bool:
+        row = self._conn().execute("SELECT 1 FROM cas_blobs WHERE digest = ?", (digest,)).fetchone()
+        return row is not None and self.blob_path(digest).exists()
+
+    def find(self, digest: str) -> str | None:
+        return self.blob_path(digest).as_posix() if self.has_blob(digest) else None
+
+    def resolve(self, path: str) -> Path | None:
+        candidate = Path(path)
+        if candidate.is_file():
+            return candidate
+        row = self._conn().execute("SELECT digest FROM cas_refs WHERE path = ?", (candidate.as_posix(),)).fetchone()
+        if row is None:
+            return None
+        blob = self.blob_path(row[0])
+        return blob if blob.exists() else None
+
+    def _store_blob(
+        self,
+        digest: str,
+        size: int,
+        source: Path | None,
+        data: bytes | None,
+        copy_from: Path | None = None,
+    ) -> bool:
+        # Returns True when the payload was already stored.
+        blob = self.blob_path(digest)
+        if blob.exists():
+            return True
+        blob.parent.mkdir(parents=True, exist_ok=True)
+        tmp = blob.with_name(f".{digest}.{uuid.uuid4().hex}.tmp")
+        try:
+            if source is not None:
+                try:
+                    os.replace(source, tmp)
+                except OSError:
+                    shutil.copyfile(source, tmp)
+            elif copy_from is not None:
+                shutil.copyfile(copy_from, tmp)
+            else:
+                tmp.write_bytes(data or b"")
+            os.chmod(tmp, 0o444)
+            os.replace(tmp, blob)
+        finally:
+            tmp.unlink(missing_ok=True)
+        return False
+
+    def _link(self, blob: Path, target: Path) -> bool:
+        if self.link_mode != "hardlink":
+            return False
+        target.parent.mkdir(parents=True, exist_ok=True)
+        tmp = target.with_name(f".{target.name}.{uuid.uuid4().hex}.tmp")
+        try:
+            os.link(blob, tmp)
+            os.replace(tmp, target)
+            return True
+        except OSError:
+            tmp.unlink(missing_ok=True)
+            with self._lock:
+                self._stats["link_fallbacks"] += 1
+            return False
+
+    def _put(
+        self,
+        request_id: str,
+        media_type: str,
+        index: int,
+        extension: str,
+        digest: str,
+        size: int,
+        source: Path | None = None,
+        data: bytes | None = None,
+        copy_from: Path | None = None,
+    ) -> str:
+        target = _local_output_path(self.base_dir, request_id, media_type, index, extension)
+        key = target.as_posix()
+        now = time.time()
+        with self._lock:
+            conn = self._conn()
+            # Take the reference before touching the blob: gc (possibly in another process sharing the
+            # base dir) only collects unreferenced blobs, so it cannot delete this one under the link.
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                previous = conn.execute("SELECT digest FROM cas_refs WHERE path = ?", (key,)).fetchone()
+                if previous is not None:
+                    conn.execute(
+                        "UPDATE cas_blobs SET refcount = refcount - 1, released_at = ? WHERE digest = ?",
+                        (now, previous[0]),
+                    )
+                conn.execute(
+                    "INSERT INTO cas_blobs(digest, size, refcount, created_at) VALUES (?, ?, 1, ?) "
+                    "ON CONFLICT(digest) DO UPDATE SET refcount = refcount + 1, released_at = NULL",
+                    (digest, size, now),
+                )
+                conn.execute(
+                    "INSERT OR REPLACE INTO cas_refs(path, digest, request_id, media_type, linked, created_at) "
+                    "VALUES (?, ?, ?, ?, 0, ?)",
+                    (key, digest, request_id, media_type, now),
+                )
+                conn.execute("COMMIT")
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+        # The blob write and link run outside the lock: blobs are named by their content hash and land via
+        # tmp + rename, so concurrent writers of the same payload are idempotent.
+        try:
+            existed = self._store_blob(digest, size, source, data, copy_from=copy_from)
+            linked = self._link(self.blob_path(digest), target)
+            if not linked:
+                target.unlink(missing_ok=True)
+        except BaseException:
+            with self._lock:
+                self._drop_refs("path = ? AND digest = ?", (key, digest))
+            raise
+        with self._lock:
+            if linked:
+                conn.execute("UPDATE cas_refs SET linked = 1 WHERE path = ? AND digest = ?", (key, digest))
+            self._stats["puts"] += 1
+            if existed:
+                self._stats["dedup_hits"] += 1
+                self._stats["bytes_saved"] += size
+            else:
+                self._stats["bytes_written"] += size
+        return key
+
+    def put_bytes(
+        self,
+        request_id: str,
+        media_type: str,
+        index: int,
+        data: bytes,
+        extension: str,
+        signed_ttl_sec: int | None = None,
+    ) -> str:
+        payload = bytes(data)
+        digest = hashlib.sha256(payload).hexdigest()
+        return self._put(request_id, media_type, index, extension, digest, len(payload), data=payload)
+
+    def put_file(
+        self,
+        request_id: str,
+        media_type: str,
+        index: int,
+        path: str,
+        extension: str,
+        signed_ttl_sec: int | None = None,
+    ) -> str:
+        digest = sha256_file(path)
+        if self.has_blob(digest):
+            # copy_from covers a gc that removes the blob before the reference is taken.
+            size = os.path.getsize(path)
+            return self._put(request_id, media_type, index, extension, digest, size, copy_from=Path(path))
+        # Copy first so the caller's file is left alone; the copy is moved into the blob store.
+        fd, spool = tempfile.mkstemp(prefix=".spool-", dir=self.blob_dir)
+        os.close(fd)
+        try:
+            shutil.copyfile(path, spool)
+            return self._put(request_id, media_type, index, extension, digest, os.path.getsize(spool), source=Path(spool))
+        finally:
+            Path(spool).unlink(missing_ok=True)
+
+    def put_stream(
+        self,
+        request_id: str,
+        media_type: str,
+        index: int,
+        chunks: Iterable[bytes],
+        extension: str,
+        signed_ttl_sec: int | None = None,
+    ) -> str:
+        digest = hashlib.sha256()
+        size = 0
+        fd, spool = tempfile.mkstemp(prefix=".spool-", dir=self.blob_dir)
+        try:
+            with os.fdopen(fd, "wb") as handle:
+                for chunk in chunks:
+                    digest.update(chunk)
+                    handle.write(chunk)
+                    size += len(chunk)
+            return self._put(request_id, media_type, index, extension, digest.hexdigest(), size, source=Path(spool))
+        finally:
+            Path(spool).unlink(missing_ok=True)
+
+    def _drop_refs(self, where: str, params: tuple[Any, ...], missing_only: bool = False) -> int:
+        # Rows are read inside the write transaction so another process cannot move a reference in between.
+        now = time.time()
+        conn = self._conn()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            rows = conn.execute(f"SELECT path, digest, linked FROM cas_refs WHERE {where}", params).fetchall()
+            if missing_only:
+                rows = [row for row in rows if not Path(row[0]).exists()]
+            for path, digest, linked in rows:
+                conn.execute("DELETE FROM cas_refs WHERE path = ?", (path,))
+                conn.execute(
+                    "UPDATE cas_blobs SET refcount = MAX(refcount - 1, 0), released_at = ? WHERE digest = ?",
+                    (now, digest),
+                )
+                if linked:
+                    Path(path).unlink(missing_ok=True)
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        return len(rows)
+
+    def _ref_key(self, path: str) -> str:
+        # References are keyed by the path put() returned, which is relative when base_dir is.
+        candidate = Path(path)
+        base = Path(self.base_dir)
+        if candidate.is_absolute() and not base.is_absolute():
+            try:
+                return (base / candidate.relative_to(os.path.abspath(base))).as_posix()
+            except ValueError:
+                pass
+        return candidate.as_posix()
+
+    def release(self, path: str) -> bool:
+        with self._lock:
+            return self._drop_refs("path = ?", (self._ref_key(path),)) > 0
+
+    def release_request(self, request_id: str) -> int:
+        with self._lock:
+            return self._drop_refs("request_id = ?", (request_id,))
+
+    def gc(self, grace_sec: float = 0.0) -> dict[str, int]:
+        with self._lock:
+            # Hardlinked outputs deleted out-of-band (retention sweeps, operators) no longer hold a reference.
+            stale = self._drop_refs("linked = 1", (), missing_only=True)
+
+            cutoff = time.time() - max(0.0, float(grace_sec))
+            conn = self._conn()
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                orphans = conn.execute(
+                    "SELECT digest, size FROM cas_blobs "
+                    "WHERE refcount <= 0 AND COALESCE(released_at, created_at) <= ?",
+                    (cutoff,),
+                ).fetchall()
+                for digest, _size in orphans:
+                    conn.execute("DELETE FROM cas_blobs WHERE digest = ?", (digest,))
+                    self.blob_path(digest).unlink(missing_ok=True)
+                conn.execute("COMMIT")
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+        freed = sum(int(size) for _digest, size in orphans)
+        return {"stale_refs": stale, "blobs_deleted": len(orphans), "bytes_freed": freed}
+
+    def snapshot(self) -> dict[str, Any]:
+        conn = self._conn()
+        blobs, stored = conn.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM cas_blobs").fetchone()
+        refs, logical = conn.execute(
+            "SELECT COUNT(*), COALESCE(SUM(b.size), 0) FROM cas_refs r JOIN cas_blobs b ON b.digest = r.digest"
+        ).fetchone()
+        with self._lock:
+            stats = dict(self._stats)
+        return {
+            **stats,
+            "link_mode": self.link_mode,
+            "blobs": int(blobs),
+            "refs": int(refs),
+            "stored_bytes": int(stored),
+            "logical_bytes": int(logical),
+        }
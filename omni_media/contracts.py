@@ -1,7 +1,12 @@
 from __future__ import annotations
 
+import importlib
+import io
 from dataclasses import dataclass, field
-from typing import Any, Literal
+from typing import TYPE_CHECKING, Any, Iterable, Iterator, Literal
+
+if TYPE_CHECKING:
+    from .video_prompt_planner import VideoGenerationSpec
 
 MediaType = Literal["image", "video", "gif"]
 StatusType = Literal["completed", "failed"]
@@ -31,6 +36,7 @@ class GenerateRequest:
     safety_level: str = "default"
     watermark: bool = True
     return_format: Literal["url", "base64", "bytes"] = "url"
+    video_plan: VideoGenerationSpec | None = field(default=None, compare=False, repr=False)
 
 
 @dataclass(slots=True)
@@ -39,6 +45,118 @@ class ImageObject:
     mime_type: str = "image/png"
     width: int | None = None
     height: int | None = None
+    # True only when generate_image's frame_filter ran and its result was kept.
+    frame_filtered: bool = False
+
+
+def _numpy() -> Any:
+    try:
+        return importlib.import_module("numpy")
+    except Exception as exc:
+        raise RuntimeError("numpy is required for array-backed frame buffers") from exc
+
+
+def _pil_image() -> Any:
+    try:
+        return importlib.import_module("PIL.Image")
+    except Exception as exc:
+        raise RuntimeError("Pillow is required for frame image encoding") from exc
+
+
+@dataclass(slots=True)
+class FrameBuffer:
+    data: Any  # contiguous numpy uint8 array shaped (N, H, W, C)
+    fps: int = 12
+
+    @classmethod
+    def allocate(cls, frame_count: int, height: int, width: int, channels: int = 3, fps: int = 12) -> "FrameBuffer":
+        np = _numpy()
+        return cls(data=np.empty((int(frame_count), int(height), int(width), int(channels)), dtype=np.uint8), fps=fps)
+
+    @classmethod
+    def from_frames(cls, frames: Iterable[Any], fps: int = 12) -> "FrameBuffer":
+        np = _numpy()
+        items = list(frames)
+        if not items:
+            raise ValueError("at least one frame is required")
+
+        def as_array(frame: Any) -> Any:
+            if hasattr(frame, "convert"):
+                frame = frame.convert("RGB")
+            array = np.asarray(frame, dtype=np.uint8)
+            return array[:, :, None] if array.ndim == 2 else array
+
+        first = as_array(items[0])
+        buffer = cls.allocate(len(items), first.shape[0], first.shape[1], first.shape[2], fps=fps)
+        buffer.data[0] = first
+        for index, frame in enumerate(items[1:], start=1):
+            buffer.data[index] = as_array(frame)
+        return buffer
+
+    @classmethod
+    def from_image_objects(cls, images: Iterable[ImageObject], fps: int = 12) -> "FrameBuffer":
+        Image = _pil_image()
+        return cls.from_frames((Image.open(io.BytesIO(image.bytes_data)) for image in images), fps=fps)
+
+    @classmethod
+    def concat(cls, buffers: list["FrameBuffer"], fps: int | None = None) -> "FrameBuffer":
+        np = _numpy()
+        if not buffers:
+            raise ValueError("at least one frame buffer is required")
+        shapes = {buffer.frame_shape for buffer in buffers}
+        if len(shapes) != 1:
+            raise ValueError(f"frame buffers have mismatched frame shapes: {sorted(shapes)}")
+        return cls(data=np.concatenate([buffer.data for buffer in buffers], axis=0), fps=int(fps or buffers[0].fps))
+
+    @property
+    def frame_count(self) -> int:
+        return int(self.data.shape[0])
+
+    @property
+    def height(self) -> int:
+        return int(self.data.shape[1])
+
+    @property
+    def width(self) -> int:
+        return int(self.data.shape[2])
+
+    @property
+    def channels(self) -> int:
+        return int(self.data.shape[3])
+
+    @property
+    def frame_shape(self) -> tuple[int, int, int]:
+        return self.height, self.width, self.channels
+
+    @property
+    def nbytes(self) -> int:
+        return int(self.data.nbytes)
+
+    def __len__(self) -> int:
+        return self.frame_count
+
+    def __getitem__(self, index: int) -> Any:
+        return self.data[index]
+
+    def __iter__(self) -> Iterator[Any]:
+        for index in range(self.frame_count):
+            yield self.data[index]
+
+    def to_image_objects(self, image_format: str = "PNG") -> list[ImageObject]:
+        Image = _pil_image()
+        images: list[ImageObject] = []
+        for frame in self:
+            buffer = io.BytesIO()
+            Image.fromarray(frame[:, :, 0] if self.channels == 1 else frame).save(buffer, format=image_format)
+            images.append(
+                ImageObject(
+                    bytes_data=buffer.getvalue(),
+                    mime_type=f"image/{image_format.lower()}",
+                    width=self.width,
+                    height=self.height,
+                )
+            )
+        return images
 
 
 @dataclass(slots=True)
@@ -49,6 +167,21 @@ class VideoObject:
     width: int
     height: int
     mp4_bytes: bytes | None = None
+    buffer: FrameBuffer | None = None
+
+    @property
+    def frame_count(self) -> int:
+        return len(self.buffer) if self.buffer is not None else len(self.frames)
+
+    def frame_buffer(self) -> FrameBuffer:
+        if self.buffer is None:
+            return FrameBuffer.from_image_objects(self.frames, fps=self.fps)
+        return self.buffer
+
+    def frame_images(self) -> list[ImageObject]:
+        if self.buffer is not None and not self.frames:
+            return self.buffer.to_image_objects()
+        return self.frames
 
 
 @dataclass(slots=True)
@@ -0,0 +1,223 @@
+from __future__ import annotations
+
+import math
+import os
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass, field, replace
+from typing import Any, Mapping
+
+from .model_registry import ModelRegistry
+from .security import RateLimiter, RateLimitError
+from .video_prompt_planner import compile_video_generation_spec
+
+# One cost unit is one denoising step over one 512x512 frame.
+UNIT_PIXELS = 512 * 512
+# Pipeline defaults for parameters a request leaves unset.
+_DEFAULT_SIZE = {"image": (1024, 1024), "video": (768, 432), "gif": (512, 512)}
+_DEFAULT_STEPS = 30
+
+
+def _positive_int(value: Any, default: int) -> int:
+    try:
+        parsed = int(value)
+    except (TypeError, ValueError, OverflowError):
+        return default
+    return parsed if parsed > 0 else default
+
+
+@dataclass(slots=True, frozen=True)
+class RequestCost:
+    units: int
+    profile: str
+    width: int
+    height: int
+    frames: int
+    steps: int
+    multiplier: float
+
+
+def _planned_frames(modality: str, prompt: str, requested: int, max_frames: int) -> int:
+    try:
+        spec = compile_video_generation_spec(prompt)
+    except ValueError:
+        return min(requested or 1, max_frames)
+    scenes = spec.metadata.get("scene_plan") or []
+    if modality == "video" and scenes:
+        # Storyboard scenes are generated one engine call each, and each call is capped by the profile.
+        return sum(min(max(1, int(scene.get("frame_count") or 1)), max_frames) for scene in scenes)
+    return min(requested or spec.num_frames, max_frames)
+
+
+def estimate_request_cost(
+    modality: str,
+    mode: str,
+    params: Mapping[str, Any],
+    prompt: str = "",
+    registry: ModelRegistry | None = None,
+) -> RequestCost:
+    # pixels x frames x steps x profile multiplier, clamped to the limits the engine will actually apply.
+    normalized = modality.strip().lower()
+    profile = (registry or ModelRegistry()).select_for_request(normalized, mode)
+    default_width, default_height = _DEFAULT_SIZE[normalized]
+    width = min(_positive_int(params.get("width"), default_width), profile.max_width)
+    height = min(_positive_int(params.get("height"), default_height), profile.max_height)
+    steps = _positive_int(params.get("num_inference_steps"), _DEFAULT_STEPS)
+    if normalized == "image":
+        frames = _positive_int(params.get("num_images"), 1)
+    else:
+        frames = _planned_frames(normalized, prompt, _positive_int(params.get("num_frames"), 0), profile.max_frames)
+    units = math.ceil(width * height * frames * steps * profile.cost_multiplier / UNIT_PIXELS)
+    return RequestCost(
+        units=max(1, units),
+        profile=profile.key,
+        width=width,
+        height=height,
+        frames=frames,
+        steps=steps,
+        multiplier=profile.cost_multiplier,
+    )
+
+
+@dataclass(slots=True, frozen=True)
+class BudgetCharge:
+    requester: str
+    cost: RequestCost
+    limit: int
+    window_sec: int
+    remaining: int
+
+    def headers(self) -> dict[str, str]:
+        return {
+            "X-Budget-Limit": str(self.limit),
+            "X-Budget-Remaining": str(max(0, self.remaining)),
+            "X-Budget-Window": str(self.window_sec),
+            "X-Request-Cost": str(self.cost.units),
+        }
+
+
+class BudgetExceededError(RateLimitError):
+    def __init__(self, message: str, charge: BudgetCharge, retry_after_sec: float | None = None) -> None:
+        super().__init__(message, retry_after_sec=retry_after_sec)
+        self.charge = charge
+
+
+@dataclass(slots=True)
+class CostBudget:
+    # Charges generation cost to one budget per requester through the configured rate limiter, so the
+    # in-memory and Redis backends enforce it the same way. Per-key usage is tracked in this process only.
+    limiter: RateLimiter
+    budget: int = 250_000
+    window_sec: int = 3600
+    registry: ModelRegistry = field(default_factory=ModelRegistry)
+    max_tracked_keys: int = 10_000
+    _lock: threading.Lock = field(init=False, default_factory=threading.Lock)
+    # requester -> {"charged", "requests", "rejected", "remaining"}, least recently seen first.
+    _usage: OrderedDict[str, dict[str, int]] = field(init=False, default_factory=OrderedDict)
+
+    @classmethod
+    def from_env(cls, limiter: RateLimiter) -> "CostBudget":
+        return cls(
+            limiter=limiter,
+            budget=int(os.getenv("OMNI_MEDIA_COST_BUDGET", "250000")),
+            window_sec=int(os.getenv("OMNI_MEDIA_COST_BUDGET_WINDOW_SEC", "3600")),
+            max_tracked_keys=int(os.getenv("OMNI_MEDIA_COST_BUDGET_TRACKED_KEYS", "10000")),
+        )
+
+    @property
+    def enabled(self) -> bool:
+        return self.budget > 0
+
+    def charge(
+        self,
+        requester: str,
+        modality: str,
+        mode: str,
+        params: Mapping[str, Any],
+        prompt: str = "",
+        budget: int | None = None,
+    ) -> BudgetCharge | None:
+        # `budget` overrides the server-wide budget for this requester, e.g. an API key's quota.
+        limit = int(budget) if budget is not None else self.budget
+        if not self.enabled or limit <= 0:
+            return None
+        cost = estimate_request_cost(modality, mode, params, prompt, self.registry)
+        try:
+            remaining = self.limiter.check(
+                key=f"cost:{requester}", limit=limit, window_sec=self.window_sec, cost=cost.units
+            )
+        except RateLimitError as exc:
+            self._record(requester, 0, rejected=True, remaining=None, limit=limit)
+            charge = BudgetCharge(
+                requester=requester, cost=cost, limit=limit, window_sec=self.window_sec, remaining=0
+            )
+            raise BudgetExceededError(
+                f"Cost budget exhausted: {exc}", charge=charge, retry_after_sec=exc.retry_after_sec
+            ) from exc
+        remaining = int(remaining) if remaining is not None else limit
+        self._record(requester, cost.units, rejected=False, remaining=remaining, limit=limit)
+        return BudgetCharge(
+            requester=requester, cost=cost, limit=limit, window_sec=self.window_sec, remaining=remaining
+        )
+
+    def refund(self, charge: BudgetCharge) -> BudgetCharge:
+        # For requests that were charged but then failed validation, hit a saturated executor or did not
+        # produce a result: the units go back to the requester's budget.
+        refund = getattr(self.limiter, "refund", None)
+        remaining = charge.remaining
+        if refund is not None:
+            remaining = int(
+                refund(
+                    key=f"cost:{charge.requester}",
+                    limit=charge.limit,
+                    window_sec=charge.window_sec,
+                    cost=charge.cost.units,
+                )
+            )
+        with self._lock:
+            usage = self._usage.get(charge.requester)
+            if usage is not None:
+                usage["charged"] -= charge.cost.units
+                usage["refunded"] += charge.cost.units
+                usage["remaining"] = remaining
+        return BudgetCharge(
+            requester=charge.requester,
+            cost=replace(charge.cost, units=0),
+            limit=charge.limit,
+            window_sec=charge.window_sec,
+            remaining=remaining,
+        )
+
+    def _record(self, requester: str, units: int, rejected: bool, remaining: int | None, limit: int) -> None:
+        with self._lock:
+            usage = self._usage.get(requester)
+            if usage is None:
+                usage = self._usage[requester] = {
+                    "charged": 0,
+                    "requests": 0,
+                    "rejected": 0,
+                    "refunded": 0,
+                    "remaining": limit,
+                }
+            else:
+                self._usage.move_to_end(requester)
+            usage["charged"] += units
+            usage["requests"] += 0 if rejected else 1
+            usage["rejected"] += 1 if rejected else 0
+            if remaining is not None:
+                usage["remaining"] = remaining
+            while len(self._usage) > self.max_tracked_keys:
+                self._usage.popitem(last=False)
+
+    def snapshot(self, top: int = 50) -> dict[str, Any]:
+        with self._lock:
+            usage = sorted(self._usage.items(), key=lambda item: item[1]["charged"], reverse=True)[: max(0, top)]
+            tracked = len(self._usage)
+        return {
+            "enabled": self.enabled,
+            "budget": self.budget,
+            "window_sec": self.window_sec,
+            "unit": "one denoising step over a 512x512 frame",
+            "tracked_keys": tracked,
+            "keys": {requester: dict(values) for requester, values in usage},
+        }
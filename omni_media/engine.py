@@ -2,11 +2,14 @@ from __future__ import annotations
 
 import io
 import importlib
-from dataclasses import asdict
-from typing import Any
+from dataclasses import asdict, replace
+from typing import Any, Callable, ContextManager
 
-from .contracts import ImageObject, VideoObject
+from .client_pool import ModelClientPool
+from .contracts import FrameBuffer, ImageObject, VideoObject, _pil_image
+from .gif_encoder import GifEncoder, GifEncoderSettings
 from .model_registry import ModelProfile
+from .video_encoder import BytesSink, EncoderSettings, VideoEncoderError, concat_mp4_bytes, encode_frame_buffer
 
 
 class OmniUnavailableError(RuntimeError):
@@ -14,13 +17,17 @@ class OmniUnavailableError(RuntimeError):
 
 
 class OmniMediaEngine:
-    def __init__(self) -> None:
-        self._clients: dict[str, Any] = {}
-
-    def _load_omni_client(self, profile: ModelProfile) -> Any:
-        if profile.key in self._clients:
-            return self._clients[profile.key]
+    def __init__(
+        self,
+        client_pool: ModelClientPool | None = None,
+        encoder_settings: EncoderSettings | None = None,
+        gif_settings: GifEncoderSettings | None = None,
+    ) -> None:
+        self._clients = client_pool or ModelClientPool.from_env()
+        self.encoder_settings = encoder_settings or EncoderSettings.from_env()
+        self.gif_settings = gif_settings or GifEncoderSettings.from_env()
 
+    def _construct_omni_client(self, profile: ModelProfile) -> Any:
         try:
             omni_module = importlib.import_module("vllm_omni.entrypoints.omni")
             Omni = getattr(omni_module, "Omni")
@@ -29,9 +36,28 @@ class OmniMediaEngine:
                 "vllm_omni is not installed or unavailable in this runtime."
             ) from exc
 
-        client = Omni(model=profile.omni_model_id)
-        self._clients[profile.key] = client
-        return client
+        return Omni(model=profile.omni_model_id)
+
+    def _lease_omni_client(self, profile: ModelProfile) -> ContextManager[Any]:
+        return self._clients.lease(
+            profile.key,
+            lambda: self._construct_omni_client(profile),
+            cost_mb=profile.memory_cost_mb,
+        )
+
+    def preload(self, profiles: list[ModelProfile]) -> dict[str, str | None]:
+        return self._clients.preload(
+            [
+                (profile.key, lambda profile=profile: self._construct_omni_client(profile), profile.memory_cost_mb)
+                for profile in profiles
+            ]
+        )
+
+    def evict(self, profile_key: str) -> bool:
+        return self._clients.evict(profile_key)
+
+    def is_loaded(self, profile_key: str) -> bool:
+        return profile_key in self._clients
 
     def probe_backend(self) -> dict[str, Any]:
         try:
@@ -44,6 +70,7 @@ class OmniMediaEngine:
                 "import_ok": True,
                 "omni_class_ok": bool(has_class),
                 "cached_clients": len(self._clients),
+                "client_pool": self._clients.snapshot(),
             }
         except Exception as exc:
             return {
@@ -52,6 +79,7 @@ class OmniMediaEngine:
                 "import_ok": False,
                 "omni_class_ok": False,
                 "cached_clients": len(self._clients),
+                "client_pool": self._clients.snapshot(),
                 "error": str(exc),
             }
 
@@ -67,8 +95,8 @@ class OmniMediaEngine:
         guidance_scale: float = 7.5,
         num_inference_steps: int = 30,
         extra: dict[str, Any] | None = None,
+        frame_filter: Callable[[Any], Any] | None = None,
     ) -> list[ImageObject]:
-        client = self._load_omni_client(profile)
         payload = {
             "prompt": prompt,
             "negative_prompt": negative_prompt,
@@ -81,11 +109,22 @@ class OmniMediaEngine:
             **(extra or {}),
         }
 
-        result = client.generate(**payload)
+        with self._lease_omni_client(profile) as client:
+            result = client.generate(**payload)
         images: list[ImageObject] = []
 
         for output in result:
             for img in getattr(output, "images", []) or []:
+                filtered = False
+                if frame_filter is not None:
+                    # On failure the unfiltered image is kept and left unflagged, so callers can fall back.
+                    try:
+                        frame = FrameBuffer.from_frames([img]).data
+                        frame_filter(frame)
+                        img = _pil_image().fromarray(frame[0])
+                        filtered = True
+                    except Exception:
+                        pass
                 buffer = io.BytesIO()
                 img.save(buffer, format="PNG")
                 images.append(
@@ -94,6 +133,7 @@ class OmniMediaEngine:
                         mime_type="image/png",
                         width=payload["width"],
                         height=payload["height"],
+                        frame_filtered=filtered,
                     )
                 )
 
@@ -113,7 +153,6 @@ class OmniMediaEngine:
         num_inference_steps: int = 30,
         extra: dict[str, Any] | None = None,
     ) -> VideoObject:
-        client = self._load_omni_client(profile)
         payload = {
             "prompt": prompt,
             "negative_prompt": negative_prompt,
@@ -127,21 +166,27 @@ class OmniMediaEngine:
             **(extra or {}),
         }
 
-        result = client.generate(**payload)
-        frames: list[ImageObject] = []
+        with self._lease_omni_client(profile) as client:
+            result = client.generate(**payload)
+            raw_frames = [frame for output in result for frame in (getattr(output, "frames", []) or [])]
 
-        for output in result:
-            for frame in getattr(output, "frames", []) or []:
-                buffer = io.BytesIO()
-                frame.save(buffer, format="PNG")
-                frames.append(
-                    ImageObject(
-                        bytes_data=buffer.getvalue(),
-                        mime_type="image/png",
-                        width=payload["width"],
-                        height=payload["height"],
+        frames: list[ImageObject] = []
+        buffer: FrameBuffer | None = None
+        if raw_frames:
+            try:
+                buffer = FrameBuffer.from_frames(raw_frames, fps=payload["fps"])
+            except RuntimeError:
+                for frame in raw_frames:
+                    png = io.BytesIO()
+                    frame.save(png, format="PNG")
+                    frames.append(
+                        ImageObject(
+                            bytes_data=png.getvalue(),
+                            mime_type="image/png",
+                            width=payload["width"],
+                            height=payload["height"],
+                        )
                     )
-                )
 
         duration = (payload["num_frames"] / max(1, payload["fps"])) if payload["num_frames"] else 0
         return VideoObject(
@@ -151,6 +196,7 @@ class OmniMediaEngine:
             width=payload["width"],
             height=payload["height"],
             mp4_bytes=getattr(result, "mp4_bytes", None),
+            buffer=buffer,
         )
 
     def assemble_video_scenes(self, scenes: list[VideoObject], fps: int | None = None) -> VideoObject:
@@ -158,18 +204,33 @@ class OmniMediaEngine:
             raise ValueError("at least one scene is required for video assembly")
 
         target_fps = int(fps or scenes[0].fps or 12)
-        merged_frames: list[ImageObject] = []
         width = int(scenes[0].width)
         height = int(scenes[0].height)
+        merged_mp4 = scenes[0].mp4_bytes if len(scenes) == 1 else self._concat_scene_mp4(scenes)
+
+        buffers = [scene.buffer for scene in scenes]
+        if all(buffer is not None for buffer in buffers) and len({buffer.frame_shape for buffer in buffers}) == 1:
+            merged_buffer = FrameBuffer.concat(buffers, fps=target_fps)  # type: ignore[arg-type]
+            if not len(merged_buffer):
+                raise ValueError("scene assembly produced no frames")
+            return VideoObject(
+                frames=[],
+                fps=target_fps,
+                duration_sec=float(len(merged_buffer) / max(1, target_fps)),
+                width=width,
+                height=height,
+                mp4_bytes=merged_mp4 if merged_mp4 is not None else self.encode_mp4(merged_buffer),
+                buffer=merged_buffer,
+            )
 
+        merged_frames: list[ImageObject] = []
         for scene in scenes:
-            merged_frames.extend(scene.frames)
+            merged_frames.extend(scene.frame_images())
 
         if not merged_frames:
             raise ValueError("scene assembly produced no frames")
 
         duration = len(merged_frames) / max(1, target_fps)
-        merged_mp4 = scenes[0].mp4_bytes if len(scenes) == 1 else None
 
         return VideoObject(
             frames=merged_frames,
@@ -180,30 +241,38 @@ class OmniMediaEngine:
             mp4_bytes=merged_mp4,
         )
 
-    def generate_gif_from_video(self, video: VideoObject, loop: int = 0) -> bytes:
+    def _concat_scene_mp4(self, scenes: list[VideoObject]) -> bytes | None:
+        clips = [scene.mp4_bytes for scene in scenes]
+        if not all(clips):
+            return None
+        # Matching geometry alone does not prove the clips share a codec or pixel format, so uniform
+        # scenes are left to concat_segments to probe before it picks stream copy over re-encoding.
+        uniform = len({(scene.width, scene.height, scene.fps) for scene in scenes}) == 1
         try:
-            image_module = importlib.import_module("PIL.Image")
-            Image = image_module
-        except Exception as exc:
-            raise RuntimeError("Pillow is required for GIF conversion") from exc
+            return concat_mp4_bytes(
+                clips,  # type: ignore[arg-type]
+                settings=self.encoder_settings,
+                stream_copy=None if uniform else False,
+            )
+        except VideoEncoderError:
+            return None
+
+    def encode_mp4(self, buffer: FrameBuffer) -> bytes | None:
+        sink = BytesSink()
+        try:
+            encode_frame_buffer(buffer, sink, settings=self.encoder_settings)
+        except VideoEncoderError:
+            return None
+        return sink.getvalue()
 
-        if not video.frames:
+    def generate_gif_from_video(self, video: VideoObject, loop: int = 0) -> bytes:
+        if not video.frame_count:
             raise ValueError("VideoObject has no frames to convert")
 
-        pil_frames = [Image.open(io.BytesIO(frame.bytes_data)).convert("RGB") for frame in video.frames]
-        output = io.BytesIO()
-        duration_ms = int(1000 / max(1, video.fps))
-
-        pil_frames[0].save(
-            output,
-            format="GIF",
-            save_all=True,
-            append_images=pil_frames[1:],
-            duration=duration_ms,
-            loop=loop,
-            optimize=True,
-        )
-        return output.getvalue()
+        settings = self.gif_settings
+        if loop != settings.loop:
+            settings = replace(settings, loop=loop)
+        return GifEncoder(settings).encode(video.frame_buffer())
 
     def debug_profile(self, profile: ModelProfile) -> dict[str, Any]:
         return asdict(profile)
@@ -0,0 +1,159 @@
+from __future__ import annotations
+
+import asyncio
+import math
+import os
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Any, Callable
+
+
+class ExecutorSaturatedError(RuntimeError):
+    def __init__(self, lane: str, retry_after_sec: int) -> None:
+        super().__init__(f"{lane} executor is saturated; retry after {retry_after_sec}s")
+        self.lane = lane
+        self.retry_after_sec = int(retry_after_sec)
+
+
+@dataclass(slots=True)
+class LaneConfig:
+    max_workers: int
+    max_queue: int
+
+
+_DEFAULT_LANES: dict[str, LaneConfig] = {
+    "image": LaneConfig(max_workers=4, max_queue=16),
+    "video": LaneConfig(max_workers=2, max_queue=4),
+    "gif": LaneConfig(max_workers=2, max_queue=8),
+    "default": LaneConfig(max_workers=2, max_queue=8),
+}
+
+
+class _Lane:
+    def __init__(self, name: str, config: LaneConfig) -> None:
+        self.name = name
+        self.config = config
+        self.executor = ThreadPoolExecutor(
+            max_workers=max(1, int(config.max_workers)),
+            thread_name_prefix=f"omni-media-{name}",
+        )
+        self.lock = threading.Lock()
+        self.pending = 0
+        self.in_flight = 0
+        self.submitted = 0
+        self.completed = 0
+        self.rejected = 0
+        self.cancelled = 0
+        self.avg_duration_sec = 0.0
+
+    @property
+    def capacity(self) -> int:
+        return max(1, int(self.config.max_workers)) + max(0, int(self.config.max_queue))
+
+    def retry_after_sec(self, fallback: int) -> int:
+        if self.avg_duration_sec <= 0:
+            return max(1, int(fallback))
+        queued = max(0, self.pending - self.in_flight)
+        waves = (queued + 1) / max(1, int(self.config.max_workers))
+        return max(1, min(300, int(math.ceil(self.avg_duration_sec * waves))))
+
+
+@dataclass(slots=True)
+class ModalityExecutorPool:
+    lanes: dict[str, LaneConfig] = field(default_factory=lambda: dict(_DEFAULT_LANES))
+    retry_after_sec: int = 5
+    _lanes: dict[str, _Lane] = field(init=False, repr=False)
+
+    def __post_init__(self) -> None:
+        configured = dict(self.lanes)
+        configured.setdefault("default", _DEFAULT_LANES["default"])
+        self._lanes = {name: _Lane(name, config) for name, config in configured.items()}
+
+    @classmethod
+    def from_env(cls) -> "ModalityExecutorPool":
+        lanes: dict[str, LaneConfig] = {}
+        for name, defaults in _DEFAULT_LANES.items():
+            suffix = name.upper()
+            lanes[name] = LaneConfig(
+                max_workers=int(os.getenv(f"OMNI_MEDIA_EXECUTOR_WORKERS_{suffix}", str(defaults.max_workers))),
+                max_queue=int(os.getenv(f"OMNI_MEDIA_EXECUTOR_QUEUE_{suffix}", str(defaults.max_queue))),
+            )
+        retry_after = int(os.getenv("OMNI_MEDIA_EXECUTOR_RETRY_AFTER_SEC", "5"))
+        return cls(lanes=lanes, retry_after_sec=retry_after)
+
+    def _lane(self, name: str) -> _Lane:
+        return self._lanes.get(str(name or "").strip().lower()) or self._lanes["default"]
+
+    def submit(self, lane_name: str, fn: Callable[..., Any], *args: Any, **kwargs: Any) -> Future:
+        lane = self._lane(lane_name)
+        with lane.lock:
+            if lane.pending >= lane.capacity:
+                lane.rejected += 1
+                raise ExecutorSaturatedError(lane.name, lane.retry_after_sec(self.retry_after_sec))
+            lane.pending += 1
+            lane.submitted += 1
+
+        def run() -> Any:
+            with lane.lock:
+                lane.in_flight += 1
+            started = time.perf_counter()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                elapsed = time.perf_counter() - started
+                with lane.lock:
+                    lane.in_flight -= 1
+                    lane.pending -= 1
+                    lane.completed += 1
+                    if lane.avg_duration_sec <= 0:
+                        lane.avg_duration_sec = elapsed
+                    else:
+                        lane.avg_duration_sec = 0.8 * lane.avg_duration_sec + 0.2 * elapsed
+
+        def release(future: Future) -> None:
+            # A future cancelled while queued (e.g. asyncio.wrap_future when the client disconnects) never
+            # reaches run(), so its slot is given back here. Futures that ran already released it in run(),
+            # before their result became visible to waiters.
+            if future.cancelled():
+                with lane.lock:
+                    lane.pending -= 1
+                    lane.cancelled += 1
+
+        try:
+            future = lane.executor.submit(run)
+        except Exception:
+            with lane.lock:
+                lane.pending -= 1
+            raise
+        future.add_done_callback(release)
+        return future
+
+    async def run(self, lane_name: str, fn: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+        return await asyncio.wrap_future(self.submit(lane_name, fn, *args, **kwargs))
+
+    def snapshot(self) -> dict[str, Any]:
+        lanes: dict[str, Any] = {}
+        for name, lane in self._lanes.items():
+            with lane.lock:
+                lanes[name] = {
+                    "max_workers": int(lane.config.max_workers),
+                    "max_queue": int(lane.config.max_queue),
+                    "in_flight": lane.in_flight,
+                    "queued": max(0, lane.pending - lane.in_flight),
+                    "submitted": lane.submitted,
+                    "completed": lane.completed,
+                    "rejected": lane.rejected,
+                    "cancelled": lane.cancelled,
+                    "avg_duration_ms": round(lane.avg_duration_sec * 1000, 2),
+                }
+        return {
+            "in_flight": sum(item["in_flight"] for item in lanes.values()),
+            "queued": sum(item["queued"] for item in lanes.values()),
+            "lanes": lanes,
+        }
+
+    def shutdown(self, wait: bool = False) -> None:
+        for lane in self._lanes.values():
+            lane.executor.shutdown(wait=wait, cancel_futures=not wait)
@@ -0,0 +1,350 @@
+from __future__ import annotations
+
+import importlib
+import io
+import os
+import struct
+from dataclasses import dataclass, field
+from typing import Any, Iterable, Sequence
+
+from .contracts import FrameBuffer, _numpy, _pil_image
+
+_KEY_BITS = 5
+_KEY_COUNT = 1 << (3 * _KEY_BITS)
+_TRANSPARENT_INDEX = 255
+_BAYER_4X4 = (
+    (0, 8, 2, 10),
+    (12, 4, 14, 6),
+    (3, 11, 1, 9),
+    (15, 7, 13, 5),
+)
+
+
+def _gif_plugin() -> Any:
+    try:
+        return importlib.import_module("PIL.GifImagePlugin")
+    except Exception as exc:
+        raise RuntimeError("Pillow is required for GIF encoding") from exc
+
+
+@dataclass(slots=True)
+class GifEncoderSettings:
+    max_colors: int = 255
+    palette_mode: str = "global"
+    dither: bool = False
+    dither_strength: float = 24.0
+    delta: bool = True
+    target_fps: int | None = None
+    max_side: int | None = None
+    sample_stride: int = 2
+    loop: int = 0
+
+    @classmethod
+    def from_env(cls) -> "GifEncoderSettings":
+        target_fps = int(os.getenv("OMNI_MEDIA_GIF_FPS", "0"))
+        max_side = int(os.getenv("OMNI_MEDIA_GIF_MAX_SIDE", "0"))
+        return cls(
+            max_colors=int(os.getenv("OMNI_MEDIA_GIF_MAX_COLORS", "255")),
+            palette_mode=str(os.getenv("OMNI_MEDIA_GIF_PALETTE", "global")).strip().lower() or "global",
+            dither=str(os.getenv("OMNI_MEDIA_GIF_DITHER", "false")).strip().lower() in {"1", "true", "yes", "on"},
+            delta=str(os.getenv("OMNI_MEDIA_GIF_DELTA", "true")).strip().lower() in {"1", "true", "yes", "on"},
+            target_fps=target_fps or None,
+            max_side=max_side or None,
+        )
+
+
+@dataclass(slots=True)
+class GifEncodeStats:
+    source_frames: int = 0
+    written_frames: int = 0
+    merged_frames: int = 0
+    palette_sizes: list[int] = field(default_factory=list)
+    width: int = 0
+    height: int = 0
+    fps: float = 0.0
+    bytes_written: int = 0
+
+
+def _color_keys(frame: Any) -> Any:
+    np = _numpy()
+    shift = 8 - _KEY_BITS
+    rgb = frame.astype(np.uint16, copy=False) >> shift
+    return (rgb[..., 0] << (2 * _KEY_BITS)) | (rgb[..., 1] << _KEY_BITS) | rgb[..., 2]
+
+
+def _key_centers() -> Any:
+    np = _numpy()
+    keys = np.arange(_KEY_COUNT, dtype=np.int32)
+    mask = (1 << _KEY_BITS) - 1
+    shift = 8 - _KEY_BITS
+    half = 1 << (shift - 1)
+    return np.stack(
+        [
+            ((keys >> (2 * _KEY_BITS)) & mask) << shift | half,
+            ((keys >> _KEY_BITS) & mask) << shift | half,
+            (keys & mask) << shift | half,
+        ],
+        axis=1,
+    )
+
+
+def build_histogram(frames: Iterable[Any], sample_stride: int = 2) -> Any:
+    np = _numpy()
+    counts = np.zeros(_KEY_COUNT, dtype=np.int64)
+    step = max(1, int(sample_stride))
+    for frame in frames:
+        counts += np.bincount(_color_keys(frame[::step, ::step]).ravel(), minlength=_KEY_COUNT)
+    return counts
+
+
+def median_cut(counts: Any, max_colors: int) -> Any:
+    np = _numpy()
+    keys = np.nonzero(counts)[0]
+    if not len(keys):
+        return np.zeros((1, 3), dtype=np.uint8)
+    colors = _key_centers()[keys]
+    weights = counts[keys].astype(np.float64)
+    if len(keys) <= max_colors:
+        return colors.astype(np.uint8)
+
+    def scored(box: Any) -> tuple[float, Any]:
+        if len(box) < 2:
+            return -1.0, box
+        span = colors[box].max(axis=0) - colors[box].min(axis=0)
+        return float(span.max()) * float(weights[box].sum()) ** 0.5, box
+
+    # Always split the box whose widest channel spans the most weighted range.
+    boxes = [scored(np.arange(len(keys)))]
+    while len(boxes) < max_colors:
+        target = max(range(len(boxes)), key=lambda index: boxes[index][0])
+        if boxes[target][0] <= 0:
+            break
+        _, box = boxes.pop(target)
+        box_colors = colors[box]
+        channel = int(np.argmax(box_colors.max(axis=0) - box_colors.min(axis=0)))
+        order = box[np.argsort(box_colors[:, channel], kind="stable")]
+        cumulative = np.cumsum(weights[order])
+        cut = int(np.searchsorted(cumulative, cumulative[-1] / 2.0))
+        cut = min(max(cut, 1), len(order) - 1)
+        boxes.extend([scored(order[:cut]), scored(order[cut:])])
+
+    palette = np.empty((len(boxes), 3), dtype=np.float64)
+    for index, (_, box) in enumerate(boxes):
+        palette[index] = np.average(colors[box], axis=0, weights=weights[box])
+    return np.clip(np.rint(palette), 0, 255).astype(np.uint8)
+
+
+def build_lookup(palette: Any) -> Any:
+    np = _numpy()
+    centers = _key_centers().astype(np.float32)
+    candidates = palette.astype(np.float32)
+    # |c - p|^2 = |c|^2 - 2 c.p + |p|^2; the |c|^2 term is constant per row and drops out of argmin.
+    distances = (candidates * candidates).sum(axis=1)[None, :] - 2.0 * (centers @ candidates.T)
+    return np.argmin(distances, axis=1).astype(np.uint8)
+
+
+class _Ditherer:
+    def __init__(self, strength: float) -> None:
+        self.strength = float(strength)
+        self._cache: dict[tuple[int, int], Any] = {}
+
+    def apply(self, frame: Any) -> Any:
+        np = _numpy()
+        height, width = frame.shape[:2]
+        offsets = self._cache.get((height, width))
+        if offsets is None:
+            bayer = (np.asarray(_BAYER_4X4, dtype=np.float32) + 0.5) / 16.0 - 0.5
+            tiled = np.tile(bayer, ((height + 3) // 4, (width + 3) // 4))[:height, :width]
+            offsets = np.rint(tiled * self.strength).astype(np.int16)[..., None]
+            self._cache[(height, width)] = offsets
+        return np.clip(frame.astype(np.int16) + offsets, 0, 255).astype(np.uint8)
+
+
+def _as_rgb(frame: Any) -> Any:
+    np = _numpy()
+    if frame.ndim == 2:
+        frame = frame[..., None]
+    channels = frame.shape[2]
+    if channels == 1:
+        return np.repeat(frame, 3, axis=2)
+    if channels == 4:
+        return frame[..., :3]
+    return frame
+
+
+class GifEncoder:
+    def __init__(self, settings: GifEncoderSettings | None = None) -> None:
+        self.settings = settings or GifEncoderSettings.from_env()
+
+    def _resize(self, frame: Any, size: tuple[int, int] | None) -> Any:
+        if size is None:
+            return frame
+        np = _numpy()
+        Image = _pil_image()
+        return np.asarray(Image.fromarray(frame).resize(size, Image.Resampling.BOX))
+
+    def _plan(self, buffer: FrameBuffer) -> tuple[list[int], tuple[int, int] | None, float]:
+        source_fps = float(max(1, buffer.fps))
+        step = 1
+        if self.settings.target_fps and self.settings.target_fps < source_fps:
+            step = max(1, round(source_fps / self.settings.target_fps))
+        indices = list(range(0, len(buffer), step))
+
+        size = None
+        if self.settings.max_side and max(buffer.width, buffer.height) > self.settings.max_side:
+            scale = self.settings.max_side / max(buffer.width, buffer.height)
+            size = (max(1, round(buffer.width * scale)), max(1, round(buffer.height * scale)))
+        return indices, size, source_fps / step
+
+    def _palette_groups(self, indices: list[int], scene_lengths: Sequence[int] | None) -> list[list[int]]:
+        if self.settings.palette_mode != "scene" or not scene_lengths:
+            return [indices]
+        groups: list[list[int]] = []
+        start = 0
+        for length in scene_lengths:
+            end = start + int(length)
+            group = [index for index in indices if start <= index < end]
+            if group:
+                groups.append(group)
+            start = end
+        tail = [index for index in indices if index >= start]
+        if tail:
+            groups.append(tail)
+        return groups
+
+    def encode(
+        self,
+        frames: FrameBuffer,
+        scene_lengths: Sequence[int] | None = None,
+        stats: GifEncodeStats | None = None,
+    ) -> bytes:
+        output = io.BytesIO()
+        self.encode_to(frames, output, scene_lengths=scene_lengths, stats=stats)
+        return output.getvalue()
+
+    def encode_to(
+        self,
+        frames: FrameBuffer,
+        sink: Any,
+        scene_lengths: Sequence[int] | None = None,
+        stats: GifEncodeStats | None = None,
+    ) -> GifEncodeStats:
+        np = _numpy()
+        Image = _pil_image()
+        gif = _gif_plugin()
+        stats = stats or GifEncodeStats()
+        if not len(frames):
+            raise ValueError("GIF encoding requires at least one frame")
+
+        indices, size, output_fps = self._plan(frames)
+        width, height = size or (frames.width, frames.height)
+        stats.source_frames = len(frames)
+        stats.width, stats.height, stats.fps = width, height, round(output_fps, 3)
+
+        # Colour budget leaves one slot for the transparent index used by delta frames.
+        max_colors = max(2, min(int(self.settings.max_colors), 255 if self.settings.delta else 256))
+        ditherer = _Ditherer(self.settings.dither_strength) if self.settings.dither else None
+
+        def prepared(index: int) -> Any:
+            frame = self._resize(_as_rgb(frames[index]), size)
+            return ditherer.apply(frame) if ditherer is not None else frame
+
+        groups = self._palette_groups(indices, scene_lengths)
+        palettes = []
+        for group in groups:
+            histogram = build_histogram(
+                (self._resize(_as_rgb(frames[index]), size) for index in group),
+                sample_stride=self.settings.sample_stride,
+            )
+            palette = median_cut(histogram, max_colors)
+            palettes.append((palette, build_lookup(palette)))
+            stats.palette_sizes.append(int(len(palette)))
+
+        frame_ms = 1000.0 / output_fps
+        global_palette = palettes[0][0] if len(palettes) == 1 else None
+        header = self._header(width, height, global_palette)
+        sink.write(header)
+        written = len(header)
+
+        pending: tuple[Any, tuple[int, int], dict[str, Any]] | None = None
+        pending_start_cs = 0
+        previous = None
+        emitted = 0
+
+        def flush(end_cs: int) -> int:
+            nonlocal pending
+            assert pending is not None
+            image, offset, params = pending
+            params["duration"] = max(10, (end_cs - pending_start_cs) * 10)
+            chunks = gif.getdata(image, offset=offset, **params)
+            pending = None
+            size_written = 0
+            for chunk in chunks:
+                sink.write(chunk)
+                size_written += len(chunk)
+            return size_written
+
+        for group, (palette, lookup) in zip(groups, palettes):
+            palette_bytes = self._palette_bytes(palette)
+            local_table = global_palette is None
+            for position, index in enumerate(group):
+                current = lookup[_color_keys(prepared(index))]
+                start_cs = round(emitted * frame_ms / 10)
+                emitted += 1
+                full_frame = previous is None or not self.settings.delta or (local_table and position == 0)
+
+                if full_frame:
+                    crop, offset, params = current, (0, 0), {"disposal": 1}
+                else:
+                    changed = current != previous
+                    if not changed.any():
+                        stats.merged_frames += 1
+                        continue
+                    rows = np.flatnonzero(changed.any(axis=1))
+                    cols = np.flatnonzero(changed.any(axis=0))
+                    y0, y1, x0, x1 = int(rows[0]), int(rows[-1]) + 1, int(cols[0]), int(cols[-1]) + 1
+                    crop = np.where(changed[y0:y1, x0:x1], current[y0:y1, x0:x1], _TRANSPARENT_INDEX).astype(np.uint8)
+                    offset = (x0, y0)
+                    params = {"disposal": 1, "transparency": _TRANSPARENT_INDEX}
+
+                if pending is not None:
+                    written += flush(start_cs)
+                image = Image.fromarray(np.ascontiguousarray(crop))
+                if local_table:
+                    image.putpalette(palette_bytes)
+                    params["include_color_table"] = True
+                pending = (image, offset, params)
+                pending_start_cs = start_cs
+                previous = current
+                stats.written_frames += 1
+
+        if pending is not None:
+            written += flush(round(emitted * frame_ms / 10))
+        sink.write(b";")
+        stats.bytes_written = written + 1
+        return stats
+
+    def _palette_bytes(self, palette: Any) -> bytes:
+        np = _numpy()
+        table = np.zeros((256, 3), dtype=np.uint8)
+        table[: len(palette)] = palette
+        return table.tobytes()
+
+    def _header(self, width: int, height: int, palette: Any | None) -> bytes:
+        flags = 0
+        table = b""
+        if palette is not None:
+            flags = 0x80 | 0x70 | 0x07
+            table = self._palette_bytes(palette)
+        loop = b""
+        if self.settings.loop is not None:
+            loop = b"!\xff\x0bNETSCAPE2.0\x03\x01" + struct.pack("<H", int(self.settings.loop)) + b"\x00"
+        return b"GIF89a" + struct.pack("<HHBBB", width, height, flags, 0, 0) + table + loop
+
+
+def encode_gif(
+    frames: FrameBuffer,
+    settings: GifEncoderSettings | None = None,
+    scene_lengths: Sequence[int] | None = None,
+) -> bytes:
+    return GifEncoder(settings).encode(frames, scene_lengths=scene_lengths)
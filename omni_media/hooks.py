@@ -1,10 +1,11 @@
 from __future__ import annotations
 
-import importlib
-import io
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from typing import Any
 
+from .budget_encoder import BudgetUnreachableError, fit_to_budget
+from .watermark import FrameWatermarker
+
 
 class MediaPolicyError(PermissionError):
     pass
@@ -13,6 +14,37 @@ class MediaPolicyError(PermissionError):
 @dataclass(slots=True)
 class DefaultMediaHooks:
     max_output_bytes: int = 64 * 1024 * 1024
+    strict_video_max_bytes: int = 32 * 1024 * 1024
+    budget_reencode: bool = True
+    watermarker: FrameWatermarker = field(default_factory=FrameWatermarker.from_env)
+
+    def byte_budget(self, media_type: str, safety_level: str) -> int:
+        strict = str(safety_level or "default").lower() in {"strict", "high"}
+        if strict and media_type == "video":
+            return min(self.max_output_bytes, self.strict_video_max_bytes)
+        return self.max_output_bytes
+
+    def fit_to_budget(
+        self,
+        media_type: str,
+        data: bytes,
+        metadata: dict[str, Any],
+        safety_level: str,
+    ) -> tuple[bytes, dict[str, Any]]:
+        budget = self.byte_budget(media_type, safety_level)
+        if not data or len(data) <= budget or not self.budget_reencode or media_type not in {"gif", "video"}:
+            return data, metadata
+
+        try:
+            result = fit_to_budget(media_type, data, budget, metadata)
+        except (BudgetUnreachableError, RuntimeError) as exc:
+            # Leave the oversized output in place so validate_output reports the policy violation.
+            metadata["budget_reencode_error"] = str(exc)
+            return data, metadata
+
+        metadata.update(result.output)
+        metadata["budget_reencode"] = result.metadata(budget_bytes=budget, original_bytes=len(data))
+        return result.data, metadata
 
     def validate_output(
         self,
@@ -30,7 +62,7 @@ class DefaultMediaHooks:
             )
 
         strict = str(safety_level or "default").lower() in {"strict", "high"}
-        if strict and media_type == "video" and len(data) > 32 * 1024 * 1024:
+        if strict and media_type == "video" and len(data) > self.strict_video_max_bytes:
             raise MediaPolicyError("video output blocked by strict safety size policy")
 
     def apply_watermark(
@@ -44,6 +76,9 @@ class DefaultMediaHooks:
             metadata["watermark_applied"] = False
             return data, metadata
 
+        if metadata.get("watermark_stage") == "frames":
+            return data, metadata
+
         if media_type in {"image", "gif"}:
             watermarked = self._overlay_text_watermark(data)
             if watermarked is not None:
@@ -57,23 +92,6 @@ class DefaultMediaHooks:
 
     def _overlay_text_watermark(self, data: bytes) -> bytes | None:
         try:
-            image_module = importlib.import_module("PIL.Image")
-            draw_module = importlib.import_module("PIL.ImageDraw")
-        except Exception:
-            return None
-
-        try:
-            image = image_module.open(io.BytesIO(data)).convert("RGBA")
-            drawer = draw_module.Draw(image)
-            text = "Omni Ai"
-            width, height = image.size
-            x = max(8, width - 88)
-            y = max(8, height - 20)
-            drawer.rectangle((x - 4, y - 2, x + 72, y + 14), fill=(0, 0, 0, 96))
-            drawer.text((x, y), text, fill=(255, 255, 255, 220))
-
-            output = io.BytesIO()
-            image.save(output, format="PNG")
-            return output.getvalue()
+            return self.watermarker.apply_encoded(data)
         except Exception:
             return None
@@ -1,6 +1,7 @@
 from __future__ import annotations
 
 import importlib
+import math
 import time
 import uuid
 from dataclasses import asdict
@@ -10,6 +11,9 @@ from starlette.requests import Request
 
 from .api_contracts import GenerateBody
 from .audit import AuditLogger
+from .cost_budget import BudgetCharge, BudgetExceededError, CostBudget
+from .executor import ExecutorSaturatedError, ModalityExecutorPool
+from .media_delivery import MediaDelivery
 from .security import (
     ApiKeyAuth,
     AuthError,
@@ -19,6 +23,7 @@ from .security import (
 )
 from .provider_video_pipeline import generate_prompt_video_export
 from .service import OmniMediaService
+from .sqlite_jobs import create_job_backends_from_env
 
 
 def create_fastapi_app(service: OmniMediaService | None = None) -> Any:
@@ -33,11 +38,16 @@ def create_fastapi_app(service: OmniMediaService | None = None) -> Any:
 
     app = FastAPI(title="Omni Media API", version="1.0.0")
     app.mount("/omni_video_exports", StaticFiles(directory="omni_video_exports"), name="omni_video_exports")
-    media_service = service or OmniMediaService()
+    media_service = service or OmniMediaService(**create_job_backends_from_env())
     auth = ApiKeyAuth()
+    if auth.registry.path is not None:
+        auth.registry.install_signal_handler()
     limiter = create_rate_limiter_from_env()
     limits = load_rate_limits_from_env()
+    budget = CostBudget.from_env(limiter)
     audit = AuditLogger.from_env()
+    executor = getattr(media_service, "executor", None) or ModalityExecutorPool.from_env()
+    delivery = getattr(media_service, "media_delivery", None) or MediaDelivery.from_env()
 
     def _headers_to_dict(request: Any) -> dict[str, str]:
         try:
@@ -45,18 +55,111 @@ def create_fastapi_app(service: OmniMediaService | None = None) -> Any:
         except Exception:
             return {}
 
+    # Budget headers computed by enforce_access, attached to whatever response the route produces.
+    @app.middleware("http")
+    async def budget_headers(request: Request, call_next: Any) -> Any:
+        response = await call_next(request)
+        response.headers.update(getattr(request.state, "budget_headers", None) or {})
+        return response
+
+    def _rate_limited(exc: RateLimitError) -> Any:
+        headers = {}
+        if exc.retry_after_sec is not None:
+            headers["Retry-After"] = str(max(1, math.ceil(exc.retry_after_sec)))
+        if isinstance(exc, BudgetExceededError):
+            headers.update(exc.charge.headers())
+        return HTTPException(status_code=429, detail=str(exc), headers=headers or None)
+
     def enforce_access(request: Any, bucket: str) -> str:
         try:
             headers = _headers_to_dict(request)
-            api_key = auth.verify(headers)
-            requester = api_key or headers.get("x-forwarded-for") or headers.get("x-real-ip") or "anonymous"
+            identity = auth.identify(headers)
+            request.state.api_key = identity
+            requester = (
+                identity.key_id if identity is not None else None
+            ) or headers.get("x-forwarded-for") or headers.get("x-real-ip") or "anonymous"
             limit, window = limits.get(bucket, limits["default"])
             limiter.check(key=f"{bucket}:{requester}", limit=limit, window_sec=window)
             return requester
         except AuthError as exc:
             raise HTTPException(status_code=401, detail=str(exc))
         except RateLimitError as exc:
-            raise HTTPException(status_code=429, detail=str(exc))
+            raise _rate_limited(exc)
+
+    def charge_budget(request: Any, requester: str, modality: str, payload: dict[str, Any]) -> BudgetCharge | None:
+        # Called once the request has passed validation, so malformed requests cost nothing.
+        identity = getattr(request.state, "api_key", None)
+        params = payload.get("params")
+        try:
+            charge = budget.charge(
+                requester,
+                modality,
+                str(payload.get("mode", "default")),
+                params if isinstance(params, dict) else {},
+                str(payload.get("prompt", "")),
+                budget=identity.quota if identity is not None else None,
+            )
+        except RateLimitError as exc:
+            raise _rate_limited(exc)
+        if charge is not None:
+            request.state.budget_headers = charge.headers()
+        return charge
+
+    def refund_budget(request: Any, charge: BudgetCharge | None) -> None:
+        if charge is not None:
+            request.state.budget_headers = budget.refund(charge).headers()
+
+    def authorize_media(headers: dict[str, str]) -> bool:
+        try:
+            auth.verify(headers)
+            return True
+        except AuthError:
+            return False
+
+    # Unsigned media requests fall back to API-key auth unless signatures are mandatory.
+    if delivery.authorize is None:
+        delivery.authorize = authorize_media
+    app.mount(delivery.prefix, delivery, name="media")
+
+    # Both runners give the budget charge back when no output is produced: a saturated lane, an error
+    # or a failed result.
+    async def run_generation(request: Any, modality: str, body: GenerateBody, charge: BudgetCharge | None) -> Any:
+        try:
+            if hasattr(media_service, "generate_async"):
+                result = await media_service.generate_async(modality, body)
+            else:
+                result = await executor.run(modality, media_service.generate_sync, modality, body)
+        except ExecutorSaturatedError as exc:
+            refund_budget(request, charge)
+            raise HTTPException(
+                status_code=503,
+                detail=str(exc),
+                headers={"Retry-After": str(exc.retry_after_sec)},
+            )
+        except BaseException:
+            refund_budget(request, charge)
+            raise
+        if result.status != "completed":
+            refund_budget(request, charge)
+        return result
+
+    async def run_provider_export(
+        request: Any, prompt: str, params: dict[str, Any], charge: BudgetCharge | None
+    ) -> dict[str, Any]:
+        try:
+            if hasattr(media_service, "generate_prompt_video_export_async"):
+                return await media_service.generate_prompt_video_export_async(prompt, params)
+            return await executor.run("video", generate_prompt_video_export, prompt, params)
+        except ExecutorSaturatedError as exc:
+            refund_budget(request, charge)
+            raise HTTPException(
+                status_code=503,
+                detail=str(exc),
+                headers={"Retry-After": str(exc.retry_after_sec)},
+            )
+        except BaseException:
+            refund_budget(request, charge)
+            raise
 
     def write_audit(
         *,
@@ -104,7 +207,8 @@ def create_fastapi_app(service: OmniMediaService | None = None) -> Any:
         try:
             requester = enforce_access(request, "image")
             body = parse_body(payload)
-            result = media_service.generate_sync("image", body)
+            charge = charge_budget(request, requester, "image", payload)
+            result = await run_generation(request, "image", body, charge)
             code = 200 if result.status == "completed" else 500
             write_audit(
                 request_id=request_id,
@@ -138,7 +242,8 @@ def create_fastapi_app(service: OmniMediaService | None = None) -> Any:
         try:
             requester = enforce_access(request, "video")
             body = parse_body(payload)
-            result = media_service.generate_sync("video", body)
+            charge = charge_budget(request, requester, "video", payload)
+            result = await run_generation(request, "video", body, charge)
             code = 200 if result.status == "completed" else 500
             write_audit(
                 request_id=request_id,
@@ -172,7 +277,8 @@ def create_fastapi_app(service: OmniMediaService | None = None) -> Any:
         try:
             requester = enforce_access(request, "gif")
             body = parse_body(payload)
-            result = media_service.generate_sync("gif", body)
+            charge = charge_budget(request, requester, "gif", payload)
+            result = await run_generation(request, "gif", body, charge)
             code = 200 if result.status == "completed" else 500
             write_audit(
                 request_id=request_id,
@@ -209,7 +315,8 @@ def create_fastapi_app(service: OmniMediaService | None = None) -> Any:
             if not prompt:
                 raise HTTPException(status_code=400, detail="Prompt is required")
             params = dict(payload.get("params") or {})
-            result = generate_prompt_video_export(prompt, params)
+            charge = charge_budget(request, requester, "video", payload)
+            result = await run_provider_export(request, prompt, params, charge)
             write_audit(
                 request_id=request_id,
                 route="/omni_video_exports",
@@ -257,7 +364,13 @@ def create_fastapi_app(service: OmniMediaService | None = None) -> Any:
                 raise HTTPException(status_code=400, detail=f"Unsupported modality: {modality}")
 
             body = parse_body(payload)
-            result = media_service.enqueue_job(mod, body)
+            # Queued jobs are charged when accepted; the budget is not refunded if the job fails later.
+            charge = charge_budget(request, requester, mod, payload)
+            try:
+                result = media_service.enqueue_job(mod, body)
+            except BaseException:
+                refund_budget(request, charge)
+                raise
             write_audit(
                 request_id=request_id,
                 route="/v1/jobs/{modality}",
@@ -334,6 +447,19 @@ def create_fastapi_app(service: OmniMediaService | None = None) -> Any:
             "video_backend": health_probe,
         }
 
+    @app.get("/v1/ready")
+    async def ready():
+        readiness = (
+            media_service.get_readiness()
+            if hasattr(media_service, "get_readiness")
+            else {"ready": True}
+        )
+        code = 200 if readiness.get("ready") else 503
+        return fastapi_module.responses.JSONResponse(
+            content={"service": "omni-media", **readiness},
+            status_code=code,
+        )
+
     @app.get("/v1/admin/security")
     async def admin_security(request: Request):
         request_id = str(uuid.uuid4())
@@ -345,13 +471,16 @@ def create_fastapi_app(service: OmniMediaService | None = None) -> Any:
                 "ok": True,
                 "auth": {
                     "header_name": auth.header_name,
-                    "keys_configured": bool(auth._configured_keys()),
+                    "keys_configured": len(auth.registry) > 0,
+                    "registry": auth.registry.snapshot(),
                     "allow_without_keys": auth.allow_without_keys,
                 },
                 "rate_limiter": {
                     "backend": type(limiter).__name__,
                     "limits": limits,
+                    "stats": limiter.snapshot() if hasattr(limiter, "snapshot") else None,
                 },
+                "cost_budget": budget.snapshot(),
                 "audit": {
                     "enabled": audit.enabled,
                     "path": audit.path,
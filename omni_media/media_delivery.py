@@ -0,0 +1,303 @@
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import hmac
+import mimetypes
+import os
+import time
+from email.utils import formatdate
+from pathlib import Path
+from typing import Any, Awaitable, Callable
+from urllib.parse import parse_qs, quote
+
+Authorize = Callable[[dict[str, str]], bool]
+
+_CHUNK_BYTES = 256 * 1024
+
+
+class RangeNotSatisfiable(ValueError):
+    pass
+
+
+def parse_range(header: str | None, size: int) -> tuple[int, int] | None:
+    # Returns an inclusive (start, end) pair, or None to serve the whole file.
+    if not header:
+        return None
+    unit, _, spec = header.partition("=")
+    if unit.strip().lower() != "bytes" or "," in spec:
+        # Multi-range requests are answered with the full body, which RFC 9110 allows.
+        return None
+    first, sep, last = spec.strip().partition("-")
+    if not sep:
+        return None
+    try:
+        if first == "":
+            suffix = int(last)
+            if suffix <= 0:
+                raise RangeNotSatisfiable(header)
+            return max(0, size - suffix), size - 1
+        start = int(first)
+        end = int(last) if last else size - 1
+    except ValueError:
+        return None
+    if start >= size or start > end:
+        raise RangeNotSatisfiable(header)
+    return start, min(end, size - 1)
+
+
+def strong_etag(stat: os.stat_result) -> str:
+    return f'"{stat.st_ino:x}-{stat.st_size:x}-{stat.st_mtime_ns:x}"'
+
+
+def _etag_matches(header: str, etag: str) -> bool:
+    if header.strip() == "*":
+        return True
+    return any(candidate.strip().removeprefix("W/") == etag for candidate in header.split(","))
+
+
+class MediaDelivery:
+    def __init__(
+        self,
+        roots: dict[str, str] | None = None,
+        secret: str | bytes | None = None,
+        prefix: str = "/v1/media",
+        base_url: str = "",
+        cache_max_age_sec: int = 3600,
+        require_signature: bool | None = None,
+        storage: Any = None,
+        authorize: Authorize | None = None,
+        access_hook: Callable[[Path], None] | None = None,
+    ) -> None:
+        self.roots = dict(roots or {"media_outputs": "media_outputs", "omni_video_exports": "omni_video_exports"})
+        self.secret = secret.encode("utf-8") if isinstance(secret, str) else secret
+        self.prefix = "/" + prefix.strip("/")
+        self.base_url = base_url.rstrip("/")
+        self.cache_max_age_sec = max(0, int(cache_max_age_sec))
+        self.require_signature = bool(self.secret) if require_signature is None else bool(require_signature)
+        self.storage = storage
+        self.authorize = authorize
+        self.access_hook = access_hook
+        self._stats = {
+            "requests": 0,
+            "full": 0,
+            "partial": 0,
+            "not_modified": 0,
+            "denied": 0,
+            "zero_copy": 0,
+            "errors": 0,
+        }
+
+    @classmethod
+    def from_env(cls) -> "MediaDelivery":
+        storage_dir = str(os.getenv("OMNI_MEDIA_STORAGE_DIR", "media_outputs")).strip() or "media_outputs"
+        require = str(os.getenv("OMNI_MEDIA_MEDIA_REQUIRE_SIGNATURE", "")).strip().lower()
+        return cls(
+            roots={"media_outputs": storage_dir, "omni_video_exports": "omni_video_exports"},
+            secret=str(os.getenv("OMNI_MEDIA_MEDIA_SIGNING_KEY", "")).strip() or None,
+            prefix=str(os.getenv("OMNI_MEDIA_MEDIA_PREFIX", "/v1/media")),
+            base_url=str(os.getenv("OMNI_MEDIA_PUBLIC_BASE_URL", "")).strip(),
+            cache_max_age_sec=int(os.getenv("OMNI_MEDIA_MEDIA_CACHE_MAX_AGE_SEC", "3600")),
+            require_signature=None if not require else require in {"1", "true", "yes", "on"},
+        )
+
+    def _signature(self, route_path: str, expires: int) -> str:
+        message = f"{route_path}\n{expires}".encode("utf-8")
+        return hmac.new(self.secret or b"", message, hashlib.sha256).hexdigest()
+
+    def route_path_for(self, path: str) -> str | None:
+        target = Path(path).resolve()
+        for name, directory in self.roots.items():
+            try:
+                relative = target.relative_to(Path(directory).resolve())
+            except ValueError:
+                continue
+            return f"{name}/{relative.as_posix()}"
+        return None
+
+    def url_for(self, path: str, ttl_sec: int | None = None, now: float | None = None) -> str | None:
+        if not self.secret or "://" in path:
+            return None
+        route_path = self.route_path_for(path)
+        if route_path is None:
+            return None
+        expires = int((now or time.time()) + ttl_sec) if ttl_sec and ttl_sec > 0 else 0
+        query = f"sig={self._signature(route_path, expires)}"
+        if expires:
+            query = f"expires={expires}&{query}"
+        return f"{self.base_url}{self.prefix}/{quote(route_path)}?{query}"
+
+    def verify(self, route_path: str, expires: int, signature: str, now: float | None = None) -> bool:
+        if not self.secret or not signature:
+            return False
+        if expires and expires < (now or time.time()):
+            return False
+        return hmac.compare_digest(self._signature(route_path, expires), signature)
+
+    def locate(self, route_path: str) -> Path | None:
+        name, _, relative = route_path.partition("/")
+        directory = self.roots.get(name)
+        if directory is None or not relative:
+            return None
+        # Dot entries are internal: the CAS index and blobs under .cas/, in-flight .tmp/.part files.
+        if any(part.startswith(".") for part in relative.split("/")):
+            return None
+        root = Path(directory).resolve()
+        candidate = (root / relative).resolve()
+        if candidate != root and root not in candidate.parents:
+            return None
+        return Path(directory) / relative
+
+    async def _materialize(self, path: Path) -> Path | None:
+        storage = self.storage
+        # Write-behind storage hands out URLs before the bytes land; wait for the pending write.
+        if storage is not None and hasattr(storage, "wait_async"):
+            await storage.wait_async(path.as_posix())
+        if path.is_file():
+            return path
+        if storage is not None and hasattr(storage, "resolve"):
+            return await asyncio.to_thread(storage.resolve, path.as_posix())
+        return None
+
+    def snapshot(self) -> dict[str, Any]:
+        return {
+            **self._stats,
+            "prefix": self.prefix,
+            "roots": dict(self.roots),
+            "signed_urls": bool(self.secret),
+            "require_signature": self.require_signature,
+        }
+
+    async def __call__(self, scope: dict[str, Any], receive: Callable[[], Awaitable[Any]], send: Any) -> None:
+        if scope["type"] != "http":
+            return
+        self._stats["requests"] += 1
+        method = scope["method"].upper()
+        if method not in {"GET", "HEAD"}:
+            await _send_empty(send, 405, [(b"allow", b"GET, HEAD")])
+            return
+
+        path = scope["path"]
+        root_path = scope.get("root_path", "")
+        if root_path and path.startswith(root_path):
+            path = path[len(root_path) :]
+        elif path.startswith(self.prefix + "/"):
+            path = path[len(self.prefix) :]
+        route_path = path.lstrip("/")
+        headers = {key.decode("latin-1").lower(): value.decode("latin-1") for key, value in scope.get("headers", [])}
+        query = parse_qs(scope.get("query_string", b"").decode("latin-1"))
+
+        signature = (query.get("sig") or [""])[0]
+        try:
+            expires = int((query.get("expires") or ["0"])[0])
+        except ValueError:
+            expires = -1
+        signed = expires >= 0 and self.verify(route_path, expires, signature)
+        if not signed and (self.require_signature or self.authorize is None or not self.authorize(headers)):
+            self._stats["denied"] += 1
+            await _send_empty(send, 403)
+            return
+
+        located = self.locate(route_path)
+        try:
+            resolved = await self._materialize(located) if located is not None else None
+        except Exception:
+            # The write-behind future (or the storage backend) failed, so the bytes never landed.
+            self._stats["errors"] += 1
+            await _send_empty(send, 500)
+            return
+        if resolved is None:
+            await _send_empty(send, 404)
+            return
+        try:
+            stat = await asyncio.to_thread(os.stat, resolved)
+        except FileNotFoundError:
+            await _send_empty(send, 404)
+            return
+        if self.access_hook is not None:
+            self.access_hook(resolved)
+        size = stat.st_size
+        etag = strong_etag(stat)
+
+        if signed and expires:
+            max_age = max(0, min(self.cache_max_age_sec, int(expires - time.time())))
+        else:
+            max_age = self.cache_max_age_sec
+        response_headers = [
+            (b"etag", etag.encode("latin-1")),
+            (b"last-modified", formatdate(stat.st_mtime, usegmt=True).encode("latin-1")),
+            (b"cache-control", f"private, max-age={max_age}".encode("latin-1")),
+            (b"accept-ranges", b"bytes"),
+        ]
+
+        if_none_match = headers.get("if-none-match")
+        if if_none_match and _etag_matches(if_none_match, etag):
+            self._stats["not_modified"] += 1
+            await _send_empty(send, 304, response_headers)
+            return
+
+        byte_range = None
+        if_range = headers.get("if-range")
+        if "range" in headers and (if_range is None or if_range.strip() == etag):
+            try:
+                byte_range = parse_range(headers["range"], size)
+            except RangeNotSatisfiable:
+                await _send_empty(send, 416, [(b"content-range", f"bytes */{size}".encode("latin-1"))])
+                return
+
+        start, end = byte_range if byte_range is not None else (0, size - 1)
+        length = max(0, end - start + 1)
+        media_type = mimetypes.guess_type(located.name)[0] or "application/octet-stream"
+        response_headers += [
+            (b"content-type", media_type.encode("latin-1")),
+            (b"content-length", str(length).encode("latin-1")),
+        ]
+        status = 200
+        if byte_range is not None:
+            status = 206
+            response_headers.append((b"content-range", f"bytes {start}-{end}/{size}".encode("latin-1")))
+            self._stats["partial"] += 1
+        else:
+            self._stats["full"] += 1
+
+        await send({"type": "http.response.start", "status": status, "headers": response_headers})
+        if method == "HEAD" or length == 0:
+            await send({"type": "http.response.body", "body": b"", "more_body": False})
+            return
+        extensions = scope.get("extensions") or {}
+        if "http.response.zerocopysend" in extensions:
+            self._stats["zero_copy"] += 1
+            with open(resolved, "rb") as handle:
+                await send({"type": "http.response.zerocopysend", "file": handle, "offset": start, "count": length})
+            return
+        if byte_range is None and "http.response.pathsend" in extensions:
+            self._stats["zero_copy"] += 1
+            await send({"type": "http.response.pathsend", "path": str(Path(resolved).resolve())})
+            return
+        await _send_file_range(send, resolved, start, length)
+
+
+async def _send_empty(send: Any, status: int, headers: list[tuple[bytes, bytes]] | None = None) -> None:
+    headers = list(headers or [])
+    if status != 304:
+        headers.append((b"content-length", b"0"))
+    await send({"type": "http.response.start", "status": status, "headers": headers})
+    await send({"type": "http.response.body", "body": b"", "more_body": False})
+
+
+async def _send_file_range(send: Any, path: Path, start: int, length: int) -> None:
+    fd = os.open(path, os.O_RDONLY)
+    try:
+        offset = start
+        remaining = length
+        while remaining > 0:
+            chunk = await asyncio.to_thread(os.pread, fd, min(_CHUNK_BYTES, remaining), offset)
+            if not chunk:
+                break
+            offset += len(chunk)
+            remaining -= len(chunk)
+            await send({"type": "http.response.body", "body": chunk, "more_body": remaining > 0})
+        if remaining > 0:
+            await send({"type": "http.response.body", "body": b"", "more_body": False})
+    finally:
+        os.close(fd)
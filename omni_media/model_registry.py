@@ -11,6 +11,9 @@ class ModelProfile:
     max_width: int
     max_height: int
     max_frames: int
+    memory_cost_mb: int = 0
+    # Relative GPU time per pixel-frame-step, used to weight per-key cost budgets.
+    cost_multiplier: float = 1.0
     scheduler: dict[str, str] = field(default_factory=dict)
     lora_hooks: list[str] = field(default_factory=list)
 
@@ -25,6 +28,7 @@ class ModelRegistry:
                 max_width=1536,
                 max_height=1536,
                 max_frames=1,
+                memory_cost_mb=14000,
                 scheduler={"name": "default"},
             ),
             "image_hd": ModelProfile(
@@ -34,6 +38,8 @@ class ModelRegistry:
                 max_width=2512,
                 max_height=2512,
                 max_frames=1,
+                memory_cost_mb=18000,
+                cost_multiplier=1.5,
                 scheduler={"name": "quality"},
             ),
             # Default short-form video profile (root: omni-ai)
@@ -41,12 +47,22 @@ class ModelRegistry:
                 key="video_default",
                 omni_model_id="omni/video-default",  # must match your deployed video model id
                 precision="fp16",
+                max_width=1280,
+                max_height=720,
+                max_frames=48,
+                memory_cost_mb=22000,
+                scheduler={"name": "default"},
             ),
             # Longer clips / extended duration profile (root: omni-ai)
             "video_long": ModelProfile(
                 key="video_long",
                 omni_model_id="omni/video-long",  # must match your deployed long-form video model id
                 precision="fp16",
+                max_width=1280,
+                max_height=720,
+                max_frames=120,
+                memory_cost_mb=26000,
+                scheduler={"name": "default"},
             ),
             # 4K super-resolution profile (CogVideoX base + SVD-SR refinement)
             "video_4k": ModelProfile(
@@ -56,6 +72,9 @@ class ModelRegistry:
                 max_width=3840,
                 max_height=2160,
                 max_frames=64,
+                memory_cost_mb=40000,
+                # The super-resolution refinement pass runs on top of the base model.
+                cost_multiplier=2.0,
                 scheduler={"name": "4k-sr"},
             ),
         }
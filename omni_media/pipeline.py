@@ -3,13 +3,24 @@ from __future__ import annotations
 import base64
 import hashlib
 import time
-from dataclasses import asdict
+from dataclasses import asdict, replace
+from functools import partial
 from typing import Any
 
-from .contracts import GenerateRequest, GenerateResponse, MediaOutput
+from .contracts import GenerateRequest, GenerateResponse, MediaOutput, VideoObject
 from .engine import OmniMediaEngine
-from .model_registry import ModelRegistry
-from .video_prompt_planner import compile_video_generation_spec
+from .model_registry import ModelProfile, ModelRegistry
+from .result_cache import CachedResult, GenerationResultCache, generation_cache_key
+from .scene_scheduler import SceneScheduler
+from .singleflight import SingleFlight
+from .video_prompt_planner import video_spec_for
+from .watermark import FrameWatermarker
+
+_FRAME_WATERMARK_METADATA = {
+    "watermark_applied": True,
+    "watermark_mode": "visible",
+    "watermark_stage": "frames",
+}
 
 
 class OmniMediaPipeline:
@@ -17,9 +28,16 @@ class OmniMediaPipeline:
         self,
         registry: ModelRegistry | None = None,
         engine: OmniMediaEngine | None = None,
+        cache: GenerationResultCache | None = None,
+        scene_scheduler: SceneScheduler | None = None,
+        watermarker: FrameWatermarker | None = None,
     ) -> None:
         self.registry = registry or ModelRegistry()
         self.engine = engine or OmniMediaEngine()
+        self.cache = cache if cache is not None else GenerationResultCache.from_env()
+        self.singleflight: SingleFlight[CachedResult] = SingleFlight()
+        self.scene_scheduler = scene_scheduler or SceneScheduler.from_env()
+        self.watermarker = watermarker or FrameWatermarker.from_env()
 
     def _normalize_input(self, request: GenerateRequest) -> GenerateRequest:
         prompt = request.prompt.strip()
@@ -53,79 +71,93 @@ class OmniMediaPipeline:
             return outputs
         raise ValueError(f"Unsupported return format: {request.return_format}")
 
-    def run(self, request: GenerateRequest) -> GenerateResponse:
-        started = time.perf_counter()
-
+    def _watermark_video(self, video: VideoObject) -> VideoObject | None:
         try:
-            request = self._normalize_input(request)
-            self._pre_safety_check(request)
-            profile = self._route_model(request)
+            buffer = self.watermarker.apply_buffer(video.frame_buffer())
+        except Exception:
+            return None
+        # Any encoded clip from the backend predates the overlay, so it is rebuilt from the frames.
+        return replace(video, frames=[], buffer=buffer, mp4_bytes=None)
 
-            outputs: list[MediaOutput] = []
-            if request.modality == "image":
-                images = self.engine.generate_image(
-                    profile=profile,
-                    prompt=request.prompt,
-                    negative_prompt=request.negative_prompt,
-                    width=request.params.width or 1024,
-                    height=request.params.height or 1024,
-                    num_images=request.params.num_images or 1,
-                    seed=request.params.seed,
-                    guidance_scale=request.params.guidance_scale or 7.5,
-                    num_inference_steps=request.params.num_inference_steps or 30,
-                    extra=request.params.extra,
-                )
-                for img in images:
-                    outputs.append(
-                        MediaOutput(
-                            type="image",
-                            metadata={
-                                "mime_type": img.mime_type,
-                                "width": img.width,
-                                "height": img.height,
-                                "_bytes": img.bytes_data,
-                            },
-                        )
+    def _generate_outputs(
+        self,
+        request: GenerateRequest,
+        profile: ModelProfile,
+    ) -> tuple[list[MediaOutput], dict[str, Any]]:
+        outputs: list[MediaOutput] = []
+        extra_metadata: dict[str, Any] = {}
+        watermark_metadata: dict[str, Any] = {}
+        if request.modality == "image":
+            image_kwargs: dict[str, Any] = {"frame_filter": self.watermarker.apply} if request.watermark else {}
+            images = self.engine.generate_image(
+                profile=profile,
+                prompt=request.prompt,
+                negative_prompt=request.negative_prompt,
+                width=request.params.width or 1024,
+                height=request.params.height or 1024,
+                num_images=request.params.num_images or 1,
+                seed=request.params.seed,
+                guidance_scale=request.params.guidance_scale or 7.5,
+                num_inference_steps=request.params.num_inference_steps or 30,
+                extra=request.params.extra,
+                **image_kwargs,
+            )
+            for img in images:
+                # Images the filter could not mark are left to the watermark hook at persist time.
+                outputs.append(
+                    MediaOutput(
+                        type="image",
+                        metadata={
+                            "mime_type": img.mime_type,
+                            "width": img.width,
+                            "height": img.height,
+                            **(_FRAME_WATERMARK_METADATA if request.watermark and img.frame_filtered else {}),
+                            "_bytes": img.bytes_data,
+                        },
                     )
+                )
+
+        elif request.modality == "video":
+            video_spec = video_spec_for(request)
+            plan_metadata = video_spec.metadata
+            if float(plan_metadata.get("grounding_score", 0)) < 0.35:
+                raise ValueError("prompt grounding score too low; unable to build a reliable video plan")
 
-            elif request.modality == "video":
-                video_spec = compile_video_generation_spec(request.prompt)
-                if float(video_spec.metadata.get("grounding_score", 0)) < 0.35:
-                    raise ValueError("prompt grounding score too low; unable to build a reliable video plan")
+            request.params.fps = request.params.fps or video_spec.fps
+            request.params.num_frames = request.params.num_frames or video_spec.num_frames
+            request.params.extra = {
+                **(request.params.extra or {}),
+                "style_preset": str(request.params.extra.get("style_preset") if request.params.extra else "")
+                or video_spec.style_preset,
+                "motion_profile": str(request.params.extra.get("motion_profile") if request.params.extra else "")
+                or video_spec.motion_profile,
+                "camera_profile": str(request.params.extra.get("camera_profile") if request.params.extra else "")
+                or video_spec.camera_profile,
+                "scene_plan": plan_metadata.get("scene_plan"),
+                "grounding_tokens": plan_metadata.get("grounding_tokens"),
+            }
 
-                request.params.fps = request.params.fps or video_spec.fps
-                request.params.num_frames = request.params.num_frames or video_spec.num_frames
-                request.params.extra = {
+            scene_specs = list(plan_metadata.get("scene_plan") or [])
+            scene_tasks = []
+            for index, scene in enumerate(scene_specs, start=1):
+                scene_text = str(scene.get("text") or "").strip()
+                scene_shot_prompt = str(scene.get("shot_prompt") or scene_text or request.prompt).strip()
+                scene_frames = int(scene.get("frame_count") or max(1, request.params.num_frames or video_spec.num_frames))
+
+                scene_extra = {
                     **(request.params.extra or {}),
-                    "style_preset": str(request.params.extra.get("style_preset") if request.params.extra else "")
-                    or video_spec.style_preset,
-                    "motion_profile": str(request.params.extra.get("motion_profile") if request.params.extra else "")
-                    or video_spec.motion_profile,
-                    "camera_profile": str(request.params.extra.get("camera_profile") if request.params.extra else "")
-                    or video_spec.camera_profile,
-                    "scene_plan": video_spec.metadata.get("scene_plan"),
-                    "grounding_tokens": video_spec.metadata.get("grounding_tokens"),
+                    "style_preset": request.params.extra.get("style_preset") if request.params.extra else video_spec.style_preset,
+                    "motion_profile": request.params.extra.get("motion_profile") if request.params.extra else video_spec.motion_profile,
+                    "camera_profile": request.params.extra.get("camera_profile") if request.params.extra else video_spec.camera_profile,
+                    "scene_index": index,
+                    "scene_text": scene_text,
+                    "scene_start_sec": scene.get("start_sec"),
+                    "scene_end_sec": scene.get("end_sec"),
                 }
 
-                scene_specs = list(video_spec.metadata.get("scene_plan") or [])
-                scene_videos = []
-                for index, scene in enumerate(scene_specs, start=1):
-                    scene_text = str(scene.get("text") or "").strip()
-                    scene_shot_prompt = str(scene.get("shot_prompt") or scene_text or request.prompt).strip()
-                    scene_frames = int(scene.get("frame_count") or max(1, request.params.num_frames or video_spec.num_frames))
-
-                    scene_extra = {
-                        **(request.params.extra or {}),
-                        "style_preset": request.params.extra.get("style_preset") if request.params.extra else video_spec.style_preset,
-                        "motion_profile": request.params.extra.get("motion_profile") if request.params.extra else video_spec.motion_profile,
-                        "camera_profile": request.params.extra.get("camera_profile") if request.params.extra else video_spec.camera_profile,
-                        "scene_index": index,
-                        "scene_text": scene_text,
-                        "scene_start_sec": scene.get("start_sec"),
-                        "scene_end_sec": scene.get("end_sec"),
-                    }
-
-                    scene_video = self.engine.generate_video(
+                scene_tasks.append(
+                    partial(
+                        self.engine.generate_video,
                         profile=profile,
                         prompt=scene_shot_prompt,
                         negative_prompt=request.negative_prompt,
@@ -138,86 +170,166 @@ class OmniMediaPipeline:
                         num_inference_steps=request.params.num_inference_steps or 30,
                         extra=scene_extra,
                     )
-                    scene_videos.append(scene_video)
-
-                video = self.engine.assemble_video_scenes(scene_videos, fps=request.params.fps or video_spec.fps)
-                outputs.append(
-                    MediaOutput(
-                        type="video",
-                        metadata={
-                            "fps": video.fps,
-                            "duration_sec": video.duration_sec,
-                            "width": video.width,
-                            "height": video.height,
-                            "frame_count": len(video.frames),
-                            "assembled_from_scenes": len(scene_specs) > 1,
-                            "prompt_aware": True,
-                            "style_preset": video_spec.style_preset,
-                            "motion_profile": video_spec.motion_profile,
-                            "camera_profile": video_spec.camera_profile,
-                            "scene_count": video_spec.metadata.get("scene_count"),
-                            "grounding_score": video_spec.metadata.get("grounding_score"),
-                            "scene_plan": video_spec.metadata.get("scene_plan"),
-                            "_bytes": video.mp4_bytes,
-                        },
-                    )
                 )
 
-            elif request.modality == "gif":
-                video_spec = compile_video_generation_spec(request.prompt)
-                video = self.engine.generate_video(
-                    profile=profile,
-                    prompt=video_spec.prompt,
-                    negative_prompt=request.negative_prompt,
-                    width=request.params.width or 512,
-                    height=request.params.height or 512,
-                    num_frames=request.params.num_frames or video_spec.num_frames,
-                    fps=request.params.fps or video_spec.fps,
-                    seed=request.params.seed,
-                    guidance_scale=request.params.guidance_scale or 7.5,
-                    num_inference_steps=request.params.num_inference_steps or 30,
-                    extra=request.params.extra,
+            scene_results = self.scene_scheduler.run(scene_tasks)
+            scene_videos = [result.value for result in scene_results]
+            extra_metadata["scene_parallelism"] = min(self.scene_scheduler.max_parallel, max(1, len(scene_tasks)))
+            extra_metadata["scene_timings"] = [
+                {
+                    "index": result.index,
+                    "started_ms": result.started_ms,
+                    "latency_ms": result.latency_ms,
+                    "frame_count": result.value.frame_count,
+                }
+                for result in scene_results
+            ]
+
+            if request.watermark:
+                marked = [self._watermark_video(scene) for scene in scene_videos]
+                if all(scene is not None for scene in marked):
+                    scene_videos = marked  # type: ignore[assignment]
+                    watermark_metadata = _FRAME_WATERMARK_METADATA
+
+            video = self.engine.assemble_video_scenes(scene_videos, fps=request.params.fps or video_spec.fps)
+            outputs.append(
+                MediaOutput(
+                    type="video",
+                    metadata={
+                        "fps": video.fps,
+                        "duration_sec": video.duration_sec,
+                        "width": video.width,
+                        "height": video.height,
+                        "frame_count": video.frame_count,
+                        "assembled_from_scenes": len(scene_specs) > 1,
+                        "prompt_aware": True,
+                        "style_preset": video_spec.style_preset,
+                        "motion_profile": video_spec.motion_profile,
+                        "camera_profile": video_spec.camera_profile,
+                        "scene_count": plan_metadata.get("scene_count"),
+                        "grounding_score": plan_metadata.get("grounding_score"),
+                        "scene_plan": plan_metadata.get("scene_plan"),
+                        **watermark_metadata,
+                        "_bytes": video.mp4_bytes,
+                    },
                 )
-                gif_bytes = self.engine.generate_gif_from_video(video)
-                outputs.append(
-                    MediaOutput(
-                        type="gif",
-                        metadata={
-                            "fps": video.fps,
-                            "duration_sec": video.duration_sec,
-                            "width": video.width,
-                            "height": video.height,
-                            "frame_count": len(video.frames),
-                            "prompt_aware": True,
-                            "style_preset": video_spec.style_preset,
-                            "motion_profile": video_spec.motion_profile,
-                            "camera_profile": video_spec.camera_profile,
-                            "scene_count": video_spec.metadata.get("scene_count"),
-                            "grounding_score": video_spec.metadata.get("grounding_score"),
-                            "scene_plan": video_spec.metadata.get("scene_plan"),
-                            "_bytes": gif_bytes,
-                        },
-                    )
+            )
+
+        elif request.modality == "gif":
+            video_spec = video_spec_for(request)
+            plan_metadata = video_spec.metadata
+            video = self.engine.generate_video(
+                profile=profile,
+                prompt=video_spec.prompt,
+                negative_prompt=request.negative_prompt,
+                width=request.params.width or 512,
+                height=request.params.height or 512,
+                num_frames=request.params.num_frames or video_spec.num_frames,
+                fps=request.params.fps or video_spec.fps,
+                seed=request.params.seed,
+                guidance_scale=request.params.guidance_scale or 7.5,
+                num_inference_steps=request.params.num_inference_steps or 30,
+                extra=request.params.extra,
+            )
+            if request.watermark:
+                marked_video = self._watermark_video(video)
+                if marked_video is not None:
+                    video = marked_video
+                    watermark_metadata = _FRAME_WATERMARK_METADATA
+            gif_bytes = self.engine.generate_gif_from_video(video)
+            outputs.append(
+                MediaOutput(
+                    type="gif",
+                    metadata={
+                        "fps": video.fps,
+                        "duration_sec": video.duration_sec,
+                        "width": video.width,
+                        "height": video.height,
+                        "frame_count": video.frame_count,
+                        "prompt_aware": True,
+                        "style_preset": video_spec.style_preset,
+                        "motion_profile": video_spec.motion_profile,
+                        "camera_profile": video_spec.camera_profile,
+                        "scene_count": plan_metadata.get("scene_count"),
+                        "grounding_score": plan_metadata.get("grounding_score"),
+                        "scene_plan": plan_metadata.get("scene_plan"),
+                        **watermark_metadata,
+                        "_bytes": gif_bytes,
+                    },
                 )
+            )
 
-            else:
-                raise ValueError(f"Unsupported modality: {request.modality}")
+        else:
+            raise ValueError(f"Unsupported modality: {request.modality}")
 
-            self._post_safety_check(request, outputs)
-            outputs = self._package_data(request, outputs)
+        return outputs, extra_metadata
 
-            latency_ms = (time.perf_counter() - started) * 1000
-            return GenerateResponse(
+    def _generate_entry(
+        self,
+        request: GenerateRequest,
+        profile: ModelProfile,
+        cache_key: str | None = None,
+    ) -> CachedResult:
+        outputs, extra_metadata = self._generate_outputs(request, profile)
+        self._post_safety_check(request, outputs)
+        entry = CachedResult.from_response(
+            GenerateResponse(
                 id=request.id,
                 status="completed",
                 outputs=outputs,
                 metadata={
-                    "latency_ms": round(latency_ms, 2),
                     "prompt_hash": hashlib.sha256(request.prompt.encode("utf-8")).hexdigest(),
                     "model_profile": profile.key,
                     "model_config": asdict(profile),
+                    **extra_metadata,
                 },
             )
+        )
+        if cache_key is not None and self.cache is not None:
+            self.cache.put(cache_key, entry)
+        return entry
+
+    def run(self, request: GenerateRequest) -> GenerateResponse:
+        started = time.perf_counter()
+
+        try:
+            request = self._normalize_input(request)
+            self._pre_safety_check(request)
+            profile = self._route_model(request)
+
+            cache_key = None
+            if request.params.seed is not None:
+                cache_key = generation_cache_key(request, profile.key)
+                cached = self.cache.get(cache_key) if self.cache is not None else None
+                if cached is not None:
+                    response = cached.to_response(request.id)
+                    response.outputs = self._package_data(request, response.outputs)
+                    latency_ms = (time.perf_counter() - started) * 1000
+                    response.metadata = {
+                        **response.metadata,
+                        "latency_ms": round(latency_ms, 2),
+                        "cache_hit": True,
+                        "cache_key": cache_key,
+                    }
+                    return response
+
+            if cache_key is None:
+                entry = self._generate_entry(request, profile)
+                coalesced = False
+            else:
+                entry, coalesced = self.singleflight.do(
+                    cache_key, lambda: self._generate_entry(request, profile, cache_key)
+                )
+
+            response = entry.to_response(request.id)
+            response.outputs = self._package_data(request, response.outputs)
+            latency_ms = (time.perf_counter() - started) * 1000
+            response.metadata = {"latency_ms": round(latency_ms, 2), **response.metadata}
+            if cache_key is not None:
+                response.metadata["cache_hit"] = False
+                response.metadata["cache_key"] = cache_key
+                response.metadata["coalesced"] = coalesced
+            return response
 
         except Exception as exc:
             latency_ms = (time.perf_counter() - started) * 1000
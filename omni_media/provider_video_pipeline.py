@@ -7,6 +7,8 @@ from datetime import datetime, timezone
 from pathlib import Path
 from typing import Any
 
+from .video_encoder import StreamingVideoWriter, VideoEncoderError
+
 
 def _clamp_int(value: Any, default: int, minimum: int, maximum: int) -> int:
     try:
@@ -64,11 +66,6 @@ def _create_frame(prompt: str, width: int, height: int, frame_index: int, num_fr
 
 
 def generate_prompt_video_export(prompt: str, params: dict[str, Any] | None = None) -> dict[str, Any]:
-    try:
-        import imageio.v2 as imageio
-    except Exception as exc:
-        raise RuntimeError("imageio is required for provider video generation") from exc
-
     params = dict(params or {})
     width = _clamp_int(params.get("width"), 768, 256, 640)
     height = _clamp_int(params.get("height"), 432, 256, 360)
@@ -82,8 +79,12 @@ def generate_prompt_video_export(prompt: str, params: dict[str, Any] | None = No
     filename = f"omni_video_{slug}_{uuid.uuid4().hex[:8]}.mp4"
     output_path = export_dir / filename
 
-    frames = [_create_frame(prompt, width, height, i, num_frames) for i in range(num_frames)]
-    imageio.mimsave(output_path.as_posix(), frames, fps=fps)
+    try:
+        with StreamingVideoWriter(output_path, width=width, height=height, fps=fps) as writer:
+            for i in range(num_frames):
+                writer.write(_create_frame(prompt, width, height, i, num_frames))
+    except VideoEncoderError as exc:
+        raise RuntimeError(f"provider video encoding failed: {exc}") from exc
 
     host = str(os.getenv("OMNI_MEDIA_HOST", "127.0.0.1")).strip() or "127.0.0.1"
     port = str(os.getenv("OMNI_MEDIA_PORT", "8788")).strip() or "8788"
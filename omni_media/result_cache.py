@@ -0,0 +1,234 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import struct
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Any
+
+from .contracts import GenerateRequest, GenerateResponse, MediaOutput
+
+_HEADER = struct.Struct(">I")
+
+
+def _canonical_params(request: GenerateRequest) -> dict[str, Any]:
+    params = asdict(request.params)
+    extra = params.pop("extra", None) or {}
+    normalized = {key: value for key, value in params.items() if value is not None}
+    if extra:
+        normalized["extra"] = extra
+    return normalized
+
+
+def generation_cache_key(request: GenerateRequest, profile_key: str) -> str:
+    payload = {
+        "profile": profile_key,
+        "modality": str(request.modality),
+        "prompt": request.prompt,
+        "negative_prompt": request.negative_prompt or "",
+        "params": _canonical_params(request),
+        "watermark": bool(request.watermark),
+    }
+    raw = json.dumps(payload, sort_keys=True, separators=(",", ":"), ensure_ascii=False, default=str)
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+@dataclass(slots=True)
+class CachedResult:
+    outputs: list[tuple[str, dict[str, Any], bytes | None]]
+    metadata: dict[str, Any]
+
+    @property
+    def size_bytes(self) -> int:
+        return sum(len(blob or b"") for _type, _meta, blob in self.outputs) + 512
+
+    @classmethod
+    def from_response(cls, response: GenerateResponse) -> "CachedResult":
+        outputs: list[tuple[str, dict[str, Any], bytes | None]] = []
+        for output in response.outputs:
+            metadata = dict(output.metadata)
+            raw = metadata.pop("_bytes", None)
+            outputs.append((output.type, metadata, bytes(raw) if raw is not None else None))
+        return cls(outputs=outputs, metadata=dict(response.metadata))
+
+    def to_response(self, request_id: str) -> GenerateResponse:
+        outputs = []
+        for media_type, metadata, blob in self.outputs:
+            restored = dict(metadata)
+            if blob is not None:
+                restored["_bytes"] = blob
+            outputs.append(MediaOutput(type=media_type, metadata=restored))  # type: ignore[arg-type]
+        return GenerateResponse(id=request_id, status="completed", outputs=outputs, metadata=dict(self.metadata))
+
+    def dumps(self) -> bytes:
+        header = {
+            "metadata": self.metadata,
+            "outputs": [
+                {"type": media_type, "metadata": metadata, "size": -1 if blob is None else len(blob)}
+                for media_type, metadata, blob in self.outputs
+            ],
+        }
+        encoded = json.dumps(header, ensure_ascii=False, default=str).encode("utf-8")
+        blobs = b"".join(blob for _type, _meta, blob in self.outputs if blob)
+        return _HEADER.pack(len(encoded)) + encoded + blobs
+
+    @classmethod
+    def loads(cls, raw: bytes) -> "CachedResult":
+        (header_len,) = _HEADER.unpack_from(raw, 0)
+        offset = _HEADER.size + header_len
+        header = json.loads(raw[_HEADER.size:offset].decode("utf-8"))
+        outputs: list[tuple[str, dict[str, Any], bytes | None]] = []
+        for item in header.get("outputs") or []:
+            size = int(item.get("size", -1))
+            blob = None
+            if size >= 0:
+                blob = raw[offset:offset + size]
+                offset += size
+            outputs.append((str(item["type"]), dict(item.get("metadata") or {}), blob))
+        return cls(outputs=outputs, metadata=dict(header.get("metadata") or {}))
+
+
+@dataclass(slots=True)
+class GenerationResultCache:
+    memory_max_bytes: int = 256 * 1024 * 1024
+    disk_dir: str | None = None
+    disk_max_bytes: int = 2 * 1024 * 1024 * 1024
+    _memory: OrderedDict[str, CachedResult] = field(default_factory=OrderedDict, init=False, repr=False)
+    _memory_bytes: int = field(default=0, init=False, repr=False)
+    _disk_index: dict[str, tuple[int, float]] = field(default_factory=dict, init=False, repr=False)
+    _disk_bytes: int = field(default=0, init=False, repr=False)
+    _lock: threading.Lock = field(default_factory=threading.Lock, init=False, repr=False)
+    _stats: dict[str, int] = field(default_factory=dict, init=False, repr=False)
+
+    def __post_init__(self) -> None:
+        self._stats = {
+            "hits_memory": 0,
+            "hits_disk": 0,
+            "misses": 0,
+            "stores": 0,
+            "evictions_memory": 0,
+            "evictions_disk": 0,
+        }
+        if self.disk_dir:
+            root = Path(self.disk_dir)
+            root.mkdir(parents=True, exist_ok=True)
+            for path in root.glob("*/*.bin"):
+                stat = path.stat()
+                self._disk_index[path.stem] = (int(stat.st_size), float(stat.st_mtime))
+                self._disk_bytes += int(stat.st_size)
+
+    @classmethod
+    def from_env(cls) -> "GenerationResultCache | None":
+        enabled = str(os.getenv("OMNI_MEDIA_RESULT_CACHE_ENABLED", "true")).strip().lower()
+        if enabled not in {"1", "true", "yes", "on"}:
+            return None
+        return cls(
+            memory_max_bytes=int(os.getenv("OMNI_MEDIA_RESULT_CACHE_MEMORY_BYTES", str(256 * 1024 * 1024))),
+            disk_dir=str(os.getenv("OMNI_MEDIA_RESULT_CACHE_DIR", "")).strip() or None,
+            disk_max_bytes=int(os.getenv("OMNI_MEDIA_RESULT_CACHE_DISK_BYTES", str(2 * 1024 * 1024 * 1024))),
+        )
+
+    def _disk_path(self, key: str) -> Path:
+        return Path(str(self.disk_dir)) / key[:2] / f"{key}.bin"
+
+    def _remember(self, key: str, entry: CachedResult) -> None:
+        size = entry.size_bytes
+        if size > self.memory_max_bytes:
+            return
+        previous = self._memory.pop(key, None)
+        if previous is not None:
+            self._memory_bytes -= previous.size_bytes
+        self._memory[key] = entry
+        self._memory_bytes += size
+        while self._memory_bytes > self.memory_max_bytes and self._memory:
+            _old_key, evicted = self._memory.popitem(last=False)
+            self._memory_bytes -= evicted.size_bytes
+            self._stats["evictions_memory"] += 1
+
+    def get(self, key: str) -> CachedResult | None:
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None:
+                self._memory.move_to_end(key)
+                self._stats["hits_memory"] += 1
+                return entry
+            on_disk = key in self._disk_index
+
+        if on_disk:
+            path = self._disk_path(key)
+            try:
+                entry = CachedResult.loads(path.read_bytes())
+                os.utime(path)
+            except Exception:
+                entry = None
+            with self._lock:
+                if entry is not None:
+                    size, _ = self._disk_index.get(key, (0, 0.0))
+                    self._disk_index[key] = (size, time.time())
+                    self._stats["hits_disk"] += 1
+                    self._remember(key, entry)
+                    return entry
+                self._drop_disk_entry(key)
+
+        with self._lock:
+            self._stats["misses"] += 1
+        return None
+
+    def put(self, key: str, entry: CachedResult) -> None:
+        with self._lock:
+            self._remember(key, entry)
+            self._stats["stores"] += 1
+        if not self.disk_dir:
+            return
+
+        raw = entry.dumps()
+        if len(raw) > self.disk_max_bytes:
+            return
+        path = self._disk_path(key)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_suffix(f".{os.getpid()}.{threading.get_ident()}.tmp")
+        tmp_path.write_bytes(raw)
+        os.replace(tmp_path, path)
+        with self._lock:
+            previous = self._disk_index.get(key)
+            if previous is not None:
+                self._disk_bytes -= previous[0]
+            self._disk_index[key] = (len(raw), time.time())
+            self._disk_bytes += len(raw)
+            self._enforce_disk_quota()
+
+    def _drop_disk_entry(self, key: str) -> None:
+        previous = self._disk_index.pop(key, None)
+        if previous is not None:
+            self._disk_bytes -= previous[0]
+        try:
+            self._disk_path(key).unlink()
+        except FileNotFoundError:
+            pass
+
+    def _enforce_disk_quota(self) -> None:
+        if self._disk_bytes <= self.disk_max_bytes:
+            return
+        for key, _entry in sorted(self._disk_index.items(), key=lambda item: item[1][1]):
+            if self._disk_bytes <= self.disk_max_bytes:
+                break
+            self._drop_disk_entry(key)
+            self._stats["evictions_disk"] += 1
+
+    def snapshot(self) -> dict[str, Any]:
+        with self._lock:
+            return {
+                **self._stats,
+                "memory_entries": len(self._memory),
+                "memory_bytes": self._memory_bytes,
+                "memory_max_bytes": self.memory_max_bytes,
+                "disk_enabled": bool(self.disk_dir),
+                "disk_entries": len(self._disk_index),
+                "disk_bytes": self._disk_bytes,
+                "disk_max_bytes": self.disk_max_bytes,
+            }
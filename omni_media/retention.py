@@ -0,0 +1,336 @@
+from __future__ import annotations
+
+import os
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Any
+
+
+def _env_int(name: str) -> int | None:
+    raw = str(os.getenv(name, "")).strip()
+    return int(raw) if raw else None
+
+
+@dataclass(slots=True)
+class RetentionRule:
+    name: str
+    directory: str
+    max_age_sec: float | None = None
+    max_bytes: int | None = None
+    # Evict down to this fraction of max_bytes so a full disk is not swept again on the next pass.
+    low_watermark: float = 0.9
+
+    def root(self) -> str:
+        return os.path.abspath(self.directory)
+
+
+@dataclass(slots=True)
+class _Entry:
+    size: int
+    mtime: float
+    accessed: float
+
+
+# Directory mtimes have coarse granularity; listings this close to the mtime may have missed an entry.
+_RACY_NS = 2_000_000_000
+
+
+@dataclass(slots=True)
+class _Listing:
+    mtime_ns: int
+    listed_ns: int
+    files: list[str] = field(default_factory=list)
+    dirs: list[str] = field(default_factory=list)
+
+
+class DirectoryIndex:
+    def __init__(self, root: str) -> None:
+        self.root = os.path.abspath(root)
+        self.files: dict[str, _Entry] = {}
+        self._listings: dict[str, _Listing] = {}
+        self._accessed: dict[str, float] = {}
+        self.stats = {"refreshes": 0, "dirs_listed": 0, "dirs_unchanged": 0}
+
+    def record_access(self, path: str, at: float | None = None) -> None:
+        key = os.path.abspath(path)
+        stamp = at or time.time()
+        self._accessed[key] = stamp
+        entry = self.files.get(key)
+        if entry is not None:
+            entry.accessed = max(entry.accessed, stamp)
+
+    def refresh(self) -> None:
+        # Directory mtimes change when direct children are added, removed or renamed over, so
+        # unchanged directories keep their cached listing and their files are not stat()ed again.
+        self.stats["refreshes"] += 1
+        seen_dirs: set[str] = set()
+        stack = [self.root]
+        while stack:
+            directory = stack.pop()
+            try:
+                mtime_ns = os.stat(directory).st_mtime_ns
+            except FileNotFoundError:
+                continue
+            seen_dirs.add(directory)
+            listing = self._listings.get(directory)
+            if listing is None or listing.mtime_ns != mtime_ns or listing.listed_ns - mtime_ns < _RACY_NS:
+                listing = self._list(directory, mtime_ns, listing)
+                self._listings[directory] = listing
+                self.stats["dirs_listed"] += 1
+            else:
+                self.stats["dirs_unchanged"] += 1
+            stack.extend(listing.dirs)
+
+        for directory in [path for path in self._listings if path not in seen_dirs]:
+            for name in self._listings.pop(directory).files:
+                self.forget(os.path.join(directory, name))
+
+    def _list(self, directory: str, mtime_ns: int, previous: _Listing | None) -> _Listing:
+        listing = _Listing(mtime_ns=mtime_ns, listed_ns=time.time_ns())
+        try:
+            entries = list(os.scandir(directory))
+        except FileNotFoundError:
+            entries = []
+        for entry in entries:
+            # Hidden entries are in-flight temp files or the content store's own blob area.
+            if entry.name.startswith("."):
+                continue
+            if entry.is_dir(follow_symlinks=False):
+                listing.dirs.append(entry.path)
+            elif entry.is_file(follow_symlinks=False):
+                try:
+                    stat = entry.stat(follow_symlinks=False)
+                except FileNotFoundError:
+                    continue
+                listing.files.append(entry.name)
+                accessed = max(stat.st_mtime, self._accessed.get(entry.path, 0.0))
+                self.files[entry.path] = _Entry(size=stat.st_size, mtime=stat.st_mtime, accessed=accessed)
+        if previous is not None:
+            current = set(listing.files)
+            for name in previous.files:
+                if name not in current:
+                    self.forget(os.path.join(directory, name))
+        return listing
+
+    def forget(self, path: str) -> None:
+        self.files.pop(path, None)
+        self._accessed.pop(path, None)
+
+
+class RetentionSweeper:
+    def __init__(
+        self,
+        rules: list[RetentionRule] | None = None,
+        interval_sec: float = 300.0,
+        min_age_sec: float = 60.0,
+        content_store: Any = None,
+    ) -> None:
+        self.rules = list(rules or [])
+        # A content-addressed store whose unreferenced blobs are collected on every pass.
+        self.content_store = content_store
+        self.interval_sec = max(1.0, float(interval_sec))
+        self.min_age_sec = max(0.0, float(min_age_sec))
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+        self._indexes: dict[str, DirectoryIndex] = {}
+        for rule in self.rules:
+            root = rule.root()
+            if not any(root == known or root.startswith(known + os.sep) for known in self._indexes):
+                for known in [path for path in self._indexes if path.startswith(root + os.sep)]:
+                    del self._indexes[known]
+                self._indexes[root] = DirectoryIndex(root)
+        self._metrics: dict[str, dict[str, Any]] = {
+            rule.name: {
+                "files": 0,
+                "bytes": 0,
+                "evicted_files": 0,
+                "evicted_bytes": 0,
+                "expired_files": 0,
+                "released_refs": 0,
+                "errors": 0,
+            }
+            for rule in self.rules
+        }
+        self._gc_metrics = {"runs": 0, "stale_refs": 0, "blobs_deleted": 0, "bytes_freed": 0, "errors": 0}
+        self._passes = 0
+        self._last_sweep_ms: float | None = None
+        self._last_sweep_at: float | None = None
+
+    @classmethod
+    def from_env(cls, media_dir: str | None = None, content_store: Any = None) -> "RetentionSweeper":
+        media_dir = media_dir or str(os.getenv("OMNI_MEDIA_STORAGE_DIR", "media_outputs")).strip() or "media_outputs"
+        exports_dir = str(os.getenv("OMNI_MEDIA_EXPORTS_DIR", "omni_video_exports")).strip() or "omni_video_exports"
+        rules: list[RetentionRule] = []
+        for modality in ("image", "video", "gif"):
+            key = modality.upper()
+            max_age = _env_int(f"OMNI_MEDIA_RETENTION_{key}_MAX_AGE_SEC")
+            max_bytes = _env_int(f"OMNI_MEDIA_RETENTION_{key}_MAX_BYTES")
+            if max_age or max_bytes:
+                rules.append(RetentionRule(f"media_outputs/{modality}", os.path.join(media_dir, modality), max_age, max_bytes))
+        for name, directory, prefix in (
+            ("media_outputs", media_dir, "OMNI_MEDIA_RETENTION_MEDIA"),
+            ("omni_video_exports", exports_dir, "OMNI_MEDIA_RETENTION_EXPORTS"),
+        ):
+            max_age = _env_int(f"{prefix}_MAX_AGE_SEC")
+            max_bytes = _env_int(f"{prefix}_MAX_BYTES")
+            if max_age or max_bytes:
+                rules.append(RetentionRule(name, directory, max_age, max_bytes))
+        return cls(
+            rules=rules,
+            interval_sec=float(os.getenv("OMNI_MEDIA_RETENTION_INTERVAL_SEC", "300")),
+            min_age_sec=float(os.getenv("OMNI_MEDIA_RETENTION_MIN_AGE_SEC", "60")),
+            content_store=content_store,
+        )
+
+    def _index_for(self, path: str) -> DirectoryIndex | None:
+        for root, index in self._indexes.items():
+            if path == root or path.startswith(root + os.sep):
+                return index
+        return None
+
+    def record_access(self, path: str | os.PathLike[str]) -> None:
+        # Called from the media route on the event loop, so it must not wait for a running sweep.
+        key = os.path.abspath(path)
+        index = self._index_for(key)
+        if index is not None:
+            index.record_access(key)
+
+    def start(self) -> None:
+        if (not self.rules and self.content_store is None) or self._thread is not None:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="omni-media-retention", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+            self._thread = None
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            try:
+                self.sweep()
+            except Exception:
+                pass
+            self._stop.wait(self.interval_sec)
+
+    def _delete(self, index: DirectoryIndex, path: str, entry: _Entry, metrics: dict[str, Any]) -> int | None:
+        # Returns the bytes reclaimed right away, or None when the file could not be removed. Removing one
+        # hardlink of a shared file frees nothing; content store blobs are reclaimed by the gc at the end.
+        reclaimed = 0
+        try:
+            if self.content_store is not None and self.content_store.release(path):
+                metrics["released_refs"] += 1
+            else:
+                links = os.stat(path).st_nlink
+                os.unlink(path)
+                reclaimed = entry.size if links <= 1 else 0
+        except FileNotFoundError:
+            pass
+        except Exception:
+            return None
+        index.forget(path)
+        parent = os.path.dirname(path)
+        # Prune the empty request/date folders left behind, stopping at the index root.
+        while parent != index.root and parent.startswith(index.root + os.sep):
+            try:
+                os.rmdir(parent)
+            except OSError:
+                break
+            parent = os.path.dirname(parent)
+        return reclaimed
+
+    def sweep(self, now: float | None = None) -> dict[str, Any]:
+        started = time.perf_counter()
+        now = now or time.time()
+        with self._lock:
+            for index in self._indexes.values():
+                index.refresh()
+
+            for rule in self.rules:
+                root = rule.root()
+                index = self._index_for(root)
+                metrics = self._metrics[rule.name]
+                if index is None:
+                    continue
+                prefix = root + os.sep
+                candidates = [
+                    (path, entry)
+                    for path, entry in index.files.items()
+                    if path.startswith(prefix) and now - entry.mtime >= self.min_age_sec
+                ]
+                total = sum(entry.size for path, entry in index.files.items() if path.startswith(prefix))
+
+                if rule.max_age_sec:
+                    cutoff = now - rule.max_age_sec
+                    survivors = []
+                    for path, entry in candidates:
+                        if entry.mtime < cutoff:
+                            reclaimed = self._delete(index, path, entry, metrics)
+                            if reclaimed is not None:
+                                total -= entry.size
+                                metrics["expired_files"] += 1
+                                metrics["evicted_bytes"] += reclaimed
+                            else:
+                                metrics["errors"] += 1
+                                survivors.append((path, entry))
+                        else:
+                            survivors.append((path, entry))
+                    candidates = survivors
+
+                if rule.max_bytes is not None and total > rule.max_bytes:
+                    target = int(rule.max_bytes * rule.low_watermark)
+                    for path, entry in sorted(candidates, key=lambda item: item[1].accessed):
+                        if total <= target:
+                            break
+                        reclaimed = self._delete(index, path, entry, metrics)
+                        if reclaimed is not None:
+                            total -= entry.size
+                            metrics["evicted_files"] += 1
+                            metrics["evicted_bytes"] += reclaimed
+                        else:
+                            metrics["errors"] += 1
+
+                metrics["files"] = sum(1 for path in index.files if path.startswith(prefix))
+                metrics["bytes"] = total
+
+            if self.content_store is not None:
+                self._collect_garbage()
+            self._passes += 1
+            self._last_sweep_ms = round((time.perf_counter() - started) * 1000, 2)
+            self._last_sweep_at = now
+        return self.snapshot()
+
+    def _collect_garbage(self) -> None:
+        try:
+            result = self.content_store.gc()
+        except Exception:
+            self._gc_metrics["errors"] += 1
+            return
+        self._gc_metrics["runs"] += 1
+        for key in ("stale_refs", "blobs_deleted", "bytes_freed"):
+            self._gc_metrics[key] += int(result.get(key, 0))
+
+    def snapshot(self) -> dict[str, Any]:
+        return {
+            "running": self._thread is not None,
+            "interval_sec": self.interval_sec,
+            "passes": self._passes,
+            "last_sweep_ms": self._last_sweep_ms,
+            "last_sweep_at": self._last_sweep_at,
+            "rules": {
+                rule.name: {
+                    "directory": rule.directory,
+                    "max_age_sec": rule.max_age_sec,
+                    "max_bytes": rule.max_bytes,
+                    **self._metrics[rule.name],
+                }
+                for rule in self.rules
+            },
+            "index": {root: dict(index.stats, files=len(index.files)) for root, index in self._indexes.items()},
+            "content_store_gc": dict(self._gc_metrics) if self.content_store is not None else None,
+        }
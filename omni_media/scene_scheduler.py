@@ -0,0 +1,73 @@
+from __future__ import annotations
+
+import os
+import threading
+import time
+from concurrent.futures import FIRST_EXCEPTION, ThreadPoolExecutor, wait
+from dataclasses import dataclass
+from typing import Callable, Generic, TypeVar
+
+T = TypeVar("T")
+
+
+@dataclass(slots=True)
+class SceneResult(Generic[T]):
+    index: int
+    value: T
+    started_ms: float
+    latency_ms: float
+
+
+class SceneScheduler:
+    def __init__(self, max_parallel: int = 1) -> None:
+        self.max_parallel = max(1, int(max_parallel))
+        self._executor: ThreadPoolExecutor | None = None
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_env(cls) -> "SceneScheduler":
+        return cls(max_parallel=int(os.getenv("OMNI_MEDIA_SCENE_PARALLELISM", "1")))
+
+    def _pool(self) -> ThreadPoolExecutor:
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self.max_parallel,
+                    thread_name_prefix="omni-media-scene",
+                )
+            return self._executor
+
+    def run(self, tasks: list[Callable[[], T]]) -> list[SceneResult[T]]:
+        origin = time.perf_counter()
+
+        def timed(index: int, task: Callable[[], T]) -> SceneResult[T]:
+            started = time.perf_counter()
+            value = task()
+            finished = time.perf_counter()
+            return SceneResult(
+                index=index,
+                value=value,
+                started_ms=round((started - origin) * 1000, 2),
+                latency_ms=round((finished - started) * 1000, 2),
+            )
+
+        if self.max_parallel <= 1 or len(tasks) <= 1:
+            return [timed(index, task) for index, task in enumerate(tasks, start=1)]
+
+        futures = [self._pool().submit(timed, index, task) for index, task in enumerate(tasks, start=1)]
+        done, pending = wait(futures, return_when=FIRST_EXCEPTION)
+        failed = [future for future in futures if future in done and future.exception() is not None]
+        if failed:
+            for future in pending:
+                future.cancel()
+            wait([future for future in pending if not future.cancelled()])
+            # Surface the first failing scene in planner order.
+            errors = [future.exception() for future in futures if future.done() and not future.cancelled()]
+            raise next(error for error in errors if error is not None)
+        return [future.result() for future in futures]
+
+    def shutdown(self) -> None:
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=False, cancel_futures=True)
+                self._executor = None
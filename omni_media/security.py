@@ -1,11 +1,16 @@
 from __future__ import annotations
 
+import hashlib
+import hmac
+import json
 import os
+import signal
+import threading
 import time
 import importlib
-from collections import defaultdict, deque
+from collections import OrderedDict
 from dataclasses import dataclass, field
-from typing import Protocol
+from typing import Any, Callable, Protocol
 
 
 class AuthError(PermissionError):
@@ -13,68 +18,421 @@ class AuthError(PermissionError):
 
 
 class RateLimitError(PermissionError):
-    pass
+    def __init__(self, message: str, retry_after_sec: float | None = None) -> None:
+        super().__init__(message)
+        self.retry_after_sec = retry_after_sec
 
 
 class RateLimiter(Protocol):
-    def check(self, key: str, limit: int | None = None, window_sec: int | None = None) -> None:
+    # Charges `cost` units against `limit` units per window and returns the units left.
+    def check(self, key: str, limit: int | None = None, window_sec: int | None = None, cost: int = 1) -> int:
+        ...
+
+    # Gives back `cost` units charged earlier by check() and returns the units left.
+    def refund(self, key: str, limit: int | None = None, window_sec: int | None = None, cost: int = 1) -> int:
         ...
 
 
+def _oversized(cost: int, limit: int, window_sec: int) -> RateLimitError:
+    # Waiting never helps a request that costs more than the whole window allows, so there is no retry hint.
+    return RateLimitError(f"Request cost {cost} exceeds the limit of {limit}/{window_sec}s")
+
+
+@dataclass(slots=True, frozen=True)
+class ApiKeyIdentity:
+    # key_id is what requests are logged, limited and budgeted under; the key itself is never kept.
+    key_id: str
+    tier: str = "default"
+    # Cost budget units per budget window for this key; None uses the server-wide budget.
+    quota: int | None = None
+    metadata: dict[str, Any] = field(default_factory=dict, compare=False)
+
+
+def _key_digest(key: str) -> bytes:
+    return hashlib.sha256(key.encode("utf-8", "surrogatepass")).digest()
+
+
+def _parse_key_entry(line: str, where: str) -> tuple[bytes, ApiKeyIdentity]:
+    # A line is a bare key, or a JSON object with "key" or "sha256" plus optional "id", "tier", "quota".
+    if not line.startswith("{"):
+        digest = _key_digest(line)
+        return digest, ApiKeyIdentity(key_id=f"key-{digest.hex()[:12]}")
+    try:
+        record = json.loads(line)
+    except json.JSONDecodeError as exc:
+        raise ValueError(f"{where}: invalid JSON ({exc.msg})") from exc
+    if not isinstance(record, dict):
+        raise ValueError(f"{where}: expected a JSON object")
+    record = dict(record)
+    key, hex_digest = record.pop("key", None), record.pop("sha256", None)
+    if isinstance(key, str) and key:
+        digest = _key_digest(key)
+    elif isinstance(hex_digest, str) and len(hex_digest) == 64:
+        try:
+            digest = bytes.fromhex(hex_digest)
+        except ValueError as exc:
+            raise ValueError(f"{where}: sha256 must be 64 hex characters") from exc
+    else:
+        raise ValueError(f"{where}: expected a 'key' or a 64 character hex 'sha256'")
+    quota = record.pop("quota", None)
+    return digest, ApiKeyIdentity(
+        key_id=str(record.pop("id", None) or f"key-{digest.hex()[:12]}"),
+        tier=str(record.pop("tier", None) or "default"),
+        quota=int(quota) if quota is not None else None,
+        metadata=record,
+    )
+
+
+@dataclass(slots=True)
+class ApiKeyRegistry:
+    # Keys are parsed once into SHA-256 digests indexed by their first 8 bytes; a lookup hashes the
+    # candidate, finds its bucket and confirms the full digest with a constant-time compare. The index
+    # is rebuilt off to the side and swapped in whole, so lookups never take a lock.
+    path: str | None = None
+    env_keys: str = ""
+    reload_check_sec: float = 5.0
+    clock: Callable[[], float] = time.monotonic
+    _index: dict[bytes, list[tuple[bytes, ApiKeyIdentity]]] = field(init=False, default_factory=dict)
+    _count: int = field(init=False, default=0)
+    _stamp: tuple[int, int] | None = field(init=False, default=None)
+    _next_check: float = field(init=False, default=0.0)
+    _reload_requested: bool = field(init=False, default=False)
+    _lock: threading.Lock = field(init=False, default_factory=threading.Lock)
+    _stats: dict[str, Any] = field(init=False)
+
+    def __post_init__(self) -> None:
+        self._stats = {"reloads": 0, "reload_errors": 0, "last_error": None}
+        # A bad key file at startup is a configuration error, not something to serve around.
+        self._load()
+        self._next_check = self.clock() + self.reload_check_sec
+
+    @classmethod
+    def from_env(cls, env_var_name: str = "OMNI_MEDIA_API_KEYS") -> "ApiKeyRegistry":
+        return cls(
+            path=str(os.getenv("OMNI_MEDIA_API_KEYS_FILE", "")).strip() or None,
+            env_keys=os.getenv(env_var_name, ""),
+            reload_check_sec=float(os.getenv("OMNI_MEDIA_API_KEYS_RELOAD_SEC", "5")),
+        )
+
+    def __len__(self) -> int:
+        return self._count
+
+    def _file_stamp(self) -> tuple[int, int] | None:
+        if self.path is None:
+            return None
+        stat = os.stat(self.path)
+        return stat.st_mtime_ns, stat.st_size
+
+    def _load(self) -> None:
+        entries: dict[bytes, ApiKeyIdentity] = {}
+        for item in self.env_keys.split(","):
+            if item.strip():
+                digest, identity = _parse_key_entry(item.strip(), "OMNI_MEDIA_API_KEYS")
+                entries[digest] = identity
+        stamp = self._file_stamp()
+        if self.path is not None:
+            with open(self.path, encoding="utf-8") as handle:
+                for line_number, line in enumerate(handle, start=1):
+                    line = line.strip()
+                    if line and not line.startswith("#"):
+                        digest, identity = _parse_key_entry(line, f"{self.path}:{line_number}")
+                        entries[digest] = identity
+            if not entries:
+                # Usually a truncated or half-written file; swapping in an empty index would disable auth.
+                raise ValueError(f"{self.path}: no API keys found")
+
+        index: dict[bytes, list[tuple[bytes, ApiKeyIdentity]]] = {}
+        for digest, identity in entries.items():
+            index.setdefault(digest[:8], []).append((digest, identity))
+        self._index, self._count, self._stamp = index, len(entries), stamp
+
+    def reload(self) -> bool:
+        # A broken edit to the key file keeps the previous keys serving instead of locking everyone out.
+        with self._lock:
+            try:
+                self._load()
+            except (OSError, ValueError) as exc:
+                self._stats["reload_errors"] += 1
+                self._stats["last_error"] = str(exc)
+                return False
+            self._stats["reloads"] += 1
+            self._stats["last_error"] = None
+            return True
+
+    def maybe_reload(self) -> None:
+        # Per request this is a flag test and a float compare; the file is stat'ed at most once per
+        # reload_check_sec and re-parsed only when its mtime or size changed.
+        if not self._reload_requested:
+            if self.path is None or self.reload_check_sec <= 0:
+                return
+            now = self.clock()
+            if now < self._next_check:
+                return
+            self._next_check = now + self.reload_check_sec
+            try:
+                if self._file_stamp() == self._stamp:
+                    return
+            except OSError:
+                pass
+        self._reload_requested = False
+        self.reload()
+
+    def request_reload(self) -> None:
+        self._reload_requested = True
+
+    def install_signal_handler(self, signum: int | None = None) -> bool:
+        # The handler only sets a flag; the next request does the reload, outside signal context.
+        signum = signum if signum is not None else getattr(signal, "SIGHUP", None)
+        if signum is None or threading.current_thread() is not threading.main_thread():
+            return False
+        previous = signal.getsignal(signum)
+
+        def _handler(received: int, frame: Any) -> None:
+            self._reload_requested = True
+            if callable(previous):
+                previous(received, frame)
+
+        signal.signal(signum, _handler)
+        return True
+
+    def lookup(self, candidate: str) -> ApiKeyIdentity | None:
+        digest = _key_digest(candidate)
+        for stored, identity in self._index.get(digest[:8], ()):
+            if hmac.compare_digest(stored, digest):
+                return identity
+        return None
+
+    def snapshot(self) -> dict[str, Any]:
+        tiers: dict[str, int] = {}
+        for bucket in self._index.values():
+            for _, identity in bucket:
+                tiers[identity.tier] = tiers.get(identity.tier, 0) + 1
+        return {"keys": self._count, "path": self.path, "tiers": tiers, **self._stats}
+
+
 @dataclass(slots=True)
 class ApiKeyAuth:
     header_name: str = "x-api-key"
     env_var_name: str = "OMNI_MEDIA_API_KEYS"
     allow_without_keys: bool = True
+    registry: ApiKeyRegistry | None = None
 
-    def _configured_keys(self) -> set[str]:
-        raw = os.getenv(self.env_var_name, "")
-        keys = {item.strip() for item in raw.split(",") if item.strip()}
-        return keys
+    def __post_init__(self) -> None:
+        if self.registry is None:
+            self.registry = ApiKeyRegistry.from_env(self.env_var_name)
 
-    def verify(self, request_headers: dict[str, str]) -> str | None:
-        keys = self._configured_keys()
+    def identify(self, request_headers: dict[str, str]) -> ApiKeyIdentity | None:
+        registry = self.registry
+        registry.maybe_reload()
         candidate = request_headers.get(self.header_name) or request_headers.get(self.header_name.lower())
 
-        if not keys:
-            if self.allow_without_keys:
+        if not registry:
+            # Open access is only for deployments with no keys configured at all, never a key file.
+            if self.allow_without_keys and registry.path is None:
                 return None
             raise AuthError("API key auth is required but no keys are configured")
 
         if not candidate:
             raise AuthError("Missing API key")
 
-        if candidate not in keys:
+        identity = registry.lookup(candidate)
+        if identity is None:
             raise AuthError("Invalid API key")
 
-        return candidate
+        return identity
+
+    def verify(self, request_headers: dict[str, str]) -> str | None:
+        identity = self.identify(request_headers)
+        return identity.key_id if identity is not None else None
+
+
+@dataclass(slots=True)
+class _LimiterShard:
+    lock: threading.Lock = field(default_factory=threading.Lock)
+    # key -> GCRA theoretical arrival time, kept in least-recently-used order.
+    tats: OrderedDict[str, float] = field(default_factory=OrderedDict)
+    allowed: int = 0
+    rejected: int = 0
+    evicted: int = 0
+    expired: int = 0
 
 
 @dataclass(slots=True)
 class InMemoryRateLimiter:
     default_limit: int = 60
     default_window_sec: int = 60
-    _events: dict[str, deque[float]] = field(init=False)
+    shards: int = 16
+    max_keys: int = 100_000
+    sweep_interval_sec: float = 30.0
+    clock: Callable[[], float] = time.monotonic
+    _shards: list[_LimiterShard] = field(init=False)
+    _mask: int = field(init=False)
+    _per_shard: int = field(init=False)
+    _sweeps: int = field(init=False, default=0)
+    _start_lock: threading.Lock = field(init=False, default_factory=threading.Lock)
+    _stop: threading.Event = field(init=False, default_factory=threading.Event)
+    _sweeper: threading.Thread | None = field(init=False, default=None)
 
     def __post_init__(self) -> None:
-        self._events: dict[str, deque[float]] = defaultdict(deque)
-
-    def _trim(self, q: deque[float], window_sec: int, now: float) -> None:
-        threshold = now - window_sec
-        while q and q[0] < threshold:
-            q.popleft()
-
-    def check(self, key: str, limit: int | None = None, window_sec: int | None = None) -> None:
+        count = 1
+        while count < max(1, int(self.shards)):
+            count <<= 1
+        self.shards = count
+        self._mask = count - 1
+        self._shards = [_LimiterShard() for _ in range(count)]
+        self._per_shard = max(1, -(-max(1, int(self.max_keys)) // count))
+
+    def check(self, key: str, limit: int | None = None, window_sec: int | None = None, cost: int = 1) -> int:
         use_limit = int(limit or self.default_limit)
         use_window = int(window_sec or self.default_window_sec)
-        now = time.monotonic()
-
-        q = self._events[key]
-        self._trim(q, use_window, now)
-        if len(q) >= use_limit:
-            raise RateLimitError(f"Rate limit exceeded ({use_limit}/{use_window}s)")
-
-        q.append(now)
+        use_cost = max(1, int(cost))
+        if use_cost > use_limit:
+            raise _oversized(use_cost, use_limit, use_window)
+        # GCRA: every request pushes the key's theoretical arrival time (TAT) one emission interval per
+        # unit of cost further out, and is allowed while the TAT stays within one window of now. That is a
+        # burst of `limit` units followed by a steady limit/window, using a single float per key.
+        interval = use_window / max(1, use_limit)
+        if self._sweeper is None and self.sweep_interval_sec > 0:
+            self.start()
+
+        shard = self._shards[hash(key) & self._mask]
+        with shard.lock:
+            now = self.clock()
+            tats = shard.tats
+            tat = tats.get(key, now)
+            if tat < now:
+                tat = now
+            new_tat = tat + interval * use_cost
+            if new_tat - now > use_window:
+                shard.rejected += 1
+                raise RateLimitError(
+                    f"Rate limit exceeded ({use_limit}/{use_window}s)",
+                    retry_after_sec=new_tat - use_window - now,
+                )
+            tats[key] = new_tat
+            tats.move_to_end(key)
+            shard.allowed += 1
+            if len(tats) > self._per_shard:
+                # Dropping a key forgives at most one window of debt, so evict the least recently seen.
+                tats.popitem(last=False)
+                shard.evicted += 1
+            return int((use_window - (new_tat - now)) / interval + 1e-9)
+
+    def refund(self, key: str, limit: int | None = None, window_sec: int | None = None, cost: int = 1) -> int:
+        use_limit = int(limit or self.default_limit)
+        use_window = int(window_sec or self.default_window_sec)
+        interval = use_window / max(1, use_limit)
+        shard = self._shards[hash(key) & self._mask]
+        with shard.lock:
+            now = self.clock()
+            tat = shard.tats.get(key)
+            if tat is None:
+                return use_limit
+            tat -= interval * max(1, int(cost))
+            if tat <= now:
+                del shard.tats[key]
+                return use_limit
+            shard.tats[key] = tat
+            return int((use_window - (tat - now)) / interval + 1e-9)
+
+    def sweep(self, now: float | None = None) -> int:
+        # A key whose TAT has passed behaves exactly like a key never seen, so dropping it is lossless.
+        removed = 0
+        for shard in self._shards:
+            with shard.lock:
+                cutoff = self.clock() if now is None else now
+                idle = [key for key, tat in shard.tats.items() if tat <= cutoff]
+                for key in idle:
+                    del shard.tats[key]
+                shard.expired += len(idle)
+            removed += len(idle)
+        self._sweeps += 1
+        return removed
+
+    def start(self) -> None:
+        with self._start_lock:
+            if self._sweeper is not None or self.sweep_interval_sec <= 0:
+                return
+            self._stop.clear()
+            self._sweeper = threading.Thread(target=self._sweep_loop, name="omni-media-ratelimit-sweep", daemon=True)
+            self._sweeper.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        with self._start_lock:
+            sweeper, self._sweeper = self._sweeper, None
+        if sweeper is not None:
+            sweeper.join(timeout=5)
+
+    def _sweep_loop(self) -> None:
+        while not self._stop.wait(self.sweep_interval_sec):
+            try:
+                self.sweep()
+            except Exception:
+                pass
+
+    def snapshot(self) -> dict[str, Any]:
+        return {
+            "algorithm": "gcra",
+            "shards": self.shards,
+            "max_keys": self.max_keys,
+            "keys": sum(len(shard.tats) for shard in self._shards),
+            "allowed": sum(shard.allowed for shard in self._shards),
+            "rejected": sum(shard.rejected for shard in self._shards),
+            "evicted": sum(shard.evicted for shard in self._shards),
+            "expired": sum(shard.expired for shard in self._shards),
+            "sweeps": self._sweeps,
+        }
+
+
+# GCRA in one atomic round trip. Grants between `need` and `want` units: plain checks ask for exactly
+# their cost, pre-aggregating clients lease a batch. Returns {granted, retry ms, units left}. Uses the
+# server clock so app hosts can disagree on time, and the key's TTL always ends when its arrival time
+# passes, so no key can be left without an expiry.
+_REDIS_GCRA_SCRIPT = """
+local limit = tonumber(ARGV[1])
+local window = tonumber(ARGV[2])
+local need = tonumber(ARGV[3])
+local want = tonumber(ARGV[4])
+local clock = redis.call('TIME')
+local now = tonumber(clock[1]) * 1000 + tonumber(clock[2]) / 1000
+local interval = window / limit
+local tat = now
+local stored = redis.call('GET', KEYS[1])
+if stored then
+  tat = math.max(tonumber(stored), now)
+end
+local available = math.floor((now + window - tat) / interval + 1e-9)
+if available < need then
+  return {0, math.ceil(tat + need * interval - window - now), available}
+end
+local granted = math.min(want, available)
+tat = tat + granted * interval
+redis.call('SET', KEYS[1], string.format('%.3f', tat), 'PX', math.max(1, math.ceil(tat - now)))
+return {granted, 0, available - granted}
+"""
+
+
+# Moves the arrival time back by `cost` units, never before now, and returns the units left.
+_REDIS_REFUND_SCRIPT = """
+local limit = tonumber(ARGV[1])
+local window = tonumber(ARGV[2])
+local cost = tonumber(ARGV[3])
+local clock = redis.call('TIME')
+local now = tonumber(clock[1]) * 1000 + tonumber(clock[2]) / 1000
+local interval = window / limit
+local stored = redis.call('GET', KEYS[1])
+if not stored then
+  return limit
+end
+local tat = tonumber(stored) - cost * interval
+if tat <= now then
+  redis.call('DEL', KEYS[1])
+  return limit
+end
+redis.call('SET', KEYS[1], string.format('%.3f', tat), 'PX', math.max(1, math.ceil(tat - now)))
+return math.floor((now + window - tat) / interval + 1e-9)
+"""
 
 
 @dataclass(slots=True)
@@ -83,27 +441,126 @@ class RedisRateLimiter:
     default_limit: int = 60
     default_window_sec: int = 60
     key_prefix: str = "omni-media:ratelimit"
-    _client: object = field(init=False)
+    # Fraction of a bucket's limit leased per round trip and then served from process memory; 0 disables.
+    # Only buckets where that works out to two or more units use it, i.e. the high-QPS ones.
+    prefetch: float = 0.0
+    max_connections: int = 32
+    socket_timeout_sec: float = 0.5
+    connect_timeout_sec: float = 0.5
+    health_check_interval_sec: int = 30
+    local_max_keys: int = 10_000
+    client: Any = None
+    clock: Callable[[], float] = time.monotonic
+    _client: Any = field(init=False)
+    _script: Any = field(init=False)
+    _refund_script: Any = field(init=False)
+    _lock: threading.Lock = field(init=False, default_factory=threading.Lock)
+    # key -> [units left, lease expiry, blocked until, server units left] for leased batches.
+    _leases: OrderedDict[str, list[float]] = field(init=False, default_factory=OrderedDict)
+    _stats: dict[str, int] = field(init=False)
 
     def __post_init__(self) -> None:
-        try:
-            redis_module = importlib.import_module("redis")
-        except Exception as exc:
-            raise RuntimeError("redis package is required for RedisRateLimiter") from exc
-
-        self._client = redis_module.from_url(self.redis_url)
-
-    def check(self, key: str, limit: int | None = None, window_sec: int | None = None) -> None:
+        if self.client is None:
+            try:
+                redis_module = importlib.import_module("redis")
+            except Exception as exc:
+                raise RuntimeError("redis package is required for RedisRateLimiter") from exc
+            pool = redis_module.ConnectionPool.from_url(
+                self.redis_url,
+                max_connections=self.max_connections,
+                socket_timeout=self.socket_timeout_sec,
+                socket_connect_timeout=self.connect_timeout_sec,
+                socket_keepalive=True,
+                health_check_interval=self.health_check_interval_sec,
+            )
+            self.client = redis_module.Redis(connection_pool=pool)
+        self._client = self.client
+        # register_script sends EVALSHA and only falls back to EVAL after a server restart.
+        self._script = self._client.register_script(_REDIS_GCRA_SCRIPT)
+        self._refund_script = self._client.register_script(_REDIS_REFUND_SCRIPT)
+        self._stats = {"round_trips": 0, "local_hits": 0, "leased_units": 0, "rejected": 0}
+
+    def _take(self, name: str, limit: int, window_sec: int, need: int, want: int) -> tuple[int, float, int]:
+        granted, retry_ms, remaining = self._script(keys=[name], args=[limit, window_sec * 1000, need, want])
+        with self._lock:
+            self._stats["round_trips"] += 1
+        return int(granted), int(retry_ms) / 1000, int(remaining)
+
+    def _reject(self, limit: int, window_sec: int, retry_after_sec: float) -> RateLimitError:
+        with self._lock:
+            self._stats["rejected"] += 1
+        return RateLimitError(f"Rate limit exceeded ({limit}/{window_sec}s)", retry_after_sec=retry_after_sec)
+
+    def check(self, key: str, limit: int | None = None, window_sec: int | None = None, cost: int = 1) -> int:
         use_limit = int(limit or self.default_limit)
         use_window = int(window_sec or self.default_window_sec)
+        use_cost = max(1, int(cost))
+        if use_cost > use_limit:
+            raise _oversized(use_cost, use_limit, use_window)
         namespaced_key = f"{self.key_prefix}:{key}"
+        batch = int(use_limit * self.prefetch)
+        if batch < 2:
+            granted, retry_after, remaining = self._take(namespaced_key, use_limit, use_window, use_cost, use_cost)
+            if not granted:
+                raise self._reject(use_limit, use_window, retry_after)
+            return remaining
+
+        with self._lock:
+            now = self.clock()
+            lease = self._leases.get(namespaced_key)
+            if lease is not None and lease[2] > now:
+                blocked_for = lease[2] - now
+            elif lease is not None and lease[0] >= use_cost and lease[1] > now:
+                lease[0] -= use_cost
+                self._stats["local_hits"] += 1
+                # Approximate: what the server had left at lease time plus what this lease still holds.
+                return int(lease[3] + lease[0])
+            else:
+                blocked_for = 0.0
+        if blocked_for:
+            # A rejected lease holds its key shut locally until the server said to retry.
+            raise self._reject(use_limit, use_window, blocked_for)
+
+        # Leased units were charged on the server when granted, so serving them later can only
+        # under-admit. Whatever is unused when the lease expires is simply forgone.
+        granted, retry_after, remaining = self._take(
+            namespaced_key, use_limit, use_window, use_cost, max(batch, use_cost)
+        )
+        with self._lock:
+            now = self.clock()
+            self._stats["leased_units"] += granted
+            self._leases[namespaced_key] = [
+                max(0, granted - use_cost),
+                now + use_window,
+                now + retry_after,
+                remaining,
+            ]
+            self._leases.move_to_end(namespaced_key)
+            while len(self._leases) > self.local_max_keys:
+                self._leases.popitem(last=False)
+        if not granted:
+            raise self._reject(use_limit, use_window, retry_after)
+        return remaining + max(0, granted - use_cost)
+
+    def refund(self, key: str, limit: int | None = None, window_sec: int | None = None, cost: int = 1) -> int:
+        use_limit = int(limit or self.default_limit)
+        use_window = int(window_sec or self.default_window_sec)
+        remaining = self._refund_script(
+            keys=[f"{self.key_prefix}:{key}"], args=[use_limit, use_window * 1000, max(1, int(cost))]
+        )
+        with self._lock:
+            self._stats["round_trips"] += 1
+        return int(remaining)
 
-        current = self._client.incr(namespaced_key)
-        if current == 1:
-            self._client.expire(namespaced_key, use_window)
-
-        if int(current) > use_limit:
-            raise RateLimitError(f"Rate limit exceeded ({use_limit}/{use_window}s)")
+    def snapshot(self) -> dict[str, Any]:
+        with self._lock:
+            return {
+                "algorithm": "gcra-lua",
+                "prefetch": self.prefetch,
+                "max_connections": self.max_connections,
+                "local_keys": len(self._leases),
+                **self._stats,
+            }
 
 
 def load_rate_limits_from_env() -> dict[str, tuple[int, int]]:
@@ -148,6 +605,16 @@ def create_rate_limiter_from_env() -> RateLimiter:
             redis_url=redis_url,
             default_limit=default_limit,
             default_window_sec=default_window,
+            prefetch=float(os.getenv("OMNI_MEDIA_RATE_LIMIT_REDIS_PREFETCH", "0")),
+            max_connections=int(os.getenv("OMNI_MEDIA_REDIS_MAX_CONNECTIONS", "32")),
+            socket_timeout_sec=float(os.getenv("OMNI_MEDIA_REDIS_SOCKET_TIMEOUT_SEC", "0.5")),
+            connect_timeout_sec=float(os.getenv("OMNI_MEDIA_REDIS_CONNECT_TIMEOUT_SEC", "0.5")),
         )
 
-    return InMemoryRateLimiter(default_limit=default_limit, default_window_sec=default_window)
+    return InMemoryRateLimiter(
+        default_limit=default_limit,
+        default_window_sec=default_window,
+        shards=int(os.getenv("OMNI_MEDIA_RATE_LIMIT_SHARDS", "16")),
+        max_keys=int(os.getenv("OMNI_MEDIA_RATE_LIMIT_MAX_KEYS", "100000")),
+        sweep_interval_sec=float(os.getenv("OMNI_MEDIA_RATE_LIMIT_SWEEP_SEC", "30")),
+    )
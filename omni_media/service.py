@@ -3,19 +3,24 @@ from __future__ import annotations
 import uuid
 import threading
 import os
+import time
 from dataclasses import asdict, dataclass, field
-from datetime import datetime, timezone
-from typing import Any
+from datetime import datetime, timedelta, timezone
+from typing import Any, Callable, Protocol
 
 from .api_contracts import GenerateApiResponse, GenerateBody, OutputItem
-from .contracts import GenerateRequest, GenerationParams, MediaOutput
+from .contracts import GenerateRequest, GenerateResponse, GenerationParams, MediaOutput
+from .executor import ModalityExecutorPool
 from .hooks import DefaultMediaHooks
 from .pipeline import OmniMediaPipeline
 from .provider_adapter import ExternalVideoProviderAdapter
 from .provider_video_pipeline import generate_prompt_video_export
-from .storage import LocalFileStorageAdapter, StorageAdapter
-from .video_prompt_planner import compile_video_generation_spec
-from .worker import InMemoryJobQueue, Job, OmniMediaWorker
+from .media_delivery import MediaDelivery
+from .retention import RetentionSweeper
+from .storage import StorageAdapter, UploadItem, create_storage_from_env
+from .video_prompt_planner import planner_cache_stats, video_spec_for
+from .warmup import ModelWarmup
+from .worker import InMemoryJobQueue, Job, JobQueue, OmniMediaWorker, OmniMediaWorkerPool
 
 
 def _parse_optional_bool_env(value: str | None) -> bool | None:
@@ -105,26 +110,61 @@ class JobRecord:
     error: str | None = None
 
 
+class JobStore(Protocol):
+    def upsert(self, record: JobRecord) -> None:
+        ...
+
+    def get(self, job_id: str) -> JobRecord | None:
+        ...
+
+
 class InMemoryJobStore:
-    def __init__(self) -> None:
+    def __init__(self, finished_ttl_sec: float | None = 86400.0, purge_interval_sec: float = 60.0) -> None:
         self._jobs: dict[str, JobRecord] = {}
+        self._lock = threading.Lock()
+        self.finished_ttl_sec = finished_ttl_sec
+        self.purge_interval_sec = float(purge_interval_sec)
+        self._last_purge = time.monotonic()
 
     def upsert(self, record: JobRecord) -> None:
-        self._jobs[record.id] = record
+        with self._lock:
+            self._jobs[record.id] = record
+        if self.finished_ttl_sec and time.monotonic() - self._last_purge >= self.purge_interval_sec:
+            self.purge_finished()
 
     def get(self, job_id: str) -> JobRecord | None:
         return self._jobs.get(job_id)
 
+    def purge_finished(self, ttl_sec: float | None = None) -> int:
+        self._last_purge = time.monotonic()
+        ttl = self.finished_ttl_sec if ttl_sec is None else ttl_sec
+        if not ttl or ttl <= 0:
+            return 0
+        cutoff = (datetime.now(timezone.utc) - timedelta(seconds=float(ttl))).isoformat()
+        with self._lock:
+            expired = [
+                job_id
+                for job_id, record in self._jobs.items()
+                if record.completed_at and record.completed_at < cutoff
+            ]
+            for job_id in expired:
+                del self._jobs[job_id]
+        return len(expired)
+
 
 @dataclass(slots=True)
 class OmniMediaService:
     pipeline: OmniMediaPipeline = field(default_factory=OmniMediaPipeline)
-    storage: StorageAdapter = field(default_factory=LocalFileStorageAdapter)
-    job_store: InMemoryJobStore = field(default_factory=InMemoryJobStore)
-    queue_backend: InMemoryJobQueue = field(default_factory=InMemoryJobQueue)
+    storage: StorageAdapter = field(default_factory=create_storage_from_env)
+    job_store: JobStore = field(default_factory=InMemoryJobStore)
+    queue_backend: JobQueue = field(default_factory=InMemoryJobQueue)
     hooks: DefaultMediaHooks = field(default_factory=DefaultMediaHooks)
     signed_url_ttl_sec: int | None = 3600
-    worker: OmniMediaWorker | None = None
+    worker: OmniMediaWorker | OmniMediaWorkerPool | None = None
+    executor: ModalityExecutorPool = field(default_factory=ModalityExecutorPool.from_env)
+    warmup: ModelWarmup | None = None
+    media_delivery: MediaDelivery | None = field(default_factory=MediaDelivery.from_env)
+    retention: RetentionSweeper | None = None
     _stats_lock: threading.Lock = field(default_factory=threading.Lock, init=False, repr=False)
     _stats: dict[str, int] = field(default_factory=dict, init=False, repr=False)
 
@@ -137,8 +177,26 @@ class OmniMediaService:
             "jobs_completed": 0,
             "jobs_failed": 0,
         }
+        if self.media_delivery is not None:
+            if isinstance(getattr(self.storage, "base_dir", None), str):
+                self.media_delivery.roots["media_outputs"] = self.storage.base_dir
+            if self.media_delivery.storage is None:
+                self.media_delivery.storage = self.storage
+        if self.retention is None:
+            base_dir = getattr(self.storage, "base_dir", None)
+            content_store = self.storage if callable(getattr(self.storage, "gc", None)) else None
+            self.retention = RetentionSweeper.from_env(base_dir if isinstance(base_dir, str) else None, content_store)
+        self.retention.start()
+        if self.media_delivery is not None and self.media_delivery.access_hook is None:
+            self.media_delivery.access_hook = self.retention.record_access
+        if self.warmup is None:
+            self.warmup = ModelWarmup.from_env(self.pipeline)
+        self.warmup.start()
+        bind_completion = getattr(self.queue_backend, "bind_completion", None)
+        if callable(bind_completion):
+            bind_completion(self._job_completion)
         if self.worker is None:
-            self.worker = OmniMediaWorker(self.pipeline, self.queue_backend)
+            self.worker = OmniMediaWorkerPool.from_env(self.pipeline, self.queue_backend)
             self.worker.start()
 
     def _inc_stat(self, key: str, value: int = 1) -> None:
@@ -169,6 +227,14 @@ class OmniMediaService:
             "strict_prompt_generation": not allow_placeholder,
         }
 
+    def get_readiness(self) -> dict[str, Any]:
+        warmup = self.warmup.snapshot() if self.warmup else {"ready": True, "profiles": {}}
+        return {
+            "ready": bool(warmup.get("ready")),
+            "warmup": warmup,
+            "worker_running": bool(self.worker.is_running() if self.worker else False),
+        }
+
     def _to_generate_request(self, modality: str, body: GenerateBody, request_id: str) -> GenerateRequest:
         params = GenerationParams(
             width=body.params.get("width"),
@@ -198,6 +264,7 @@ class OmniMediaService:
 
     def _persist_outputs(self, response, request: GenerateRequest | None = None) -> list[OutputItem]:
         outputs: list[OutputItem] = []
+        uploads: list[tuple[int, UploadItem]] = []
         for index, output in enumerate(response.outputs):
             media_type = output.type
             metadata = dict(output.metadata)
@@ -206,28 +273,39 @@ class OmniMediaService:
             data = output.data
 
             if isinstance(raw, (bytes, bytearray)):
-                self.hooks.validate_output(
+                # Watermarking may re-encode the output, so the byte budget is fitted and checked afterwards.
+                raw_bytes, metadata = self.hooks.apply_watermark(
                     media_type=media_type,
                     data=bytes(raw),
                     metadata=metadata,
-                    safety_level=request.safety_level if request else "default",
+                    enabled=bool(request.watermark) if request else False,
                 )
 
-                raw_bytes, metadata = self.hooks.apply_watermark(
+                if hasattr(self.hooks, "fit_to_budget"):
+                    raw_bytes, metadata = self.hooks.fit_to_budget(
+                        media_type=media_type,
+                        data=raw_bytes,
+                        metadata=metadata,
+                        safety_level=request.safety_level if request else "default",
+                    )
+
+                self.hooks.validate_output(
                     media_type=media_type,
-                    data=bytes(raw),
+                    data=raw_bytes,
                     metadata=metadata,
-                    enabled=bool(request.watermark) if request else False,
+                    safety_level=request.safety_level if request else "default",
                 )
 
-                ext = _infer_extension(media_type, metadata)
-                url = self.storage.put_bytes(
-                    response.id,
-                    media_type,
-                    index,
-                    raw_bytes,
-                    ext,
-                    signed_ttl_sec=self.signed_url_ttl_sec,
+                uploads.append(
+                    (
+                        len(outputs),
+                        UploadItem(
+                            media_type=media_type,
+                            index=index,
+                            extension=_infer_extension(media_type, metadata),
+                            data=raw_bytes,
+                        ),
+                    )
                 )
 
             outputs.append(
@@ -239,6 +317,26 @@ class OmniMediaService:
                 )
             )
 
+        if uploads:
+            items = [item for _position, item in uploads]
+            if hasattr(self.storage, "put_many"):
+                urls = self.storage.put_many(response.id, items, signed_ttl_sec=self.signed_url_ttl_sec)
+            else:
+                urls = [
+                    self.storage.put_bytes(
+                        response.id,
+                        item.media_type,
+                        item.index,
+                        item.data,
+                        item.extension,
+                        signed_ttl_sec=self.signed_url_ttl_sec,
+                    )
+                    for item in items
+                ]
+            for (position, _item), url in zip(uploads, urls):
+                signed = self.media_delivery.url_for(url, self.signed_url_ttl_sec) if self.media_delivery else None
+                outputs[position].url = signed or url
+
         return outputs
 
     def generate_sync(self, modality: str, body: GenerateBody) -> GenerateApiResponse:
@@ -251,7 +349,8 @@ class OmniMediaService:
             provider = ExternalVideoProviderAdapter.from_env()
             if provider.is_configured():
                 try:
-                    video_spec = compile_video_generation_spec(request.prompt)
+                    video_spec = video_spec_for(request)
+                    plan_metadata = video_spec.metadata
                     provider_url = str(getattr(provider, "video_url", "") or "").strip().lower()
                     provider_params = {
                         "width": request.params.width or 768,
@@ -275,7 +374,7 @@ class OmniMediaService:
                             mode=request.mode,
                             params=provider_params,
                             negative_prompt=request.negative_prompt,
-                            metadata=video_spec.metadata,
+                            metadata=plan_metadata,
                         )
                     response.status = "completed"
                     response.error = None
@@ -291,9 +390,9 @@ class OmniMediaService:
                                 "style_preset": video_spec.style_preset,
                                 "motion_profile": video_spec.motion_profile,
                                 "camera_profile": video_spec.camera_profile,
-                                "scene_count": video_spec.metadata.get("scene_count"),
-                                "duration_sec": video_spec.metadata.get("duration_sec"),
-                                "scene_plan": video_spec.metadata.get("scene_plan"),
+                                "scene_count": plan_metadata.get("scene_count"),
+                                "duration_sec": plan_metadata.get("duration_sec"),
+                                "scene_plan": plan_metadata.get("scene_plan"),
                             },
                         )
                     ]
@@ -339,7 +438,8 @@ class OmniMediaService:
                     "https://interactive-examples.mdn.mozilla.net/media/cc0-videos/flower.mp4",
                 )
             ).strip()
-            video_spec = compile_video_generation_spec(request.prompt)
+            video_spec = video_spec_for(request)
+            plan_metadata = video_spec.metadata
             fallback_url = _select_prompt_aware_fallback_url(request.prompt, configured_fallback_url)
             if fallback_url:
                 response.status = "completed"
@@ -356,9 +456,9 @@ class OmniMediaService:
                             "style_preset": video_spec.style_preset,
                             "motion_profile": video_spec.motion_profile,
                             "camera_profile": video_spec.camera_profile,
-                            "scene_count": video_spec.metadata.get("scene_count"),
-                            "duration_sec": video_spec.metadata.get("duration_sec"),
-                            "scene_plan": video_spec.metadata.get("scene_plan"),
+                            "scene_count": plan_metadata.get("scene_count"),
+                            "duration_sec": plan_metadata.get("duration_sec"),
+                            "scene_plan": plan_metadata.get("scene_plan"),
                             "prompt_aware": True,
                         },
                     )
@@ -370,9 +470,9 @@ class OmniMediaService:
                     "style_preset": video_spec.style_preset,
                     "motion_profile": video_spec.motion_profile,
                     "camera_profile": video_spec.camera_profile,
-                    "scene_count": video_spec.metadata.get("scene_count"),
-                    "duration_sec": video_spec.metadata.get("duration_sec"),
-                    "scene_plan": video_spec.metadata.get("scene_plan"),
+                    "scene_count": plan_metadata.get("scene_count"),
+                    "duration_sec": plan_metadata.get("duration_sec"),
+                    "scene_plan": plan_metadata.get("scene_plan"),
                     "prompt_aware": True,
                 }
 
@@ -389,16 +489,19 @@ class OmniMediaService:
             metadata=response.metadata,
         )
 
-    def enqueue_job(self, modality: str, body: GenerateBody) -> dict[str, Any]:
-        self._inc_stat("jobs_enqueued")
-        job_id = str(uuid.uuid4())
-        submitted_at = datetime.now(timezone.utc).isoformat()
-        record = JobRecord(id=job_id, modality=modality, status="queued", submitted_at=submitted_at)
-        self.job_store.upsert(record)
+    async def generate_async(self, modality: str, body: GenerateBody) -> GenerateApiResponse:
+        return await self.executor.run(modality, self.generate_sync, modality, body)
 
-        request = self._to_generate_request(modality, body, job_id)
+    async def generate_prompt_video_export_async(self, prompt: str, params: dict[str, Any]) -> dict[str, Any]:
+        return await self.executor.run("video", generate_prompt_video_export, prompt, params)
 
-        def on_complete(result) -> None:
+    def _job_completion(self, request: GenerateRequest) -> Callable[[GenerateResponse], None]:
+        job_id = request.id
+        modality = str(request.modality)
+
+        def on_complete(result: GenerateResponse) -> None:
+            existing = self.job_store.get(job_id)
+            submitted_at = existing.submitted_at if existing else datetime.now(timezone.utc).isoformat()
             try:
                 outputs = self._persist_outputs(result, request=request)
                 api_response = GenerateApiResponse(
@@ -434,7 +537,17 @@ class OmniMediaService:
                 self.job_store.upsert(failed)
                 self._inc_stat("jobs_failed")
 
-        self.queue_backend.enqueue(Job(request=request, on_complete=on_complete))
+        return on_complete
+
+    def enqueue_job(self, modality: str, body: GenerateBody) -> dict[str, Any]:
+        self._inc_stat("jobs_enqueued")
+        job_id = str(uuid.uuid4())
+        submitted_at = datetime.now(timezone.utc).isoformat()
+        record = JobRecord(id=job_id, modality=modality, status="queued", submitted_at=submitted_at)
+        self.job_store.upsert(record)
+
+        request = self._to_generate_request(modality, body, job_id)
+        self.queue_backend.enqueue(Job(request=request, on_complete=self._job_completion(request)))
         return {"id": job_id, "status": "queued", "submitted_at": submitted_at}
 
     def get_job(self, job_id: str) -> dict[str, Any] | None:
@@ -461,9 +574,20 @@ class OmniMediaService:
         return {
             "stats": stats,
             "queue_depth": self.queue_backend.size(),
+            "queue_backend": type(self.queue_backend).__name__,
+            "job_store": type(self.job_store).__name__,
             "worker_running": bool(self.worker.is_running() if self.worker else False),
+            "worker_pool": self.worker.snapshot() if self.worker else None,
+            "executor": self.executor.snapshot(),
+            "result_cache": self.pipeline.cache.snapshot() if getattr(self.pipeline, "cache", None) else None,
+            "coalescing": self.pipeline.singleflight.snapshot() if hasattr(self.pipeline, "singleflight") else None,
             "signed_url_ttl_sec": self.signed_url_ttl_sec,
             "storage_adapter": type(self.storage).__name__,
+            "storage": self.storage.snapshot() if hasattr(self.storage, "snapshot") else None,
+            "media_delivery": self.media_delivery.snapshot() if self.media_delivery else None,
+            "retention": self.retention.snapshot() if self.retention else None,
+            "video_planner": planner_cache_stats(),
             "hooks_adapter": type(self.hooks).__name__,
             "video_backend": self.get_video_backend_health(),
+            "warmup": self.warmup.snapshot() if self.warmup else None,
         }
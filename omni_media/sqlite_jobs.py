@@ -0,0 +1,302 @@
+from __future__ import annotations
+
+import json
+import os
+import socket
+import sqlite3
+import threading
+import time
+import uuid
+from dataclasses import asdict
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Any, Callable
+
+from .api_contracts import GenerateApiResponse, OutputItem
+from .contracts import GenerateRequest, GenerateResponse, GenerationParams
+from .service import JobRecord
+from .worker import Job
+
+CompletionFactory = Callable[[GenerateRequest], Callable[[GenerateResponse], None]]
+
+
+def _request_to_json(request: GenerateRequest) -> str:
+    data = asdict(request)
+    # Plans are process-local cache entries; the worker that runs the job re-plans from the prompt.
+    data.pop("video_plan", None)
+    return json.dumps(data, ensure_ascii=False)
+
+
+def _request_from_json(raw: str) -> GenerateRequest:
+    data = json.loads(raw)
+    data.pop("video_plan", None)
+    params = GenerationParams(**dict(data.pop("params", None) or {}))
+    return GenerateRequest(params=params, **data)
+
+
+def _response_from_dict(data: dict[str, Any]) -> GenerateApiResponse:
+    outputs = [OutputItem(**item) for item in data.get("outputs") or []]
+    return GenerateApiResponse(
+        id=data["id"],
+        status=data["status"],
+        outputs=outputs,
+        error=data.get("error"),
+        metadata=dict(data.get("metadata") or {}),
+    )
+
+
+class _SQLiteBase:
+    def __init__(self, path: str, busy_timeout_ms: int = 5000) -> None:
+        self.path = str(path)
+        self.busy_timeout_ms = int(busy_timeout_ms)
+        self._local = threading.local()
+        if self.path != ":memory:":
+            Path(self.path).parent.mkdir(parents=True, exist_ok=True)
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=self.busy_timeout_ms / 1000, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute(f"PRAGMA busy_timeout={self.busy_timeout_ms}")
+            self._local.conn = conn
+        return conn
+
+
+class SQLiteJobQueue(_SQLiteBase):
+    def __init__(
+        self,
+        path: str = "data/omni_media_jobs.sqlite3",
+        visibility_timeout_sec: float = 900.0,
+        max_attempts: int = 3,
+        poll_interval_sec: float = 0.1,
+        completion_factory: CompletionFactory | None = None,
+    ) -> None:
+        super().__init__(path)
+        self.visibility_timeout_sec = float(visibility_timeout_sec)
+        self.max_attempts = max(1, int(max_attempts))
+        self.poll_interval_sec = max(0.01, float(poll_interval_sec))
+        self.owner_id = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        self._completion_factory = completion_factory
+        self._conn().executescript(
+            """
+            CREATE TABLE IF NOT EXISTS job_queue (
+                id TEXT PRIMARY KEY,
+                request_json TEXT NOT NULL,
+                status TEXT NOT NULL,
+                enqueued_at REAL NOT NULL,
+                lease_owner TEXT,
+                lease_until REAL,
+                attempts INTEGER NOT NULL DEFAULT 0
+            );
+            CREATE INDEX IF NOT EXISTS idx_job_queue_claim ON job_queue (status, lease_until, enqueued_at);
+            """
+        )
+
+    def bind_completion(self, completion_factory: CompletionFactory) -> None:
+        self._completion_factory = completion_factory
+
+    def enqueue(self, job: Job) -> None:
+        self._conn().execute(
+            "INSERT OR REPLACE INTO job_queue (id, request_json, status, enqueued_at, attempts) "
+            "VALUES (?, ?, 'queued', ?, COALESCE((SELECT attempts FROM job_queue WHERE id = ?), 0))",
+            (job.request.id, _request_to_json(job.request), time.time(), job.request.id),
+        )
+
+    def _claim(self) -> tuple[GenerateRequest, int] | None:
+        conn = self._conn()
+        now = time.time()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            row = conn.execute(
+                "SELECT id, request_json, attempts FROM job_queue "
+                "WHERE status = 'queued' OR (status = 'leased' AND lease_until < ?) "
+                "ORDER BY enqueued_at LIMIT 1",
+                (now,),
+            ).fetchone()
+            if row is None:
+                conn.execute("COMMIT")
+                return None
+            job_id, request_json, attempts = row
+            conn.execute(
+                "UPDATE job_queue SET status = 'leased', lease_owner = ?, lease_until = ?, attempts = attempts + 1 "
+                "WHERE id = ?",
+                (self.owner_id, now + self.visibility_timeout_sec, job_id),
+            )
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        return _request_from_json(request_json), int(attempts) + 1
+
+    def dequeue(self, timeout_sec: float = 1.0) -> Job | None:
+        deadline = time.monotonic() + max(0.0, float(timeout_sec))
+        while True:
+            claimed = self._claim()
+            if claimed is not None:
+                request, attempts = claimed
+                if attempts > self.max_attempts:
+                    self.ack(request.id)
+                    self._complete(request)(
+                        GenerateResponse(
+                            id=request.id,
+                            status="failed",
+                            error=f"job lease expired {attempts - 1} times; giving up",
+                        )
+                    )
+                    continue
+                return Job(request=request, on_complete=self._acking(request))
+            if time.monotonic() >= deadline:
+                return None
+            time.sleep(self.poll_interval_sec)
+
+    def _complete(self, request: GenerateRequest) -> Callable[[GenerateResponse], None]:
+        if self._completion_factory is None:
+            return lambda _result: None
+        return self._completion_factory(request)
+
+    def _acking(self, request: GenerateRequest) -> Callable[[GenerateResponse], None]:
+        on_complete = self._complete(request)
+
+        def handler(result: GenerateResponse) -> None:
+            try:
+                on_complete(result)
+            finally:
+                self.ack(request.id)
+
+        return handler
+
+    def ack(self, job_id: str) -> None:
+        self._conn().execute(
+            "DELETE FROM job_queue WHERE id = ? AND lease_owner = ?",
+            (job_id, self.owner_id),
+        )
+
+    def extend_lease(self, job_id: str, extra_sec: float | None = None) -> bool:
+        until = time.time() + float(extra_sec or self.visibility_timeout_sec)
+        cursor = self._conn().execute(
+            "UPDATE job_queue SET lease_until = ? WHERE id = ? AND status = 'leased' AND lease_owner = ?",
+            (until, job_id, self.owner_id),
+        )
+        return cursor.rowcount > 0
+
+    def recover_expired(self) -> int:
+        cursor = self._conn().execute(
+            "UPDATE job_queue SET status = 'queued', lease_owner = NULL, lease_until = NULL "
+            "WHERE status = 'leased' AND lease_until < ?",
+            (time.time(),),
+        )
+        return int(cursor.rowcount)
+
+    def size(self) -> int:
+        row = self._conn().execute(
+            "SELECT COUNT(*) FROM job_queue WHERE status = 'queued' OR (status = 'leased' AND lease_until < ?)",
+            (time.time(),),
+        ).fetchone()
+        return int(row[0])
+
+    def leased_count(self) -> int:
+        row = self._conn().execute(
+            "SELECT COUNT(*) FROM job_queue WHERE status = 'leased' AND lease_until >= ?",
+            (time.time(),),
+        ).fetchone()
+        return int(row[0])
+
+
+class SQLiteJobStore(_SQLiteBase):
+    def __init__(
+        self,
+        path: str = "data/omni_media_jobs.sqlite3",
+        finished_ttl_sec: float | None = 86400.0,
+        purge_interval_sec: float = 60.0,
+    ) -> None:
+        super().__init__(path)
+        self.finished_ttl_sec = finished_ttl_sec
+        self.purge_interval_sec = float(purge_interval_sec)
+        self._last_purge = time.monotonic()
+        self._conn().executescript(
+            """
+            CREATE TABLE IF NOT EXISTS job_records (
+                id TEXT PRIMARY KEY,
+                modality TEXT NOT NULL,
+                status TEXT NOT NULL,
+                submitted_at TEXT NOT NULL,
+                completed_at TEXT,
+                response_json TEXT,
+                error TEXT
+            );
+            CREATE INDEX IF NOT EXISTS idx_job_records_status ON job_records (status, completed_at);
+            """
+        )
+
+    def upsert(self, record: JobRecord) -> None:
+        response_json = json.dumps(asdict(record.response), ensure_ascii=False) if record.response else None
+        self._conn().execute(
+            "INSERT OR REPLACE INTO job_records (id, modality, status, submitted_at, completed_at, response_json, error) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?)",
+            (
+                record.id,
+                record.modality,
+                record.status,
+                record.submitted_at,
+                record.completed_at,
+                response_json,
+                record.error,
+            ),
+        )
+        if self.finished_ttl_sec and time.monotonic() - self._last_purge >= self.purge_interval_sec:
+            self.purge_finished()
+
+    def get(self, job_id: str) -> JobRecord | None:
+        row = self._conn().execute(
+            "SELECT id, modality, status, submitted_at, completed_at, response_json, error "
+            "FROM job_records WHERE id = ?",
+            (job_id,),
+        ).fetchone()
+        if row is None:
+            return None
+        return JobRecord(
+            id=row[0],
+            modality=row[1],
+            status=row[2],
+            submitted_at=row[3],
+            completed_at=row[4],
+            response=_response_from_dict(json.loads(row[5])) if row[5] else None,
+            error=row[6],
+        )
+
+    def count_by_status(self) -> dict[str, int]:
+        rows = self._conn().execute("SELECT status, COUNT(*) FROM job_records GROUP BY status").fetchall()
+        return {str(status): int(count) for status, count in rows}
+
+    def purge_finished(self, ttl_sec: float | None = None) -> int:
+        self._last_purge = time.monotonic()
+        ttl = self.finished_ttl_sec if ttl_sec is None else ttl_sec
+        if not ttl or ttl <= 0:
+            return 0
+        cutoff = (datetime.now(timezone.utc) - timedelta(seconds=float(ttl))).isoformat()
+        cursor = self._conn().execute(
+            "DELETE FROM job_records WHERE status IN ('completed', 'failed') AND completed_at < ?",
+            (cutoff,),
+        )
+        return int(cursor.rowcount)
+
+
+def create_job_backends_from_env() -> dict[str, Any]:
+    backend = str(os.getenv("OMNI_MEDIA_JOB_BACKEND", "memory")).strip().lower()
+    if backend != "sqlite":
+        return {}
+
+    path = str(os.getenv("OMNI_MEDIA_JOB_DB_PATH", "data/omni_media_jobs.sqlite3")).strip()
+    return {
+        "queue_backend": SQLiteJobQueue(
+            path=path,
+            visibility_timeout_sec=float(os.getenv("OMNI_MEDIA_JOB_LEASE_SEC", "900")),
+            max_attempts=int(os.getenv("OMNI_MEDIA_JOB_MAX_ATTEMPTS", "3")),
+        ),
+        "job_store": SQLiteJobStore(
+            path=path,
+            finished_ttl_sec=float(os.getenv("OMNI_MEDIA_JOB_TTL_SEC", "86400")),
+        ),
+    }
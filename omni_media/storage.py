@@ -1,9 +1,28 @@
 from __future__ import annotations
 
+import asyncio
 import importlib
+import os
+import shutil
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from concurrent.futures import Future, InvalidStateError, ThreadPoolExecutor
+from concurrent.futures import wait as wait_futures
 from dataclasses import dataclass
 from datetime import datetime, timezone
 from pathlib import Path
+from typing import Any, Callable, Iterable, Iterator
+
+
+@dataclass(slots=True)
+class UploadItem:
+    media_type: str
+    index: int
+    extension: str
+    data: bytes | None = None
+    path: str | None = None
 
 
 class StorageAdapter:
@@ -18,6 +37,47 @@ class StorageAdapter:
     ) -> str:
         raise NotImplementedError
 
+    def put_file(
+        self,
+        request_id: str,
+        media_type: str,
+        index: int,
+        path: str,
+        extension: str,
+        signed_ttl_sec: int | None = None,
+    ) -> str:
+        return self.put_bytes(request_id, media_type, index, Path(path).read_bytes(), extension, signed_ttl_sec)
+
+    def put_stream(
+        self,
+        request_id: str,
+        media_type: str,
+        index: int,
+        chunks: Iterable[bytes],
+        extension: str,
+        signed_ttl_sec: int | None = None,
+    ) -> str:
+        return self.put_bytes(request_id, media_type, index, b"".join(chunks), extension, signed_ttl_sec)
+
+    def put_many(
+        self,
+        request_id: str,
+        items: list[UploadItem],
+        signed_ttl_sec: int | None = None,
+    ) -> list[str]:
+        return [self._put_item(request_id, item, signed_ttl_sec) for item in items]
+
+    def _put_item(self, request_id: str, item: UploadItem, signed_ttl_sec: int | None) -> str:
+        if item.path is not None:
+            return self.put_file(request_id, item.media_type, item.index, item.path, item.extension, signed_ttl_sec)
+        return self.put_bytes(request_id, item.media_type, item.index, item.data or b"", item.extension, signed_ttl_sec)
+
+
+def _local_output_path(base_dir: str, request_id: str, media_type: str, index: int, extension: str) -> Path:
+    now = datetime.now(timezone.utc)
+    folder = Path(base_dir) / media_type / now.strftime("%Y") / now.strftime("%m") / now.strftime("%d") / request_id
+    return folder / f"{media_type}_{index}.{extension.strip('.').lower() or 'bin'}"
+
 
 @dataclass(slots=True)
 class LocalFileStorageAdapter(StorageAdapter):
@@ -32,34 +92,186 @@ class LocalFileStorageAdapter(StorageAdapter):
         extension: str,
         signed_ttl_sec: int | None = None,
     ) -> str:
-        now = datetime.now(timezone.utc)
-        folder = Path(self.base_dir) / media_type / now.strftime("%Y") / now.strftime("%m") / now.strftime("%d") / request_id
-        folder.mkdir(parents=True, exist_ok=True)
-
-        filename = f"{media_type}_{index}.{extension.strip('.').lower() or 'bin'}"
-        path = folder / filename
+        path = _local_output_path(self.base_dir, request_id, media_type, index, extension)
+        path.parent.mkdir(parents=True, exist_ok=True)
         path.write_bytes(data)
         return str(path.as_posix())
 
 
-@dataclass(slots=True)
-class S3LikeStorageAdapter(StorageAdapter):
-    bucket: str
-    prefix: str = "omni-media"
-    endpoint_url: str | None = None
-    region_name: str | None = None
+class WriteBehindFileStorageAdapter(StorageAdapter):
+    def __init__(
+        self,
+        base_dir: str = "media_outputs",
+        io_workers: int = 4,
+        max_pending_bytes: int = 256 * 1024 * 1024,
+        fsync: str = "batch",
+        fsync_batch_size: int = 32,
+        fsync_interval_sec: float = 0.05,
+        durable: bool = False,
+    ) -> None:
+        if fsync not in {"none", "batch", "always"}:
+            raise ValueError(f"unsupported fsync mode: {fsync}")
+        self.base_dir = base_dir
+        self.max_pending_bytes = max(1, int(max_pending_bytes))
+        self.fsync = fsync
+        self.fsync_batch_size = max(1, int(fsync_batch_size))
+        self.fsync_interval_sec = max(0.0, float(fsync_interval_sec))
+        self.durable = bool(durable)
+        self._executor = ThreadPoolExecutor(max_workers=max(1, int(io_workers)), thread_name_prefix="omni-media-io")
+        self._cond = threading.Condition()
+        self._pending: dict[str, Future[str]] = {}
+        # Failed writes stay visible to wait() until the path is written again.
+        self._failed: OrderedDict[str, Future[str]] = OrderedDict()
+        self._pending_bytes = 0
+        self._sync_queue: list[tuple[str, Future[str], int]] = []
+        self._closed = False
+        self._stats = {
+            "writes": 0,
+            "bytes_written": 0,
+            "errors": 0,
+            "fsync_batches": 0,
+            "fsynced_files": 0,
+            "backpressure_waits": 0,
+            "backpressure_wait_ms": 0.0,
+        }
+        self._syncer: threading.Thread | None = None
+        if self.fsync == "batch":
+            self._syncer = threading.Thread(target=self._sync_loop, name="omni-media-fsync", daemon=True)
+            self._syncer.start()
 
-    def _client(self):
+    @classmethod
+    def from_env(cls) -> "WriteBehindFileStorageAdapter":
+        return cls(
+            base_dir=str(os.getenv("OMNI_MEDIA_STORAGE_DIR", "media_outputs")).strip() or "media_outputs",
+            io_workers=int(os.getenv("OMNI_MEDIA_STORAGE_IO_WORKERS", "4")),
+            max_pending_bytes=int(os.getenv("OMNI_MEDIA_STORAGE_MAX_PENDING_BYTES", str(256 * 1024 * 1024))),
+            fsync=str(os.getenv("OMNI_MEDIA_STORAGE_FSYNC", "batch")).strip().lower() or "batch",
+            durable=str(os.getenv("OMNI_MEDIA_STORAGE_DURABLE", "false")).strip().lower() in {"1", "true", "yes", "on"},
+        )
+
+    def _reserve(self, size: int) -> None:
+        with self._cond:
+            if self._closed:
+                raise RuntimeError("storage adapter is shut down")
+            # A single write larger than the threshold is still admitted once the queue drains.
+            if self._pending_bytes and self._pending_bytes + size > self.max_pending_bytes:
+                started = time.perf_counter()
+                self._stats["backpressure_waits"] += 1
+                while self._pending_bytes and self._pending_bytes + size > self.max_pending_bytes:
+                    self._cond.wait()
+                self._stats["backpressure_wait_ms"] += (time.perf_counter() - started) * 1000
+            self._pending_bytes += size
+
+    def _release(self, key: str, size: int, future: Future[str]) -> None:
+        with self._cond:
+            self._pending_bytes -= size
+            if self._pending.get(key) is future:
+                del self._pending[key]
+            self._cond.notify_all()
+
+    def _write(self, path: Path, size: int, writer: Callable[[Path], None], future: Future[str]) -> None:
+        key = path.as_posix()
         try:
-            boto3 = importlib.import_module("boto3")
-        except Exception as exc:
-            raise RuntimeError("boto3 is required for S3LikeStorageAdapter") from exc
+            path.parent.mkdir(parents=True, exist_ok=True)
+            tmp = path.with_name(f".{path.name}.{uuid.uuid4().hex}.tmp")
+            try:
+                writer(tmp)
+                if self.fsync == "always":
+                    _fsync_path(tmp)
+                os.replace(tmp, path)
+            except BaseException:
+                tmp.unlink(missing_ok=True)
+                raise
+            if self.fsync == "always":
+                _fsync_path(path.parent)
+            with self._cond:
+                self._stats["writes"] += 1
+                self._stats["bytes_written"] += size
+        except BaseException as exc:
+            _settle(future, exc=exc)
+            with self._cond:
+                self._stats["errors"] += 1
+                self._failed[key] = future
+                while len(self._failed) > 256:
+                    self._failed.popitem(last=False)
+            self._release(key, size, future)
+            return
 
-        return boto3.client(
-            "s3",
-            endpoint_url=self.endpoint_url,
-            region_name=self.region_name,
-        )
+        if self.fsync == "batch":
+            with self._cond:
+                self._sync_queue.append((key, future, size))
+                self._cond.notify_all()
+            return
+        _settle(future, result=key)
+        self._release(key, size, future)
+
+    def _sync_loop(self) -> None:
+        while True:
+            with self._cond:
+                while not self._sync_queue and not self._closed:
+                    self._cond.wait()
+                if not self._sync_queue and self._closed:
+                    return
+                deadline = time.monotonic() + self.fsync_interval_sec
+                while len(self._sync_queue) < self.fsync_batch_size and not self._closed:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    self._cond.wait(timeout=remaining)
+                batch, self._sync_queue = self._sync_queue, []
+
+            errors: dict[str, BaseException] = {}
+            for key, _future, _size in batch:
+                try:
+                    _fsync_path(Path(key))
+                except OSError as exc:
+                    errors[key] = exc
+            # Renames are only durable once the containing directory entries are flushed too.
+            for directory in sorted({str(Path(key).parent) for key, _future, _size in batch}):
+                try:
+                    _fsync_path(Path(directory))
+                except OSError:
+                    pass
+            with self._cond:
+                self._stats["fsync_batches"] += 1
+                self._stats["fsynced_files"] += len(batch) - len(errors)
+                self._stats["errors"] += len(errors)
+            for key, future, size in batch:
+                if key in errors:
+                    _settle(future, exc=errors[key])
+                    with self._cond:
+                        self._failed[key] = future
+                else:
+                    _settle(future, result=key)
+                self._release(key, size, future)
+
+    def _submit(self, path: Path, size: int, writer: Callable[[Path], None]) -> Future[str]:
+        self._reserve(size)
+        future: Future[str] = Future()
+        with self._cond:
+            self._pending[path.as_posix()] = future
+            self._failed.pop(path.as_posix(), None)
+        try:
+            self._executor.submit(self._write, path, size, writer, future)
+        except BaseException:
+            self._release(path.as_posix(), size, future)
+            raise
+        return future
+
+    def _submit_bytes(self, path: Path, data: bytes) -> Future[str]:
+        payload = bytes(data)
+        return self._submit(path, len(payload), lambda tmp: tmp.write_bytes(payload))
+
+    def _submit_file(self, path: Path, source: str) -> Future[str]:
+        return self._submit(path, os.path.getsize(source), lambda tmp: shutil.copyfile(source, tmp))
+
+    def submit_bytes(self, request_id: str, media_type: str, index: int, data: bytes, extension: str) -> Future[str]:
+        path = _local_output_path(self.base_dir, request_id, media_type, index, extension)
+        return self._submit_bytes(path, data)
+
+    def submit_file(self, request_id: str, media_type: str, index: int, source: str, extension: str) -> Future[str]:
+        path = _local_output_path(self.base_dir, request_id, media_type, index, extension)
+        return self._submit_file(path, source)
 
     def put_bytes(
         self,
@@ -68,17 +280,204 @@ class S3LikeStorageAdapter(StorageAdapter):
         index: int,
         data: bytes,
         extension: str,
-        signed_ttl_sec: int | None = 3600,
+        signed_ttl_sec: int | None = None,
     ) -> str:
+        # The date-partitioned path is computed once so the returned URL names the folder the write lands in.
+        path = _local_output_path(self.base_dir, request_id, media_type, index, extension)
+        future = self._submit_bytes(path, data)
+        return future.result() if self.durable else path.as_posix()
+
+    def put_file(
+        self,
+        request_id: str,
+        media_type: str,
+        index: int,
+        path: str,
+        extension: str,
+        signed_ttl_sec: int | None = None,
+    ) -> str:
+        target = _local_output_path(self.base_dir, request_id, media_type, index, extension)
+        future = self._submit_file(target, path)
+        return future.result() if self.durable else target.as_posix()
+
+    def put_many(
+        self,
+        request_id: str,
+        items: list[UploadItem],
+        signed_ttl_sec: int | None = None,
+    ) -> list[str]:
+        paths = [
+            _local_output_path(self.base_dir, request_id, item.media_type, item.index, item.extension) for item in items
+        ]
+        futures = [
+            self._submit_file(path, item.path) if item.path is not None else self._submit_bytes(path, item.data or b"")
+            for path, item in zip(paths, items)
+        ]
+        if self.durable:
+            return [future.result() for future in futures]
+        return [path.as_posix() for path in paths]
+
+    def pending(self, path: str) -> Future[str] | None:
+        key = Path(path).as_posix()
+        with self._cond:
+            return self._pending.get(key) or self._failed.get(key)
+
+    def wait(self, path: str, timeout: float | None = None) -> bool:
+        future = self.pending(path)
+        if future is None:
+            return True
+        future.result(timeout=timeout)
+        return True
+
+    async def wait_async(self, path: str) -> bool:
+        future = self.pending(path)
+        if future is None:
+            return True
+        await asyncio.wrap_future(future)
+        return True
+
+    def flush(self, timeout: float | None = None) -> bool:
+        with self._cond:
+            futures = list(self._pending.values())
+        _done, not_done = wait_futures(futures, timeout=timeout)
+        return not not_done
+
+    def snapshot(self) -> dict[str, Any]:
+        with self._cond:
+            return {
+                **self._stats,
+                "backpressure_wait_ms": round(self._stats["backpressure_wait_ms"], 2),
+                "pending_writes": len(self._pending),
+                "pending_bytes": self._pending_bytes,
+                "max_pending_bytes": self.max_pending_bytes,
+                "fsync": self.fsync,
+                "durable": self.durable,
+            }
+
+    def shutdown(self, wait: bool = True) -> None:
+        if wait:
+            self.flush()
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+        self._executor.shutdown(wait=wait, cancel_futures=not wait)
+        if self._syncer is not None and wait:
+            self._syncer.join()
+        if not wait:
+            # Cancelled writes, and writes still waiting for a batched fsync, would otherwise never resolve.
+            with self._cond:
+                abandoned = [(key, future) for key, future in self._pending.items() if not future.done()]
+            for key, future in abandoned:
+                if _settle(future, exc=RuntimeError("storage adapter shut down before the write completed")):
+                    with self._cond:
+                        self._failed[key] = future
+
+
+def _settle(future: Future[str], result: str | None = None, exc: BaseException | None = None) -> bool:
+    # shutdown(wait=False) may have failed the future already while the write was still running.
+    try:
+        if exc is not None:
+            future.set_exception(exc)
+        else:
+            future.set_result(result or "")
+    except InvalidStateError:
+        return False
+    return True
+
+
+def _fsync_path(path: Path) -> None:
+    flags = os.O_RDONLY
+    if path.is_dir():
+        flags |= getattr(os, "O_DIRECTORY", 0)
+    fd = os.open(path, flags)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+_MIN_PART_BYTES = 5 * 1024 * 1024
+_CLIENT_CACHE: dict[tuple[Any, ...], Any] = {}
+_CLIENT_LOCK = threading.Lock()
+
+
+def _shared_s3_client(endpoint_url: str | None, region_name: str | None, max_pool_connections: int) -> Any:
+    key = (endpoint_url, region_name, int(max_pool_connections), os.getpid())
+    with _CLIENT_LOCK:
+        client = _CLIENT_CACHE.get(key)
+        if client is not None:
+            return client
+        try:
+            boto3 = importlib.import_module("boto3")
+            botocore_config = importlib.import_module("botocore.config")
+        except Exception as exc:
+            raise RuntimeError("boto3 is required for S3LikeStorageAdapter") from exc
+
+        # Clients are thread-safe once built; sessions are not, so each cached client gets its own.
+        client = boto3.session.Session().client(
+            "s3",
+            endpoint_url=endpoint_url,
+            region_name=region_name,
+            config=botocore_config.Config(
+                max_pool_connections=int(max_pool_connections),
+                retries={"max_attempts": 5, "mode": "adaptive"},
+                tcp_keepalive=True,
+            ),
+        )
+        _CLIENT_CACHE[key] = client
+        return client
+
+
+def _file_parts(path: str, part_size: int) -> Iterator[tuple[int, int]]:
+    size = os.path.getsize(path)
+    offset = 0
+    while offset < size:
+        yield offset, min(part_size, size - offset)
+        offset += part_size
+
+
+@dataclass(slots=True)
+class S3LikeStorageAdapter(StorageAdapter):
+    bucket: str
+    prefix: str = "omni-media"
+    endpoint_url: str | None = None
+    region_name: str | None = None
+    max_pool_connections: int = 32
+    multipart_threshold_bytes: int = 16 * 1024 * 1024
+    part_size_bytes: int = 8 * 1024 * 1024
+    max_concurrency: int = 8
+    client_factory: Callable[[], Any] | None = None
+
+    @classmethod
+    def from_env(cls, bucket: str | None = None) -> "S3LikeStorageAdapter":
+        return cls(
+            bucket=bucket or str(os.getenv("OMNI_MEDIA_S3_BUCKET", "")).strip(),
+            prefix=str(os.getenv("OMNI_MEDIA_S3_PREFIX", "omni-media")).strip() or "omni-media",
+            endpoint_url=str(os.getenv("OMNI_MEDIA_S3_ENDPOINT_URL", "")).strip() or None,
+            region_name=str(os.getenv("OMNI_MEDIA_S3_REGION", "")).strip() or None,
+            max_pool_connections=int(os.getenv("OMNI_MEDIA_S3_MAX_POOL_CONNECTIONS", "32")),
+            multipart_threshold_bytes=int(os.getenv("OMNI_MEDIA_S3_MULTIPART_THRESHOLD_BYTES", str(16 * 1024 * 1024))),
+            part_size_bytes=int(os.getenv("OMNI_MEDIA_S3_PART_SIZE_BYTES", str(8 * 1024 * 1024))),
+            max_concurrency=int(os.getenv("OMNI_MEDIA_S3_MAX_CONCURRENCY", "8")),
+        )
+
+    def _client(self):
+        if self.client_factory is not None:
+            return self.client_factory()
+        return _shared_s3_client(self.endpoint_url, self.region_name, self.max_pool_connections)
+
+    @property
+    def _part_size(self) -> int:
+        return max(_MIN_PART_BYTES, int(self.part_size_bytes))
+
+    def _key(self, request_id: str, media_type: str, index: int, extension: str) -> str:
         now = datetime.now(timezone.utc)
-        key = (
+        return (
             f"{self.prefix}/{media_type}/{now.strftime('%Y/%m/%d')}/"
             f"{request_id}/{media_type}_{index}.{extension.strip('.').lower() or 'bin'}"
         )
 
-        client = self._client()
-        client.put_object(Bucket=self.bucket, Key=key, Body=data)
-
+    def _url(self, client: Any, key: str, signed_ttl_sec: int | None) -> str:
         if signed_ttl_sec and signed_ttl_sec > 0:
             try:
                 return client.generate_presigned_url(
@@ -90,3 +489,167 @@ class S3LikeStorageAdapter(StorageAdapter):
                 return f"s3://{self.bucket}/{key}"
 
         return f"s3://{self.bucket}/{key}"
+
+    def _multipart(self, client: Any, key: str, parts: Iterable[tuple[int, Callable[[], Any]]]) -> None:
+        upload_id = client.create_multipart_upload(Bucket=self.bucket, Key=key)["UploadId"]
+        workers = max(1, int(self.max_concurrency))
+        # Bound the parts held in memory: a part is only read once a worker slot is free.
+        slots = threading.BoundedSemaphore(workers * 2)
+
+        def upload(number: int, body_fn: Callable[[], Any]) -> dict[str, Any]:
+            try:
+                response = client.upload_part(
+                    Bucket=self.bucket,
+                    Key=key,
+                    UploadId=upload_id,
+                    PartNumber=number,
+                    Body=body_fn(),
+                )
+                return {"PartNumber": number, "ETag": response["ETag"]}
+            finally:
+                slots.release()
+
+        try:
+            with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="omni-media-s3-part") as pool:
+                futures = []
+                for number, body_fn in parts:
+                    slots.acquire()
+                    futures.append(pool.submit(upload, number, body_fn))
+                completed = [future.result() for future in futures]
+            client.complete_multipart_upload(
+                Bucket=self.bucket,
+                Key=key,
+                UploadId=upload_id,
+                MultipartUpload={"Parts": sorted(completed, key=lambda part: part["PartNumber"])},
+            )
+        except BaseException:
+            try:
+                client.abort_multipart_upload(Bucket=self.bucket, Key=key, UploadId=upload_id)
+            except Exception:
+                pass
+            raise
+
+    def put_bytes(
+        self,
+        request_id: str,
+        media_type: str,
+        index: int,
+        data: bytes,
+        extension: str,
+        signed_ttl_sec: int | None = 3600,
+    ) -> str:
+        key = self._key(request_id, media_type, index, extension)
+        client = self._client()
+        if len(data) < self.multipart_threshold_bytes:
+            client.put_object(Bucket=self.bucket, Key=key, Body=data)
+        else:
+            view = memoryview(data)
+            size = self._part_size
+            self._multipart(
+                client,
+                key,
+                (
+                    (number, lambda start=start: view[start : start + size].tobytes())
+                    for number, start in enumerate(range(0, len(data), size), start=1)
+                ),
+            )
+        return self._url(client, key, signed_ttl_sec)
+
+    def put_file(
+        self,
+        request_id: str,
+        media_type: str,
+        index: int,
+        path: str,
+        extension: str,
+        signed_ttl_sec: int | None = 3600,
+    ) -> str:
+        if os.path.getsize(path) < self.multipart_threshold_bytes:
+            return self.put_bytes(request_id, media_type, index, Path(path).read_bytes(), extension, signed_ttl_sec)
+
+        key = self._key(request_id, media_type, index, extension)
+        client = self._client()
+
+        def read_range(offset: int, length: int) -> bytes:
+            with open(path, "rb") as handle:
+                handle.seek(offset)
+                return handle.read(length)
+
+        self._multipart(
+            client,
+            key,
+            (
+                (number, lambda offset=offset, length=length: read_range(offset, length))
+                for number, (offset, length) in enumerate(_file_parts(path, self._part_size), start=1)
+            ),
+        )
+        return self._url(client, key, signed_ttl_sec)
+
+    def put_stream(
+        self,
+        request_id: str,
+        media_type: str,
+        index: int,
+        chunks: Iterable[bytes],
+        extension: str,
+        signed_ttl_sec: int | None = 3600,
+    ) -> str:
+        iterator = iter(chunks)
+        size = self._part_size
+        head = bytearray()
+        for chunk in iterator:
+            head.extend(chunk)
+            if len(head) >= max(size, self.multipart_threshold_bytes):
+                break
+        else:
+            return self.put_bytes(request_id, media_type, index, bytes(head), extension, signed_ttl_sec)
+
+        key = self._key(request_id, media_type, index, extension)
+        client = self._client()
+
+        def parts() -> Iterator[tuple[int, Callable[[], bytes]]]:
+            pending = head
+            number = 0
+            for chunk in iterator:
+                pending.extend(chunk)
+                while len(pending) >= size:
+                    number += 1
+                    part = bytes(pending[:size])
+                    del pending[:size]
+                    yield number, lambda part=part: part
+            while pending:
+                number += 1
+                part = bytes(pending[:size])
+                del pending[:size]
+                yield number, lambda part=part: part
+
+        self._multipart(client, key, parts())
+        return self._url(client, key, signed_ttl_sec)
+
+    def put_many(
+        self,
+        request_id: str,
+        items: list[UploadItem],
+        signed_ttl_sec: int | None = 3600,
+    ) -> list[str]:
+        if len(items) <= 1:
+            return [self._put_item(request_id, item, signed_ttl_sec) for item in items]
+        workers = min(len(items), max(1, int(self.max_concurrency)))
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="omni-media-s3-put") as pool:
+            return list(pool.map(lambda item: self._put_item(request_id, item, signed_ttl_sec), items))
+
+
+def create_storage_from_env() -> StorageAdapter:
+    backend = str(os.getenv("OMNI_MEDIA_STORAGE_BACKEND", "local")).strip().lower()
+    if backend in {"cas", "dedup"}:
+        from .content_store import ContentAddressedStorageAdapter
+
+        return ContentAddressedStorageAdapter.from_env()
+    if backend in {"write_behind", "local_async"}:
+        return WriteBehindFileStorageAdapter.from_env()
+    if backend == "s3":
+        adapter = S3LikeStorageAdapter.from_env()
+        if not adapter.bucket:
+            raise RuntimeError("OMNI_MEDIA_S3_BUCKET is required when OMNI_MEDIA_STORAGE_BACKEND=s3")
+        return adapter
+    return LocalFileStorageAdapter(base_dir=str(os.getenv("OMNI_MEDIA_STORAGE_DIR", "media_outputs")).strip() or "media_outputs")
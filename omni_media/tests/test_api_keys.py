@@ -0,0 +1,141 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import signal
+import tempfile
+import unittest
+from pathlib import Path
+
+from omni_media.security import ApiKeyAuth, ApiKeyRegistry, AuthError
+
+
+class _Clock:
+    def __init__(self) -> None:
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+class TestApiKeyRegistry(unittest.TestCase):
+    def setUp(self) -> None:
+        self._tmp = tempfile.TemporaryDirectory()
+        self.path = Path(self._tmp.name) / "keys.jsonl"
+
+    def tearDown(self) -> None:
+        self._tmp.cleanup()
+
+    def _write(self, lines: list[str]) -> None:
+        previous = self.path.stat().st_mtime_ns if self.path.exists() else 0
+        self.path.write_text("\n".join(lines) + "\n")
+        # Make sure the stamp changes even on filesystems with coarse mtimes.
+        os.utime(self.path, ns=(previous + 1_000_000_000, previous + 1_000_000_000))
+
+    def test_file_entries_carry_identity_and_hide_the_key(self) -> None:
+        self._write(
+            [
+                "# team keys",
+                json.dumps(
+                    {"sha256": hashlib.sha256(b"alpha-key").hexdigest(), "id": "alpha", "tier": "pro", "quota": 5000}
+                ),
+                json.dumps({"key": "beta-key", "tier": "free", "owner": "beta team"}),
+                "gamma-key",
+            ]
+        )
+        registry = ApiKeyRegistry(path=str(self.path), env_keys="env-key")
+
+        alpha = registry.lookup("alpha-key")
+        beta = registry.lookup("beta-key")
+        self.assertEqual((alpha.key_id, alpha.tier, alpha.quota), ("alpha", "pro", 5000))
+        self.assertEqual((beta.tier, beta.metadata), ("free", {"owner": "beta team"}))
+        self.assertTrue(beta.key_id.startswith("key-"))
+        self.assertNotIn("gamma", registry.lookup("gamma-key").key_id)
+        self.assertIsNotNone(registry.lookup("env-key"))
+        self.assertIsNone(registry.lookup("alpha-key "))
+        self.assertEqual(len(registry), 4)
+
+    def test_thousands_of_keys(self) -> None:
+        self._write([json.dumps({"key": f"k{index:05d}", "id": f"user-{index}"}) for index in range(5000)])
+        registry = ApiKeyRegistry(path=str(self.path))
+
+        self.assertEqual(len(registry), 5000)
+        self.assertEqual(registry.lookup("k04321").key_id, "user-4321")
+        self.assertIsNone(registry.lookup("k05000"))
+
+    def test_file_changes_are_picked_up_without_restart(self) -> None:
+        clock = _Clock()
+        self._write(["old-key"])
+        auth = ApiKeyAuth(registry=ApiKeyRegistry(path=str(self.path), reload_check_sec=5, clock=clock))
+        auth.verify({"x-api-key": "old-key"})
+
+        self._write(["new-key"])
+        clock.now += 1
+        auth.verify({"x-api-key": "old-key"})
+        clock.now += 5
+        auth.verify({"x-api-key": "new-key"})
+        with self.assertRaises(AuthError):
+            auth.verify({"x-api-key": "old-key"})
+        self.assertEqual(auth.registry.snapshot()["reloads"], 1)
+
+    def test_broken_reload_keeps_serving_previous_keys(self) -> None:
+        self._write(["good-key"])
+        registry = ApiKeyRegistry(path=str(self.path), reload_check_sec=0)
+
+        self._write(['{"tier": "pro"}'])
+        self.assertFalse(registry.reload())
+        self.assertIsNotNone(registry.lookup("good-key"))
+        self.assertIn("keys.jsonl:1", registry.snapshot()["last_error"])
+        with self.assertRaises(ValueError):
+            ApiKeyRegistry(path=str(self.path))
+
+    def test_truncated_key_file_never_opens_access(self) -> None:
+        clock = _Clock()
+        self._write(["only-key"])
+        auth = ApiKeyAuth(registry=ApiKeyRegistry(path=str(self.path), reload_check_sec=5, clock=clock))
+        with self.assertRaises(AuthError):
+            auth.verify({})
+
+        self._write([""])
+        clock.now += 10
+        with self.assertRaises(AuthError):
+            auth.verify({})
+        self.assertIsNotNone(auth.verify({"x-api-key": "only-key"}))
+        self.assertIn("no API keys", auth.registry.snapshot()["last_error"])
+
+    @unittest.skipUnless(hasattr(signal, "SIGUSR1"), "needs POSIX signals")
+    def test_signal_requests_a_reload(self) -> None:
+        self._write(["first-key"])
+        registry = ApiKeyRegistry(path=str(self.path), reload_check_sec=0)
+        previous = signal.getsignal(signal.SIGUSR1)
+        try:
+            self.assertTrue(registry.install_signal_handler(signal.SIGUSR1))
+            self._write(["second-key"])
+            os.kill(os.getpid(), signal.SIGUSR1)
+            registry.maybe_reload()
+        finally:
+            signal.signal(signal.SIGUSR1, previous)
+
+        self.assertIsNotNone(registry.lookup("second-key"))
+        self.assertIsNone(registry.lookup("first-key"))
+
+
+class TestApiKeyAuth(unittest.TestCase):
+    def test_env_keys_are_parsed_once(self) -> None:
+        auth = ApiKeyAuth(registry=ApiKeyRegistry(env_keys="one, two"))
+
+        self.assertIsNotNone(auth.identify({"x-api-key": "two"}))
+        with self.assertRaises(AuthError):
+            auth.identify({"x-api-key": "three"})
+        with self.assertRaises(AuthError):
+            auth.identify({})
+
+    def test_no_keys_configured(self) -> None:
+        self.assertIsNone(ApiKeyAuth(registry=ApiKeyRegistry()).verify({}))
+        with self.assertRaises(AuthError):
+            ApiKeyAuth(registry=ApiKeyRegistry(), allow_without_keys=False).verify({"x-api-key": "x"})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,110 @@
+from __future__ import annotations
+
+import contextlib
+import importlib
+import importlib.util
+import io
+import json
+import subprocess
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+
+from omni_media.batch_planner import CATEGORIES, main, plan_batch, read_jsonl, write_batches
+from omni_media.video_prompt_planner import build_video_prompt_plan
+
+_PROMPTS = [
+    "a lighthouse in a storm",
+    "Scene 1: aerial drone over a harbor. Scene 2: close up of ropes in slow motion. Scene 3: wide sunset.",
+    "",
+    "a fox runs through snow then pauses on a ridge next the camera pulls back over the valley",
+    "cinematic neon alley at night",
+]
+
+
+class TestBatchPlanner(unittest.TestCase):
+    def _records(self) -> list[tuple[str, str]]:
+        return [(f"p{index}", prompt) for index, prompt in enumerate(_PROMPTS)]
+
+    def test_columns_round_trip_to_the_per_prompt_plan(self) -> None:
+        batches = list(plan_batch(self._records(), workers=1, chunk_size=2))
+
+        self.assertEqual([len(columns) for columns in batches], [2, 2, 1])
+        self.assertEqual(batches[1].row(0), {"id": "p2", "error": "prompt is required"})
+        storyboard = batches[0].row(1)
+        plan = build_video_prompt_plan(_PROMPTS[1])
+        self.assertEqual(storyboard["scene_count"], plan.scene_count)
+        self.assertEqual(storyboard["camera_profile"], plan.camera_profile)
+        self.assertEqual(
+            [(scene["text"], scene["frame_count"], scene["shot_prompt"]) for scene in storyboard["scenes"]],
+            [(scene.text, scene.frame_count, scene.shot_prompt) for scene in plan.scenes],
+        )
+        self.assertEqual(sum(batches[0].scene_frame_count[1:4]), plan.total_frames)
+
+    def test_process_pool_preserves_input_order(self) -> None:
+        records = self._records() * 6
+
+        inline = [columns.to_dict() for columns in plan_batch(records, workers=1, chunk_size=4)]
+        pooled = [columns.to_dict() for columns in plan_batch(records, workers=2, chunk_size=4, max_in_flight=2)]
+
+        self.assertEqual(pooled, inline)
+
+    def test_read_jsonl_accepts_strings_and_objects(self) -> None:
+        stream = io.StringIO('"a red kite"\n\n{"id": "x1", "prompt": "a blue boat"}\n')
+
+        self.assertEqual(list(read_jsonl(stream)), [("1", "a red kite"), ("x1", "a blue boat")])
+        with self.assertRaises(ValueError):
+            list(read_jsonl(io.StringIO('{"text": "missing prompt"}\n')))
+
+    def test_cli_writes_columnar_jsonl(self) -> None:
+        with tempfile.TemporaryDirectory() as tmp:
+            source = Path(tmp) / "prompts.jsonl"
+            output = Path(tmp) / "plans.jsonl"
+            source.write_text("\n".join(json.dumps({"id": i, "prompt": p}) for i, p in enumerate(_PROMPTS)))
+
+            stderr = io.StringIO()
+            with contextlib.redirect_stderr(stderr):
+                main([str(source), "-o", str(output), "--workers", "1", "--chunk-size", "3"])
+
+            chunks = [json.loads(line) for line in output.read_text().splitlines()]
+            stats = json.loads(stderr.getvalue())
+        self.assertEqual([chunk["rows"] for chunk in chunks], [3, 2])
+        self.assertEqual(chunks[0]["errors"], {"2": "prompt is required"})
+        self.assertEqual(chunks[0]["categories"]["camera"], list(CATEGORIES["camera"]))
+        self.assertEqual(len(chunks[0]["scene_offsets"]), 4)
+        self.assertEqual((stats["prompts"], stats["errors"]), (5, 1))
+
+    def test_module_entry_point_runs_without_loading_the_http_app(self) -> None:
+        root = Path(__file__).resolve().parents[2]
+        script = (
+            "import runpy, sys; sys.argv = ['batch_planner', '-']; runpy.run_module('omni_media.batch_planner', "
+            "run_name='__main__', alter_sys=True); print('fastapi' in sys.modules, file=sys.stderr)"
+        )
+        result = subprocess.run(
+            [sys.executable, "-W", "error::RuntimeWarning", "-c", script],
+            input='"a fox in the snow"\n',
+            capture_output=True,
+            text=True,
+            cwd=root,
+            timeout=60,
+        )
+
+        self.assertEqual(result.returncode, 0, result.stderr)
+        self.assertEqual(result.stderr.strip().splitlines()[-1], "False")
+        self.assertEqual(json.loads(result.stdout)["ids"], ["1"])
+
+    @unittest.skipUnless(importlib.util.find_spec("pyarrow"), "pyarrow not installed")
+    def test_parquet_output_uses_list_columns(self) -> None:
+        parquet = importlib.import_module("pyarrow.parquet")
+        with tempfile.TemporaryDirectory() as tmp:
+            path = str(Path(tmp) / "plans.parquet")
+            write_batches(plan_batch(self._records(), workers=1, chunk_size=2), path, "parquet")
+            table = parquet.read_table(path)
+
+        self.assertEqual(table.num_rows, len(_PROMPTS))
+        self.assertEqual(len(table.column("scene_frame_count")[1].as_py()), 3)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,152 @@
+from __future__ import annotations
+
+import importlib.util
+import tempfile
+import unittest
+from pathlib import Path
+
+from omni_media.budget_encoder import (
+    BudgetUnreachableError,
+    GifBudgetEncoder,
+    Mp4BudgetEncoder,
+    _scaled_size,
+    decode_gif,
+)
+from omni_media.contracts import FrameBuffer, GenerateRequest, GenerateResponse, MediaOutput
+from omni_media.gif_encoder import GifEncoder, GifEncoderSettings
+from omni_media.hooks import DefaultMediaHooks, MediaPolicyError
+from omni_media.pipeline import OmniMediaPipeline
+from omni_media.service import OmniMediaService
+from omni_media.storage import LocalFileStorageAdapter
+from omni_media.video_encoder import BytesSink, EncoderSettings, encode_frame_buffer
+from omni_media.worker import InMemoryJobQueue, OmniMediaWorker
+
+
+def _has_numpy_and_pillow() -> bool:
+    return bool(importlib.util.find_spec("numpy") and importlib.util.find_spec("PIL"))
+
+
+def _noisy_clip(frame_count: int, size: int, fps: int = 12) -> FrameBuffer:
+    import numpy as np
+
+    rng = np.random.default_rng(7)
+    buffer = FrameBuffer.allocate(frame_count, size, size, fps=fps)
+    buffer.data[:] = rng.integers(0, 256, size=buffer.data.shape, dtype=np.uint8)
+    return buffer
+
+
+class BulkyWatermarker:
+    # Stands in for a watermark pass whose re-encode comes out ~2 KB larger than its input.
+    def apply_encoded(self, data: bytes) -> bytes:
+        comment = b"\x21\xfe" + (b"\xff" + b"w" * 255) * 8 + b"\x00"
+        return data[:-1] + comment + b";"
+
+
+@unittest.skipUnless(_has_numpy_and_pillow(), "numpy/Pillow not installed")
+class TestGifBudget(unittest.TestCase):
+    def test_reencodes_gif_under_budget(self) -> None:
+        buffer = _noisy_clip(24, 96)
+        original = GifEncoder(GifEncoderSettings()).encode(buffer)
+        budget = len(original) // 4
+
+        result = GifBudgetEncoder(base_settings=GifEncoderSettings()).encode(buffer, budget)
+
+        self.assertLessEqual(len(result.data), budget)
+        self.assertLessEqual(result.attempts, 4)
+        self.assertTrue(result.estimates)
+        self.assertNotEqual(result.settings, {"colors": 255, "frame_step": 1, "scale": 1.0})
+
+    def test_estimate_tracks_full_encode(self) -> None:
+        buffer = _noisy_clip(40, 64)
+        encoder = GifBudgetEncoder(base_settings=GifEncoderSettings())
+
+        estimate, exact = encoder.estimate(buffer, 64, 2, 1.0)
+        actual = len(GifEncoder(GifEncoderSettings(max_colors=64, target_fps=6)).encode(buffer))
+
+        self.assertIsNone(exact)
+        self.assertLess(abs(estimate - actual) / actual, 0.25)
+
+    def test_unreachable_budget_raises(self) -> None:
+        buffer = _noisy_clip(8, 64)
+
+        with self.assertRaises(BudgetUnreachableError):
+            GifBudgetEncoder(base_settings=GifEncoderSettings()).encode(buffer, 200)
+
+    def test_hooks_reencode_instead_of_rejecting(self) -> None:
+        buffer = _noisy_clip(12, 64)
+        data = GifEncoder(GifEncoderSettings()).encode(buffer)
+        hooks = DefaultMediaHooks(max_output_bytes=len(data) // 3)
+
+        fitted, metadata = hooks.fit_to_budget("gif", data, {"fps": 12}, "default")
+        hooks.validate_output("gif", fitted, metadata, "default")
+
+        self.assertLessEqual(len(fitted), hooks.max_output_bytes)
+        self.assertEqual(metadata["budget_reencode"]["original_bytes"], len(data))
+        decoded = decode_gif(fitted)
+        self.assertEqual(
+            (metadata["width"], metadata["height"], metadata["frame_count"]),
+            (decoded.width, decoded.height, len(decoded)),
+        )
+        self.assertEqual(metadata["fps"], decoded.fps)
+
+    def test_service_fits_budget_after_watermark_reencode(self) -> None:
+        buffer = _noisy_clip(12, 64)
+        data = GifEncoder(GifEncoderSettings()).encode(buffer)
+        # Watermarking after the budget fit used to push the stored GIF back over the budget.
+        hooks = DefaultMediaHooks(max_output_bytes=8200, watermarker=BulkyWatermarker())
+        pipeline = OmniMediaPipeline()
+        with tempfile.TemporaryDirectory() as tmp:
+            # An unstarted worker keeps the service from spinning up its own pool.
+            service = OmniMediaService(
+                pipeline=pipeline,
+                storage=LocalFileStorageAdapter(base_dir=tmp),
+                hooks=hooks,
+                media_delivery=None,
+                worker=OmniMediaWorker(pipeline, InMemoryJobQueue()),
+            )
+            response = GenerateResponse(
+                id="req-1",
+                status="completed",
+                outputs=[MediaOutput(type="gif", metadata={"fps": 12, "width": 64, "height": 64, "_bytes": data})],
+            )
+            request = GenerateRequest(id="req-1", modality="gif", mode="t2g", prompt="noise", watermark=True)
+
+            [output] = service._persist_outputs(response, request)
+
+            stored = Path(output.url).read_bytes()
+            self.assertLessEqual(len(stored), hooks.max_output_bytes)
+            self.assertTrue(output.metadata["watermark_applied"])
+            self.assertIn("budget_reencode", output.metadata)
+
+    def test_hooks_still_reject_when_reencode_disabled(self) -> None:
+        data = GifEncoder(GifEncoderSettings()).encode(_noisy_clip(4, 32))
+        hooks = DefaultMediaHooks(max_output_bytes=len(data) // 2, budget_reencode=False)
+
+        fitted, metadata = hooks.fit_to_budget("gif", data, {}, "default")
+        with self.assertRaises(MediaPolicyError):
+            hooks.validate_output("gif", fitted, metadata, "default")
+
+
+@unittest.skipUnless(
+    _has_numpy_and_pillow() and importlib.util.find_spec("imageio_ffmpeg"),
+    "numpy/imageio-ffmpeg not installed",
+)
+class TestMp4Budget(unittest.TestCase):
+    def test_reencodes_mp4_under_budget(self) -> None:
+        buffer = _noisy_clip(24, 96, fps=12)
+        sink = BytesSink()
+        encode_frame_buffer(buffer, sink, settings=EncoderSettings(crf=10, preset="ultrafast"))
+        data = sink.getvalue()
+        budget = len(data) // 5
+
+        result = Mp4BudgetEncoder(base_settings=EncoderSettings(preset="ultrafast")).encode(data, budget, duration_sec=2.0)
+
+        self.assertLessEqual(len(result.data), budget)
+        self.assertEqual(result.data[4:8], b"ftyp")
+
+    def test_downscaled_size_matches_transcode(self) -> None:
+        # Values checked against ffmpeg's scale filter with force_original_aspect_ratio=decrease.
+        self.assertEqual(_scaled_size(1280, 720, 640), (640, 360))
+        self.assertEqual(_scaled_size(334, 1002, 640), (214, 640))
+        self.assertEqual(_scaled_size(642, 500, 640), (640, 498))
+        self.assertEqual(_scaled_size(300, 200, 640), (300, 200))
@@ -0,0 +1,108 @@
+from __future__ import annotations
+
+import threading
+import time
+import unittest
+
+from omni_media.client_pool import ModelClientPool
+from omni_media.engine import OmniMediaEngine
+from omni_media.model_registry import ModelRegistry
+
+
+class FakeClient:
+    def __init__(self, key: str) -> None:
+        self.key = key
+        self.closed = False
+
+    def close(self) -> None:
+        self.closed = True
+
+
+class TestModelClientPool(unittest.TestCase):
+    def test_concurrent_first_requests_load_once(self) -> None:
+        pool = ModelClientPool(max_resident=2)
+        loads: list[str] = []
+
+        def loader() -> FakeClient:
+            loads.append("video_default")
+            time.sleep(0.05)
+            return FakeClient("video_default")
+
+        clients: list[FakeClient] = []
+        threads = [
+            threading.Thread(target=lambda: clients.append(pool.get("video_default", loader)))
+            for _ in range(5)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join(timeout=5)
+
+        self.assertEqual(len(loads), 1)
+        self.assertEqual(len({id(client) for client in clients}), 1)
+        snapshot = pool.snapshot()
+        self.assertEqual(snapshot["loads"], 1)
+        self.assertEqual(snapshot["hits"], 4)
+
+    def test_lru_and_memory_budget_evictions(self) -> None:
+        pool = ModelClientPool(max_resident=2, memory_budget_mb=30_000)
+        first = pool.get("image_default", lambda: FakeClient("image_default"), cost_mb=10_000)
+        pool.get("image_hd", lambda: FakeClient("image_hd"), cost_mb=12_000)
+        pool.get("image_default", lambda: FakeClient("unused"))
+        pool.get("video_default", lambda: FakeClient("video_default"), cost_mb=8_000)
+
+        self.assertIn("image_default", pool)
+        self.assertNotIn("image_hd", pool)
+        self.assertFalse(first.closed)
+
+        pool.get("video_4k", lambda: FakeClient("video_4k"), cost_mb=25_000)
+        self.assertEqual(list(pool.snapshot()["clients"]), ["video_4k"])
+        snapshot = pool.snapshot()
+        self.assertEqual(snapshot["evictions_lru"], 2)
+        self.assertEqual(snapshot["evictions_memory"], 1)
+        self.assertTrue(first.closed)
+
+    def test_idle_ttl_and_manual_eviction(self) -> None:
+        pool = ModelClientPool(max_resident=4, idle_ttl_sec=0.05)
+        pool.get("image_default", lambda: FakeClient("image_default"))
+        time.sleep(0.1)
+        pool.evict_idle()
+        self.assertEqual(len(pool), 0)
+
+        pool.get("image_hd", lambda: FakeClient("image_hd"))
+        self.assertTrue(pool.evict("image_hd"))
+        self.assertFalse(pool.evict("image_hd"))
+        self.assertEqual(pool.snapshot()["evictions_manual"], 1)
+
+    def test_leased_clients_are_not_closed_under_the_caller(self) -> None:
+        pool = ModelClientPool(max_resident=1)
+        with pool.lease("image_default", lambda: FakeClient("image_default")) as busy:
+            other = pool.get("image_hd", lambda: FakeClient("image_hd"))
+            # The busy client is skipped as a victim, so the pool runs over its limit for now.
+            self.assertIn("image_default", pool)
+            self.assertFalse(busy.closed)
+            self.assertEqual(pool.snapshot()["clients"]["image_default"]["leases"], 1)
+        # Once the lease ends the deferred eviction picks the least recently used idle client.
+        self.assertEqual(len(pool), 1)
+        self.assertTrue(busy.closed)
+        self.assertFalse(other.closed)
+
+        with pool.lease("image_hd", lambda: FakeClient("unused")) as leased:
+            self.assertTrue(pool.evict("image_hd"))
+            self.assertNotIn("image_hd", pool)
+            self.assertFalse(leased.closed)
+        self.assertTrue(leased.closed)
+
+    def test_engine_preload_reports_in_probe(self) -> None:
+        engine = OmniMediaEngine(client_pool=ModelClientPool(max_resident=1))
+        registry = ModelRegistry()
+        engine._construct_omni_client = lambda profile: FakeClient(profile.key)  # type: ignore[method-assign]
+
+        results = engine.preload([registry.get("image_default")])
+
+        self.assertEqual(results, {"image_default": None})
+        self.assertEqual(engine.probe_backend()["client_pool"]["resident"], 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
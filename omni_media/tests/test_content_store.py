@@ -0,0 +1,161 @@
+from __future__ import annotations
+
+import hashlib
+import os
+import tempfile
+import threading
+import time
+import unittest
+from pathlib import Path
+from unittest import mock
+
+from omni_media.content_store import ContentAddressedStorageAdapter
+from omni_media.retention import RetentionSweeper
+from omni_media.storage import create_storage_from_env
+
+
+class TestContentAddressedStorageAdapter(unittest.TestCase):
+    def setUp(self) -> None:
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+
+    def test_identical_outputs_share_one_blob(self) -> None:
+        store = ContentAddressedStorageAdapter(base_dir=self.tmp.name)
+        payload = b"placeholder-png" * 100
+
+        first = store.put_bytes("req-1", "image", 0, payload, "png")
+        second = store.put_bytes("req-2", "image", 0, payload, "png")
+
+        self.assertNotEqual(first, second)
+        self.assertEqual(Path(first).read_bytes(), payload)
+        self.assertTrue(os.path.samefile(first, second))
+        digest = hashlib.sha256(payload).hexdigest()
+        self.assertTrue(store.has_blob(digest))
+        snapshot = store.snapshot()
+        self.assertEqual(snapshot["blobs"], 1)
+        self.assertEqual(snapshot["refs"], 2)
+        self.assertEqual(snapshot["dedup_hits"], 1)
+        self.assertEqual(snapshot["bytes_saved"], len(payload))
+        self.assertEqual(snapshot["logical_bytes"], 2 * snapshot["stored_bytes"])
+
+    def test_manifest_mode_resolves_without_output_files(self) -> None:
+        store = ContentAddressedStorageAdapter(base_dir=self.tmp.name, link_mode="manifest")
+
+        url = store.put_bytes("req-1", "gif", 0, b"GIF89a-data", "gif")
+
+        self.assertFalse(Path(url).exists())
+        self.assertEqual(store.resolve(url).read_bytes(), b"GIF89a-data")
+
+    def test_refcount_gc_keeps_shared_blobs(self) -> None:
+        store = ContentAddressedStorageAdapter(base_dir=self.tmp.name)
+        shared = b"shared" * 50
+        store.put_bytes("req-1", "image", 0, shared, "png")
+        store.put_bytes("req-1", "image", 1, b"unique", "png")
+        store.put_bytes("req-2", "image", 0, shared, "png")
+
+        self.assertEqual(store.release_request("req-1"), 2)
+        result = store.gc()
+
+        self.assertEqual(result["blobs_deleted"], 1)
+        self.assertEqual(result["bytes_freed"], len(b"unique"))
+        self.assertTrue(store.has_blob(hashlib.sha256(shared).hexdigest()))
+        self.assertFalse(store.has_blob(hashlib.sha256(b"unique").hexdigest()))
+
+    def test_gc_drops_refs_for_deleted_hardlinks_and_honours_grace(self) -> None:
+        store = ContentAddressedStorageAdapter(base_dir=self.tmp.name)
+        url = store.put_bytes("req-1", "video", 0, b"mp4-bytes", "mp4")
+        os.unlink(url)
+
+        self.assertEqual(store.gc(grace_sec=3600), {"stale_refs": 1, "blobs_deleted": 0, "bytes_freed": 0})
+        self.assertEqual(store.gc()["blobs_deleted"], 1)
+
+    def test_overwriting_a_path_moves_the_reference(self) -> None:
+        store = ContentAddressedStorageAdapter(base_dir=self.tmp.name)
+        store.put_bytes("req-1", "image", 0, b"old", "png")
+        url = store.put_bytes("req-1", "image", 0, b"new", "png")
+
+        self.assertEqual(Path(url).read_bytes(), b"new")
+        self.assertEqual(store.gc()["blobs_deleted"], 1)
+        self.assertEqual(store.snapshot()["refs"], 1)
+
+    def test_file_and_stream_inputs_dedupe_against_bytes(self) -> None:
+        store = ContentAddressedStorageAdapter(base_dir=self.tmp.name)
+        payload = os.urandom(3 * 1024 * 1024 + 5)
+        source = Path(self.tmp.name) / "clip.mp4"
+        source.write_bytes(payload)
+
+        store.put_bytes("req-1", "video", 0, payload, "mp4")
+        from_file = store.put_file("req-2", "video", 0, str(source), "mp4")
+        from_stream = store.put_stream("req-3", "video", 0, iter([payload[:1000], payload[1000:]]), "mp4")
+
+        self.assertTrue(source.exists())
+        self.assertEqual(Path(from_stream).read_bytes(), payload)
+        self.assertTrue(os.path.samefile(from_file, from_stream))
+        self.assertEqual(store.snapshot()["dedup_hits"], 2)
+        leftovers = [p for p in store.blob_dir.iterdir() if p.name.startswith(".")]
+        self.assertEqual(leftovers, [])
+
+    def test_stores_sharing_a_base_dir_keep_refcounts_consistent(self) -> None:
+        # Two adapters stand in for two processes sharing one index.
+        first = ContentAddressedStorageAdapter(base_dir=self.tmp.name)
+        second = ContentAddressedStorageAdapter(base_dir=self.tmp.name)
+        url = first.put_bytes("req-1", "image", 0, b"pixels", "png")
+        second.release(url)
+        self.assertEqual(first.gc()["blobs_deleted"], 1)
+
+        source = Path(self.tmp.name) / "pixels.png"
+        source.write_bytes(b"pixels")
+        # A put that saw the blob before another process collected it still stores the bytes.
+        with mock.patch.object(second, "has_blob", return_value=True):
+            again = second.put_file("req-2", "image", 0, str(source), "png")
+
+        self.assertEqual(Path(again).read_bytes(), b"pixels")
+        self.assertEqual(first.snapshot()["refs"], 1)
+        self.assertEqual(first.gc()["blobs_deleted"], 0)
+
+    def test_slow_blob_writes_do_not_serialize_other_puts(self) -> None:
+        store = ContentAddressedStorageAdapter(base_dir=self.tmp.name)
+        store_blob = store._store_blob
+        slow_started, release = threading.Event(), threading.Event()
+
+        def gated_store_blob(digest, size, source, data, copy_from=None):
+            if data == b"slow":
+                slow_started.set()
+                release.wait(timeout=5)
+            return store_blob(digest, size, source, data, copy_from=copy_from)
+
+        with mock.patch.object(store, "_store_blob", gated_store_blob):
+            slow = threading.Thread(target=store.put_bytes, args=("req-slow", "video", 0, b"slow", "mp4"))
+            slow.start()
+            self.assertTrue(slow_started.wait(timeout=5))
+            started = time.perf_counter()
+            fast = store.put_bytes("req-fast", "image", 0, b"fast", "png")
+            elapsed = time.perf_counter() - started
+            release.set()
+            slow.join(timeout=5)
+
+        self.assertLess(elapsed, 1.0)
+        self.assertEqual(Path(fast).read_bytes(), b"fast")
+        self.assertEqual(store.snapshot()["refs"], 2)
+
+    def test_retention_sweeper_collects_orphaned_blobs(self) -> None:
+        store = ContentAddressedStorageAdapter(base_dir=self.tmp.name)
+        url = store.put_bytes("req-1", "video", 0, b"mp4-bytes", "mp4")
+        os.unlink(url)
+        sweeper = RetentionSweeper(content_store=store)
+
+        gc = sweeper.sweep()["content_store_gc"]
+
+        self.assertEqual((gc["runs"], gc["stale_refs"], gc["blobs_deleted"]), (1, 1, 1))
+        self.assertEqual(gc["bytes_freed"], len(b"mp4-bytes"))
+
+    def test_env_selects_content_addressed_backend(self) -> None:
+        env = {"OMNI_MEDIA_STORAGE_BACKEND": "cas", "OMNI_MEDIA_STORAGE_DIR": self.tmp.name}
+        with mock.patch.dict(os.environ, env):
+            store = create_storage_from_env()
+
+        self.assertIsInstance(store, ContentAddressedStorageAdapter)
+
+
+if __name__ == "__main__":
+    unittest.main()
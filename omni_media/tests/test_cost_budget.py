@@ -0,0 +1,91 @@
+from __future__ import annotations
+
+import importlib
+import importlib.util
+import unittest
+
+from omni_media.cost_budget import BudgetExceededError, CostBudget, estimate_request_cost
+from omni_media.security import InMemoryRateLimiter, RateLimitError, RedisRateLimiter
+
+
+class TestRequestCost(unittest.TestCase):
+    def test_cost_scales_with_pixels_frames_steps_and_profile(self) -> None:
+        image = estimate_request_cost("image", "default", {"width": 512, "height": 512, "num_inference_steps": 20})
+        hd = estimate_request_cost("image", "hd", {"width": 512, "height": 512, "num_inference_steps": 20})
+        gif = estimate_request_cost("gif", "default", {"width": 256, "height": 256, "num_frames": 5}, "a red kite")
+        uhd = estimate_request_cost(
+            "video", "4k", {"width": 3840, "height": 2160, "num_frames": 64}, "a drone shot over a harbor"
+        )
+
+        self.assertEqual(image.units, 20)
+        self.assertEqual(hd.units, 30)
+        self.assertEqual((gif.frames, gif.units), (5, 38))
+        self.assertEqual(uhd.profile, "video_4k")
+        self.assertGreater(uhd.units, gif.units * 1000)
+
+    def test_requests_are_clamped_to_the_profile(self) -> None:
+        cost = estimate_request_cost("gif", "default", {"width": 99999, "height": "bad", "num_frames": 500}, "waves")
+
+        self.assertEqual((cost.width, cost.height, cost.frames), (1280, 512, 48))
+
+
+class TestCostBudget(unittest.TestCase):
+    def test_budget_is_charged_by_weight_and_tracked_per_key(self) -> None:
+        limiter = InMemoryRateLimiter(sweep_interval_sec=0)
+        budget = CostBudget(limiter=limiter, budget=100, window_sec=60)
+        params = {"width": 512, "height": 512, "num_inference_steps": 30}
+
+        charge = budget.charge("alice", "image", "default", params)
+        budget.charge("alice", "image", "default", params)
+        budget.charge("bob", "image", "default", params)
+        with self.assertRaises(BudgetExceededError) as ctx:
+            budget.charge("alice", "image", "default", {**params, "num_images": 2})
+
+        self.assertEqual((charge.cost.units, charge.remaining), (30, 70))
+        self.assertEqual(ctx.exception.charge.headers()["X-Budget-Remaining"], "0")
+        self.assertGreater(ctx.exception.retry_after_sec, 0)
+        snapshot = budget.snapshot()
+        self.assertEqual(list(snapshot["keys"]), ["alice", "bob"])
+        self.assertEqual(snapshot["keys"]["alice"], {"charged": 60, "requests": 2, "rejected": 1, "refunded": 0, "remaining": 40})
+
+    def test_refund_gives_the_units_back(self) -> None:
+        budget = CostBudget(limiter=InMemoryRateLimiter(sweep_interval_sec=0), budget=100, window_sec=60)
+        params = {"width": 512, "height": 512, "num_inference_steps": 30}
+
+        budget.charge("alice", "image", "default", params)
+        refunded = budget.refund(budget.charge("alice", "image", "default", params))
+
+        self.assertEqual((refunded.remaining, refunded.cost.units), (70, 0))
+        self.assertEqual(budget.snapshot()["keys"]["alice"]["refunded"], 30)
+        self.assertEqual(budget.charge("alice", "image", "default", params).remaining, 40)
+
+    def test_unparseable_params_fall_back_to_defaults(self) -> None:
+        cost = estimate_request_cost("image", "default", {"width": float("inf"), "num_inference_steps": "nan"})
+
+        self.assertEqual((cost.width, cost.steps), (1024, 30))
+
+    def test_requests_larger_than_the_budget_never_retry(self) -> None:
+        budget = CostBudget(limiter=InMemoryRateLimiter(sweep_interval_sec=0), budget=10, window_sec=60)
+
+        with self.assertRaises(RateLimitError) as ctx:
+            budget.charge("alice", "image", "default", {})
+        self.assertIsNone(ctx.exception.retry_after_sec)
+
+    @unittest.skipUnless(
+        importlib.util.find_spec("fakeredis") and importlib.util.find_spec("lupa"), "fakeredis[lua] not installed"
+    )
+    def test_redis_backend_charges_the_same_budget(self) -> None:
+        client = importlib.import_module("fakeredis").FakeRedis()
+        budget = CostBudget(limiter=RedisRateLimiter("redis://unused", client=client), budget=100, window_sec=60)
+        params = {"width": 512, "height": 512, "num_inference_steps": 30}
+
+        self.assertEqual(budget.charge("alice", "image", "default", params).remaining, 70)
+        self.assertEqual(budget.charge("alice", "image", "default", params).remaining, 40)
+        with self.assertRaises(BudgetExceededError):
+            budget.charge("alice", "image", "default", {**params, "num_images": 2})
+        charge = budget.charge("alice", "image", "default", {**params, "num_inference_steps": 10})
+        self.assertEqual(budget.refund(charge).remaining, 40)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,98 @@
+from __future__ import annotations
+
+import asyncio
+import threading
+import unittest
+
+from omni_media.executor import ExecutorSaturatedError, LaneConfig, ModalityExecutorPool
+
+
+class TestModalityExecutorPool(unittest.TestCase):
+    def setUp(self) -> None:
+        self.pool = ModalityExecutorPool(
+            lanes={
+                "image": LaneConfig(max_workers=1, max_queue=1),
+                "video": LaneConfig(max_workers=1, max_queue=0),
+            },
+            retry_after_sec=7,
+        )
+
+    def tearDown(self) -> None:
+        self.pool.shutdown(wait=False)
+
+    def test_run_returns_result_off_loop_thread(self) -> None:
+        loop_thread = threading.get_ident()
+
+        async def scenario():
+            return await self.pool.run("image", threading.get_ident)
+
+        worker_thread = asyncio.run(scenario())
+        self.assertNotEqual(worker_thread, loop_thread)
+        self.assertEqual(self.pool.snapshot()["lanes"]["image"]["completed"], 1)
+
+    def test_full_lane_rejects_with_retry_after(self) -> None:
+        release = threading.Event()
+        started = threading.Event()
+
+        def blocking() -> str:
+            started.set()
+            release.wait(timeout=5)
+            return "done"
+
+        running = self.pool.submit("image", blocking)
+        started.wait(timeout=5)
+        queued = self.pool.submit("image", blocking)
+
+        snapshot = self.pool.snapshot()["lanes"]["image"]
+        self.assertEqual(snapshot["in_flight"], 1)
+        self.assertEqual(snapshot["queued"], 1)
+
+        with self.assertRaises(ExecutorSaturatedError) as ctx:
+            self.pool.submit("image", blocking)
+        self.assertEqual(ctx.exception.retry_after_sec, 7)
+
+        # Other modalities keep their own capacity.
+        self.assertEqual(self.pool.submit("video", lambda: "ok").result(timeout=5), "ok")
+
+        release.set()
+        self.assertEqual(running.result(timeout=5), "done")
+        self.assertEqual(queued.result(timeout=5), "done")
+
+        snapshot = self.pool.snapshot()["lanes"]["image"]
+        self.assertEqual(snapshot["rejected"], 1)
+        self.assertEqual(snapshot["in_flight"], 0)
+        self.assertEqual(snapshot["queued"], 0)
+
+    def test_cancelled_queued_future_frees_its_slot(self) -> None:
+        release = threading.Event()
+        started = threading.Event()
+
+        def blocking() -> str:
+            started.set()
+            release.wait(timeout=5)
+            return "done"
+
+        async def scenario() -> None:
+            running = self.pool.submit("image", blocking)
+            started.wait(timeout=5)
+            waiter = asyncio.ensure_future(self.pool.run("image", blocking))
+            await asyncio.sleep(0)
+            waiter.cancel()
+            with self.assertRaises(asyncio.CancelledError):
+                await waiter
+            release.set()
+            await asyncio.wrap_future(running)
+
+        asyncio.run(scenario())
+
+        snapshot = self.pool.snapshot()["lanes"]["image"]
+        self.assertEqual((snapshot["queued"], snapshot["in_flight"], snapshot["cancelled"]), (0, 0, 1))
+        self.assertEqual(self.pool.submit("image", lambda: "ok").result(timeout=5), "ok")
+
+    def test_unknown_lane_uses_default(self) -> None:
+        self.assertEqual(self.pool.submit("audio", lambda: 3).result(timeout=5), 3)
+        self.assertEqual(self.pool.snapshot()["lanes"]["default"]["completed"], 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
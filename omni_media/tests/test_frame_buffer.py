@@ -0,0 +1,94 @@
+from __future__ import annotations
+
+import importlib.util
+import io
+import unittest
+
+from omni_media.contracts import FrameBuffer, ImageObject, VideoObject
+from omni_media.engine import OmniMediaEngine
+
+
+def _has_numpy_and_pillow() -> bool:
+    return bool(importlib.util.find_spec("numpy") and importlib.util.find_spec("PIL"))
+
+
+@unittest.skipUnless(_has_numpy_and_pillow(), "numpy/Pillow not installed")
+class TestFrameBuffer(unittest.TestCase):
+    def setUp(self) -> None:
+        import numpy as np
+
+        self.np = np
+
+    def _buffer(self, frame_count: int, value: int = 0) -> FrameBuffer:
+        buffer = FrameBuffer.allocate(frame_count, 8, 12, fps=6)
+        for index in range(frame_count):
+            buffer.data[index] = value + index
+        return buffer
+
+    def _video(self, buffer: FrameBuffer) -> VideoObject:
+        return VideoObject(
+            frames=[],
+            fps=buffer.fps,
+            duration_sec=len(buffer) / buffer.fps,
+            width=buffer.width,
+            height=buffer.height,
+            buffer=buffer,
+        )
+
+    def test_from_frames_builds_one_contiguous_array_with_views(self) -> None:
+        from PIL import Image
+
+        frames = [Image.new("RGB", (12, 8), (index * 10, 0, 0)) for index in range(4)]
+        buffer = FrameBuffer.from_frames(frames, fps=6)
+
+        self.assertEqual(buffer.data.shape, (4, 8, 12, 3))
+        self.assertTrue(buffer.data.flags["C_CONTIGUOUS"])
+        self.assertTrue(self.np.shares_memory(buffer[2], buffer.data))
+        self.assertEqual(int(buffer[3][0, 0, 0]), 30)
+
+    def test_png_round_trip_only_on_request(self) -> None:
+        buffer = self._buffer(3, value=40)
+        images = buffer.to_image_objects()
+
+        self.assertEqual(len(images), 3)
+        self.assertEqual(images[0].mime_type, "image/png")
+        decoded = FrameBuffer.from_image_objects(images, fps=6)
+        self.assertTrue(self.np.array_equal(decoded.data, buffer.data))
+
+    def test_assemble_concatenates_scene_buffers(self) -> None:
+        engine = OmniMediaEngine()
+        merged = engine.assemble_video_scenes([self._video(self._buffer(2)), self._video(self._buffer(3, value=100))])
+
+        self.assertEqual(merged.frame_count, 5)
+        self.assertEqual(merged.frames, [])
+        self.assertEqual(int(merged.buffer[2][0, 0, 0]), 100)
+
+    def test_assemble_mixed_scenes_falls_back_to_images(self) -> None:
+        engine = OmniMediaEngine()
+        png_scene = VideoObject(
+            frames=self._buffer(2).to_image_objects(),
+            fps=6,
+            duration_sec=0.3,
+            width=12,
+            height=8,
+        )
+        merged = engine.assemble_video_scenes([png_scene, self._video(self._buffer(1))])
+
+        self.assertIsNone(merged.buffer)
+        self.assertEqual(merged.frame_count, 3)
+        self.assertTrue(all(isinstance(frame, ImageObject) for frame in merged.frames))
+
+    def test_gif_encoder_reads_buffer_directly(self) -> None:
+        from PIL import Image
+
+        buffer = self._buffer(4)
+        buffer.data[:] *= 40
+        gif_bytes = OmniMediaEngine().generate_gif_from_video(self._video(buffer))
+        gif = Image.open(io.BytesIO(gif_bytes))
+
+        self.assertEqual(gif.format, "GIF")
+        self.assertEqual(gif.n_frames, 4)
+
+
+if __name__ == "__main__":
+    unittest.main()
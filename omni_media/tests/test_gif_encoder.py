@@ -0,0 +1,105 @@
+from __future__ import annotations
+
+import importlib.util
+import io
+import unittest
+
+from omni_media.contracts import FrameBuffer
+from omni_media.gif_encoder import GifEncodeStats, GifEncoder, GifEncoderSettings
+
+
+def _has_numpy_and_pillow() -> bool:
+    return bool(importlib.util.find_spec("numpy") and importlib.util.find_spec("PIL"))
+
+
+@unittest.skipUnless(_has_numpy_and_pillow(), "numpy/Pillow not installed")
+class TestGifEncoder(unittest.TestCase):
+    def setUp(self) -> None:
+        import numpy as np
+
+        self.np = np
+
+    def _moving_square(self, frame_count: int = 6, size: int = 32, fps: int = 12) -> FrameBuffer:
+        buffer = FrameBuffer.allocate(frame_count, size, size, fps=fps)
+        buffer.data[:] = (20, 60, 120)
+        for index in range(frame_count):
+            x = 2 + index * 3
+            buffer.data[index, 8:16, x : x + 8] = (240, 200, 30)
+        return buffer
+
+    def _decode(self, data: bytes) -> list:
+        from PIL import Image, ImageSequence
+
+        gif = Image.open(io.BytesIO(data))
+        return [
+            (self.np.asarray(frame.convert("RGB")).astype(int), frame.info.get("duration"))
+            for frame in ImageSequence.Iterator(gif)
+        ]
+
+    def test_round_trip_with_delta_frames(self) -> None:
+        buffer = self._moving_square()
+        stats = GifEncodeStats()
+
+        data = GifEncoder(GifEncoderSettings()).encode(buffer, stats=stats)
+        frames = self._decode(data)
+
+        self.assertEqual(len(frames), 6)
+        self.assertEqual(stats.written_frames, 6)
+        for (decoded, _), original in zip(frames, buffer):
+            self.assertLessEqual(int(self.np.abs(decoded - original.astype(int)).max()), 8)
+
+    def test_delta_frames_are_smaller_than_full_frames(self) -> None:
+        buffer = self._moving_square(frame_count=12, size=96)
+
+        delta = GifEncoder(GifEncoderSettings(delta=True)).encode(buffer)
+        full = GifEncoder(GifEncoderSettings(delta=False)).encode(buffer)
+
+        self.assertLess(len(delta), len(full))
+
+    def test_identical_frames_extend_previous_duration(self) -> None:
+        buffer = FrameBuffer.allocate(4, 16, 16, fps=10)
+        buffer.data[:2] = 50
+        buffer.data[2:] = 200
+        stats = GifEncodeStats()
+
+        frames = self._decode(GifEncoder(GifEncoderSettings()).encode(buffer, stats=stats))
+
+        self.assertEqual(stats.merged_frames, 2)
+        self.assertEqual([duration for _, duration in frames], [200, 200])
+
+    def test_fps_and_size_downsampling(self) -> None:
+        buffer = self._moving_square(frame_count=8, size=64, fps=12)
+        stats = GifEncodeStats()
+
+        data = GifEncoder(GifEncoderSettings(target_fps=6, max_side=32)).encode(buffer, stats=stats)
+        frames = self._decode(data)
+
+        self.assertEqual(len(frames), 4)
+        self.assertEqual(frames[0][0].shape, (32, 32, 3))
+        self.assertEqual(stats.fps, 6.0)
+
+    def test_scene_palettes_are_written_as_local_tables(self) -> None:
+        buffer = FrameBuffer.allocate(4, 16, 16, fps=8)
+        buffer.data[:2] = (255, 0, 0)
+        buffer.data[2:] = (0, 0, 255)
+        buffer.data[1, :4, :4] = (0, 255, 0)
+        stats = GifEncodeStats()
+
+        data = GifEncoder(GifEncoderSettings(palette_mode="scene")).encode(buffer, scene_lengths=[2, 2], stats=stats)
+        frames = self._decode(data)
+
+        self.assertEqual(len(stats.palette_sizes), 2)
+        self.assertEqual(tuple(frames[0][0][8, 8]), (252, 4, 4))
+        self.assertEqual(tuple(frames[-1][0][8, 8]), (4, 4, 252))
+
+    def test_ordered_dither_keeps_dimensions(self) -> None:
+        buffer = self._moving_square()
+
+        frames = self._decode(GifEncoder(GifEncoderSettings(dither=True, max_colors=16)).encode(buffer))
+
+        self.assertEqual(len(frames), 6)
+        self.assertEqual(frames[0][0].shape, (32, 32, 3))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,11 +1,16 @@
 from __future__ import annotations
 
+import hashlib
 import importlib.util
 import importlib
+import json
 import os
+import tempfile
 import unittest
+from pathlib import Path
 
 from omni_media.api_contracts import GenerateApiResponse, OutputItem
+from omni_media.executor import ExecutorSaturatedError
 from omni_media.http_fastapi import create_fastapi_app
 
 
@@ -46,6 +51,27 @@ class FakeService:
         }
 
 
+class FailedService(FakeService):
+    def generate_sync(self, modality: str, _body):
+        return GenerateApiResponse(id="req_failed", status="failed", error="model crashed")
+
+    def generate_prompt_video_export(self, *_args):
+        return {"ok": True}
+
+    async def generate_prompt_video_export_async(self, _prompt, _params):
+        return {"ok": True, "url": "/omni_video_exports/x.mp4"}
+
+
+class ColdService(FakeService):
+    def get_readiness(self):
+        return {"ready": False, "warmup": {"profiles": {"video_default": {"state": "loading"}}}}
+
+
+class SaturatedService(FakeService):
+    async def generate_async(self, _modality: str, _body):
+        raise ExecutorSaturatedError("video", retry_after_sec=12)
+
+
 @unittest.skipUnless(_has_fastapi_testclient(), "fastapi/starlette test client not installed")
 class TestHttpIntegration(unittest.TestCase):
     def setUp(self) -> None:
@@ -90,6 +116,66 @@ class TestHttpIntegration(unittest.TestCase):
         self.assertEqual(first.status_code, 200)
         self.assertEqual(second.status_code, 200)
         self.assertEqual(third.status_code, 429)
+        self.assertEqual(third.headers.get("retry-after"), "30")
+
+    def test_generation_is_charged_to_the_cost_budget(self) -> None:
+        os.environ["OMNI_MEDIA_COST_BUDGET"] = "300"
+        os.environ["OMNI_MEDIA_RATE_LIMIT_IMAGE"] = "10"
+        fastapi_testclient = importlib.import_module("fastapi.testclient")
+        client = fastapi_testclient.TestClient(create_fastapi_app(service=FakeService()))
+        body = {"prompt": "a lighthouse", "params": {"width": 1024, "height": 1024}}
+
+        first = client.post("/v1/generate/image", headers=self.headers, json=body)
+        second = client.post("/v1/generate/image", headers=self.headers, json=body)
+        third = client.post("/v1/generate/image", headers=self.headers, json=body)
+        security = client.get("/v1/admin/security", headers=self.headers).json()
+
+        self.assertEqual(first.status_code, 200)
+        self.assertEqual(first.headers.get("x-request-cost"), "120")
+        self.assertEqual(first.headers.get("x-budget-remaining"), "180")
+        self.assertEqual(second.headers.get("x-budget-remaining"), "60")
+        self.assertEqual(third.status_code, 429)
+        self.assertEqual(third.headers.get("x-budget-remaining"), "0")
+        self.assertIsNotNone(third.headers.get("retry-after"))
+        usage = security["cost_budget"]["keys"]
+        # Requesters are tracked under the key's id, never the key itself.
+        self.assertNotIn("test-key", usage)
+        self.assertEqual(list(usage.values()), [{"charged": 240, "requests": 2, "rejected": 1, "refunded": 0, "remaining": 60}])
+
+    def test_budget_is_refunded_when_no_output_is_produced(self) -> None:
+        os.environ["OMNI_MEDIA_COST_BUDGET"] = "100000"
+        fastapi_testclient = importlib.import_module("fastapi.testclient")
+        client = fastapi_testclient.TestClient(create_fastapi_app(service=FailedService()))
+        body = {"prompt": "a lighthouse", "params": {"width": 1024, "height": 1024, "num_images": float("inf")}}
+
+        headers = {**self.headers, "content-type": "application/json"}
+        failed = client.post("/v1/generate/image", headers=headers, content=json.dumps(body))
+        exported = client.post("/omni_video_exports", headers=self.headers, json={"prompt": "a harbor at dawn"})
+
+        self.assertEqual(failed.status_code, 500)
+        self.assertEqual(failed.headers.get("x-request-cost"), "0")
+        self.assertEqual(failed.headers.get("x-budget-remaining"), "100000")
+        self.assertEqual(exported.status_code, 200)
+        self.assertGreater(int(exported.headers.get("x-request-cost")), 0)
+
+    def test_key_file_quota_sets_the_budget(self) -> None:
+        with tempfile.TemporaryDirectory() as tmp:
+            key_file = Path(tmp) / "keys.jsonl"
+            digest = hashlib.sha256(b"studio-key").hexdigest()
+            key_file.write_text(json.dumps({"sha256": digest, "id": "studio", "tier": "pro", "quota": 1000}) + "\n")
+            os.environ["OMNI_MEDIA_API_KEYS_FILE"] = str(key_file)
+            fastapi_testclient = importlib.import_module("fastapi.testclient")
+            client = fastapi_testclient.TestClient(create_fastapi_app(service=FakeService()))
+
+            res = client.post("/v1/generate/image", headers={"x-api-key": "studio-key"}, json={"prompt": "a kite"})
+            legacy = client.post("/v1/generate/image", headers=self.headers, json={"prompt": "a kite"})
+            security = client.get("/v1/admin/security", headers=self.headers).json()
+
+        self.assertEqual(res.status_code, 200)
+        self.assertEqual(res.headers.get("x-budget-limit"), "1000")
+        self.assertEqual(legacy.headers.get("x-budget-limit"), "250000")
+        self.assertEqual(security["auth"]["registry"]["tiers"], {"default": 1, "pro": 1})
+        self.assertIn("studio", security["cost_budget"]["keys"])
 
     def test_admin_endpoints(self) -> None:
         security = self.client.get("/v1/admin/security", headers=self.headers)
@@ -106,6 +192,24 @@ class TestHttpIntegration(unittest.TestCase):
         self.assertTrue(runtime_body.get("ok"))
         self.assertIn("runtime", runtime_body)
 
+    def test_generate_returns_503_when_executor_saturated(self) -> None:
+        fastapi_testclient = importlib.import_module("fastapi.testclient")
+        client = fastapi_testclient.TestClient(create_fastapi_app(service=SaturatedService()))
+
+        res = client.post("/v1/generate/video", headers=self.headers, json={"prompt": "forest"})
+
+        self.assertEqual(res.status_code, 503)
+        self.assertEqual(res.headers.get("retry-after"), "12")
+
+    def test_ready_endpoint_reflects_warmup_state(self) -> None:
+        fastapi_testclient = importlib.import_module("fastapi.testclient")
+        cold_client = fastapi_testclient.TestClient(create_fastapi_app(service=ColdService()))
+
+        self.assertEqual(self.client.get("/v1/ready").status_code, 200)
+        cold = cold_client.get("/v1/ready")
+        self.assertEqual(cold.status_code, 503)
+        self.assertFalse(cold.json()["ready"])
+
 
 if __name__ == "__main__":
     unittest.main()
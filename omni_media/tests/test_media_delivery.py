@@ -0,0 +1,173 @@
+from __future__ import annotations
+
+import importlib
+import importlib.util
+import os
+import tempfile
+import threading
+import time
+import unittest
+from pathlib import Path
+from urllib.parse import urlsplit
+
+from omni_media.http_fastapi import create_fastapi_app
+from omni_media.media_delivery import MediaDelivery, RangeNotSatisfiable, parse_range
+from omni_media.storage import WriteBehindFileStorageAdapter
+
+
+def _has_fastapi_testclient() -> bool:
+    return bool(importlib.util.find_spec("fastapi") and importlib.util.find_spec("httpx"))
+
+
+class MediaService:
+    def __init__(self, delivery: MediaDelivery) -> None:
+        self.media_delivery = delivery
+
+
+class TestMediaDeliveryHelpers(unittest.TestCase):
+    def test_parse_range_forms(self) -> None:
+        self.assertEqual(parse_range("bytes=0-99", 1000), (0, 99))
+        self.assertEqual(parse_range("bytes=900-", 1000), (900, 999))
+        self.assertEqual(parse_range("bytes=-100", 1000), (900, 999))
+        self.assertEqual(parse_range("bytes=990-5000", 1000), (990, 999))
+        self.assertIsNone(parse_range("bytes=0-1,5-6", 1000))
+        self.assertIsNone(parse_range("items=0-1", 1000))
+        with self.assertRaises(RangeNotSatisfiable):
+            parse_range("bytes=1000-", 1000)
+
+    def test_signed_urls_expire_and_reject_tampering(self) -> None:
+        with tempfile.TemporaryDirectory() as tmp:
+            delivery = MediaDelivery(roots={"media_outputs": tmp}, secret="s3cret")
+            url = delivery.url_for(str(Path(tmp) / "image" / "a.png"), ttl_sec=60, now=1000)
+
+            parts = urlsplit(url)
+            route_path = parts.path.removeprefix("/v1/media/")
+            query = dict(item.split("=") for item in parts.query.split("&"))
+            self.assertEqual(route_path, "media_outputs/image/a.png")
+            self.assertTrue(delivery.verify(route_path, int(query["expires"]), query["sig"], now=1030))
+            self.assertFalse(delivery.verify(route_path, int(query["expires"]), query["sig"], now=1061))
+            self.assertFalse(delivery.verify("media_outputs/image/b.png", int(query["expires"]), query["sig"], now=1030))
+            self.assertIsNone(delivery.url_for("/elsewhere/a.png", ttl_sec=60))
+            self.assertIsNone(MediaDelivery(roots={"media_outputs": tmp}).url_for(str(Path(tmp) / "a.png")))
+
+    def test_locate_refuses_traversal(self) -> None:
+        delivery = MediaDelivery(roots={"media_outputs": "media_outputs"})
+
+        self.assertIsNone(delivery.locate("media_outputs/../secrets.txt"))
+        self.assertIsNone(delivery.locate("other/file.png"))
+        self.assertIsNone(delivery.locate("media_outputs/.cas/index.sqlite3"))
+        self.assertIsNone(delivery.locate("media_outputs/.cas/blobs/ab/abcdef"))
+        self.assertIsNone(delivery.locate("media_outputs/image/.a.png.123.tmp"))
+        self.assertEqual(delivery.locate("media_outputs/a/b.mp4"), Path("media_outputs/a/b.mp4"))
+
+
+@unittest.skipUnless(_has_fastapi_testclient(), "fastapi/httpx test client not installed")
+class TestMediaDeliveryHttp(unittest.TestCase):
+    def setUp(self) -> None:
+        self._env_backup = dict(os.environ)
+        os.environ["OMNI_MEDIA_API_KEYS"] = "test-key"
+        os.environ["OMNI_MEDIA_AUDIT_ENABLED"] = "false"
+        self.tmp = tempfile.TemporaryDirectory()
+        self.payload = os.urandom(50_000)
+        self.path = Path(self.tmp.name) / "video" / "req" / "video_0.mp4"
+        self.path.parent.mkdir(parents=True)
+        self.path.write_bytes(self.payload)
+        self.delivery = MediaDelivery(roots={"media_outputs": self.tmp.name}, secret="s3cret", cache_max_age_sec=600)
+        TestClient = getattr(importlib.import_module("fastapi.testclient"), "TestClient")
+        self.client = TestClient(create_fastapi_app(service=MediaService(self.delivery)))
+
+    def tearDown(self) -> None:
+        self.tmp.cleanup()
+        os.environ.clear()
+        os.environ.update(self._env_backup)
+
+    def _url(self, ttl_sec: int = 60) -> str:
+        return self.delivery.url_for(str(self.path), ttl_sec=ttl_sec)
+
+    def test_full_and_partial_responses(self) -> None:
+        full = self.client.get(self._url())
+        partial = self.client.get(self._url(), headers={"Range": "bytes=100-199"})
+        unsatisfiable = self.client.get(self._url(), headers={"Range": "bytes=60000-"})
+
+        self.assertEqual(full.status_code, 200)
+        self.assertEqual(full.content, self.payload)
+        self.assertEqual(full.headers["content-type"], "video/mp4")
+        self.assertEqual(full.headers["accept-ranges"], "bytes")
+        self.assertTrue(full.headers["cache-control"].startswith("private, max-age="))
+        self.assertLessEqual(int(full.headers["cache-control"].rsplit("=", 1)[1]), 60)
+        self.assertEqual(partial.status_code, 206)
+        self.assertEqual(partial.content, self.payload[100:200])
+        self.assertEqual(partial.headers["content-range"], "bytes 100-199/50000")
+        self.assertEqual(unsatisfiable.status_code, 416)
+        self.assertEqual(unsatisfiable.headers["content-range"], "bytes */50000")
+
+    def test_etag_revalidation_and_if_range(self) -> None:
+        etag = self.client.head(self._url()).headers["etag"]
+
+        cached = self.client.get(self._url(), headers={"If-None-Match": etag})
+        stale_range = self.client.get(self._url(), headers={"Range": "bytes=0-9", "If-Range": '"other"'})
+
+        self.assertFalse(etag.startswith("W/"))
+        self.assertEqual(cached.status_code, 304)
+        self.assertEqual(cached.content, b"")
+        self.assertEqual(stale_range.status_code, 200)
+        self.assertEqual(len(stale_range.content), len(self.payload))
+
+    def test_unsigned_and_expired_requests_are_rejected(self) -> None:
+        route = urlsplit(self._url()).path
+
+        unsigned = self.client.get(route, headers={"x-api-key": "test-key"})
+        expired = self.client.get(self._url(ttl_sec=-1).replace("sig=", "expires=1&sig="))
+
+        self.assertEqual(unsigned.status_code, 403)
+        self.assertEqual(expired.status_code, 403)
+        self.assertEqual(self.client.post(self._url()).status_code, 405)
+
+    def test_api_key_fallback_without_signing_key(self) -> None:
+        delivery = MediaDelivery(roots={"media_outputs": self.tmp.name})
+        TestClient = getattr(importlib.import_module("fastapi.testclient"), "TestClient")
+        client = TestClient(create_fastapi_app(service=MediaService(delivery)))
+        route = "/v1/media/media_outputs/video/req/video_0.mp4"
+
+        self.assertEqual(client.get(route).status_code, 403)
+        self.assertEqual(client.get(route, headers={"x-api-key": "test-key"}).content, self.payload)
+        self.assertEqual(client.get("/v1/media/media_outputs/../x", headers={"x-api-key": "test-key"}).status_code, 404)
+
+    def test_waits_for_write_behind_output(self) -> None:
+        storage = WriteBehindFileStorageAdapter(base_dir=self.tmp.name, fsync="none", io_workers=1)
+        self.addCleanup(storage.shutdown)
+        self.delivery.storage = storage
+        gate = threading.Event()
+        storage._executor.submit(gate.wait, 5)
+
+        path = storage.put_bytes("req-late", "image", 0, b"late-bytes", "png")
+        threading.Timer(0.1, gate.set).start()
+        started = time.perf_counter()
+        response = self.client.get(self.delivery.url_for(path, ttl_sec=60))
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.content, b"late-bytes")
+        self.assertGreaterEqual(time.perf_counter() - started, 0.05)
+
+    def test_failed_write_behind_output_is_a_clean_error(self) -> None:
+        storage = WriteBehindFileStorageAdapter(base_dir=self.tmp.name, fsync="none", io_workers=1)
+        self.addCleanup(storage.shutdown)
+        self.delivery.storage = storage
+        gate = threading.Event()
+        storage._executor.submit(gate.wait, 5)
+        source = Path(self.tmp.name) / "source.png"
+        source.write_bytes(b"gone")
+
+        path = storage.put_file("req-lost", "image", 0, source.as_posix(), "png")
+        source.unlink()
+        gate.set()
+        with self.assertRaises(OSError):
+            storage.wait(path, timeout=5)
+        response = self.client.get(self.delivery.url_for(path, ttl_sec=60))
+
+        self.assertEqual(response.status_code, 500)
+        self.assertEqual(self.delivery.snapshot()["errors"], 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
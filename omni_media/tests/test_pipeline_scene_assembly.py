@@ -1,10 +1,13 @@
 from __future__ import annotations
 
+import threading
+import time
 import unittest
 
 from omni_media.contracts import GenerateRequest, GenerationParams, ImageObject, VideoObject
 from omni_media.model_registry import ModelProfile
 from omni_media.pipeline import OmniMediaPipeline
+from omni_media.scene_scheduler import SceneScheduler
 
 
 class FakeRegistry:
@@ -86,6 +89,28 @@ class FakeEngine:
         )
 
 
+class SlowFirstSceneEngine(FakeEngine):
+    def __init__(self) -> None:
+        super().__init__()
+        self.active = 0
+        self.max_active = 0
+        self._lock = threading.Lock()
+
+    def generate_video(self, profile, prompt, **kwargs):
+        with self._lock:
+            self.active += 1
+            self.max_active = max(self.max_active, self.active)
+        try:
+            scene_index = int((kwargs.get("extra") or {}).get("scene_index") or 0)
+            time.sleep(0.15 if scene_index == 1 else 0.02)
+            video = super().generate_video(profile, prompt, **kwargs)
+            video.width = 100 + scene_index
+            return video
+        finally:
+            with self._lock:
+                self.active -= 1
+
+
 class TestPipelineSceneAssembly(unittest.TestCase):
     def setUp(self) -> None:
         self.engine = FakeEngine()
@@ -136,6 +161,48 @@ class TestPipelineSceneAssembly(unittest.TestCase):
         total_requested_frames = sum(int(call["num_frames"]) for call in self.engine.video_calls)
         self.assertEqual(int(video_meta.get("frame_count") or 0), total_requested_frames)
 
+    def test_parallel_scenes_keep_planner_order_and_report_timings(self) -> None:
+        engine = SlowFirstSceneEngine()
+        pipeline = OmniMediaPipeline(
+            registry=FakeRegistry(),
+            engine=engine,
+            scene_scheduler=SceneScheduler(max_parallel=3),
+        )
+        request = GenerateRequest(
+            id="req-parallel",
+            modality="video",
+            mode="default",
+            prompt=(
+                "Scene 1: forest in rain at dawn. "
+                "Scene 2: close-up of rain on leaves. "
+                "Scene 3: wide shot of mist through trees."
+            ),
+            params=GenerationParams(width=768, height=432),
+        )
+
+        response = pipeline.run(request)
+
+        self.assertEqual(response.status, "completed")
+        self.assertGreater(engine.max_active, 1)
+        self.assertEqual(response.outputs[0].metadata["width"], 101)
+        timings = response.metadata["scene_timings"]
+        self.assertEqual([item["index"] for item in timings], [1, 2, 3])
+        self.assertGreater(timings[0]["latency_ms"], timings[1]["latency_ms"])
+        self.assertEqual(response.metadata["scene_parallelism"], 3)
+
+    def test_scene_scheduler_raises_first_failure_in_order(self) -> None:
+        scheduler = SceneScheduler(max_parallel=2)
+
+        def fail(message: str):
+            def task():
+                raise RuntimeError(message)
+
+            return task
+
+        with self.assertRaisesRegex(RuntimeError, "scene-2"):
+            scheduler.run([lambda: 1, fail("scene-2"), fail("scene-3")])
+        scheduler.shutdown()
+
 
 if __name__ == "__main__":
     unittest.main()
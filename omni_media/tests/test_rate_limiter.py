@@ -0,0 +1,111 @@
+from __future__ import annotations
+
+import threading
+import tracemalloc
+import unittest
+
+from omni_media.security import InMemoryRateLimiter, RateLimitError
+
+
+class _Clock:
+    def __init__(self) -> None:
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+class TestInMemoryRateLimiter(unittest.TestCase):
+    def test_burst_then_steady_rate(self) -> None:
+        clock = _Clock()
+        limiter = InMemoryRateLimiter(default_limit=3, default_window_sec=60, clock=clock, sweep_interval_sec=0)
+        for _ in range(3):
+            limiter.check("image:alice")
+
+        with self.assertRaises(RateLimitError) as ctx:
+            limiter.check("image:alice")
+        self.assertAlmostEqual(ctx.exception.retry_after_sec, 20.0)
+        limiter.check("image:bob")
+
+        clock.now += 20
+        limiter.check("image:alice")
+        with self.assertRaises(RateLimitError):
+            limiter.check("image:alice")
+
+    def test_sweep_drops_only_idle_keys(self) -> None:
+        clock = _Clock()
+        limiter = InMemoryRateLimiter(default_limit=10, default_window_sec=10, clock=clock, sweep_interval_sec=0)
+        limiter.check("idle")
+        clock.now += 5
+        for _ in range(10):
+            limiter.check("busy")
+
+        self.assertEqual(limiter.sweep(), 1)
+        self.assertEqual(limiter.snapshot()["keys"], 1)
+        with self.assertRaises(RateLimitError):
+            limiter.check("busy")
+
+    def test_concurrent_checks_admit_exactly_the_limit(self) -> None:
+        limiter = InMemoryRateLimiter(default_limit=500, default_window_sec=3600, shards=4, sweep_interval_sec=0)
+        admitted: list[int] = []
+
+        def hammer() -> None:
+            count = 0
+            for _ in range(200):
+                try:
+                    limiter.check("jobs:shared")
+                    count += 1
+                except RateLimitError:
+                    pass
+            admitted.append(count)
+
+        threads = [threading.Thread(target=hammer) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(sum(admitted), 500)
+        self.assertEqual(limiter.snapshot()["rejected"], 1100)
+
+    def test_memory_stays_flat_across_a_million_distinct_keys(self) -> None:
+        limiter = InMemoryRateLimiter(max_keys=10_000, sweep_interval_sec=0)
+        for index in range(880_000):
+            limiter.check(f"anonymous:{index}")
+
+        tracemalloc.start()
+        try:
+            # tracemalloc only sees blocks allocated while tracing, so turn the table over once first.
+            for index in range(880_000, 900_000):
+                limiter.check(f"anonymous:{index}")
+            turned_over = tracemalloc.get_traced_memory()[0]
+            for index in range(900_000, 1_000_000):
+                limiter.check(f"anonymous:{index}")
+            growth = tracemalloc.get_traced_memory()[0] - turned_over
+        finally:
+            tracemalloc.stop()
+
+        snapshot = limiter.snapshot()
+        self.assertLessEqual(snapshot["keys"], 10_000 + limiter.shards)
+        self.assertEqual(snapshot["evicted"] + snapshot["keys"], 1_000_000)
+        self.assertLess(growth, 256 * 1024)
+
+    def test_background_sweeper_starts_and_stops(self) -> None:
+        limiter = InMemoryRateLimiter(default_limit=1, default_window_sec=1, sweep_interval_sec=0.05)
+        limiter.check("gif:carol")
+        self.addCleanup(limiter.stop)
+
+        deadline = threading.Event()
+        for _ in range(60):
+            if limiter.snapshot()["keys"] == 0:
+                break
+            deadline.wait(0.05)
+
+        self.assertEqual(limiter.snapshot()["keys"], 0)
+        self.assertGreaterEqual(limiter.snapshot()["sweeps"], 1)
+        limiter.stop()
+        self.assertIsNone(limiter._sweeper)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,105 @@
+from __future__ import annotations
+
+import importlib
+import importlib.util
+import os
+import unittest
+from unittest import mock
+
+from omni_media.security import RateLimitError, RedisRateLimiter, create_rate_limiter_from_env
+
+_HAS_FAKEREDIS = bool(importlib.util.find_spec("fakeredis") and importlib.util.find_spec("lupa"))
+
+
+class _Clock:
+    def __init__(self) -> None:
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@unittest.skipUnless(_HAS_FAKEREDIS, "fakeredis[lua] not installed")
+class TestRedisRateLimiter(unittest.TestCase):
+    def setUp(self) -> None:
+        fakeredis = importlib.import_module("fakeredis")
+        self.server = fakeredis.FakeServer()
+        self.client = fakeredis.FakeRedis(server=self.server)
+
+    def _limiter(self, **kwargs) -> RedisRateLimiter:
+        fakeredis = importlib.import_module("fakeredis")
+        return RedisRateLimiter("redis://unused", client=fakeredis.FakeRedis(server=self.server), **kwargs)
+
+    def test_gcra_script_rejects_with_retry_after(self) -> None:
+        limiter = self._limiter(default_limit=3, default_window_sec=60)
+        for _ in range(3):
+            limiter.check("image:alice")
+
+        with self.assertRaises(RateLimitError) as ctx:
+            limiter.check("image:alice")
+        self.assertGreater(ctx.exception.retry_after_sec, 19.0)
+        self.assertLessEqual(ctx.exception.retry_after_sec, 20.0)
+        limiter.check("image:bob")
+        self.assertEqual(limiter.snapshot()["round_trips"], 5)
+
+    def test_every_key_is_written_with_its_expiry(self) -> None:
+        limiter = self._limiter(default_limit=4, default_window_sec=60)
+        limiter.check("video:alice")
+        limiter.check("video:alice")
+
+        # Two of four slots used: the arrival time, and so the TTL, is 30s ahead.
+        ttl_ms = self.client.pttl("omni-media:ratelimit:video:alice")
+        self.assertGreater(ttl_ms, 29_000)
+        self.assertLessEqual(ttl_ms, 30_000)
+
+    def test_leased_batches_never_over_admit_across_processes(self) -> None:
+        clock = _Clock()
+        first = self._limiter(default_limit=100, default_window_sec=60, prefetch=0.1, clock=clock)
+        second = self._limiter(default_limit=100, default_window_sec=60, prefetch=0.1, clock=clock)
+
+        admitted = 0
+        for index in range(300):
+            try:
+                (first if index % 3 else second).check("gif:shared")
+                admitted += 1
+            except RateLimitError:
+                pass
+
+        self.assertLessEqual(admitted, 100)
+        self.assertGreaterEqual(admitted, 90)
+        stats = first.snapshot()
+        self.assertGreater(stats["local_hits"], stats["round_trips"])
+        # Once rejected, a leasing client stops asking Redis until the retry-after passes.
+        self.assertLess(stats["round_trips"] + second.snapshot()["round_trips"], 20)
+
+    def test_small_buckets_skip_the_local_lease(self) -> None:
+        limiter = self._limiter(default_limit=10, default_window_sec=60, prefetch=0.1)
+        for _ in range(3):
+            limiter.check("admin:ops")
+
+        self.assertEqual(limiter.snapshot()["round_trips"], 3)
+        self.assertEqual(limiter.snapshot()["local_keys"], 0)
+
+
+@unittest.skipUnless(importlib.util.find_spec("redis"), "redis not installed")
+class TestRedisPoolConfig(unittest.TestCase):
+    def test_env_tunes_the_connection_pool(self) -> None:
+        env = {
+            "OMNI_MEDIA_RATE_LIMIT_BACKEND": "redis",
+            "OMNI_MEDIA_REDIS_URL": "redis://127.0.0.1:6399/0",
+            "OMNI_MEDIA_REDIS_MAX_CONNECTIONS": "8",
+            "OMNI_MEDIA_REDIS_SOCKET_TIMEOUT_SEC": "0.2",
+            "OMNI_MEDIA_RATE_LIMIT_REDIS_PREFETCH": "0.05",
+        }
+        with mock.patch.dict(os.environ, env):
+            limiter = create_rate_limiter_from_env()
+
+        self.assertIsInstance(limiter, RedisRateLimiter)
+        pool = limiter.client.connection_pool
+        self.assertEqual(pool.max_connections, 8)
+        self.assertEqual(pool.connection_kwargs["socket_timeout"], 0.2)
+        self.assertEqual(limiter.prefetch, 0.05)
+
+
+if __name__ == "__main__":
+    unittest.main()
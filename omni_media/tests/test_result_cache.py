@@ -0,0 +1,104 @@
+from __future__ import annotations
+
+import tempfile
+import unittest
+
+from omni_media.contracts import GenerateRequest, GenerateResponse, GenerationParams, ImageObject, MediaOutput
+from omni_media.model_registry import ModelRegistry
+from omni_media.pipeline import OmniMediaPipeline
+from omni_media.result_cache import CachedResult, GenerationResultCache, generation_cache_key
+
+
+class CountingImageEngine:
+    def __init__(self) -> None:
+        self.calls = 0
+
+    def generate_image(self, profile, prompt, **kwargs):
+        _ = profile, prompt
+        self.calls += 1
+        return [ImageObject(bytes_data=b"png-bytes-%d" % self.calls, width=kwargs.get("width"), height=kwargs.get("height"))]
+
+
+def _request(request_id: str, seed: int | None = 42, prompt: str = "a lighthouse at dusk") -> GenerateRequest:
+    return GenerateRequest(
+        id=request_id,
+        modality="image",
+        mode="default",
+        prompt=prompt,
+        params=GenerationParams(width=512, height=512, seed=seed),
+    )
+
+
+def _entry(payload: bytes) -> CachedResult:
+    response = GenerateResponse(
+        id="x",
+        status="completed",
+        outputs=[MediaOutput(type="image", metadata={"mime_type": "image/png", "_bytes": payload})],
+    )
+    return CachedResult.from_response(response)
+
+
+class TestGenerationResultCache(unittest.TestCase):
+    def test_seeded_request_hits_cache_and_skips_engine(self) -> None:
+        engine = CountingImageEngine()
+        pipeline = OmniMediaPipeline(registry=ModelRegistry(), engine=engine, cache=GenerationResultCache())
+
+        first = pipeline.run(_request("req-1"))
+        second = pipeline.run(_request("req-2"))
+
+        self.assertEqual(engine.calls, 1)
+        self.assertFalse(first.metadata["cache_hit"])
+        self.assertTrue(second.metadata["cache_hit"])
+        self.assertEqual(second.id, "req-2")
+        self.assertEqual(second.outputs[0].metadata["_bytes"], first.outputs[0].metadata["_bytes"])
+        self.assertEqual(pipeline.cache.snapshot()["hits_memory"], 1)
+
+    def test_unseeded_request_is_not_cached(self) -> None:
+        engine = CountingImageEngine()
+        pipeline = OmniMediaPipeline(registry=ModelRegistry(), engine=engine, cache=GenerationResultCache())
+
+        pipeline.run(_request("req-1", seed=None))
+        response = pipeline.run(_request("req-2", seed=None))
+
+        self.assertEqual(engine.calls, 2)
+        self.assertNotIn("cache_hit", response.metadata)
+
+    def test_key_depends_on_watermark_and_params(self) -> None:
+        base = _request("a")
+        other = _request("b")
+        self.assertEqual(generation_cache_key(base, "image_default"), generation_cache_key(other, "image_default"))
+
+        other.watermark = False
+        self.assertNotEqual(generation_cache_key(base, "image_default"), generation_cache_key(other, "image_default"))
+        self.assertNotEqual(generation_cache_key(base, "image_default"), generation_cache_key(base, "image_hd"))
+
+    def test_memory_tier_evicts_by_bytes(self) -> None:
+        cache = GenerationResultCache(memory_max_bytes=2000)
+        cache.put("a", _entry(b"a" * 900))
+        cache.put("b", _entry(b"b" * 900))
+
+        self.assertIsNone(cache.get("a"))
+        self.assertIsNotNone(cache.get("b"))
+        self.assertEqual(cache.snapshot()["evictions_memory"], 1)
+
+    def test_disk_tier_survives_new_instance_and_enforces_quota(self) -> None:
+        with tempfile.TemporaryDirectory() as tmp:
+            cache = GenerationResultCache(memory_max_bytes=10_000, disk_dir=tmp, disk_max_bytes=1500)
+            cache.put("k1", _entry(b"1" * 600))
+
+            reloaded = GenerationResultCache(memory_max_bytes=10_000, disk_dir=tmp, disk_max_bytes=1500)
+            entry = reloaded.get("k1")
+            self.assertIsNotNone(entry)
+            assert entry is not None
+            self.assertEqual(entry.outputs[0][2], b"1" * 600)
+            self.assertEqual(reloaded.snapshot()["hits_disk"], 1)
+
+            reloaded.put("k2", _entry(b"2" * 600))
+            reloaded.put("k3", _entry(b"3" * 600))
+            snapshot = reloaded.snapshot()
+            self.assertLessEqual(snapshot["disk_bytes"], 1500)
+            self.assertGreaterEqual(snapshot["evictions_disk"], 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
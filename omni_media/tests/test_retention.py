@@ -0,0 +1,154 @@
+from __future__ import annotations
+
+import os
+import tempfile
+import time
+import unittest
+from pathlib import Path
+from unittest import mock
+
+from omni_media.content_store import ContentAddressedStorageAdapter
+from omni_media.retention import DirectoryIndex, RetentionRule, RetentionSweeper
+
+
+def _write(path: Path, size: int, age_sec: float, now: float) -> Path:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_bytes(b"x" * size)
+    os.utime(path, (now - age_sec, now - age_sec))
+    return path
+
+
+class TestRetentionSweeper(unittest.TestCase):
+    def setUp(self) -> None:
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.root = Path(self.tmp.name)
+        self.now = time.time()
+
+    def test_expires_old_files_and_prunes_empty_folders(self) -> None:
+        old = _write(self.root / "media" / "image" / "2026" / "req-old" / "image_0.png", 10, 7200, self.now)
+        fresh = _write(self.root / "media" / "image" / "2026" / "req-new" / "image_0.png", 10, 600, self.now)
+        sweeper = RetentionSweeper([RetentionRule("media", str(self.root / "media"), max_age_sec=3600)], min_age_sec=0)
+
+        snapshot = sweeper.sweep(now=self.now)
+
+        self.assertFalse(old.exists())
+        self.assertFalse(old.parent.exists())
+        self.assertTrue(fresh.exists())
+        self.assertEqual(snapshot["rules"]["media"]["expired_files"], 1)
+        self.assertEqual(snapshot["rules"]["media"]["files"], 1)
+
+    def test_quota_evicts_least_recently_accessed_first(self) -> None:
+        exports = self.root / "exports"
+        files = [_write(exports / f"clip_{i}.mp4", 100, 1000 - i * 100, self.now) for i in range(3)]
+        sweeper = RetentionSweeper([RetentionRule("exports", str(exports), max_bytes=350)], min_age_sec=0)
+        sweeper.sweep(now=self.now)
+        sweeper.record_access(files[0])
+
+        files += [_write(exports / f"clip_{i}.mp4", 100, 10, self.now) for i in (3, 4)]
+        snapshot = sweeper.sweep(now=self.now)
+
+        # The oldest file was just served, so the next-oldest files go first.
+        self.assertEqual([path.exists() for path in files], [True, False, False, True, True])
+        self.assertEqual(snapshot["rules"]["exports"]["bytes"], 300)
+        self.assertEqual(snapshot["rules"]["exports"]["evicted_files"], 2)
+
+    def test_content_store_outputs_are_released_and_collected(self) -> None:
+        self.addCleanup(os.chdir, os.getcwd())
+        os.chdir(self.root)
+        # A relative base dir, as configured by default, keys references by relative paths.
+        store = ContentAddressedStorageAdapter(base_dir="media")
+        shared = [store.put_bytes(f"req-{i}", "video", 0, b"v" * 400, "mp4") for i in range(2)]
+        plain = _write(self.root / "media" / "video" / "plain.mp4", 50, 7200, self.now)
+        for path in shared:
+            os.utime(path, (self.now - 7200, self.now - 7200))
+        sweeper = RetentionSweeper(
+            [RetentionRule("media", str(self.root / "media"), max_age_sec=3600)],
+            min_age_sec=0,
+            content_store=store,
+        )
+
+        snapshot = sweeper.sweep(now=self.now)
+
+        rule = snapshot["rules"]["media"]
+        self.assertEqual((rule["expired_files"], rule["released_refs"]), (3, 2))
+        # Only the plain file's bytes came back on unlink; the shared blob is freed once by the gc.
+        self.assertEqual(rule["evicted_bytes"], 50)
+        self.assertEqual(snapshot["content_store_gc"]["bytes_freed"], 400)
+        self.assertFalse(plain.exists())
+        self.assertEqual((store.snapshot()["refs"], store.snapshot()["blobs"]), (0, 0))
+
+    def test_hardlinked_copies_reclaim_nothing_until_the_last_link(self) -> None:
+        exports = self.root / "exports"
+        original = _write(exports / "a" / "clip.mp4", 100, 7200, self.now)
+        os.makedirs(exports / "b")
+        os.link(original, exports / "b" / "clip.mp4")
+        sweeper = RetentionSweeper([RetentionRule("exports", str(exports), max_age_sec=3600)], min_age_sec=0)
+
+        rule = sweeper.sweep(now=self.now)["rules"]["exports"]
+
+        self.assertEqual(rule["expired_files"], 2)
+        self.assertEqual(rule["evicted_bytes"], 100)
+
+    def test_grace_period_protects_new_outputs(self) -> None:
+        path = _write(self.root / "exports" / "clip.mp4", 500, 5, self.now)
+        sweeper = RetentionSweeper([RetentionRule("exports", str(self.root / "exports"), max_bytes=10)], min_age_sec=60)
+
+        sweeper.sweep(now=self.now)
+
+        self.assertTrue(path.exists())
+
+    def test_modality_rules_share_the_parent_index(self) -> None:
+        _write(self.root / "media" / "video" / "a.mp4", 400, 100, self.now)
+        kept = _write(self.root / "media" / "image" / "a.png", 400, 100, self.now)
+        sweeper = RetentionSweeper(
+            [
+                RetentionRule("media/video", str(self.root / "media" / "video"), max_bytes=100),
+                RetentionRule("media", str(self.root / "media"), max_bytes=1000),
+            ],
+            min_age_sec=0,
+        )
+
+        snapshot = sweeper.sweep(now=self.now)
+
+        self.assertEqual(list(snapshot["index"]), [str(self.root / "media")])
+        self.assertEqual(snapshot["rules"]["media/video"]["evicted_files"], 1)
+        self.assertTrue(kept.exists())
+        self.assertEqual(snapshot["rules"]["media"]["bytes"], 400)
+
+    def test_env_rules_are_opt_in(self) -> None:
+        with mock.patch.dict(os.environ, {}, clear=True):
+            self.assertEqual(RetentionSweeper.from_env().rules, [])
+        env = {"OMNI_MEDIA_RETENTION_VIDEO_MAX_BYTES": "1000", "OMNI_MEDIA_RETENTION_EXPORTS_MAX_AGE_SEC": "86400"}
+        with mock.patch.dict(os.environ, env, clear=True):
+            rules = RetentionSweeper.from_env(str(self.root)).rules
+
+        self.assertEqual([rule.name for rule in rules], ["media_outputs/video", "omni_video_exports"])
+        self.assertEqual(rules[0].directory, str(self.root / "video"))
+
+
+class TestDirectoryIndex(unittest.TestCase):
+    def test_unchanged_directories_are_not_relisted(self) -> None:
+        with tempfile.TemporaryDirectory() as tmp:
+            root = Path(tmp)
+            past = time.time() - 3600
+            for day in range(3):
+                for request in range(4):
+                    _write(root / f"day{day}" / f"req{request}" / "out.png", 1, 0, time.time())
+                    os.utime(root / f"day{day}" / f"req{request}", (past, past))
+                os.utime(root / f"day{day}", (past, past))
+            os.utime(root, (past, past))
+            index = DirectoryIndex(tmp)
+            index.refresh()
+            listed = index.stats["dirs_listed"]
+
+            _write(root / "day1" / "req9" / "out.png", 1, 0, time.time())
+            index.refresh()
+
+            self.assertEqual(listed, 16)
+            self.assertEqual(index.stats["dirs_listed"] - listed, 2)
+            self.assertEqual(len(index.files), 13)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,178 @@
+from __future__ import annotations
+
+import importlib.util
+import os
+import tempfile
+import threading
+import time
+import unittest
+
+from omni_media.storage import S3LikeStorageAdapter, UploadItem
+
+MIB = 1024 * 1024
+
+
+def _has_moto() -> bool:
+    return bool(importlib.util.find_spec("boto3") and importlib.util.find_spec("moto"))
+
+
+class RecordingS3Client:
+    def __init__(self, delay_sec: float = 0.0) -> None:
+        self.delay_sec = delay_sec
+        self.objects: dict[str, bytes] = {}
+        self.uploads: dict[str, dict[int, bytes]] = {}
+        self.aborted: list[str] = []
+        self.active = 0
+        self.max_active = 0
+        self.fail_part: int | None = None
+        self._lock = threading.Lock()
+
+    def _enter(self) -> None:
+        with self._lock:
+            self.active += 1
+            self.max_active = max(self.max_active, self.active)
+
+    def _exit(self) -> None:
+        with self._lock:
+            self.active -= 1
+
+    def put_object(self, Bucket, Key, Body):
+        self._enter()
+        try:
+            time.sleep(self.delay_sec)
+            self.objects[Key] = bytes(Body)
+        finally:
+            self._exit()
+
+    def create_multipart_upload(self, Bucket, Key):
+        upload_id = f"upload-{len(self.uploads) + 1}"
+        self.uploads[upload_id] = {}
+        return {"UploadId": upload_id}
+
+    def upload_part(self, Bucket, Key, UploadId, PartNumber, Body):
+        self._enter()
+        try:
+            time.sleep(self.delay_sec)
+            if PartNumber == self.fail_part:
+                raise IOError("part upload failed")
+            self.uploads[UploadId][PartNumber] = bytes(Body)
+            return {"ETag": f'"etag-{PartNumber}"'}
+        finally:
+            self._exit()
+
+    def complete_multipart_upload(self, Bucket, Key, UploadId, MultipartUpload):
+        parts = self.uploads.pop(UploadId)
+        numbers = [part["PartNumber"] for part in MultipartUpload["Parts"]]
+        self.objects[Key] = b"".join(parts[number] for number in numbers)
+
+    def abort_multipart_upload(self, Bucket, Key, UploadId):
+        self.aborted.append(UploadId)
+        self.uploads.pop(UploadId, None)
+
+    def generate_presigned_url(self, operation, Params, ExpiresIn):
+        return f"https://fake-s3/{Params['Bucket']}/{Params['Key']}?ttl={ExpiresIn}"
+
+
+def _adapter(client: RecordingS3Client, **kwargs) -> S3LikeStorageAdapter:
+    options = {"multipart_threshold_bytes": 6 * MIB, "part_size_bytes": 5 * MIB, "max_concurrency": 4}
+    options.update(kwargs)
+    return S3LikeStorageAdapter(bucket="media", client_factory=lambda: client, **options)
+
+
+class TestS3LikeStorageAdapter(unittest.TestCase):
+    def test_large_bytes_use_parallel_multipart_upload(self) -> None:
+        client = RecordingS3Client(delay_sec=0.05)
+        payload = os.urandom(21 * MIB)
+
+        url = _adapter(client).put_bytes("req-1", "video", 0, payload, "mp4", signed_ttl_sec=60)
+
+        self.assertIn("ttl=60", url)
+        [stored] = client.objects.values()
+        self.assertEqual(stored, payload)
+        self.assertGreater(client.max_active, 1)
+
+    def test_stream_upload_is_split_into_parts(self) -> None:
+        client = RecordingS3Client()
+        chunks = [os.urandom(MIB) for _ in range(13)]
+
+        _adapter(client).put_stream("req-2", "video", 0, iter(chunks), "mp4", signed_ttl_sec=0)
+
+        [stored] = client.objects.values()
+        self.assertEqual(stored, b"".join(chunks))
+
+    def test_small_stream_falls_back_to_put_object(self) -> None:
+        client = RecordingS3Client()
+
+        url = _adapter(client).put_stream("req-3", "gif", 0, iter([b"GIF89a", b"rest"]), "gif", signed_ttl_sec=0)
+
+        self.assertTrue(url.startswith("s3://media/"))
+        self.assertEqual(list(client.objects.values()), [b"GIF89arest"])
+
+    def test_file_upload_reads_ranges(self) -> None:
+        client = RecordingS3Client()
+        payload = os.urandom(12 * MIB + 17)
+        with tempfile.NamedTemporaryFile(delete=False) as handle:
+            handle.write(payload)
+        try:
+            _adapter(client).put_file("req-4", "video", 0, handle.name, "mp4", signed_ttl_sec=0)
+        finally:
+            os.unlink(handle.name)
+
+        self.assertEqual(list(client.objects.values()), [payload])
+
+    def test_failed_part_aborts_upload(self) -> None:
+        client = RecordingS3Client()
+        client.fail_part = 2
+
+        with self.assertRaises(IOError):
+            _adapter(client).put_bytes("req-5", "video", 0, os.urandom(16 * MIB), "mp4", signed_ttl_sec=0)
+
+        self.assertEqual(client.aborted, ["upload-1"])
+        self.assertEqual(client.objects, {})
+
+    def test_multiple_outputs_upload_concurrently(self) -> None:
+        client = RecordingS3Client(delay_sec=0.05)
+        items = [UploadItem(media_type="image", index=i, extension="png", data=b"png-%d" % i) for i in range(4)]
+
+        urls = _adapter(client).put_many("req-6", items, signed_ttl_sec=0)
+
+        self.assertEqual([url.rsplit("/", 1)[-1] for url in urls], [f"image_{i}.png" for i in range(4)])
+        self.assertGreater(client.max_active, 1)
+
+
+@unittest.skipUnless(_has_moto(), "boto3/moto not installed")
+class TestS3LikeStorageAdapterMoto(unittest.TestCase):
+    def setUp(self) -> None:
+        import boto3
+        from moto import mock_aws
+
+        os.environ.setdefault("AWS_ACCESS_KEY_ID", "testing")
+        os.environ.setdefault("AWS_SECRET_ACCESS_KEY", "testing")
+        self.mock = mock_aws()
+        self.mock.start()
+        self.s3 = boto3.client("s3", region_name="us-east-1")
+        self.s3.create_bucket(Bucket="media")
+
+    def tearDown(self) -> None:
+        self.mock.stop()
+
+    def test_client_is_reused_and_multipart_round_trips(self) -> None:
+        adapter = S3LikeStorageAdapter(
+            bucket="media",
+            region_name="us-east-1",
+            multipart_threshold_bytes=6 * MIB,
+            part_size_bytes=5 * MIB,
+        )
+        payload = os.urandom(11 * MIB)
+
+        self.assertIs(adapter._client(), adapter._client())
+        url = adapter.put_bytes("req-moto", "video", 0, payload, "mp4", signed_ttl_sec=0)
+
+        key = url.removeprefix("s3://media/")
+        self.assertEqual(self.s3.get_object(Bucket="media", Key=key)["Body"].read(), payload)
+        head = self.s3.head_object(Bucket="media", Key=key)
+        self.assertTrue(head["ETag"].strip('"').endswith("-3"))
+
+
+if __name__ == "__main__":
+    unittest.main()
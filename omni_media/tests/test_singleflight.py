@@ -0,0 +1,98 @@
+from __future__ import annotations
+
+import threading
+import time
+import unittest
+
+from omni_media.contracts import GenerateRequest, GenerationParams, ImageObject
+from omni_media.model_registry import ModelRegistry
+from omni_media.pipeline import OmniMediaPipeline
+from omni_media.result_cache import GenerationResultCache
+from omni_media.singleflight import SingleFlight
+
+
+class SlowImageEngine:
+    def __init__(self) -> None:
+        self.calls = 0
+        self.release = threading.Event()
+
+    def generate_image(self, profile, prompt, **kwargs):
+        _ = profile, prompt, kwargs
+        self.calls += 1
+        self.release.wait(timeout=5)
+        return [ImageObject(bytes_data=b"shared-png")]
+
+
+class TestSingleFlight(unittest.TestCase):
+    def test_concurrent_identical_calls_share_one_execution(self) -> None:
+        flight: SingleFlight[int] = SingleFlight()
+        release = threading.Event()
+        calls: list[int] = []
+        results: list[tuple[int, bool]] = []
+
+        def work() -> int:
+            calls.append(1)
+            release.wait(timeout=5)
+            return 7
+
+        threads = [threading.Thread(target=lambda: results.append(flight.do("k", work))) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        while flight.snapshot()["waiting"] < 3:
+            time.sleep(0.01)
+        release.set()
+        for thread in threads:
+            thread.join(timeout=5)
+
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(sorted(results), [(7, False), (7, True), (7, True), (7, True)])
+        self.assertEqual(flight.snapshot()["leaders"], 1)
+        self.assertEqual(flight.snapshot()["joined"], 3)
+
+    def test_leader_error_propagates_to_followers(self) -> None:
+        flight: SingleFlight[int] = SingleFlight()
+
+        def fail() -> int:
+            raise RuntimeError("boom")
+
+        with self.assertRaises(RuntimeError):
+            flight.do("k", fail)
+        self.assertEqual(flight.snapshot()["in_flight"], 0)
+
+    def test_pipeline_coalesces_identical_seeded_requests(self) -> None:
+        engine = SlowImageEngine()
+        pipeline = OmniMediaPipeline(registry=ModelRegistry(), engine=engine, cache=GenerationResultCache())
+        responses = {}
+
+        def run(request_id: str) -> None:
+            responses[request_id] = pipeline.run(
+                GenerateRequest(
+                    id=request_id,
+                    modality="image",
+                    mode="default",
+                    prompt="a lighthouse at dusk",
+                    params=GenerationParams(seed=3),
+                )
+            )
+
+        leader = threading.Thread(target=run, args=("req-a",))
+        follower = threading.Thread(target=run, args=("req-b",))
+        leader.start()
+        while engine.calls == 0:
+            time.sleep(0.01)
+        follower.start()
+        while pipeline.singleflight.snapshot()["waiting"] < 1:
+            time.sleep(0.01)
+        engine.release.set()
+        leader.join(timeout=5)
+        follower.join(timeout=5)
+
+        self.assertEqual(engine.calls, 1)
+        self.assertFalse(responses["req-a"].metadata["coalesced"])
+        self.assertTrue(responses["req-b"].metadata["coalesced"])
+        self.assertEqual(responses["req-b"].id, "req-b")
+        self.assertIsNot(responses["req-a"].outputs[0].metadata, responses["req-b"].outputs[0].metadata)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,127 @@
+from __future__ import annotations
+
+import os
+import tempfile
+import time
+import unittest
+from datetime import datetime, timedelta, timezone
+
+from omni_media.api_contracts import GenerateApiResponse, OutputItem
+from omni_media.contracts import GenerateRequest, GenerateResponse, GenerationParams
+from omni_media.service import JobRecord
+from omni_media.sqlite_jobs import SQLiteJobQueue, SQLiteJobStore
+from omni_media.worker import Job
+
+
+def _request(job_id: str) -> GenerateRequest:
+    return GenerateRequest(
+        id=job_id,
+        modality="image",
+        mode="default",
+        prompt="forest in rain",
+        params=GenerationParams(width=512, seed=7, extra={"style_preset": "natural"}),
+    )
+
+
+class TestSQLiteJobQueue(unittest.TestCase):
+    def setUp(self) -> None:
+        self._tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self._tmp.name, "jobs.sqlite3")
+        self.completed: list[GenerateResponse] = []
+
+    def tearDown(self) -> None:
+        self._tmp.cleanup()
+
+    def _completion(self, _request: GenerateRequest):
+        return self.completed.append
+
+    def test_round_trip_and_ack(self) -> None:
+        queue_backend = SQLiteJobQueue(self.path, completion_factory=self._completion)
+        queue_backend.enqueue(Job(request=_request("job-1"), on_complete=lambda _r: None))
+        self.assertEqual(queue_backend.size(), 1)
+
+        job = queue_backend.dequeue(timeout_sec=0)
+        self.assertIsNotNone(job)
+        assert job is not None
+        self.assertEqual(job.request.params.seed, 7)
+        self.assertEqual(job.request.params.extra, {"style_preset": "natural"})
+        self.assertEqual(queue_backend.size(), 0)
+        self.assertIsNone(queue_backend.dequeue(timeout_sec=0))
+
+        job.on_complete(GenerateResponse(id="job-1", status="completed"))
+        self.assertEqual([item.id for item in self.completed], ["job-1"])
+        self.assertEqual(queue_backend.leased_count(), 0)
+
+    def test_expired_lease_is_reclaimed_by_another_consumer(self) -> None:
+        first = SQLiteJobQueue(self.path, visibility_timeout_sec=0.05)
+        second = SQLiteJobQueue(self.path, visibility_timeout_sec=60)
+        first.enqueue(Job(request=_request("job-2"), on_complete=lambda _r: None))
+
+        self.assertIsNotNone(first.dequeue(timeout_sec=0))
+        self.assertIsNone(second.dequeue(timeout_sec=0))
+
+        time.sleep(0.1)
+        reclaimed = second.dequeue(timeout_sec=0)
+        self.assertIsNotNone(reclaimed)
+        assert reclaimed is not None
+        self.assertEqual(reclaimed.request.id, "job-2")
+
+    def test_job_fails_after_max_attempts(self) -> None:
+        queue_backend = SQLiteJobQueue(
+            self.path,
+            visibility_timeout_sec=0.01,
+            max_attempts=1,
+            completion_factory=self._completion,
+        )
+        queue_backend.enqueue(Job(request=_request("job-3"), on_complete=lambda _r: None))
+        self.assertIsNotNone(queue_backend.dequeue(timeout_sec=0))
+
+        time.sleep(0.05)
+        self.assertIsNone(queue_backend.dequeue(timeout_sec=0))
+        self.assertEqual(self.completed[0].status, "failed")
+        self.assertEqual(queue_backend.size(), 0)
+
+
+class TestSQLiteJobStore(unittest.TestCase):
+    def setUp(self) -> None:
+        self._tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self._tmp.name, "jobs.sqlite3")
+
+    def tearDown(self) -> None:
+        self._tmp.cleanup()
+
+    def test_records_survive_reopen(self) -> None:
+        store = SQLiteJobStore(self.path)
+        store.upsert(
+            JobRecord(
+                id="job-1",
+                modality="image",
+                status="completed",
+                submitted_at="2026-01-01T00:00:00+00:00",
+                completed_at="2026-01-01T00:00:05+00:00",
+                response=GenerateApiResponse(
+                    id="job-1",
+                    status="completed",
+                    outputs=[OutputItem(type="image", url="media_outputs/x.png")],
+                ),
+            )
+        )
+
+        record = SQLiteJobStore(self.path, finished_ttl_sec=None).get("job-1")
+        self.assertIsNotNone(record)
+        assert record is not None and record.response is not None
+        self.assertEqual(record.response.outputs[0].url, "media_outputs/x.png")
+
+    def test_purge_finished_keeps_active_records(self) -> None:
+        store = SQLiteJobStore(self.path, finished_ttl_sec=60)
+        old = (datetime.now(timezone.utc) - timedelta(hours=1)).isoformat()
+        store.upsert(JobRecord(id="old", modality="gif", status="failed", submitted_at=old, completed_at=old))
+        store.upsert(JobRecord(id="queued", modality="gif", status="queued", submitted_at=old))
+
+        self.assertEqual(store.purge_finished(), 1)
+        self.assertIsNone(store.get("old"))
+        self.assertEqual(store.count_by_status(), {"queued": 1})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,184 @@
+from __future__ import annotations
+
+import importlib.util
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+from omni_media.contracts import FrameBuffer, VideoObject
+from omni_media.engine import OmniMediaEngine
+from omni_media.video_encoder import (
+    BytesSink,
+    EncoderSettings,
+    StreamingVideoWriter,
+    VideoEncoderError,
+    _FfmpegProcess,
+    concat_segments,
+    encode_frame_buffer,
+)
+
+
+def _has_encoder() -> bool:
+    return bool(
+        importlib.util.find_spec("numpy")
+        and importlib.util.find_spec("imageio")
+        and importlib.util.find_spec("imageio_ffmpeg")
+    )
+
+
+@unittest.skipUnless(_has_encoder(), "numpy/imageio-ffmpeg not installed")
+class TestStreamingVideoWriter(unittest.TestCase):
+    def setUp(self) -> None:
+        import numpy as np
+
+        self.np = np
+        self.settings = EncoderSettings(preset="ultrafast")
+        self._tmp = tempfile.TemporaryDirectory()
+        self.tmp = Path(self._tmp.name)
+
+    def tearDown(self) -> None:
+        self._tmp.cleanup()
+
+    def _count_frames(self, path: Path) -> int:
+        import imageio.v2 as imageio
+
+        reader = imageio.get_reader(path.as_posix(), format="FFMPEG")
+        try:
+            return sum(1 for _ in reader)
+        finally:
+            reader.close()
+
+    def _buffer(self, frame_count: int, width: int = 32, height: int = 24) -> FrameBuffer:
+        buffer = FrameBuffer.allocate(frame_count, height, width, fps=8)
+        for index in range(frame_count):
+            buffer.data[index] = (index * 20) % 255
+        return buffer
+
+    def test_writes_frames_incrementally_to_file(self) -> None:
+        output = self.tmp / "clip.mp4"
+        with StreamingVideoWriter(output, width=32, height=24, fps=8, settings=self.settings) as writer:
+            for index in range(5):
+                writer.write(self.np.full((24, 32, 3), index * 40, dtype=self.np.uint8))
+
+        self.assertEqual(writer.frame_count, 5)
+        self.assertEqual(self._count_frames(output), 5)
+        self.assertEqual([path.name for path in self.tmp.iterdir()], ["clip.mp4"])
+
+    def test_odd_dimensions_are_padded_for_yuv420p(self) -> None:
+        output = self.tmp / "odd.mp4"
+        segment = encode_frame_buffer(self._buffer(3, width=33, height=25), output, settings=self.settings)
+
+        self.assertEqual(segment.frame_count, 3)
+        self.assertEqual(self._count_frames(output), 3)
+
+    def test_streams_fragmented_mp4_to_sink(self) -> None:
+        sink = BytesSink()
+        encode_frame_buffer(self._buffer(4), sink, settings=self.settings)
+
+        data = sink.getvalue()
+        self.assertEqual(data[4:8], b"ftyp")
+        output = self.tmp / "from_sink.mp4"
+        output.write_bytes(data)
+        self.assertEqual(self._count_frames(output), 4)
+
+    def test_rejects_frames_of_the_wrong_size(self) -> None:
+        writer = StreamingVideoWriter(self.tmp / "bad.mp4", width=32, height=24, fps=8, settings=self.settings)
+        with self.assertRaises(ValueError):
+            with writer:
+                writer.write(self.np.zeros((10, 10, 3), dtype=self.np.uint8))
+        self.assertEqual(list(self.tmp.iterdir()), [])
+
+    def test_ffmpeg_exiting_early_raises_encoder_error(self) -> None:
+        settings = EncoderSettings(codec="nonexistent_codec")
+        with self.assertRaises(VideoEncoderError) as caught:
+            encode_frame_buffer(self._buffer(200, width=640, height=480), self.tmp / "broken.mp4", settings=settings)
+        self.assertIn("nonexistent_codec", str(caught.exception))
+        self.assertEqual(list(self.tmp.iterdir()), [])
+
+        engine = OmniMediaEngine(encoder_settings=settings)
+        self.assertIsNone(engine.encode_mp4(self._buffer(200, width=640, height=480)))
+
+    def test_concat_stream_copies_matching_segments(self) -> None:
+        segments = [
+            encode_frame_buffer(self._buffer(3), self.tmp / f"scene_{index}.mp4", settings=self.settings)
+            for index in range(2)
+        ]
+        output = self.tmp / "merged.mp4"
+
+        mode = concat_segments(segments, output, settings=self.settings)
+
+        self.assertEqual(mode, "copy")
+        self.assertEqual(self._count_frames(output), 6)
+
+    def test_concat_reencodes_mismatched_segments(self) -> None:
+        segments = [
+            encode_frame_buffer(self._buffer(2), self.tmp / "a.mp4", settings=self.settings),
+            encode_frame_buffer(self._buffer(2, width=48, height=32), self.tmp / "b.mp4", settings=self.settings),
+        ]
+        output = self.tmp / "merged.mp4"
+
+        mode = concat_segments(segments, output, settings=self.settings)
+
+        self.assertEqual(mode, "reencode")
+        self.assertEqual(self._count_frames(output), 4)
+
+    def test_concat_probes_bare_paths_before_stream_copy(self) -> None:
+        h264 = encode_frame_buffer(self._buffer(2), self.tmp / "h264.mp4", settings=self.settings)
+        mpeg4 = encode_frame_buffer(
+            self._buffer(2), self.tmp / "mpeg4.mp4", settings=EncoderSettings(codec="mpeg4", crf=None, preset=None)
+        )
+
+        self.assertEqual(concat_segments([h264.path, h264.path], self.tmp / "same.mp4", settings=self.settings), "copy")
+        mode = concat_segments([h264.path, mpeg4.path], self.tmp / "mixed.mp4", settings=self.settings)
+
+        self.assertEqual(mode, "reencode")
+        self.assertEqual(self._count_frames(self.tmp / "mixed.mp4"), 4)
+
+    def test_engine_reencodes_scenes_with_matching_geometry_but_different_codecs(self) -> None:
+        engine = OmniMediaEngine(encoder_settings=self.settings)
+        scenes = []
+        for settings in (self.settings, EncoderSettings(preset="ultrafast", pixel_format="yuv444p")):
+            sink = BytesSink()
+            encode_frame_buffer(self._buffer(3), sink, settings=settings)
+            scenes.append(VideoObject(frames=[], fps=8, duration_sec=3 / 8, width=32, height=24, mp4_bytes=sink.getvalue()))
+
+        with mock.patch("omni_media.video_encoder._FfmpegProcess", wraps=_FfmpegProcess) as process:
+            merged = engine._concat_scene_mp4(scenes)
+
+        self.assertIsNotNone(merged)
+        self.assertNotIn("copy", process.call_args.args[0])
+        output = self.tmp / "mixed_scenes.mp4"
+        output.write_bytes(merged)
+        self.assertEqual(self._count_frames(output), 6)
+
+    def test_engine_joins_scene_clips_without_dropping_mp4(self) -> None:
+        engine = OmniMediaEngine(encoder_settings=self.settings)
+        scenes = []
+        for _ in range(2):
+            buffer = self._buffer(3)
+            sink = BytesSink()
+            encode_frame_buffer(buffer, sink, settings=self.settings)
+            scenes.append(
+                VideoObject(
+                    frames=[],
+                    fps=8,
+                    duration_sec=3 / 8,
+                    width=32,
+                    height=24,
+                    mp4_bytes=sink.getvalue(),
+                    buffer=buffer,
+                )
+            )
+
+        merged = engine.assemble_video_scenes(scenes)
+
+        self.assertIsNotNone(merged.mp4_bytes)
+        output = self.tmp / "assembled.mp4"
+        output.write_bytes(merged.mp4_bytes)
+        self.assertEqual(self._count_frames(output), 6)
+        self.assertEqual(merged.frame_count, 6)
+
+
+if __name__ == "__main__":
+    unittest.main()
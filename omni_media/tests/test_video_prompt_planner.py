@@ -1,8 +1,17 @@
 from __future__ import annotations
 
+import dataclasses
 import unittest
 
-from omni_media.video_prompt_planner import build_video_prompt_plan, compile_video_generation_spec
+from omni_media.benchmarks.prompt_planning import legacy_build_plan, sample_prompts
+from omni_media.contracts import GenerateRequest
+from omni_media.video_prompt_planner import (
+    VideoPlanCache,
+    _allocate_scene_frames,
+    build_video_prompt_plan,
+    compile_video_generation_spec,
+    video_spec_for,
+)
 
 
 class TestVideoPromptPlanner(unittest.TestCase):
@@ -64,6 +73,77 @@ class TestVideoPromptPlanner(unittest.TestCase):
 
         self.assertEqual(cursor, plan.total_frames)
 
+    def test_lexer_reads_phrase_features_and_headings(self) -> None:
+        plan = build_video_prompt_plan(
+            "Intro credits. Scene 1: bird's eye view of a black and white harbor. "
+            "Scene2 - sci-fi drones in slow motion over the x-ray lab"
+        )
+
+        self.assertEqual((plan.style_preset, plan.motion_profile, plan.camera_profile), ("noir", "slow", "aerial"))
+        self.assertEqual([scene.text for scene in plan.scenes][1], "sci-fi drones in slow motion over the x-ray lab")
+        self.assertIn("bird's", plan.grounding_tokens)
+        self.assertIn("x-ray", plan.grounding_tokens)
+        # "intro" and "credits" sit before the first heading, so they are not carried into any scene.
+        self.assertLess(plan.grounding_score, 1.0)
+
+    def test_frames_are_apportioned_by_largest_remainder(self) -> None:
+        self.assertEqual(_allocate_scene_frames([1.0, 1.0, 1.0], 10), [4, 3, 3])
+        self.assertEqual(_allocate_scene_frames([5.2, 1.0, 3.1, 1.0], 113), [57, 11, 34, 11])
+        self.assertEqual(_allocate_scene_frames([0.01, 10.0], 16), [1, 15])
+        self.assertEqual(_allocate_scene_frames([2.0, 3.0], 1), [1, 1])
+
+    def test_matches_the_multi_pass_planner(self) -> None:
+        prompts = [prompt for batch in sample_prompts(5).values() for prompt in batch]
+        prompts += [
+            "a fox then, a hare next  the owl cut to black",
+            "Scene 1: -- Scene 2: rain-soaked streets-scene 3: neon",
+            "close-up then then slow-mo. Then closeup, birdseye, high energy chase",
+            "İstanbul skyline at dusk then a ferry crossing",
+            "... - ...",
+        ]
+        for prompt in prompts:
+            with self.subTest(prompt=prompt[:60]):
+                self.assertEqual(build_video_prompt_plan(prompt), legacy_build_plan(prompt))
+
+
+class TestVideoPlanCache(unittest.TestCase):
+    def test_normalized_prompts_share_a_frozen_plan(self) -> None:
+        cache = VideoPlanCache(max_entries=8)
+
+        first = cache.get("a fox  running through snow")
+        second = cache.get("  a fox running\nthrough snow ")
+
+        self.assertIs(first.plan.scenes, second.plan.scenes)
+        self.assertEqual(second.plan.original_prompt, "  a fox running\nthrough snow ")
+        self.assertEqual(cache.snapshot()["hits"], 1)
+        self.assertEqual(cache.snapshot()["hit_rate"], 0.5)
+        with self.assertRaises(dataclasses.FrozenInstanceError):
+            first.plan.scenes[0].frame_count = 1  # type: ignore[misc]
+
+    def test_metadata_copies_cannot_corrupt_the_cache(self) -> None:
+        cache = VideoPlanCache(max_entries=8)
+        cache.get("waves crashing on a rocky shore").metadata["scene_plan"].clear()
+
+        self.assertTrue(cache.get("waves crashing on a rocky shore").metadata["scene_plan"])
+
+    def test_cache_is_bounded(self) -> None:
+        cache = VideoPlanCache(max_entries=2)
+        for prompt in ("red kite over hills", "blue boat on lake", "green tram in city"):
+            cache.get(prompt)
+
+        snapshot = cache.snapshot()
+        self.assertEqual(snapshot["entries"], 2)
+        self.assertEqual(snapshot["evictions"], 1)
+
+    def test_spec_travels_with_the_request(self) -> None:
+        request = GenerateRequest(id="req", modality="video", mode="default", prompt="lanterns floating over a river")
+
+        spec = video_spec_for(request)
+
+        self.assertIs(request.video_plan, spec)
+        self.assertIs(video_spec_for(request), spec)
+        self.assertEqual(spec.prompt, compile_video_generation_spec(request.prompt).prompt)
+
 
 if __name__ == "__main__":
     unittest.main()
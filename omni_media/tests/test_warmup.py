@@ -0,0 +1,90 @@
+from __future__ import annotations
+
+import threading
+import unittest
+
+from omni_media.client_pool import ModelClientPool
+from omni_media.engine import OmniMediaEngine
+from omni_media.model_registry import ModelRegistry
+from omni_media.warmup import ModelWarmup
+
+
+class FakeEngine:
+    def __init__(self) -> None:
+        self.release = threading.Event()
+        self.preloaded: list[str] = []
+        self.dummy_calls: list[tuple[str, str]] = []
+
+    def preload(self, profiles):
+        self.release.wait(timeout=5)
+        self.preloaded.extend(profile.key for profile in profiles)
+        return {profile.key: None for profile in profiles}
+
+    def generate_image(self, profile, prompt, **kwargs):
+        _ = prompt, kwargs
+        self.dummy_calls.append(("image", profile.key))
+        return []
+
+    def generate_video(self, profile, prompt, **kwargs):
+        _ = prompt, kwargs
+        self.dummy_calls.append(("video", profile.key))
+
+
+class FakePipeline:
+    def __init__(self) -> None:
+        self.registry = ModelRegistry()
+        self.engine = FakeEngine()
+
+
+class TestModelWarmup(unittest.TestCase):
+    def test_ready_only_after_all_profiles_load(self) -> None:
+        pipeline = FakePipeline()
+        warmup = ModelWarmup(pipeline, ["image_default", "video_default"], dummy_generation=True)
+
+        warmup.start()
+        self.assertFalse(warmup.is_ready())
+
+        pipeline.engine.release.set()
+        self.assertTrue(warmup.wait(timeout_sec=5))
+        self.assertTrue(warmup.is_ready())
+        self.assertEqual(pipeline.engine.preloaded, ["image_default", "video_default"])
+        self.assertEqual(
+            pipeline.engine.dummy_calls,
+            [("image", "image_default"), ("video", "video_default")],
+        )
+        self.assertEqual(warmup.snapshot()["profiles"]["video_default"]["state"], "ready")
+
+    def test_unknown_profile_keeps_instance_unready(self) -> None:
+        pipeline = FakePipeline()
+        pipeline.engine.release.set()
+        warmup = ModelWarmup(pipeline, ["image_default", "missing_profile"])
+
+        warmup.start()
+        warmup.wait(timeout_sec=5)
+
+        snapshot = warmup.snapshot()
+        self.assertFalse(snapshot["ready"])
+        self.assertEqual(snapshot["profiles"]["missing_profile"]["state"], "failed")
+
+    def test_profiles_evicted_by_the_pool_keep_instance_unready(self) -> None:
+        pipeline = FakePipeline()
+        pipeline.engine = OmniMediaEngine(client_pool=ModelClientPool(max_resident=2))
+        pipeline.engine._construct_omni_client = lambda profile: object()  # type: ignore[method-assign]
+        warmup = ModelWarmup(pipeline, ["image_default", "video_default", "video_long"])
+
+        warmup.start()
+        self.assertTrue(warmup.wait(timeout_sec=5))
+
+        snapshot = warmup.snapshot()
+        self.assertFalse(snapshot["ready"])
+        self.assertEqual(
+            {key: item["resident"] for key, item in snapshot["profiles"].items()},
+            {"image_default": False, "video_default": True, "video_long": True},
+        )
+
+    def test_empty_warmup_set_is_ready_immediately(self) -> None:
+        self.assertTrue(ModelWarmup(FakePipeline(), []).is_ready())
+
+
+if __name__ == "__main__":
+    unittest.main()
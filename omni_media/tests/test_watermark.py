@@ -0,0 +1,163 @@
+from __future__ import annotations
+
+import importlib.util
+import io
+import unittest
+from types import SimpleNamespace
+
+from omni_media.client_pool import ModelClientPool
+from omni_media.contracts import FrameBuffer, GenerateRequest, GenerationParams, VideoObject
+from omni_media.engine import OmniMediaEngine
+from omni_media.gif_encoder import GifEncoder, GifEncoderSettings
+from omni_media.hooks import DefaultMediaHooks
+from omni_media.model_registry import ModelRegistry
+from omni_media.pipeline import OmniMediaPipeline
+from omni_media.watermark import FrameWatermarker
+
+
+def _has_numpy_and_pillow() -> bool:
+    return bool(importlib.util.find_spec("numpy") and importlib.util.find_spec("PIL"))
+
+
+class GifFramesEngine:
+    def __init__(self) -> None:
+        self.gif_inputs: list[VideoObject] = []
+
+    def generate_video(self, profile, prompt, width=512, height=512, num_frames=4, fps=8, **kwargs):
+        _ = profile, prompt, kwargs
+        buffer = FrameBuffer.allocate(4, int(height), int(width), fps=int(fps))
+        for index in range(4):
+            buffer.data[index] = 40 * index
+        return VideoObject(frames=[], fps=int(fps), duration_sec=4 / int(fps), width=int(width), height=int(height), buffer=buffer)
+
+    def generate_gif_from_video(self, video):
+        self.gif_inputs.append(video)
+        return GifEncoder(GifEncoderSettings()).encode(video.frame_buffer())
+
+
+@unittest.skipUnless(_has_numpy_and_pillow(), "numpy/Pillow not installed")
+class TestFrameWatermarker(unittest.TestCase):
+    def setUp(self) -> None:
+        import numpy as np
+
+        self.np = np
+
+    def test_overlay_is_cached_per_resolution(self) -> None:
+        watermarker = FrameWatermarker()
+
+        first = watermarker.overlay(320, 240)
+        second = watermarker.overlay(320, 240)
+        watermarker.overlay(640, 480)
+
+        self.assertIs(first, second)
+        snapshot = watermarker.snapshot()
+        self.assertEqual(snapshot["overlay_builds"], 2)
+        self.assertEqual(snapshot["overlay_hits"], 1)
+
+    def test_batch_blend_matches_pil_composite_and_leaves_rest_untouched(self) -> None:
+        from PIL import Image
+
+        frames = self.np.zeros((3, 120, 160, 3), dtype=self.np.uint8)
+        frames[:] = self.np.arange(3, dtype=self.np.uint8)[:, None, None, None] * 60
+        original = frames.copy()
+        watermarker = FrameWatermarker()
+
+        watermarker.apply(frames)
+
+        overlay = watermarker.overlay(160, 120)
+        h, w = overlay.premultiplied.shape[:2]
+        changed = self.np.argwhere((frames != original).any(axis=(0, 3)))
+        self.assertTrue(len(changed))
+        self.assertGreaterEqual(changed[:, 0].min(), overlay.y0)
+        self.assertGreaterEqual(changed[:, 1].min(), overlay.x0)
+
+        rgba = self.np.concatenate(
+            [overlay.premultiplied // self.np.maximum(overlay.alpha, 1), overlay.alpha], axis=2
+        ).astype(self.np.uint8)
+        for index in range(3):
+            base = Image.fromarray(original[index]).convert("RGBA")
+            base.alpha_composite(Image.fromarray(rgba), dest=(overlay.x0, overlay.y0))
+            expected = self.np.asarray(base.convert("RGB")).astype(int)
+            self.assertLessEqual(int(self.np.abs(expected - frames[index].astype(int)).max()), 2)
+
+    def test_encoded_gif_stays_animated_and_jpeg_stays_jpeg(self) -> None:
+        from PIL import Image
+
+        buffer = FrameBuffer.allocate(3, 64, 128, fps=6)
+        for index in range(3):
+            buffer.data[index] = 70 * index
+        gif = GifEncoder(GifEncoderSettings()).encode(buffer)
+        jpeg = io.BytesIO()
+        Image.new("RGB", (128, 64), (10, 90, 200)).save(jpeg, format="JPEG")
+
+        marked_gif = FrameWatermarker().apply_encoded(gif)
+        marked_jpeg = FrameWatermarker().apply_encoded(jpeg.getvalue())
+
+        self.assertEqual(Image.open(io.BytesIO(marked_gif)).n_frames, 3)
+        self.assertEqual(Image.open(io.BytesIO(marked_jpeg)).format, "JPEG")
+
+    def test_pipeline_marks_gif_frames_before_encoding(self) -> None:
+        engine = GifFramesEngine()
+        pipeline = OmniMediaPipeline(registry=ModelRegistry(), engine=engine)
+        request = GenerateRequest(
+            id="req-gif",
+            modality="gif",
+            mode="default",
+            prompt="a paper boat drifting on a pond",
+            params=GenerationParams(width=160, height=96),
+            watermark=True,
+        )
+
+        response = pipeline.run(request)
+
+        self.assertEqual(response.status, "completed")
+        metadata = dict(response.outputs[0].metadata)
+        self.assertEqual(metadata["watermark_stage"], "frames")
+        marked = engine.gif_inputs[0].buffer
+        self.assertFalse(self.np.array_equal(marked.data[0], self.np.zeros_like(marked.data[0])))
+
+        data = metadata.pop("_bytes")
+        passed, hook_metadata = DefaultMediaHooks().apply_watermark("gif", data, metadata, enabled=True)
+        self.assertIs(passed, data)
+        self.assertEqual(hook_metadata["watermark_mode"], "visible")
+
+    def test_images_the_filter_could_not_mark_fall_back_to_the_hook(self) -> None:
+        from PIL import Image
+
+        engine = OmniMediaEngine(client_pool=ModelClientPool())
+        engine._construct_omni_client = lambda profile: ImageClient(Image)  # type: ignore[method-assign]
+        pipeline = OmniMediaPipeline(registry=ModelRegistry(), engine=engine)
+        apply = pipeline.watermarker.apply
+        calls: list[int] = []
+
+        def flaky_apply(frame):
+            calls.append(1)
+            if len(calls) == 2:
+                raise RuntimeError("overlay failed")
+            return apply(frame)
+
+        pipeline.watermarker.apply = flaky_apply  # type: ignore[method-assign]
+        request = GenerateRequest(id="req-img", modality="image", mode="default", prompt="two lamps", watermark=True)
+
+        response = pipeline.run(request)
+
+        marked, unmarked = (dict(output.metadata) for output in response.outputs)
+        self.assertEqual(marked["watermark_stage"], "frames")
+        self.assertNotIn("watermark_stage", unmarked)
+        data = unmarked.pop("_bytes")
+        hooked, hook_metadata = DefaultMediaHooks().apply_watermark("image", data, unmarked, enabled=True)
+        self.assertNotEqual(hooked, data)
+        self.assertEqual(hook_metadata["watermark_mode"], "visible")
+
+
+class ImageClient:
+    def __init__(self, image_module) -> None:
+        self.image_module = image_module
+
+    def generate(self, **payload):
+        size = (int(payload["width"]), int(payload["height"]))
+        return [SimpleNamespace(images=[self.image_module.new("RGB", size) for _ in range(2)])]
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,200 @@
+from __future__ import annotations
+
+import os
+import tempfile
+import threading
+import time
+import unittest
+from collections import Counter
+
+from omni_media.contracts import GenerateRequest, GenerateResponse
+from omni_media.model_registry import ModelRegistry
+from omni_media.sqlite_jobs import SQLiteJobQueue
+from omni_media.worker import InMemoryJobQueue, Job, OmniMediaWorkerPool
+
+
+class BlockingPipeline:
+    def __init__(self) -> None:
+        self.registry = ModelRegistry()
+        self.release_video = threading.Event()
+        self.video_started = threading.Event()
+
+    def run(self, request: GenerateRequest) -> GenerateResponse:
+        if request.modality == "video":
+            self.video_started.set()
+            self.release_video.wait(timeout=5)
+        return GenerateResponse(id=request.id, status="completed", metadata={"modality": request.modality})
+
+
+class SlowPipeline:
+    def __init__(self, run_sec: float) -> None:
+        self.registry = ModelRegistry()
+        self.run_sec = run_sec
+        self.runs: Counter[str] = Counter()
+        self._lock = threading.Lock()
+
+    def run(self, request: GenerateRequest) -> GenerateResponse:
+        with self._lock:
+            self.runs[request.id] += 1
+        time.sleep(self.run_sec)
+        return GenerateResponse(id=request.id, status="completed")
+
+
+class FailingPipeline:
+    def __init__(self) -> None:
+        self.registry = ModelRegistry()
+
+    def run(self, request: GenerateRequest) -> GenerateResponse:
+        raise RuntimeError(f"gpu fell over on {request.id}")
+
+
+class EchoPipeline:
+    def __init__(self) -> None:
+        self.registry = ModelRegistry()
+
+    def run(self, request: GenerateRequest) -> GenerateResponse:
+        return GenerateResponse(id=request.id, status="completed", metadata={"prompt": request.prompt})
+
+
+def _request(request_id: str, modality: str, mode: str = "default") -> GenerateRequest:
+    return GenerateRequest(id=request_id, modality=modality, mode=mode, prompt=f"prompt {request_id}")  # type: ignore[arg-type]
+
+
+class TestOmniMediaWorkerPool(unittest.TestCase):
+    def test_image_jobs_are_not_blocked_by_capped_video_jobs(self) -> None:
+        pipeline = BlockingPipeline()
+        queue_backend = InMemoryJobQueue()
+        pool = OmniMediaWorkerPool(pipeline, queue_backend, workers=3, modality_limits={"video": 1})
+        done: dict[str, threading.Event] = {key: threading.Event() for key in ("v1", "v2", "i1")}
+
+        def on_complete_for(key: str):
+            return lambda _result: done[key].set()
+
+        pool.start()
+        try:
+            queue_backend.enqueue(Job(request=_request("v1", "video", "long"), on_complete=on_complete_for("v1")))
+            self.assertTrue(pipeline.video_started.wait(timeout=5))
+            queue_backend.enqueue(Job(request=_request("v2", "video", "long"), on_complete=on_complete_for("v2")))
+            queue_backend.enqueue(Job(request=_request("i1", "image"), on_complete=on_complete_for("i1")))
+
+            self.assertTrue(done["i1"].wait(timeout=5))
+            self.assertFalse(done["v2"].is_set())
+
+            snapshot = pool.snapshot()
+            self.assertEqual(snapshot["pool_size"], 3)
+            self.assertEqual(snapshot["busy_workers"], 1)
+            self.assertEqual(snapshot["active_by_profile"], {"video_long": 1})
+            self.assertEqual(snapshot["pending_admission"], 1)
+
+            pipeline.release_video.set()
+            self.assertTrue(done["v1"].wait(timeout=5))
+            self.assertTrue(done["v2"].wait(timeout=5))
+        finally:
+            pipeline.release_video.set()
+            pool.stop()
+
+    def test_capped_jobs_waiting_for_admission_do_not_block_other_modalities(self) -> None:
+        pipeline = BlockingPipeline()
+        queue_backend = InMemoryJobQueue()
+        pool = OmniMediaWorkerPool(pipeline, queue_backend, workers=3, modality_limits={"video": 1})
+        done: dict[str, threading.Event] = {key: threading.Event() for key in ("v1", "v2", "v3", "i1")}
+
+        pool.start()
+        try:
+            queue_backend.enqueue(Job(request=_request("v1", "video"), on_complete=lambda _r: done["v1"].set()))
+            self.assertTrue(pipeline.video_started.wait(timeout=5))
+            for key in ("v2", "v3"):
+                queue_backend.enqueue(Job(request=_request(key, "video"), on_complete=lambda _r, k=key: done[k].set()))
+            deadline = time.monotonic() + 5
+            while pool.snapshot()["pending_admission"] < 2 and time.monotonic() < deadline:
+                time.sleep(0.01)
+            queue_backend.enqueue(Job(request=_request("i1", "image"), on_complete=lambda _r: done["i1"].set()))
+
+            # Two capped videos now fill as many pending entries as there are idle slots.
+            self.assertTrue(done["i1"].wait(timeout=5))
+            self.assertFalse(done["v2"].is_set() or done["v3"].is_set())
+            self.assertEqual(pool.snapshot()["pending_admission"], 2)
+
+            pipeline.release_video.set()
+            for key in ("v1", "v2", "v3"):
+                self.assertTrue(done[key].wait(timeout=5))
+        finally:
+            pipeline.release_video.set()
+            pool.stop()
+
+    def test_leased_jobs_run_once_when_they_outlive_the_lease(self) -> None:
+        with tempfile.TemporaryDirectory() as tmp:
+            queue_backend = SQLiteJobQueue(os.path.join(tmp, "jobs.sqlite3"), visibility_timeout_sec=0.3)
+            pipeline = SlowPipeline(run_sec=0.5)
+            pool = OmniMediaWorkerPool(pipeline, queue_backend, workers=4, modality_limits={"video": 1})
+            finished = threading.Semaphore(0)
+            for index in range(5):
+                queue_backend.enqueue(Job(request=_request(f"v{index}", "video"), on_complete=lambda _r: None))
+            queue_backend.bind_completion(lambda _request: lambda _result: finished.release())
+
+            pool.start()
+            peak_pending = 0
+            try:
+                for _ in range(5):
+                    deadline = time.monotonic() + 10
+                    while not finished.acquire(timeout=0.05):
+                        peak_pending = max(peak_pending, pool.snapshot()["pending_admission"])
+                        self.assertLess(time.monotonic(), deadline)
+            finally:
+                pool.stop()
+
+            self.assertEqual(dict(pipeline.runs), {f"v{index}": 1 for index in range(5)})
+            # Capped jobs held for admission are bounded by the pool size, not pulled off the queue wholesale.
+            self.assertLessEqual(peak_pending, 4)
+            self.assertEqual(queue_backend.size() + queue_backend.leased_count(), 0)
+
+    def test_pipeline_errors_are_recorded_as_failed_jobs(self) -> None:
+        queue_backend = InMemoryJobQueue()
+        pool = OmniMediaWorkerPool(FailingPipeline(), queue_backend, workers=1)
+        results: list[GenerateResponse] = []
+        finished = threading.Event()
+
+        def on_complete(result: GenerateResponse) -> None:
+            results.append(result)
+            finished.set()
+
+        pool.start()
+        try:
+            with self.assertLogs("omni_media.worker", level="ERROR"):
+                queue_backend.enqueue(Job(request=_request("f1", "image"), on_complete=on_complete))
+                self.assertTrue(finished.wait(timeout=5))
+        finally:
+            pool.stop()
+
+        self.assertEqual((results[0].status, results[0].error), ("failed", "worker failed: gpu fell over on f1"))
+
+    def test_process_mode_runs_pipeline_in_child(self) -> None:
+        queue_backend = InMemoryJobQueue()
+        pool = OmniMediaWorkerPool(
+            EchoPipeline(),
+            queue_backend,
+            workers=1,
+            mode="process",
+            pipeline_factory=EchoPipeline,
+        )
+        results: list[GenerateResponse] = []
+        finished = threading.Event()
+
+        def on_complete(result: GenerateResponse) -> None:
+            results.append(result)
+            finished.set()
+
+        pool.start()
+        try:
+            queue_backend.enqueue(Job(request=_request("p1", "image"), on_complete=on_complete))
+            self.assertTrue(finished.wait(timeout=30))
+        finally:
+            pool.stop()
+
+        self.assertEqual(results[0].status, "completed")
+        self.assertEqual(results[0].metadata["prompt"], "prompt p1")
+        self.assertEqual(pool.snapshot()["slots"][0]["jobs_done"], 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
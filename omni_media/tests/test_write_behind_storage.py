@@ -0,0 +1,172 @@
+from __future__ import annotations
+
+import asyncio
+import os
+import tempfile
+import threading
+import time
+import unittest
+from datetime import datetime, timezone
+from pathlib import Path
+from unittest import mock
+
+from omni_media.storage import UploadItem, WriteBehindFileStorageAdapter, create_storage_from_env
+
+
+class TestWriteBehindFileStorageAdapter(unittest.TestCase):
+    def setUp(self) -> None:
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+
+    def _adapter(self, **kwargs) -> WriteBehindFileStorageAdapter:
+        adapter = WriteBehindFileStorageAdapter(base_dir=self.tmp.name, **kwargs)
+        self.addCleanup(adapter.shutdown)
+        return adapter
+
+    def test_url_is_returned_before_write_and_wait_makes_it_durable(self) -> None:
+        adapter = self._adapter(fsync="batch", fsync_interval_sec=0.2)
+
+        url = adapter.put_bytes("req-1", "image", 0, b"png-bytes", "png")
+
+        self.assertTrue(url.endswith("image/%s/req-1/image_0.png" % time.strftime("%Y/%m/%d", time.gmtime())))
+        self.assertTrue(adapter.wait(url, timeout=5))
+        self.assertEqual(Path(url).read_bytes(), b"png-bytes")
+        self.assertIsNone(adapter.pending(url))
+        snapshot = adapter.snapshot()
+        self.assertEqual(snapshot["writes"], 1)
+        self.assertEqual(snapshot["fsync_batches"], 1)
+        self.assertEqual(snapshot["pending_bytes"], 0)
+
+    def test_durable_mode_returns_after_rename(self) -> None:
+        adapter = self._adapter(fsync="always", durable=True)
+
+        url = adapter.put_bytes("req-2", "gif", 1, b"GIF89a", "gif")
+
+        self.assertEqual(Path(url).read_bytes(), b"GIF89a")
+        self.assertEqual(adapter.snapshot()["pending_writes"], 0)
+
+    def test_no_partial_files_are_visible_under_final_name(self) -> None:
+        adapter = self._adapter(fsync="none", io_workers=1)
+        release = threading.Event()
+        original = Path.write_bytes
+
+        def slow_write(path: Path, data: bytes) -> int:
+            original(path, data[:3])
+            release.wait(5)
+            return original(path, data)
+
+        with mock.patch.object(Path, "write_bytes", slow_write):
+            url = adapter.put_bytes("req-3", "video", 0, b"0123456789", "mp4")
+            time.sleep(0.05)
+            self.assertFalse(Path(url).exists())
+            release.set()
+            adapter.wait(url, timeout=5)
+
+        self.assertEqual(Path(url).read_bytes(), b"0123456789")
+        leftovers = [p.name for p in Path(url).parent.iterdir() if p.name.endswith(".tmp")]
+        self.assertEqual(leftovers, [])
+
+    def test_backpressure_blocks_when_queue_is_full(self) -> None:
+        adapter = self._adapter(fsync="none", io_workers=1, max_pending_bytes=10)
+        release = threading.Event()
+        original = Path.write_bytes
+
+        def gated_write(path: Path, data: bytes) -> int:
+            release.wait(5)
+            return original(path, data)
+
+        with mock.patch.object(Path, "write_bytes", gated_write):
+            adapter.put_bytes("req-4", "image", 0, b"x" * 8, "png")
+            blocked = threading.Event()
+
+            def second() -> None:
+                adapter.put_bytes("req-4", "image", 1, b"y" * 8, "png")
+                blocked.set()
+
+            thread = threading.Thread(target=second)
+            thread.start()
+            self.assertFalse(blocked.wait(0.1))
+            release.set()
+            thread.join(5)
+
+        self.assertTrue(blocked.is_set())
+        self.assertTrue(adapter.flush(timeout=5))
+        self.assertEqual(adapter.snapshot()["backpressure_waits"], 1)
+
+    def test_put_many_and_async_wait(self) -> None:
+        adapter = self._adapter(io_workers=4)
+        source = Path(self.tmp.name) / "source.mp4"
+        source.write_bytes(os.urandom(4096))
+        items = [
+            UploadItem(media_type="image", index=0, extension="png", data=b"a"),
+            UploadItem(media_type="video", index=1, extension="mp4", path=str(source)),
+        ]
+
+        urls = adapter.put_many("req-5", items)
+
+        async def wait_all() -> None:
+            await asyncio.gather(*(adapter.wait_async(url) for url in urls))
+
+        asyncio.run(wait_all())
+        self.assertEqual(Path(urls[0]).read_bytes(), b"a")
+        self.assertEqual(Path(urls[1]).read_bytes(), source.read_bytes())
+
+    def test_write_errors_surface_on_wait(self) -> None:
+        adapter = self._adapter(fsync="none")
+
+        def failing_write(path: Path, data: bytes) -> int:
+            raise OSError("disk full")
+
+        with mock.patch.object(Path, "write_bytes", failing_write):
+            url = adapter.put_bytes("req-6", "image", 0, b"data", "png")
+            with self.assertRaises(OSError):
+                adapter.wait(url, timeout=5)
+
+        self.assertEqual(adapter.snapshot()["errors"], 1)
+        self.assertFalse(Path(url).exists())
+
+    def test_returned_url_matches_the_written_folder_across_midnight(self) -> None:
+        adapter = self._adapter(fsync="none")
+        before = datetime(2026, 3, 1, 23, 59, 59, 999000, tzinfo=timezone.utc)
+        after = datetime(2026, 3, 2, 0, 0, 0, 1000, tzinfo=timezone.utc)
+
+        with mock.patch("omni_media.storage.datetime") as clock:
+            clock.now.side_effect = [before, after, after, after]
+            url = adapter.put_bytes("req-7", "image", 0, b"late-night", "png")
+            [many] = adapter.put_many("req-8", [UploadItem(media_type="gif", index=0, data=b"gif", extension="gif")])
+
+        self.assertIn("/2026/03/01/req-7/", url)
+        self.assertTrue(adapter.wait(url, timeout=5))
+        self.assertEqual(Path(url).read_bytes(), b"late-night")
+        self.assertTrue(adapter.wait(many, timeout=5))
+        self.assertEqual(Path(many).read_bytes(), b"gif")
+
+    def test_shutdown_without_wait_fails_unfinished_writes(self) -> None:
+        adapter = self._adapter(fsync="batch", io_workers=1)
+        gate = threading.Event()
+        self.addCleanup(gate.set)
+        adapter._executor.submit(gate.wait, 5)
+        url = adapter.put_bytes("req-9", "image", 0, b"queued", "png")
+
+        adapter.shutdown(wait=False)
+
+        with self.assertRaises(RuntimeError):
+            adapter.wait(url, timeout=1)
+        gate.set()
+
+    def test_env_selects_write_behind_backend(self) -> None:
+        env = {
+            "OMNI_MEDIA_STORAGE_BACKEND": "write_behind",
+            "OMNI_MEDIA_STORAGE_DIR": self.tmp.name,
+            "OMNI_MEDIA_STORAGE_FSYNC": "none",
+        }
+        with mock.patch.dict(os.environ, env):
+            adapter = create_storage_from_env()
+        self.addCleanup(adapter.shutdown)
+
+        self.assertIsInstance(adapter, WriteBehindFileStorageAdapter)
+        self.assertEqual(adapter.fsync, "none")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,420 @@
+from __future__ import annotations
+
+import importlib
+import io
+import os
+import re
+import shutil
+import subprocess
+import tempfile
+import threading
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Iterable, Protocol
+
+from .contracts import FrameBuffer
+
+_CHUNK_SIZE = 64 * 1024
+_VIDEO_STREAM = re.compile(r"Stream #\d+:\d+.*?: Video: (.+)")
+
+
+class VideoEncoderError(RuntimeError):
+    pass
+
+
+class ChunkSink(Protocol):
+    def write(self, chunk: bytes) -> Any:
+        ...
+
+
+class BytesSink:
+    def __init__(self) -> None:
+        self._buffer = io.BytesIO()
+
+    def write(self, chunk: bytes) -> int:
+        return self._buffer.write(chunk)
+
+    def getvalue(self) -> bytes:
+        return self._buffer.getvalue()
+
+
+def find_ffmpeg() -> str:
+    try:
+        return str(importlib.import_module("imageio_ffmpeg").get_ffmpeg_exe())
+    except Exception:
+        pass
+    exe = shutil.which("ffmpeg")
+    if not exe:
+        raise VideoEncoderError("ffmpeg is required for video encoding (install imageio-ffmpeg or ffmpeg)")
+    return exe
+
+
+@dataclass(slots=True)
+class EncoderSettings:
+    codec: str = "libx264"
+    crf: int | None = 23
+    preset: str | None = "veryfast"
+    threads: int = 0
+    pixel_format: str = "yuv420p"
+    bitrate: int | None = None
+    extra_args: list[str] = field(default_factory=list)
+
+    @classmethod
+    def from_env(cls) -> "EncoderSettings":
+        return cls(
+            codec=str(os.getenv("OMNI_MEDIA_VIDEO_CODEC", "libx264")).strip() or "libx264",
+            crf=int(os.getenv("OMNI_MEDIA_VIDEO_CRF", "23")),
+            preset=str(os.getenv("OMNI_MEDIA_VIDEO_PRESET", "veryfast")).strip() or None,
+            threads=int(os.getenv("OMNI_MEDIA_VIDEO_THREADS", "0")),
+        )
+
+    def codec_signature(self) -> tuple[str, str]:
+        return self.codec, self.pixel_format
+
+    def output_args(self) -> list[str]:
+        args = ["-c:v", self.codec, "-pix_fmt", self.pixel_format]
+        if self.bitrate:
+            rate = int(self.bitrate)
+            args += ["-b:v", str(rate), "-maxrate", str(rate), "-bufsize", str(rate * 2)]
+        elif self.crf is not None:
+            args += ["-crf", str(int(self.crf))]
+        if self.preset:
+            args += ["-preset", self.preset]
+        if self.threads:
+            args += ["-threads", str(int(self.threads))]
+        return args + list(self.extra_args)
+
+
+@dataclass(slots=True)
+class EncodedSegment:
+    path: str
+    settings: EncoderSettings
+    width: int
+    height: int
+    fps: int
+    frame_count: int
+
+    def matches(self, other: "EncodedSegment") -> bool:
+        return (
+            self.settings.codec_signature() == other.settings.codec_signature()
+            and (self.width, self.height, self.fps) == (other.width, other.height, other.fps)
+        )
+
+
+def probe_video_stream(path: str | Path) -> tuple[str, ...] | None:
+    # ffmpeg prints the stream layout to stderr when given no output; the description covers codec,
+    # profile, pixel format, geometry, frame rate and timebase, which is what a stream copy relies on.
+    try:
+        result = subprocess.run(
+            [find_ffmpeg(), "-hide_banner", "-i", Path(path).as_posix()],
+            stdin=subprocess.DEVNULL,
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.PIPE,
+            timeout=30,
+        )
+    except (OSError, subprocess.TimeoutExpired):
+        return None
+    match = _VIDEO_STREAM.search(result.stderr.decode("utf-8", "replace"))
+    if match is None:
+        return None
+    # Bitrate differs per clip without affecting concat compatibility.
+    parts = match.group(1).removesuffix(" (default)").strip().split(", ")
+    return tuple(part for part in parts if not part.endswith("kb/s"))
+
+
+def _stream_size(stream: tuple[str, ...] | None) -> tuple[int, int] | None:
+    for part in stream or ():
+        match = re.match(r"(\d+)x(\d+)", part)
+        if match:
+            return int(match.group(1)), int(match.group(2))
+    return None
+
+
+def _container_args(target: str | Path | ChunkSink) -> tuple[list[str], str | None]:
+    if isinstance(target, (str, Path)):
+        final = Path(target)
+        final.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = final.with_name(f".{final.name}.{os.getpid()}.{threading.get_ident()}.part")
+        return ["-movflags", "+faststart", "-f", "mp4", tmp_path.as_posix()], tmp_path.as_posix()
+    return ["-movflags", "frag_keyframe+empty_moov+default_base_moof", "-f", "mp4", "pipe:1"], None
+
+
+class _FfmpegProcess:
+    def __init__(self, args: list[str], target: str | Path | ChunkSink, stdin: bool) -> None:
+        container_args, self._tmp_path = _container_args(target)
+        self._target = target
+        self._sink = None if isinstance(target, (str, Path)) else target
+        self._stderr = tempfile.TemporaryFile()
+        self.process = subprocess.Popen(
+            [find_ffmpeg(), "-hide_banner", "-loglevel", "error", "-y", *args, *container_args],
+            stdin=subprocess.PIPE if stdin else subprocess.DEVNULL,
+            stdout=subprocess.PIPE if self._sink is not None else subprocess.DEVNULL,
+            stderr=self._stderr,
+        )
+        self.bytes_written = 0
+        self._reader: threading.Thread | None = None
+        if self._sink is not None:
+            self._reader = threading.Thread(target=self._pump, daemon=True)
+            self._reader.start()
+
+    def _pump(self) -> None:
+        assert self.process.stdout is not None and self._sink is not None
+        while True:
+            chunk = self.process.stdout.read(_CHUNK_SIZE)
+            if not chunk:
+                break
+            self.bytes_written += len(chunk)
+            self._sink.write(chunk)
+
+    def finish(self) -> None:
+        if self.process.stdin is not None:
+            try:
+                self.process.stdin.close()
+            except BrokenPipeError:
+                pass
+        code, message = self._reap()
+        if code != 0:
+            self._discard_tmp()
+            raise VideoEncoderError(f"ffmpeg exited with {code}: {message[-500:]}")
+        if self._tmp_path is not None:
+            os.replace(self._tmp_path, Path(self._target))  # type: ignore[arg-type]
+            self.bytes_written = Path(self._target).stat().st_size  # type: ignore[arg-type]
+
+    def fail(self, exc: OSError) -> VideoEncoderError:
+        # ffmpeg stopped reading stdin, usually because it exited on bad arguments; reap it and report why.
+        self._close_pipes()
+        code, message = self._reap()
+        self._discard_tmp()
+        return VideoEncoderError(f"ffmpeg stopped reading frames ({exc}), exited with {code}: {message[-500:]}")
+
+    def _reap(self) -> tuple[int, str]:
+        code = self.process.wait()
+        if self._reader is not None:
+            self._reader.join()
+        self._close_pipes()
+        self._stderr.seek(0)
+        message = self._stderr.read().decode("utf-8", errors="replace").strip()
+        self._stderr.close()
+        return code, message
+
+    def abort(self) -> None:
+        self.process.kill()
+        self.process.wait()
+        if self._reader is not None:
+            self._reader.join()
+        self._close_pipes()
+        self._stderr.close()
+        self._discard_tmp()
+
+    def _close_pipes(self) -> None:
+        for pipe in (self.process.stdin, self.process.stdout):
+            if pipe is not None:
+                try:
+                    pipe.close()
+                except OSError:
+                    pass
+
+    def _discard_tmp(self) -> None:
+        if self._tmp_path is not None:
+            try:
+                os.unlink(self._tmp_path)
+            except FileNotFoundError:
+                pass
+
+
+class StreamingVideoWriter:
+    def __init__(
+        self,
+        target: str | Path | ChunkSink,
+        width: int,
+        height: int,
+        fps: int,
+        settings: EncoderSettings | None = None,
+        channels: int = 3,
+    ) -> None:
+        if channels not in {1, 3, 4}:
+            raise ValueError(f"unsupported channel count: {channels}")
+        self.target = target
+        self.width = int(width)
+        self.height = int(height)
+        self.fps = max(1, int(fps))
+        self.channels = int(channels)
+        self.settings = settings or EncoderSettings.from_env()
+        self.frame_count = 0
+        self._frame_bytes = self.width * self.height * self.channels
+        self._process: _FfmpegProcess | None = None
+
+    def _open(self) -> _FfmpegProcess:
+        pixel_in = {1: "gray", 3: "rgb24", 4: "rgba"}[self.channels]
+        args = [
+            "-f", "rawvideo",
+            "-pix_fmt", pixel_in,
+            "-s", f"{self.width}x{self.height}",
+            "-r", str(self.fps),
+            "-i", "pipe:0",
+        ]
+        if self.width % 2 or self.height % 2:
+            args += ["-vf", "pad=ceil(iw/2)*2:ceil(ih/2)*2"]
+        return _FfmpegProcess(args + self.settings.output_args(), self.target, stdin=True)
+
+    def write(self, frame: Any) -> None:
+        if self._process is None:
+            self._process = self._open()
+        data = frame if isinstance(frame, (bytes, bytearray)) else memoryview(frame)
+        if isinstance(data, memoryview):
+            data = data.cast("B") if data.c_contiguous else memoryview(frame.tobytes())
+        if len(data) != self._frame_bytes:
+            raise ValueError(f"frame has {len(data)} bytes, expected {self._frame_bytes}")
+        assert self._process.process.stdin is not None
+        try:
+            self._process.process.stdin.write(data)
+        except OSError as exc:
+            process, self._process = self._process, None
+            raise process.fail(exc) from exc
+        self.frame_count += 1
+
+    def write_frames(self, frames: Iterable[Any]) -> None:
+        for frame in frames:
+            self.write(frame)
+
+    def close(self) -> EncodedSegment | None:
+        if self._process is None:
+            return None
+        process, self._process = self._process, None
+        process.finish()
+        return EncodedSegment(
+            path=str(self.target) if isinstance(self.target, (str, Path)) else "",
+            settings=self.settings,
+            width=self.width,
+            height=self.height,
+            fps=self.fps,
+            frame_count=self.frame_count,
+        )
+
+    def abort(self) -> None:
+        if self._process is not None:
+            process, self._process = self._process, None
+            process.abort()
+
+    def __enter__(self) -> "StreamingVideoWriter":
+        return self
+
+    def __exit__(self, exc_type, _exc, _tb) -> None:
+        if exc_type is not None:
+            self.abort()
+        else:
+            self.close()
+
+
+def encode_frame_buffer(
+    buffer: FrameBuffer,
+    target: str | Path | ChunkSink,
+    settings: EncoderSettings | None = None,
+) -> EncodedSegment | None:
+    with StreamingVideoWriter(
+        target,
+        width=buffer.width,
+        height=buffer.height,
+        fps=buffer.fps,
+        settings=settings,
+        channels=buffer.channels,
+    ) as writer:
+        writer.write_frames(buffer)
+    return EncodedSegment(
+        path=str(target) if isinstance(target, (str, Path)) else "",
+        settings=writer.settings,
+        width=buffer.width,
+        height=buffer.height,
+        fps=buffer.fps,
+        frame_count=len(buffer),
+    )
+
+
+def transcode(
+    source: str | Path,
+    target: str | Path | ChunkSink,
+    settings: EncoderSettings | None = None,
+    max_side: int | None = None,
+    fps: float | None = None,
+    duration_sec: float | None = None,
+) -> None:
+    filters = []
+    if fps:
+        filters.append(f"fps={float(fps):g}")
+    if max_side:
+        side = int(max_side)
+        filters.append(f"scale='min({side},iw)':'min({side},ih)':force_original_aspect_ratio=decrease")
+        filters.append("pad=ceil(iw/2)*2:ceil(ih/2)*2")
+    args = ["-i", Path(source).as_posix(), "-an"]
+    if duration_sec:
+        args += ["-t", f"{float(duration_sec):.3f}"]
+    if filters:
+        args += ["-vf", ",".join(filters)]
+    _FfmpegProcess([*args, *(settings or EncoderSettings.from_env()).output_args()], target, stdin=False).finish()
+
+
+def concat_segments(
+    segments: list[EncodedSegment | str],
+    target: str | Path | ChunkSink,
+    settings: EncoderSettings | None = None,
+    stream_copy: bool | None = None,
+) -> str:
+    if not segments:
+        raise ValueError("at least one segment is required")
+
+    paths = [segment.path if isinstance(segment, EncodedSegment) else str(segment) for segment in segments]
+    known = [segment for segment in segments if isinstance(segment, EncodedSegment)]
+    bare = len(known) < len(segments)
+    streams: list[tuple[str, ...] | None] = []
+    if stream_copy is None:
+        # The concat demuxer copies packets blindly, so only skip the re-encode when every
+        # segment is known to share codec, pixel format, geometry and frame rate.
+        if not bare:
+            stream_copy = all(known[0].matches(segment) for segment in known[1:])
+        else:
+            # Bare paths carry no encoder settings, so compare what ffmpeg reports for each file.
+            streams = [probe_video_stream(path) for path in paths]
+            stream_copy = streams[0] is not None and all(stream == streams[0] for stream in streams[1:])
+
+    if stream_copy:
+        with tempfile.TemporaryDirectory(prefix="omni-concat-") as tmp:
+            list_path = Path(tmp) / "segments.txt"
+            list_path.write_text(
+                "".join("file '{}'\n".format(Path(path).resolve().as_posix().replace("'", "'\\''")) for path in paths),
+                encoding="utf-8",
+            )
+            concat_input = ["-f", "concat", "-safe", "0", "-i", list_path.as_posix()]
+            _FfmpegProcess([*concat_input, "-c", "copy"], target, stdin=False).finish()
+        return "copy"
+
+    # The concat demuxer keeps decoding with the first segment's codec, so mismatched segments go
+    # through the concat filter instead, each scaled to the first segment's geometry.
+    if isinstance(segments[0], EncodedSegment):
+        size = (segments[0].width, segments[0].height)
+    else:
+        size = _stream_size(streams[0] if streams else probe_video_stream(paths[0]))
+    scale = f"scale={size[0]}:{size[1]}," if size else ""
+    inputs = [arg for path in paths for arg in ("-i", Path(path).resolve().as_posix())]
+    graph = "".join(f"[{index}:v]{scale}setsar=1[v{index}];" for index in range(len(paths)))
+    graph += "".join(f"[v{index}]" for index in range(len(paths))) + f"concat=n={len(paths)}:v=1:a=0[out]"
+    encoder = settings or EncoderSettings.from_env()
+    _FfmpegProcess(
+        [*inputs, "-filter_complex", graph, "-map", "[out]", *encoder.output_args()], target, stdin=False
+    ).finish()
+    return "reencode"
+
+
+def concat_mp4_bytes(
+    clips: list[bytes],
+    settings: EncoderSettings | None = None,
+    stream_copy: bool | None = None,
+) -> bytes:
+    with tempfile.TemporaryDirectory(prefix="omni-scenes-") as tmp:
+        paths = []
+        for index, clip in enumerate(clips):
+            path = Path(tmp) / f"scene_{index:03d}.mp4"
+            path.write_bytes(clip)
+            paths.append(path.as_posix())
+        output = Path(tmp) / "merged.mp4"
+        concat_segments(paths, output, settings=settings, stream_copy=stream_copy)
+        return output.read_bytes()
@@ -1,15 +1,67 @@
 from __future__ import annotations
 
+import itertools
 import math
+import os
 import re
-from dataclasses import dataclass
-
-
-_SCENE_SPLIT_PATTERN = re.compile(r"(?:\n\s*scene\s*\d+[:\-]|\n\s*\d+[\)\.]\s+|\n\s*[-*]\s+|\s+then\s+|\s+next\s+|\s+cut\s+to\s+)", re.IGNORECASE)
-_SCENE_MARKER_PATTERN = re.compile(r"\bscene\s*\d+\s*[:\-]", re.IGNORECASE)
-
-
-@dataclass(slots=True)
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass, field, replace
+from typing import Any, Iterable
+
+
+# Splitting on a capturing word pattern yields [sep, word, sep, word, ..., sep] in one scan; every
+# planner feature below is read off that token stream instead of rescanning the prompt.
+_LEXER = re.compile(r"(\w+)")
+_GROUNDING_PATTERN = re.compile(r"\b[a-zA-Z][a-zA-Z'-]{2,}\b")
+_GROUNDING_STOP = frozenset(
+    {
+        "the", "and", "with", "into", "from", "that", "this", "then", "next", "scene", "video",
+        "make", "create", "generate", "show", "shot", "shots", "camera", "style", "motion", "slow",
+        "fast", "for", "of", "in", "on", "at", "to", "a", "an",
+    }
+)
+_SPLIT_WORDS = frozenset({"then", "next", "cut"})
+
+# Checked in priority order; "{s}" is optional whitespace, "{h}" an optional hyphen or space and
+# "{a}" an optional apostrophe, so e.g. "close up" and "closeup" both count.
+_FEATURE_PHRASES = (
+    ("style", "cinematic", ("cinematic", "film", "movie", "dramatic", "epic", "anamorphic")),
+    ("style", "stylized", ("anime", "cartoon", "pixar", "stylized", "illustrated")),
+    ("style", "noir", ("noir", "monochrome", "black{s}and{s}white", "gritty")),
+    ("style", "neon", ("neon", "cyberpunk", "sci{h}fi", "futuristic")),
+    ("motion", "slow", ("slow{s}motion", "slow-mo", "dramatic{s}slow")),
+    ("motion", "fast", ("fast", "action", "chase", "dynamic", "high{s}energy")),
+    ("camera", "aerial", ("aerial", "drone", "overhead", "bird{a}s{s}eye")),
+    ("camera", "close-up", ("close{s}up", "macro", "portrait")),
+    ("camera", "wide", ("wide", "landscape", "establishing{s}shot")),
+)
+_FEATURE_JOINERS = {"{s}": ("", " "), "{h}": ("", "-", " "), "{a}": ("", "'")}
+_FEATURE_DEFAULTS = {"style": "natural", "motion": "normal", "camera": "standard"}
+
+
+def _compile_features() -> tuple[tuple[str, str, frozenset[str], tuple[tuple[list[str], list[str]], ...]], ...]:
+    compiled = []
+    for kind, value, phrases in _FEATURE_PHRASES:
+        singles: set[str] = set()
+        sequences: list[tuple[list[str], list[str]]] = []
+        for phrase in phrases:
+            pieces = re.split(r"(\{[sha]\})", phrase)
+            for joiners in itertools.product(*(_FEATURE_JOINERS[piece] for piece in pieces[1::2])):
+                text = pieces[0] + "".join(joiner + piece for joiner, piece in zip(joiners, pieces[2::2]))
+                parts = _LEXER.split(text)
+                if len(parts) == 3:
+                    singles.add(parts[1])
+                else:
+                    sequences.append((parts[1::2], parts[2:-1:2]))
+        compiled.append((kind, value, frozenset(singles), tuple(sequences)))
+    return tuple(compiled)
+
+
+_FEATURES = _compile_features()
+
+
+@dataclass(slots=True, frozen=True)
 class SceneSpec:
     index: int
     text: str
@@ -22,7 +74,7 @@ class SceneSpec:
     end_frame: int = 0
 
 
-@dataclass(slots=True)
+@dataclass(slots=True, frozen=True)
 class VideoPromptPlan:
     original_prompt: str
     normalized_prompt: str
@@ -33,8 +85,8 @@ class VideoPromptPlan:
     style_preset: str
     motion_profile: str
     camera_profile: str
-    scenes: list[SceneSpec]
-    grounding_tokens: list[str]
+    scenes: tuple[SceneSpec, ...]
+    grounding_tokens: tuple[str, ...]
     grounding_score: float
 
     def to_metadata(self) -> dict[str, object]:
@@ -47,7 +99,7 @@ class VideoPromptPlan:
             "style_preset": self.style_preset,
             "motion_profile": self.motion_profile,
             "camera_profile": self.camera_profile,
-            "grounding_tokens": self.grounding_tokens,
+            "grounding_tokens": list(self.grounding_tokens),
             "grounding_score": round(self.grounding_score, 3),
             "scene_plan": [
                 {
@@ -66,7 +118,7 @@ class VideoPromptPlan:
         }
 
 
-@dataclass(slots=True)
+@dataclass(slots=True, frozen=True)
 class VideoGenerationSpec:
     prompt: str
     fps: int
@@ -74,98 +126,273 @@ class VideoGenerationSpec:
     style_preset: str
     motion_profile: str
     camera_profile: str
-    metadata: dict[str, object]
+    plan: VideoPromptPlan
+
+    @property
+    def metadata(self) -> dict[str, object]:
+        # Specs are shared through the plan cache, so callers always get their own copy.
+        metadata = self.plan.to_metadata()
+        metadata["compiled_prompt_preview"] = self.prompt[:700]
+        return metadata
 
 
 def _normalize_prompt(prompt: str) -> str:
-    text = str(prompt or "").strip()
-    text = re.sub(r"\s+", " ", text)
-    return text
-
-
-def _infer_style_profile(prompt: str) -> tuple[str, str, str]:
-    lower = prompt.lower()
-
-    style = "natural"
-    if re.search(r"\b(cinematic|film|movie|dramatic|epic|anamorphic)\b", lower):
-        style = "cinematic"
-    elif re.search(r"\b(anime|cartoon|pixar|stylized|illustrated)\b", lower):
-        style = "stylized"
-    elif re.search(r"\b(noir|monochrome|black\s*and\s*white|gritty)\b", lower):
-        style = "noir"
-    elif re.search(r"\b(neon|cyberpunk|sci[-\s]?fi|futuristic)\b", lower):
-        style = "neon"
-
-    motion = "normal"
-    if re.search(r"\b(slow\s*motion|slow-mo|dramatic\s*slow)\b", lower):
-        motion = "slow"
-    elif re.search(r"\b(fast|action|chase|dynamic|high\s*energy)\b", lower):
-        motion = "fast"
-
-    camera = "standard"
-    if re.search(r"\b(aerial|drone|overhead|bird'?s\s*eye)\b", lower):
-        camera = "aerial"
-    elif re.search(r"\b(close\s*up|macro|portrait)\b", lower):
-        camera = "close-up"
-    elif re.search(r"\b(wide|landscape|establishing\s*shot)\b", lower):
-        camera = "wide"
-
-    return style, motion, camera
-
-
-def _extract_grounding_tokens(prompt: str) -> list[str]:
-    candidates = re.findall(r"\b[a-zA-Z][a-zA-Z'-]{2,}\b", prompt.lower())
-    stop = {
-        "the", "and", "with", "into", "from", "that", "this", "then", "next", "scene", "video",
-        "make", "create", "generate", "show", "shot", "shots", "camera", "style", "motion", "slow",
-        "fast", "for", "of", "in", "on", "at", "to", "a", "an",
-    }
-    unique: list[str] = []
-    for token in candidates:
-        if token in stop:
+    return " ".join(str(prompt or "").split())
+
+
+@dataclass(slots=True)
+class _PromptLexemes:
+    source: str
+    words: list[str]
+    seps: list[str]
+    word_count: int
+    style: str
+    motion: str
+    camera: str
+    grounding: list[tuple[str, int, int]]
+    scene_texts: list[str] = field(default_factory=list)
+    # Raw spans of the prompt kept in scene_texts; None when the scenes cover the whole prompt.
+    scene_spans: list[tuple[int, int]] | None = None
+    _starts: list[int] | None = None
+
+    def starts(self) -> list[int]:
+        # Character offset of every token, built only for prompts that actually need positions.
+        if self._starts is None:
+            parts = [""] * (len(self.words) + len(self.seps))
+            parts[0::2] = self.seps
+            parts[1::2] = self.words
+            self._starts = [0, *itertools.accumulate(map(len, parts))]
+        return self._starts
+
+    def word_span(self, index: int) -> tuple[int, int]:
+        starts = self.starts()
+        return starts[2 * index + 1], starts[2 * index + 2]
+
+
+def _has_sequence(words: list[str], seps: list[str], vocab: set[str], sequence: tuple[list[str], list[str]]) -> bool:
+    phrase, joiners = sequence
+    if not vocab.issuperset(phrase):
+        return False
+    width = len(phrase)
+    index = -1
+    while True:
+        try:
+            index = words.index(phrase[0], index + 1)
+        except ValueError:
+            return False
+        if words[index : index + width] == phrase and seps[index + 1 : index + width] == joiners:
+            return True
+
+
+def _match_features(words: list[str], seps: list[str], vocab: set[str]) -> dict[str, str]:
+    profile: dict[str, str] = {}
+    for kind, value, singles, sequences in _FEATURES:
+        if kind in profile:
             continue
-        if token not in unique:
-            unique.append(token)
-        if len(unique) >= 12:
-            break
+        if not singles.isdisjoint(vocab) or any(_has_sequence(words, seps, vocab, seq) for seq in sequences):
+            profile[kind] = value
+    return {**_FEATURE_DEFAULTS, **profile}
+
+
+def _grounding_candidates(words: list[str], seps: list[str]) -> list[tuple[str, int, int]]:
+    # Grounding tokens may span apostrophes and hyphens ("bird's", "x-ray"), so adjacent words joined
+    # only by those are scanned as one run. Returns (token, word index, char offset into the run).
+    unique: list[tuple[str, int, int]] = []
+    seen: set[str] = set()
+    count = len(words)
+    index = 0
+    while index < count and len(unique) < 12:
+        last = index
+        while last + 1 < count and seps[last + 1] and not seps[last + 1].strip("'-"):
+            last += 1
+        if last == index:
+            run = words[index]
+            if run.isascii() and run.isalpha():
+                matches = [(run, 0)] if len(run) >= 3 else []
+            else:
+                matches = [(match.group(), match.start()) for match in _GROUNDING_PATTERN.finditer(run)]
+        else:
+            run = words[index] + "".join(seps[pos] + words[pos] for pos in range(index + 1, last + 1))
+            matches = [(match.group(), match.start()) for match in _GROUNDING_PATTERN.finditer(run)]
+        for token, offset in matches:
+            if token in _GROUNDING_STOP or token in seen:
+                continue
+            seen.add(token)
+            unique.append((token, index, offset))
+            if len(unique) >= 12:
+                break
+        index = last + 1
     return unique
 
 
-def _split_scenes(prompt: str) -> list[str]:
-    markers = list(_SCENE_MARKER_PATTERN.finditer(prompt))
-    if markers:
-        parts: list[str] = []
-        for index, marker in enumerate(markers):
-            start = marker.end()
-            end = markers[index + 1].start() if index + 1 < len(markers) else len(prompt)
-            chunk = prompt[start:end].strip(" ,.-")
-            if chunk:
-                parts.append(chunk)
-        if parts:
-            return parts[:8]
-
-    chunks = [part.strip(" ,.-") for part in _SCENE_SPLIT_PATTERN.split(prompt) if part and part.strip(" ,.-")]
+def _word_positions(words: list[str], targets: Iterable[str]) -> list[int]:
+    # list.index runs in C, which beats a Python loop over every word of a long storyboard.
+    positions: list[int] = []
+    for target in targets:
+        index = -1
+        while True:
+            try:
+                index = words.index(target, index + 1)
+            except ValueError:
+                break
+            positions.append(index)
+    return sorted(positions)
+
+
+def _scene_markers(lexemes: _PromptLexemes) -> list[tuple[int, int]]:
+    # "scene 2:" / "Scene2 -" style headings: the word "scene", optional whitespace, digits and a colon or dash.
+    words, seps = lexemes.words, lexemes.seps
+    if lexemes.source.count("scene") == words.count("scene"):
+        candidates = _word_positions(words, ("scene",))
+    else:
+        candidates = [index for index, word in enumerate(words) if word.startswith("scene")]
+    starts = lexemes.starts()
+    markers: list[tuple[int, int]] = []
+    for index in candidates:
+        word = words[index]
+        if word == "scene":
+            digits = index + 1
+            if digits >= len(words) or not seps[digits].isspace() or not words[digits].isdecimal():
+                continue
+        elif word[5:].isdecimal():
+            digits = index
+        else:
+            continue
+        tail = seps[digits + 1]
+        gap = len(tail) - len(tail.lstrip())
+        if tail[gap : gap + 1] not in (":", "-"):
+            continue
+        markers.append((starts[2 * index + 1], starts[2 * digits + 2] + gap + 1))
+    return markers
+
+
+def _scene_cuts(lexemes: _PromptLexemes) -> list[tuple[int, int]]:
+    # Whitespace-delimited "then", "next" and "cut to"; each cut swallows the whitespace around it.
+    words, seps = lexemes.words, lexemes.seps
+    cuts: list[tuple[int, int]] = []
+    consumed = 0
+    for index in _word_positions(words, _SPLIT_WORDS):
+        word = words[index]
+        last = index
+        if word == "cut":
+            last = index + 1
+            if last >= len(words) or words[last] != "to" or not seps[last].isspace():
+                continue
+        before, after = seps[index], seps[last + 1]
+        if not after[:1].isspace():
+            continue
+        word_start = lexemes.word_span(index)[0]
+        start = max(word_start - (len(before) - len(before.rstrip())), consumed)
+        if start >= word_start:
+            continue
+        consumed = lexemes.word_span(last)[1] + len(after) - len(after.lstrip())
+        cuts.append((start, consumed))
+    return cuts
+
+
+def _split_scenes(lexemes: _PromptLexemes, prompt: str) -> None:
+    lowered = lexemes.source
+    if "scene" in lowered:
+        markers = _scene_markers(lexemes)
+        spans = [
+            (marker[1], markers[index + 1][0] if index + 1 < len(markers) else len(prompt))
+            for index, marker in enumerate(markers)
+        ]
+        kept = [(span, prompt[span[0] : span[1]].strip(" ,.-")) for span in spans]
+        kept = [(span, text) for span, text in kept if text][:8]
+        if kept:
+            lexemes.scene_spans = [span for span, _ in kept]
+            lexemes.scene_texts = [text for _, text in kept]
+            return
+
+    cuts = _scene_cuts(lexemes) if any(word in lowered for word in _SPLIT_WORDS) else []
+    if not cuts:
+        chunk = prompt.strip(" ,.-")
+        lexemes.scene_texts = [chunk or prompt]
+        return
+
+    bounds = [0, *itertools.chain.from_iterable(cuts), len(prompt)]
+    chunks = [
+        ((start, end), prompt[start:end].strip(" ,.-"))
+        for start, end in zip(bounds[0::2], bounds[1::2])
+    ]
+    chunks = [(span, text) for span, text in chunks if text]
     if not chunks:
-        return [prompt]
+        lexemes.scene_texts = [prompt]
+        return
     if len(chunks) == 1:
-        return chunks
-
-    merged: list[str] = []
-    for chunk in chunks:
-        if len(chunk.split()) < 4 and merged:
-            merged[-1] = f"{merged[-1]}, {chunk}".strip()
+        lexemes.scene_spans = [chunks[0][0]]
+        lexemes.scene_texts = [chunks[0][1]]
+        return
+
+    groups: list[tuple[list[tuple[int, int]], str]] = []
+    for span, text in chunks:
+        if len(text.split()) < 4 and groups:
+            groups[-1][0].append(span)
+            groups[-1] = (groups[-1][0], f"{groups[-1][1]}, {text}".strip())
         else:
-            merged.append(chunk)
-    return merged[:8]
+            groups.append(([span], text))
+    groups = groups[:8]
+    lexemes.scene_spans = [span for spans, _ in groups for span in spans]
+    lexemes.scene_texts = [text for _, text in groups]
+
+
+def _lex_prompt(prompt: str) -> _PromptLexemes:
+    lowered = prompt.lower()
+    starts = None
+    if len(lowered) == len(prompt):
+        parts = _LEXER.split(lowered)
+        words = parts[1::2]
+    else:
+        # A few characters lowercase to more than one code point; lex the original so offsets line up.
+        parts = _LEXER.split(prompt)
+        words = [word.lower() for word in parts[1::2]]
+        starts = [0, *itertools.accumulate(map(len, parts))]
+    seps = parts[0::2]
+    profile = _match_features(words, seps, set(words))
+    lexemes = _PromptLexemes(
+        source=lowered,
+        words=words,
+        seps=seps,
+        word_count=len(words),
+        style=profile["style"],
+        motion=profile["motion"],
+        camera=profile["camera"],
+        grounding=_grounding_candidates(words, seps),
+        _starts=starts,
+    )
+    _split_scenes(lexemes, prompt)
+    return lexemes
+
+
+def _grounding_hits(lexemes: _PromptLexemes, scenes: list[SceneSpec]) -> int:
+    if lexemes.scene_spans is None:
+        return len(lexemes.grounding)
+    hits = 0
+    compiled_text: str | None = None
+    for token, index, offset in lexemes.grounding:
+        start = lexemes.word_span(index)[0] + offset
+        end = start + len(token)
+        if not token[-1].isalpha():
+            # A trailing "-" right before the next heading is stripped from the scene text.
+            end += 1
+        if any(low <= start and end <= high for low, high in lexemes.scene_spans):
+            hits += 1
+            continue
+        # Not inside a kept scene, but it may still appear elsewhere in the shot prompts.
+        if compiled_text is None:
+            compiled_text = " ".join(scene.shot_prompt.lower() for scene in scenes)
+        if token in compiled_text:
+            hits += 1
+    return hits
 
 
-def _estimate_duration_sec(prompt: str, scene_count: int) -> float:
-    words = len(re.findall(r"\b\w+\b", prompt))
-    if words <= 12:
+def _estimate_duration_sec(word_count: int, scene_count: int) -> float:
+    if word_count <= 12:
         base = 5.0
-    elif words <= 40:
+    elif word_count <= 40:
         base = 10.0
-    elif words <= 100:
+    elif word_count <= 100:
         base = 18.0
     else:
         base = 28.0
@@ -206,43 +433,49 @@ def _compile_shot_prompt(scene_text: str, style: str, motion: str, camera: str)
     )
 
 
-def _allocate_scene_frames(per_scene_duration: list[float], fps: int, total_frames: int) -> list[int]:
-    if not per_scene_duration:
+def _allocate_scene_frames(per_scene_duration: list[float], total_frames: int) -> list[int]:
+    # Largest-remainder apportionment: floor every scene's exact share of the frames, then give the
+    # frames lost to flooring to the largest fractional remainders (earlier scenes win ties).
+    count = len(per_scene_duration)
+    if not count:
         return []
-
-    allocations = [max(1, int(round(duration * fps))) for duration in per_scene_duration]
-    frame_delta = int(total_frames - sum(allocations))
-
-    if frame_delta > 0:
-        index = 0
-        while frame_delta > 0:
-            allocations[index % len(allocations)] += 1
-            frame_delta -= 1
-            index += 1
-    elif frame_delta < 0:
-        index = 0
-        while frame_delta < 0 and any(value > 1 for value in allocations):
-            slot = index % len(allocations)
-            if allocations[slot] > 1:
-                allocations[slot] -= 1
-                frame_delta += 1
-            index += 1
-
+    if total_frames <= count:
+        return [1] * count
+
+    weights = [max(0.0, float(duration)) for duration in per_scene_duration]
+    weight_total = sum(weights)
+    if weight_total <= 0:
+        weights, weight_total = [1.0] * count, float(count)
+    quotas = [total_frames * weight / weight_total for weight in weights]
+    allocations = [int(quota) for quota in quotas]
+    leftover = total_frames - sum(allocations)
+    for index in sorted(range(count), key=lambda slot: allocations[slot] - quotas[slot])[:leftover]:
+        allocations[index] += 1
+
+    # Every scene keeps at least one frame, borrowed from the longest scene.
+    for index in [slot for slot, value in enumerate(allocations) if value < 1]:
+        donor = max(range(count), key=allocations.__getitem__)
+        allocations[donor] -= 1
+        allocations[index] = 1
     return allocations
 
 
 def build_video_prompt_plan(prompt: str) -> VideoPromptPlan:
-    normalized = _normalize_prompt(prompt)
+    return _build_plan(prompt, _normalize_prompt(prompt))
+
+
+def _build_plan(prompt: str, normalized: str) -> VideoPromptPlan:
     if not normalized:
         raise ValueError("prompt is required")
 
-    style, motion, camera = _infer_style_profile(normalized)
-    scene_texts = _split_scenes(normalized)
-    duration_sec = _estimate_duration_sec(normalized, len(scene_texts))
+    lexemes = _lex_prompt(normalized)
+    style, motion, camera = lexemes.style, lexemes.motion, lexemes.camera
+    scene_texts = lexemes.scene_texts
+    duration_sec = _estimate_duration_sec(lexemes.word_count, len(scene_texts))
     per_scene = _duration_distribution(duration_sec, len(scene_texts))
     fps = 10 if motion == "slow" else 16 if motion == "fast" else 12
     total_frames = max(16, int(round(duration_sec * fps)))
-    frame_allocations = _allocate_scene_frames(per_scene, fps, total_frames)
+    frame_allocations = _allocate_scene_frames(per_scene, total_frames)
 
     scenes: list[SceneSpec] = []
     cursor_frame = 0
@@ -268,9 +501,8 @@ def build_video_prompt_plan(prompt: str) -> VideoPromptPlan:
         )
         cursor_frame = end_frame + 1
 
-    grounding_tokens = _extract_grounding_tokens(normalized)
-    compiled_text = " ".join(scene.shot_prompt.lower() for scene in scenes)
-    hits = sum(1 for token in grounding_tokens if token in compiled_text)
+    grounding_tokens = [token for token, _, _ in lexemes.grounding]
+    hits = _grounding_hits(lexemes, scenes)
     grounding_score = (hits / len(grounding_tokens)) if grounding_tokens else 1.0
 
     return VideoPromptPlan(
@@ -283,14 +515,13 @@ def build_video_prompt_plan(prompt: str) -> VideoPromptPlan:
         style_preset=style,
         motion_profile=motion,
         camera_profile=camera,
-        scenes=scenes,
-        grounding_tokens=grounding_tokens,
+        scenes=tuple(scenes),
+        grounding_tokens=tuple(grounding_tokens),
         grounding_score=round(max(0.0, min(1.0, grounding_score)), 3),
     )
 
 
-def compile_video_generation_spec(prompt: str) -> VideoGenerationSpec:
-    plan = build_video_prompt_plan(prompt)
+def _build_generation_spec(plan: VideoPromptPlan) -> VideoGenerationSpec:
     scene_block = "\n".join([f"Scene {scene.index}: {scene.shot_prompt}" for scene in plan.scenes])
     compiled_prompt = (
         f"Create a video storyboard with {plan.scene_count} scenes. "
@@ -298,9 +529,6 @@ def compile_video_generation_spec(prompt: str) -> VideoGenerationSpec:
         f"{scene_block}"
     )
 
-    metadata = plan.to_metadata()
-    metadata["compiled_prompt_preview"] = compiled_prompt[:700]
-
     return VideoGenerationSpec(
         prompt=compiled_prompt,
         fps=plan.fps,
@@ -308,5 +536,68 @@ def compile_video_generation_spec(prompt: str) -> VideoGenerationSpec:
         style_preset=plan.style_preset,
         motion_profile=plan.motion_profile,
         camera_profile=plan.camera_profile,
-        metadata=metadata,
+        plan=plan,
     )
+
+
+class VideoPlanCache:
+    def __init__(self, max_entries: int = 1024) -> None:
+        self.max_entries = max(0, int(max_entries))
+        self._entries: OrderedDict[str, VideoGenerationSpec] = OrderedDict()
+        self._lock = threading.Lock()
+        self._stats = {"hits": 0, "misses": 0, "evictions": 0}
+
+    def get(self, prompt: str) -> VideoGenerationSpec:
+        key = _normalize_prompt(prompt)
+        with self._lock:
+            spec = self._entries.get(key)
+            if spec is not None:
+                self._entries.move_to_end(key)
+                self._stats["hits"] += 1
+        if spec is None:
+            spec = _build_generation_spec(_build_plan(prompt, key))
+            with self._lock:
+                self._stats["misses"] += 1
+                if self.max_entries:
+                    self._entries[key] = spec
+                    self._entries.move_to_end(key)
+                    while len(self._entries) > self.max_entries:
+                        self._entries.popitem(last=False)
+                        self._stats["evictions"] += 1
+        if spec.plan.original_prompt != str(prompt):
+            spec = replace(spec, plan=replace(spec.plan, original_prompt=str(prompt)))
+        return spec
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def snapshot(self) -> dict[str, Any]:
+        with self._lock:
+            lookups = self._stats["hits"] + self._stats["misses"]
+            return {
+                **self._stats,
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "hit_rate": round(self._stats["hits"] / lookups, 4) if lookups else None,
+            }
+
+
+_PLAN_CACHE = VideoPlanCache(max_entries=int(os.getenv("OMNI_MEDIA_PLANNER_CACHE_SIZE", "1024")))
+
+
+def compile_video_generation_spec(prompt: str) -> VideoGenerationSpec:
+    return _PLAN_CACHE.get(prompt)
+
+
+def video_spec_for(request: Any) -> VideoGenerationSpec:
+    # The first stage to plan a request attaches the spec so later stages and fallbacks reuse it.
+    spec = getattr(request, "video_plan", None)
+    if spec is None:
+        spec = compile_video_generation_spec(request.prompt)
+        request.video_plan = spec
+    return spec
+
+
+def planner_cache_stats() -> dict[str, Any]:
+    return _PLAN_CACHE.snapshot()
@@ -0,0 +1,136 @@
+from __future__ import annotations
+
+import os
+import threading
+import time
+from typing import Any
+
+from .pipeline import OmniMediaPipeline
+
+
+def _parse_bool_env(name: str, default: str) -> bool:
+    return str(os.getenv(name, default)).strip().lower() in {"1", "true", "yes", "on"}
+
+
+class ModelWarmup:
+    def __init__(
+        self,
+        pipeline: OmniMediaPipeline,
+        profile_keys: list[str] | None = None,
+        dummy_generation: bool = False,
+    ) -> None:
+        self.pipeline = pipeline
+        self.profile_keys = [key for key in (profile_keys or []) if key]
+        self.dummy_generation = bool(dummy_generation)
+        self._lock = threading.Lock()
+        self._done = threading.Event()
+        self._thread: threading.Thread | None = None
+        self._started_at: float | None = None
+        self._finished_at: float | None = None
+        self._profiles: dict[str, dict[str, Any]] = {
+            key: {"state": "pending", "load_ms": None, "dummy_ms": None, "error": None} for key in self.profile_keys
+        }
+        if not self.profile_keys:
+            self._done.set()
+
+    @classmethod
+    def from_env(cls, pipeline: OmniMediaPipeline) -> "ModelWarmup":
+        raw = str(os.getenv("OMNI_MEDIA_WARMUP_PROFILES", ""))
+        return cls(
+            pipeline,
+            profile_keys=[item.strip() for item in raw.split(",") if item.strip()],
+            dummy_generation=_parse_bool_env("OMNI_MEDIA_WARMUP_DUMMY_GENERATION", "false"),
+        )
+
+    def start(self) -> None:
+        if not self.profile_keys or self._thread is not None:
+            return
+        self._started_at = time.time()
+        self._thread = threading.Thread(target=self._run, name="omni-media-warmup", daemon=True)
+        self._thread.start()
+
+    def wait(self, timeout_sec: float | None = None) -> bool:
+        return self._done.wait(timeout=timeout_sec)
+
+    def _set(self, key: str, **values: Any) -> None:
+        with self._lock:
+            self._profiles[key].update(values)
+
+    def _dummy_generate(self, profile) -> None:
+        engine = self.pipeline.engine
+        if int(profile.max_frames) <= 1:
+            engine.generate_image(
+                profile=profile,
+                prompt="warmup",
+                width=256,
+                height=256,
+                num_images=1,
+                seed=0,
+                num_inference_steps=1,
+            )
+            return
+        engine.generate_video(
+            profile=profile,
+            prompt="warmup",
+            width=256,
+            height=256,
+            num_frames=2,
+            fps=2,
+            seed=0,
+            num_inference_steps=1,
+        )
+
+    def _run(self) -> None:
+        try:
+            for key in self.profile_keys:
+                self._set(key, state="loading")
+                try:
+                    profile = self.pipeline.registry.get(key)
+                    started = time.perf_counter()
+                    error = self.pipeline.engine.preload([profile]).get(key)
+                    if error:
+                        raise RuntimeError(error)
+                    self._set(key, load_ms=round((time.perf_counter() - started) * 1000, 2))
+
+                    if self.dummy_generation:
+                        self._set(key, state="compiling")
+                        started = time.perf_counter()
+                        self._dummy_generate(profile)
+                        self._set(key, dummy_ms=round((time.perf_counter() - started) * 1000, 2))
+
+                    self._set(key, state="ready")
+                except Exception as exc:
+                    self._set(key, state="failed", error=str(exc))
+        finally:
+            self._finished_at = time.time()
+            self._done.set()
+
+    def _resident(self, key: str) -> bool:
+        # The client pool may have evicted a warmed profile since (max_resident / memory budget too small
+        # for the warm set), in which case the first request pays the load again.
+        is_loaded = getattr(self.pipeline.engine, "is_loaded", None)
+        return not callable(is_loaded) or bool(is_loaded(key))
+
+    def is_ready(self) -> bool:
+        if not self._done.is_set():
+            return False
+        with self._lock:
+            keys = [key for key, item in self._profiles.items() if item["state"] == "ready"]
+            if len(keys) != len(self._profiles):
+                return False
+        return all(self._resident(key) for key in keys)
+
+    def snapshot(self) -> dict[str, Any]:
+        with self._lock:
+            profiles = {key: dict(value) for key, value in self._profiles.items()}
+        for key, item in profiles.items():
+            if item["state"] == "ready":
+                item["resident"] = self._resident(key)
+        return {
+            "ready": self.is_ready(),
+            "finished": self._done.is_set(),
+            "dummy_generation": self.dummy_generation,
+            "started_at": self._started_at,
+            "finished_at": self._finished_at,
+            "profiles": profiles,
+        }
@@ -0,0 +1,141 @@
+from __future__ import annotations
+
+import importlib
+import io
+import os
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any
+
+from .budget_encoder import decode_gif
+from .contracts import FrameBuffer, _numpy, _pil_image
+from .gif_encoder import GifEncoder, GifEncoderSettings
+
+
+@dataclass(slots=True)
+class _Overlay:
+    y0: int
+    x0: int
+    premultiplied: Any
+    inverse_alpha: Any
+    alpha: Any
+
+
+class FrameWatermarker:
+    def __init__(self, text: str = "Omni Ai", opacity: float = 1.0, cache_size: int = 16) -> None:
+        self.text = text
+        self.opacity = min(1.0, max(0.0, float(opacity)))
+        self.cache_size = max(1, int(cache_size))
+        self._cache: OrderedDict[tuple[int, int], _Overlay] = OrderedDict()
+        self._lock = threading.Lock()
+        self._stats = {"overlay_hits": 0, "overlay_builds": 0, "frames": 0}
+
+    @classmethod
+    def from_env(cls) -> "FrameWatermarker":
+        return cls(
+            text=str(os.getenv("OMNI_MEDIA_WATERMARK_TEXT", "Omni Ai")),
+            opacity=float(os.getenv("OMNI_MEDIA_WATERMARK_OPACITY", "1.0")),
+        )
+
+    def _render(self, width: int, height: int) -> _Overlay:
+        np = _numpy()
+        Image = _pil_image()
+        try:
+            ImageDraw = importlib.import_module("PIL.ImageDraw")
+        except Exception as exc:
+            raise RuntimeError("Pillow is required for watermark rendering") from exc
+
+        # Same placement as the original PIL watermark: bottom-right badge anchored 88x20 px from the corner.
+        x = max(8, width - 88)
+        y = max(8, height - 20)
+        x0, y0 = max(0, x - 4), max(0, y - 2)
+        x1, y1 = min(width, x + 73), min(height, y + 15)
+        patch = Image.new("RGBA", (x1 - x0, y1 - y0), (0, 0, 0, 0))
+        patch.alpha_composite(Image.new("RGBA", patch.size, (0, 0, 0, 96)))
+        layer = Image.new("RGBA", patch.size, (0, 0, 0, 0))
+        ImageDraw.Draw(layer).text((x - x0, y - y0), self.text, fill=(255, 255, 255, 220))
+        patch.alpha_composite(layer)
+
+        rgba = np.asarray(patch, dtype=np.uint16)
+        alpha = np.rint(rgba[..., 3:4] * self.opacity).astype(np.uint16)
+        return _Overlay(
+            y0=y0,
+            x0=x0,
+            premultiplied=rgba[..., :3] * alpha,
+            inverse_alpha=255 - alpha,
+            alpha=alpha.astype(np.uint8),
+        )
+
+    def overlay(self, width: int, height: int) -> _Overlay:
+        key = (int(width), int(height))
+        with self._lock:
+            cached = self._cache.get(key)
+            if cached is not None:
+                self._cache.move_to_end(key)
+                self._stats["overlay_hits"] += 1
+                return cached
+        built = self._render(*key)
+        with self._lock:
+            self._cache[key] = built
+            self._cache.move_to_end(key)
+            self._stats["overlay_builds"] += 1
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+        return built
+
+    def apply(self, frames: Any) -> Any:
+        np = _numpy()
+        batch = frames if frames.ndim == 4 else frames[None, ...]
+        if batch.ndim != 4 or batch.dtype != np.uint8:
+            raise ValueError("watermarking expects uint8 frames shaped (N, H, W, C)")
+        height, width, channels = batch.shape[1:]
+        overlay = self.overlay(width, height)
+        h, w = overlay.premultiplied.shape[:2]
+        region = batch[:, overlay.y0 : overlay.y0 + h, overlay.x0 : overlay.x0 + w]
+
+        if channels == 1:
+            weights = np.array([77, 150, 29], dtype=np.uint32)
+            luma = ((overlay.premultiplied.astype(np.uint32) * weights).sum(axis=2, keepdims=True) >> 8).astype(np.uint16)
+            blended = region.astype(np.uint16) * overlay.inverse_alpha + luma + 127
+        else:
+            blended = region[..., :3].astype(np.uint16) * overlay.inverse_alpha + overlay.premultiplied + 127
+        target = region if channels == 1 else region[..., :3]
+        target[...] = (blended // 255).astype(np.uint8)
+        if channels == 4:
+            np.maximum(region[..., 3:4], overlay.alpha, out=region[..., 3:4])
+
+        with self._lock:
+            self._stats["frames"] += batch.shape[0]
+        return frames
+
+    def apply_buffer(self, buffer: FrameBuffer) -> FrameBuffer:
+        self.apply(buffer.data)
+        return buffer
+
+    def apply_encoded(self, data: bytes) -> bytes | None:
+        np = _numpy()
+        Image = _pil_image()
+        source = Image.open(io.BytesIO(data))
+        image_format = source.format or "PNG"
+
+        if image_format == "GIF" and getattr(source, "n_frames", 1) > 1:
+            buffer = self.apply_buffer(decode_gif(data))
+            loop = int(source.info.get("loop", 0))
+            return GifEncoder(GifEncoderSettings(loop=loop)).encode(buffer)
+
+        if image_format not in {"PNG", "JPEG", "WEBP", "GIF"}:
+            return None
+        mode = "RGBA" if source.mode in {"RGBA", "LA", "P"} and image_format in {"PNG", "WEBP"} else "RGB"
+        frame = np.array(source.convert(mode))
+        self.apply(frame)
+        output = io.BytesIO()
+        params: dict[str, Any] = {}
+        if image_format in {"JPEG", "WEBP"}:
+            params["quality"] = 92
+        Image.fromarray(frame).save(output, format=image_format, **params)
+        return output.getvalue()
+
+    def snapshot(self) -> dict[str, Any]:
+        with self._lock:
+            return {**self._stats, "cached_resolutions": len(self._cache), "text": self.text}
@@ -1,13 +1,19 @@
 from __future__ import annotations
 
+import logging
+import os
 import queue
 import threading
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
 from dataclasses import dataclass
-from typing import Callable
+from typing import Any, Callable, Literal, Protocol
 
 from .contracts import GenerateRequest, GenerateResponse
 from .pipeline import OmniMediaPipeline
 
+logger = logging.getLogger(__name__)
 
 @dataclass(slots=True)
 class Job:
@@ -15,6 +21,38 @@ class Job:
     on_complete: Callable[[GenerateResponse], None]
 
 
+def _finish_job(job: Job, run: Callable[[GenerateRequest], GenerateResponse]) -> None:
+    # A failed run or completion handler must still leave a failed record behind, not a job stuck running.
+    try:
+        result = run(job.request)
+    except Exception as exc:
+        logger.exception("job %s failed", job.request.id)
+        result = GenerateResponse(id=job.request.id, status="failed", error=f"worker failed: {exc}")
+    try:
+        job.on_complete(result)
+    except Exception as exc:
+        logger.exception("completion handler for job %s failed", job.request.id)
+        if result.status == "failed":
+            return
+        try:
+            job.on_complete(
+                GenerateResponse(id=job.request.id, status="failed", error=f"could not record job result: {exc}")
+            )
+        except Exception:
+            logger.exception("could not record job %s as failed", job.request.id)
+
+
+class JobQueue(Protocol):
+    def enqueue(self, job: Job) -> None:
+        ...
+
+    def dequeue(self, timeout_sec: float = 1.0) -> Job | None:
+        ...
+
+    def size(self) -> int:
+        ...
+
+
 class InMemoryJobQueue:
     def __init__(self) -> None:
         self._queue: queue.Queue[Job] = queue.Queue()
@@ -33,7 +71,7 @@ class InMemoryJobQueue:
 
 
 class OmniMediaWorker:
-    def __init__(self, pipeline: OmniMediaPipeline, queue_backend: InMemoryJobQueue) -> None:
+    def __init__(self, pipeline: OmniMediaPipeline, queue_backend: JobQueue) -> None:
         self.pipeline = pipeline
         self.queue_backend = queue_backend
         self._stop_event = threading.Event()
@@ -55,11 +93,288 @@ class OmniMediaWorker:
     def is_running(self) -> bool:
         return bool(self._thread and self._thread.is_alive() and not self._stop_event.is_set())
 
+    def snapshot(self) -> dict[str, Any]:
+        return {"mode": "single", "pool_size": 1, "running": self.is_running()}
+
     def _run_loop(self) -> None:
         while not self._stop_event.is_set():
             job = self.queue_backend.dequeue(timeout_sec=0.5)
             if not job:
                 continue
 
-            result = self.pipeline.run(job.request)
-            job.on_complete(result)
+            _finish_job(job, self.pipeline.run)
+
+
+_PROCESS_PIPELINE: OmniMediaPipeline | None = None
+
+
+def _init_process_pipeline(pipeline_factory: Callable[[], OmniMediaPipeline]) -> None:
+    global _PROCESS_PIPELINE
+    _PROCESS_PIPELINE = pipeline_factory()
+
+
+def _run_in_process(request: GenerateRequest) -> GenerateResponse:
+    if _PROCESS_PIPELINE is None:
+        raise RuntimeError("worker process pipeline is not initialized")
+    return _PROCESS_PIPELINE.run(request)
+
+
+def _parse_limits(raw: str) -> dict[str, int]:
+    limits: dict[str, int] = {}
+    for item in str(raw or "").split(","):
+        key, sep, value = item.partition("=")
+        if not sep or not key.strip():
+            continue
+        try:
+            limits[key.strip()] = max(1, int(value))
+        except ValueError:
+            continue
+    return limits
+
+
+@dataclass(slots=True)
+class _WorkerSlot:
+    index: int
+    busy: bool = False
+    current_modality: str | None = None
+    current_profile: str | None = None
+    jobs_done: int = 0
+    busy_sec: float = 0.0
+
+
+class OmniMediaWorkerPool:
+    def __init__(
+        self,
+        pipeline: OmniMediaPipeline,
+        queue_backend: JobQueue,
+        workers: int = 4,
+        mode: Literal["thread", "process"] = "thread",
+        modality_limits: dict[str, int] | None = None,
+        profile_limits: dict[str, int] | None = None,
+        pipeline_factory: Callable[[], OmniMediaPipeline] | None = None,
+    ) -> None:
+        if mode not in {"thread", "process"}:
+            raise ValueError(f"Unsupported worker pool mode: {mode}")
+        self.pipeline = pipeline
+        self.queue_backend = queue_backend
+        self.workers = max(1, int(workers))
+        self.mode = mode
+        self.modality_limits = dict(modality_limits or {})
+        self.profile_limits = dict(profile_limits or {})
+        self.pipeline_factory = pipeline_factory or OmniMediaPipeline
+        self._stop_event = threading.Event()
+        self._cond = threading.Condition()
+        self._pending: deque[tuple[Job, str]] = deque()
+        # Ids of jobs claimed from the queue and not finished yet, waiting for admission or running.
+        self._held: set[str] = set()
+        self._active_modality: dict[str, int] = {}
+        self._active_profile: dict[str, int] = {}
+        self._slots = [_WorkerSlot(index=i) for i in range(self.workers)]
+        self._threads: list[threading.Thread] = []
+        self._process_executor: ProcessPoolExecutor | None = None
+        self._started_at = 0.0
+
+    @classmethod
+    def from_env(cls, pipeline: OmniMediaPipeline, queue_backend: JobQueue) -> "OmniMediaWorkerPool":
+        modality_limits = {"video": int(os.getenv("OMNI_MEDIA_WORKER_LIMIT_VIDEO", "2"))}
+        for modality in ("image", "gif"):
+            raw = os.getenv(f"OMNI_MEDIA_WORKER_LIMIT_{modality.upper()}", "").strip()
+            if raw:
+                modality_limits[modality] = int(raw)
+        mode = str(os.getenv("OMNI_MEDIA_WORKER_MODE", "thread")).strip().lower() or "thread"
+        return cls(
+            pipeline,
+            queue_backend,
+            workers=int(os.getenv("OMNI_MEDIA_WORKER_COUNT", "4")),
+            mode=mode,  # type: ignore[arg-type]
+            modality_limits=modality_limits,
+            profile_limits=_parse_limits(os.getenv("OMNI_MEDIA_WORKER_PROFILE_LIMITS", "")),
+        )
+
+    def start(self) -> None:
+        if self.is_running():
+            return
+
+        self._stop_event.clear()
+        self._started_at = time.monotonic()
+        if self.mode == "process":
+            self._process_executor = ProcessPoolExecutor(
+                max_workers=self.workers,
+                initializer=_init_process_pipeline,
+                initargs=(self.pipeline_factory,),
+            )
+
+        self._threads = [threading.Thread(target=self._dispatch_loop, daemon=True)]
+        # Durable queues lease jobs for visibility_timeout_sec; keep extending the leases of held jobs so a
+        # long generation or a wait for admission is not mistaken for a dead worker and handed out again.
+        visibility = getattr(self.queue_backend, "visibility_timeout_sec", None)
+        if visibility and hasattr(self.queue_backend, "extend_lease"):
+            self._threads.append(
+                threading.Thread(target=self._heartbeat_loop, args=(max(0.05, float(visibility) / 3),), daemon=True)
+            )
+        self._threads.extend(
+            threading.Thread(target=self._slot_loop, args=(slot,), daemon=True) for slot in self._slots
+        )
+        for thread in self._threads:
+            thread.start()
+
+    def stop(self) -> None:
+        self._stop_event.set()
+        with self._cond:
+            self._cond.notify_all()
+        for thread in self._threads:
+            thread.join(timeout=3)
+        with self._cond:
+            while self._pending:
+                job, _profile = self._pending.popleft()
+                self._held.discard(job.request.id)
+                self.queue_backend.enqueue(job)
+        if self._process_executor is not None:
+            self._process_executor.shutdown(wait=False, cancel_futures=True)
+            self._process_executor = None
+
+    def is_running(self) -> bool:
+        return bool(self._threads) and not self._stop_event.is_set() and all(t.is_alive() for t in self._threads)
+
+    def _profile_key(self, request: GenerateRequest) -> str:
+        try:
+            return self.pipeline.registry.select_for_request(request.modality, request.mode).key
+        except Exception:
+            return "unknown"
+
+    def _has_capacity(self) -> bool:
+        # Only take another job off the queue while an idle slot is left over for it. Jobs held back by a
+        # modality/profile cap do not use up idle slots, so the dispatcher keeps pulling past them to reach
+        # other work; at most `workers` of them are held at once so a capped backlog is not leased wholesale.
+        idle = sum(1 for slot in self._slots if not slot.busy)
+        active_modality = dict(self._active_modality)
+        active_profile = dict(self._active_profile)
+        admissible = blocked = 0
+        for job, profile_key in self._pending:
+            modality = str(job.request.modality)
+            if self._admissible(modality, profile_key, active_modality, active_profile):
+                admissible += 1
+                active_modality[modality] = active_modality.get(modality, 0) + 1
+                active_profile[profile_key] = active_profile.get(profile_key, 0) + 1
+            else:
+                blocked += 1
+        return admissible < idle and blocked < self.workers
+
+    def _dispatch_loop(self) -> None:
+        while not self._stop_event.is_set():
+            with self._cond:
+                while not self._stop_event.is_set() and not self._has_capacity():
+                    self._cond.wait(timeout=0.5)
+            if self._stop_event.is_set():
+                break
+            job = self.queue_backend.dequeue(timeout_sec=0.5)
+            if not job:
+                continue
+            profile_key = self._profile_key(job.request)
+            with self._cond:
+                if job.request.id in self._held:
+                    # The queue handed back a job this pool already holds (its lease lapsed); keep one copy.
+                    continue
+                self._held.add(job.request.id)
+                self._pending.append((job, profile_key))
+                self._cond.notify_all()
+
+    def _heartbeat_loop(self, interval_sec: float) -> None:
+        extend_lease = getattr(self.queue_backend, "extend_lease")
+        while not self._stop_event.wait(interval_sec):
+            with self._cond:
+                held = list(self._held)
+            for job_id in held:
+                try:
+                    extend_lease(job_id)
+                except Exception:
+                    logger.warning("could not extend the lease of job %s", job_id, exc_info=True)
+
+    def _admissible(
+        self,
+        modality: str,
+        profile_key: str,
+        active_modality: dict[str, int] | None = None,
+        active_profile: dict[str, int] | None = None,
+    ) -> bool:
+        active_modality = self._active_modality if active_modality is None else active_modality
+        active_profile = self._active_profile if active_profile is None else active_profile
+        modality_limit = self.modality_limits.get(modality)
+        if modality_limit is not None and active_modality.get(modality, 0) >= modality_limit:
+            return False
+        profile_limit = self.profile_limits.get(profile_key)
+        if profile_limit is not None and active_profile.get(profile_key, 0) >= profile_limit:
+            return False
+        return True
+
+    def _claim(self) -> tuple[Job, str] | None:
+        for position, (job, profile_key) in enumerate(self._pending):
+            modality = str(job.request.modality)
+            if self._admissible(modality, profile_key):
+                del self._pending[position]
+                self._active_modality[modality] = self._active_modality.get(modality, 0) + 1
+                self._active_profile[profile_key] = self._active_profile.get(profile_key, 0) + 1
+                return job, profile_key
+        return None
+
+    def _execute(self, request: GenerateRequest) -> GenerateResponse:
+        if self._process_executor is None:
+            return self.pipeline.run(request)
+        try:
+            return self._process_executor.submit(_run_in_process, request).result()
+        except Exception as exc:
+            return GenerateResponse(id=request.id, status="failed", error=f"worker process failed: {exc}")
+
+    def _slot_loop(self, slot: _WorkerSlot) -> None:
+        while not self._stop_event.is_set():
+            with self._cond:
+                claimed = self._claim()
+                if claimed is None:
+                    self._cond.wait(timeout=0.5)
+                    continue
+                job, profile_key = claimed
+                modality = str(job.request.modality)
+                slot.busy = True
+                slot.current_modality = modality
+                slot.current_profile = profile_key
+
+            started = time.monotonic()
+            try:
+                _finish_job(job, self._execute)
+            finally:
+                with self._cond:
+                    self._held.discard(job.request.id)
+                    self._active_modality[modality] -= 1
+                    self._active_profile[profile_key] -= 1
+                    slot.busy = False
+                    slot.current_modality = None
+                    slot.current_profile = None
+                    slot.jobs_done += 1
+                    slot.busy_sec += time.monotonic() - started
+                    self._cond.notify_all()
+
+    def snapshot(self) -> dict[str, Any]:
+        uptime = max(1e-6, time.monotonic() - self._started_at) if self._started_at else 0.0
+        with self._cond:
+            slots = [
+                {
+                    "index": slot.index,
+                    "busy": slot.busy,
+                    "modality": slot.current_modality,
+                    "profile": slot.current_profile,
+                    "jobs_done": slot.jobs_done,
+                    "utilization": round(min(1.0, slot.busy_sec / uptime), 4) if uptime else 0.0,
+                }
+                for slot in self._slots
+            ]
+            return {
+                "mode": self.mode,
+                "pool_size": self.workers,
+                "busy_workers": sum(1 for slot in self._slots if slot.busy),
+                "pending_admission": len(self._pending),
+                "modality_limits": dict(self.modality_limits),
+                "profile_limits": dict(self.profile_limits),
+                "active_by_modality": {k: v for k, v in self._active_modality.items() if v},
+                "active_by_profile": {k: v for k, v in self._active_profile.items() if v},
+                "slots": slots,
+            }